@@ -1,20 +1,60 @@
-from strands.models import BedrockModel
-from strands import Agent
-from utils.config import AWS_REGION, BEDROCK_MODEL_ID
+from utils.agent_pool import get_agent_template
+from utils.async_runtime import run_sync
 from tools.amenities_tools import check_nearby_amenities, get_restaurant_menu, place_food_order
 import json
 import asyncio
 
+SYSTEM_PROMPT = """You are an amenities specialist. Check what's available and 
+pre-order based on user preferences and charging duration. ONLY order items that the user 
+has specified in their preferences. If they don't want drinks or food, don't order them.
+
+NOTE: The amenities data is currently mocked for demo purposes. When you check nearby amenities,
+you'll get a standard list of restaurants (Starbucks, Subway, McDonald's). Just proceed with
+ordering from these options based on user preferences."""
+
 class AmenitiesAgent:
     def __init__(self):
-        self.model = BedrockModel(
-            model_id=BEDROCK_MODEL_ID,
-            region_name=AWS_REGION,
-            temperature=0.7
+        self.template = get_agent_template(
+            "amenities",
+            SYSTEM_PROMPT,
+            [check_nearby_amenities, get_restaurant_menu, place_food_order]
         )
     
-    def order_amenities(self, location: str, user_prefs: dict, charging_duration_min: int) -> dict:
+    @staticmethod
+    def wants_order(user_prefs: dict) -> bool:
+        """Whether the user's preferences call for a pre-order at all."""
+        favorite_drink = user_prefs.get('favorite_drink', 'Coffee')
+        favorite_food = user_prefs.get('favorite_food', '')
+        return bool(user_prefs.get('auto_order_coffee')) and not (
+            (not favorite_drink or favorite_drink == 'None') and (not favorite_food or favorite_food == 'None')
+        )
+    
+    async def prefetch_async(self, location: str) -> dict:
+        """
+        Look up the amenities near a charging location and their menus, without the LLM.
+        
+        Args:
+            location: Charging location (e.g., "Kettleman City, CA")
+        
+        Returns:
+            Dictionary with the 'location', its 'amenities' (check_nearby_amenities
+            result) and the 'menus' of its restaurants
+        """
+        amenities = json.loads(await asyncio.to_thread(check_nearby_amenities, location))
+        restaurants = amenities.get('restaurants', [])
+        menus = await asyncio.gather(*(asyncio.to_thread(get_restaurant_menu, name) for name in restaurants))
+        return {
+            "location": location,
+            "amenities": amenities,
+            "menus": {name: json.loads(menu) for name, menu in zip(restaurants, menus)}
+        }
+    
+    def order_amenities(self, location: str, user_prefs: dict, charging_duration_min: int, prefetched: dict = None) -> dict:
         """Synchronous wrapper for async order_amenities"""
+        return run_sync(self.order_amenities_async(location, user_prefs, charging_duration_min, prefetched))
+    
+    async def order_amenities_async(self, location: str, user_prefs: dict, charging_duration_min: int,
+                                    prefetched: dict = None) -> dict:
         if not user_prefs.get('auto_order_coffee'):
             print("\n⏭️  Amenities: Auto-order disabled by user")
             return {"order": None, "message": "Auto-order disabled", "tool_results": []}
@@ -27,9 +67,6 @@ class AmenitiesAgent:
             print("\n⏭️  Amenities: No food or drink preferences set (both are 'None')")
             return {"order": None, "message": "No food or drink preferences", "tool_results": []}
         
-        return asyncio.run(self.order_amenities_async(location, user_prefs, charging_duration_min))
-    
-    async def order_amenities_async(self, location: str, user_prefs: dict, charging_duration_min: int) -> dict:
         print(f"🍽️  Amenities Agent: Starting async order_amenities...")
         print(f"   Location: {location}")
         print(f"   Duration: {charging_duration_min} min")
@@ -38,14 +75,6 @@ class AmenitiesAgent:
         favorite_drink = user_prefs.get('favorite_drink', 'None')
         favorite_food = user_prefs.get('favorite_food', 'None')
         
-        system_prompt = """You are an amenities specialist. Check what's available and 
-pre-order based on user preferences and charging duration. ONLY order items that the user 
-has specified in their preferences. If they don't want drinks or food, don't order them.
-
-NOTE: The amenities data is currently mocked for demo purposes. When you check nearby amenities,
-you'll get a standard list of restaurants (Starbucks, Subway, McDonald's). Just proceed with
-ordering from these options based on user preferences."""
-        
         user_prompt = f"""
 Location: {location}
 Charging Duration: {charging_duration_min} minutes
@@ -65,47 +94,49 @@ User Preferences:"""
         else:
             user_prompt += "\n- Food: None (do NOT order food)"
         
-        user_prompt += f"\n\nCheck amenities and pre-order ONLY these items: {', '.join(items_to_order)}"
+        if prefetched:
+            # Looked up while the charging stop was negotiated: go straight to the order
+            user_prompt += f"\n\nNearby amenities (already checked): {json.dumps(prefetched['amenities'])}"
+            user_prompt += f"\nMenus (already fetched): {json.dumps(prefetched['menus'])}"
+            user_prompt += ("\n\nDo NOT call check_nearby_amenities or get_restaurant_menu again. "
+                            f"Pre-order ONLY these items: {', '.join(items_to_order)}")
+        else:
+            user_prompt += f"\n\nCheck amenities and pre-order ONLY these items: {', '.join(items_to_order)}"
         
         print(f"\n🍽️  Amenities Agent: Ordering {', '.join(items_to_order)}")
         
-        agent = Agent(
-            model=self.model,
-            system_prompt=system_prompt,
-            tools=[check_nearby_amenities, get_restaurant_menu, place_food_order]
-        )
-        
         response_text = ""
-        tool_results = []
+        tool_results = [prefetched['amenities'], *prefetched['menus'].values()] if prefetched else []
         
         print(f"🍽️  Amenities Agent: Starting Bedrock API stream...")
         
-        try:
-            async for event in agent.stream_async(user_prompt):
-                if isinstance(event, dict):
-                    if 'data' in event:
-                        response_text += str(event['data'])
-                    
-                    # Extract tool results from message
-                    if 'message' in event:
-                        message = event['message']
-                        if isinstance(message, dict) and 'content' in message:
-                            for content_block in message['content']:
-                                if isinstance(content_block, dict) and 'toolResult' in content_block:
-                                    tool_result = content_block['toolResult']
-                                    if 'content' in tool_result:
-                                        for content_item in tool_result['content']:
-                                            if 'text' in content_item:
-                                                try:
-                                                    result_json = json.loads(content_item['text'])
-                                                    tool_results.append(result_json)
-                                                except:
-                                                    pass
-        except Exception as e:
-            print(f"❌ Amenities Agent Error: {e}")
-            import traceback
-            traceback.print_exc()
-            response_text = f"Error: {str(e)}"
+        with self.template.checkout() as agent:
+            try:
+                async for event in agent.stream_async(user_prompt):
+                    if isinstance(event, dict):
+                        if 'data' in event:
+                            response_text += str(event['data'])
+                        
+                        # Extract tool results from message
+                        if 'message' in event:
+                            message = event['message']
+                            if isinstance(message, dict) and 'content' in message:
+                                for content_block in message['content']:
+                                    if isinstance(content_block, dict) and 'toolResult' in content_block:
+                                        tool_result = content_block['toolResult']
+                                        if 'content' in tool_result:
+                                            for content_item in tool_result['content']:
+                                                if 'text' in content_item:
+                                                    try:
+                                                        result_json = json.loads(content_item['text'])
+                                                        tool_results.append(result_json)
+                                                    except:
+                                                        pass
+            except Exception as e:
+                print(f"❌ Amenities Agent Error: {e}")
+                import traceback
+                traceback.print_exc()
+                response_text = f"Error: {str(e)}"
         
         print(f"🍽️  Amenities Agent: Completed with {len(tool_results)} tool results\n")
         
@@ -1,23 +1,68 @@
-from strands.models import BedrockModel
-from strands import Agent
-from utils.config import AWS_REGION, BEDROCK_MODEL_ID
-from tools.charging_tools import search_chargers, reserve_charging_slot, check_charger_status
+from utils.agent_pool import get_agent_template
+from utils.async_runtime import run_sync
+from utils.charging_session import DEFAULT_VEHICLE_MODEL
+from tools.charging_tools import (
+    plan_charging_stops_async,
+    search_chargers_async,
+    reserve_charging_slot,
+    check_charger_status,
+)
 import json
-import asyncio
+
+SYSTEM_PROMPT = """You are a charging negotiation specialist. A deterministic planner chooses 
+the charging stops; your job is to confirm its plan, reserve the first stop and explain the plan.
+
+IMPORTANT: 
+1. Call plan_charging_stops with the ORIGIN, DESTINATION, BATTERY_PERCENT and VEHICLE_RANGE_MILES
+2. If the plan is "feasible" with "stops", DO NOT pick different stations or reorder them:
+   - Reserve the FIRST stop with reserve_charging_slot, using its station_id, a slot from its "slots"
+     (or an estimated arrival time), its location, its network and its charge_minutes as duration_min
+   - Narrate every stop in order: location, network, arrival and departure charge, charging time
+   - Finish with the totals (charging time, trip time, cost) and the arrival charge at the destination
+3. If the plan is "feasible" with no stops, tell the user no charging is needed on this trip
+4. If the plan is not feasible, call search_chargers with the ORIGIN, DESTINATION, and CURRENT_RANGE_MILES.
+   It only returns stations you can actually reach with your current battery
+5. If the search response contains an "error" field with "insufficient_range":
+   - DO NOT try to reserve a station
+   - Inform the user they need to charge at home first
+   - Show them which stations they could reach if fully charged (from "stations_if_fully_charged")
+   - Recommend charging to 100% before departure
+6. If the search finds stations, reserve the best one and include:
+   - charger_id: from the search results
+   - time_slot: pick from available slots
+   - location: the location field from the charger
+   - network: the network field from the charger (e.g., "Tesla Supercharger", "EVgo")
+
+Example responses:
+- If insufficient range: "⚠️ Your current battery (35%, 105 miles) cannot reach any charging stations on this route. Please charge to 100% at home before departure. Once fully charged, your first stop would be: Tesla Supercharger at Lost Hills, CA (134 miles away)."
+- If the plan has stops: plan_charging_stops() then reserve_charging_slot(charger_id="OCM-12345", time_slot="10:00", duration_min=22, location="Kettleman City, CA", network="Tesla Supercharger"), then "Stop 1: Kettleman City, CA (Tesla Supercharger), arrive 18%, charge 22 min to 65%..."
+- If the plan is not feasible: search_chargers() then reserve_charging_slot(charger_id="OCM-12345", time_slot="10:00", location="Kettleman City, CA", network="Tesla Supercharger")"""
 
 class ChargingNegotiationAgent:
     def __init__(self):
-        self.model = BedrockModel(
-            model_id=BEDROCK_MODEL_ID,
-            region_name=AWS_REGION,
-            temperature=0.7
+        self.template = get_agent_template(
+            "charging_negotiation",
+            SYSTEM_PROMPT,
+            [plan_charging_stops_async, search_chargers_async, reserve_charging_slot, check_charger_status]
         )
     
-    def find_and_reserve(self, trip_data: dict, preferences: dict = None) -> dict:
+    def find_and_reserve(self, trip_data: dict, preferences: dict = None, charging_plan: dict = None) -> dict:
         """Synchronous wrapper for async find_and_reserve"""
-        return asyncio.run(self.find_and_reserve_async(trip_data, preferences))
+        return run_sync(self.find_and_reserve_async(trip_data, preferences, charging_plan))
     
-    async def find_and_reserve_async(self, trip_data: dict, preferences: dict = None) -> dict:
+    async def find_and_reserve_async(self, trip_data: dict, preferences: dict = None, charging_plan: dict = None) -> dict:
+        """
+        Plan the charging stops and reserve the first one.
+        
+        Args:
+            trip_data: Trip 'origin' and 'destination', with the 'vehicle_data' embedded
+            preferences: User preferences
+            charging_plan: Feasible plan already computed for this trip (e.g. from a
+                           plan skeleton); the agent reserves from it instead of planning
+        
+        Returns:
+            'reservation' text and 'tool_results' (the given plan first, if any)
+        """
         origin = trip_data.get('origin', 'Unknown')
         destination = trip_data.get('destination', 'Unknown')
         
@@ -25,76 +70,69 @@ class ChargingNegotiationAgent:
         vehicle_data = trip_data.get('vehicle_data', {})
         battery_percent = vehicle_data.get('battery_percent', 100)
         vehicle_range = vehicle_data.get('range_miles', 300)
+        vehicle_model = vehicle_data.get('model', DEFAULT_VEHICLE_MODEL)
         current_range = int((battery_percent / 100) * vehicle_range)
         
-        system_prompt = """You are a charging negotiation specialist. Find the best charger 
-based on price, speed, location, and availability. Reserve the optimal slot.
+        if charging_plan is not None:
+            user_prompt = f"""
+Trip: {origin} → {destination}
+Current Battery: {battery_percent}% ({current_range} miles range)
+User Preferences: {preferences or 'Prioritize speed and convenience'}
 
-IMPORTANT: 
-1. Call search_chargers with the ORIGIN, DESTINATION, and CURRENT_RANGE_MILES
-2. The system will only return stations you can actually reach with your current battery
-3. If the response contains an "error" field with "insufficient_range":
-   - DO NOT try to reserve a station
-   - Inform the user they need to charge at home first
-   - Show them which stations they could reach if fully charged (from "stations_if_fully_charged")
-   - Recommend charging to 100% before departure
-4. If stations are found, reserve the best one and include:
-   - charger_id: from the search results
-   - time_slot: pick from available slots
-   - location: the location field from the charger
-   - network: the network field from the charger (e.g., "Tesla Supercharger", "EVgo")
+The charging plan for this trip has already been computed (do NOT call plan_charging_stops):
+{json.dumps(charging_plan)}
 
-Example responses:
-- If insufficient range: "⚠️ Your current battery (35%, 105 miles) cannot reach any charging stations on this route. Please charge to 100% at home before departure. Once fully charged, your first stop would be: Tesla Supercharger at Lost Hills, CA (134 miles away)."
-- If stations found: search_chargers() then reserve_charging_slot(charger_id="OCM-12345", time_slot="10:00", location="Kettleman City, CA", network="Tesla Supercharger")"""
-        
-        user_prompt = f"""
+Reserve its first stop (charger_id, time_slot, duration_min, location, network) and narrate the stops in order.
+If it has no stops, tell the user no charging is needed on this trip."""
+        else:
+            user_prompt = f"""
 Trip: {origin} → {destination}
 Current Battery: {battery_percent}% ({current_range} miles range)
 User Preferences: {preferences or 'Prioritize speed and convenience'}
 
-CRITICAL: First call search_chargers(route="{origin}", destination="{destination}", min_power_kw=150, current_range_miles={current_range})
+CRITICAL: First call plan_charging_stops(route="{origin}", destination="{destination}", battery_percent={battery_percent}, vehicle_range_miles={vehicle_range}, min_power_kw=150, vehicle_model="{vehicle_model}")
+
+If the plan is feasible:
+- Reserve its first stop (charger_id, time_slot, duration_min, location, network) and narrate the stops in order
+
+If the plan is not feasible, call search_chargers(route="{origin}", destination="{destination}", min_power_kw=150, current_range_miles={current_range})
 
 If the response contains "error": "insufficient_range":
 - DO NOT attempt to reserve
 - Explain to the user they need to charge at home first
 - Mention the stations they could reach if fully charged
 
-If stations are found:
+If the search finds stations:
 - Reserve the best one with all required parameters (charger_id, time_slot, location, network)"""
         
-        agent = Agent(
-            model=self.model,
-            system_prompt=system_prompt,
-            tools=[search_chargers, reserve_charging_slot, check_charger_status]
-        )
-        
         response_text = ""
-        tool_results = []
+        # The outcome is read from the tool results, so a given plan goes first as if it had been called
+        tool_results = [charging_plan] if charging_plan is not None else []
         
-        try:
-            async for event in agent.stream_async(user_prompt):
-                if isinstance(event, dict):
-                    if 'data' in event:
-                        response_text += str(event['data'])
-                    
-                    # Extract tool results from message
-                    if 'message' in event:
-                        message = event['message']
-                        if isinstance(message, dict) and 'content' in message:
-                            for content_block in message['content']:
-                                if isinstance(content_block, dict) and 'toolResult' in content_block:
-                                    tool_result = content_block['toolResult']
-                                    if 'content' in tool_result:
-                                        for content_item in tool_result['content']:
-                                            if 'text' in content_item:
-                                                try:
-                                                    result_json = json.loads(content_item['text'])
-                                                    tool_results.append(result_json)
-                                                except:
-                                                    pass
-        except Exception as e:
-            response_text = f"Error: {str(e)}"
+        with self.template.checkout() as agent:
+            try:
+                async for event in agent.stream_async(user_prompt):
+                    if isinstance(event, dict):
+                        if 'data' in event:
+                            response_text += str(event['data'])
+                        
+                        # Extract tool results from message
+                        if 'message' in event:
+                            message = event['message']
+                            if isinstance(message, dict) and 'content' in message:
+                                for content_block in message['content']:
+                                    if isinstance(content_block, dict) and 'toolResult' in content_block:
+                                        tool_result = content_block['toolResult']
+                                        if 'content' in tool_result:
+                                            for content_item in tool_result['content']:
+                                                if 'text' in content_item:
+                                                    try:
+                                                        result_json = json.loads(content_item['text'])
+                                                        tool_results.append(result_json)
+                                                    except:
+                                                        pass
+            except Exception as e:
+                response_text = f"Error: {str(e)}"
         
         return {
             "reservation": response_text,
@@ -1,9 +1,15 @@
-from utils.config import AWS_REGION, BEDROCK_MODEL_ID, USE_MOCK_DATA
+import asyncio
+from typing import Optional
+from utils.config import AWS_REGION, BEDROCK_MODEL_ID, USE_MOCK_DATA, TRIP_PLANNING_MODE, TRIP_NARRATIVE_ENABLED
 from agents.trip_planning import TripPlanningAgent
 from agents.charging_negotiation import ChargingNegotiationAgent
 from agents.amenities import AmenitiesAgent
 from agents.payment import PaymentAgent
 from agents.monitoring import MonitoringAgent
+from utils.charging_planner import replan_from_charge
+from utils.charging_session import DEFAULT_VEHICLE_MODEL, StationIndex, estimate_reserved_session, get_charging_curve
+from utils.async_runtime import run_sync
+from utils.task_graph import TaskGraph
 
 class CoordinatorAgent:
     def __init__(self):
@@ -16,9 +22,30 @@ class CoordinatorAgent:
         
         # Coordinator doesn't need its own agent - it orchestrates other agents
     
-    def orchestrate(self, vehicle_data: dict, trip_data: dict, user_prefs: dict) -> dict:
-        results = {}
-        
+    def orchestrate(self, vehicle_data: dict, trip_data: dict, user_prefs: dict, plan_skeleton: Optional[dict] = None) -> dict:
+        """Synchronous wrapper for async orchestrate (runs on the shared event loop)"""
+        return run_sync(self.orchestrate_async(vehicle_data, trip_data, user_prefs, plan_skeleton))
+    
+    async def orchestrate_async(
+        self,
+        vehicle_data: dict,
+        trip_data: dict,
+        user_prefs: dict,
+        plan_skeleton: Optional[dict] = None
+    ) -> dict:
+        """
+        Run the agents for a trip.
+        
+        Args:
+            vehicle_data: Vehicle 'model', 'battery_percent' and 'range_miles'
+            trip_data: Trip 'origin', 'destination' and 'distance_miles'
+            user_prefs: Wallet and amenity preferences
+            plan_skeleton: Precomputed plan of this trip (see utils.plan_cache); its route
+                           and charging plan are reused instead of being computed again
+        
+        Returns:
+            Summary, per-agent results and the energy analysis
+        """
         print("\n" + "="*70)
         print("🎯 COORDINATOR: Starting orchestration")
         print("="*70)
@@ -28,18 +55,185 @@ class CoordinatorAgent:
         print(f"🍽️  Preferences: drink={user_prefs.get('favorite_drink')}, food={user_prefs.get('favorite_food')}")
         print("="*70 + "\n")
         
+        graph = self._build_graph(vehicle_data, trip_data, user_prefs, plan_skeleton)
+        steps = await graph.run()
+        critical_path = graph.critical_path()
+        print(f"⏱️  Critical path: {' → '.join(critical_path)} "
+              f"({graph.timings[critical_path[-1]].finished:.1f}s)\n")
+        
+        return self._assemble(vehicle_data, steps)
+    
+    def _build_graph(self, vehicle_data: dict, trip_data: dict, user_prefs: dict, plan_skeleton: Optional[dict] = None) -> TaskGraph:
+        """
+        Orchestration steps and their dependencies.
+        
+        The critical path is trip plan → charging → amenities → payments; the
+        wallet check, the trip narrative and the amenities lookup at the likeliest
+        charging stop run beside it.
+        """
+        wallet_id = user_prefs.get('wallet_id', 'default')
+        skeleton_plan = self._skeleton_plan(plan_skeleton, vehicle_data)
+        graph = TaskGraph()
+        
         # Step 1: Trip Planning
-        print("🗺️  STEP 1: Trip Planning Agent...")
-        trip_plan = self.trip_agent.analyze(vehicle_data, trip_data)
-        print("✅ Trip Planning complete\n")
-        results['trip_plan'] = trip_plan
+        async def plan_trip(_):
+            if plan_skeleton is not None:
+                # Route from the precomputed plan; the energy check is redone for the actual charge
+                print("🗺️  STEP 1: Trip Planning (precomputed plan)...")
+                trip_plan = await self.trip_agent.analyze_direct_async(vehicle_data, trip_data, route=plan_skeleton['route'])
+            elif TRIP_PLANNING_MODE == 'direct':
+                # Energy and route are deterministic: compute them here, the LLM only narrates (optionally)
+                print("🗺️  STEP 1: Trip Planning (direct)...")
+                trip_plan = await self.trip_agent.analyze_direct_async(vehicle_data, trip_data)
+            else:
+                print("🗺️  STEP 1: Trip Planning Agent...")
+                trip_plan = await self.trip_agent.analyze_async(vehicle_data, trip_data)
+            print("✅ Trip Planning complete\n")
+            return trip_plan
+        
+        async def narrate_trip(deps):
+            trip_plan = deps['trip_plan']
+            if not TRIP_NARRATIVE_ENABLED or 'energy' not in trip_plan:
+                return None
+            # Only the summary shows the narrative, so charging doesn't wait for it
+            return await self.trip_agent.narrate_async(vehicle_data, trip_data, trip_plan['energy'], trip_plan['route'])
+        
+        async def check_energy(deps):
+            return self._energy_result(deps['trip_plan'])
+        
+        async def validate_wallet(deps):
+            # Only a trip that needs charging pays for anything; it runs beside the negotiation
+            energy_result = deps['energy']
+            if not (energy_result and energy_result.get('needs_charging')):
+                return None
+            try:
+                return await asyncio.to_thread(self.payment_agent.validate_user_wallet, wallet_id)
+            except Exception as e:
+                print(f"⚠️  Wallet pre-validation failed: {e}")
+                return None
+        
+        # Step 2: Charging Negotiation
+        async def negotiate_charging(deps):
+            energy_result = deps['energy']
+            if not (energy_result and energy_result.get('needs_charging')):
+                print("⏭️  Skipping charging, amenities, and payment\n")
+                return None
+            print("⚡ STEP 2: Charging Negotiation Agent...")
+            print(f"   Origin: {trip_data['origin']}")
+            print(f"   Destination: {trip_data['destination']}")
+            print(f"   Current range: {int((vehicle_data['battery_percent']/100) * vehicle_data['range_miles'])} miles")
+            # Pass trip_data with vehicle_data embedded for range calculation
+            trip_data_with_vehicle = {**trip_data, 'vehicle_data': vehicle_data}
+            charging_result = await self.charging_agent.find_and_reserve_async(trip_data_with_vehicle, user_prefs, skeleton_plan)
+            print("✅ Charging negotiation complete")
+            print(f"   Tool results: {len(charging_result.get('tool_results', []))} results\n")
+            return charging_result
+        
+        async def find_top_station(deps):
+            energy_result = deps['energy']
+            if not (energy_result and energy_result.get('needs_charging')):
+                return None
+            # The top station only feeds the amenities prefetch, so don't search without an order
+            if not self.amenities_agent.wants_order(user_prefs):
+                return None
+            if skeleton_plan is not None:
+                stops = skeleton_plan.get('stops') or []
+                return {"id": stops[0]['station_id'], "location": stops[0]['location']} if stops else None
+            try:
+                return await self._top_station(vehicle_data, trip_data)
+            except Exception as e:
+                print(f"⚠️  Could not rank charging stations ahead of the negotiation: {e}")
+                return None
+        
+        async def prefetch_amenities(deps):
+            station = deps['top_station']
+            if station is None or not station.get('location'):
+                return None
+            # Speculative: kept only if the reservation lands at this station
+            prefetched = await self.amenities_agent.prefetch_async(station['location'])
+            print(f"🔮 Prefetched amenities at {station['location']}")
+            return {**prefetched, "station_id": station.get('id')}
+        
+        async def read_charging_outcome(deps):
+            if deps['charging'] is None:
+                return None
+            return await self._charging_outcome(deps['charging'], trip_data)
+        
+        # Step 3: Amenities at the charging stop
+        async def order_amenities(deps):
+            outcome = deps['charging_outcome']
+            if outcome is None:
+                return None
+            prefetched = deps['amenities_prefetch']
+            if prefetched is not None:
+                if outcome['status'] == 'reserved' and self._same_station(prefetched, outcome):
+                    print(f"♻️  Using amenities prefetched at {prefetched['location']}")
+                else:
+                    print(f"🗑️  Discarding amenities prefetched at {prefetched['location']}")
+                    prefetched = None
+            if outcome['status'] == 'not_needed':
+                return None
+            if outcome['status'] == 'insufficient_range':
+                if not outcome['recommended_stations']:
+                    print("   No stations found even with full charge\n")
+                    return None
+                print(f"   Planning amenities at first stop: {outcome['location']}\n")
+                print("🍽️  STEP 3: Amenities Agent...")
+            elif outcome['status'] == 'failed':
+                print("\n⚠️  WARNING: Charging reservation failed!")
+                print("   No chargers were found or reserved.")
+                print("   Continuing with amenities only...\n")
+            else:
+                print("🍽️  STEP 3: Amenities Agent...")
+                print(f"   Location: {outcome['location']}")
+                print(f"   Duration: {outcome['duration']} min")
+                print(f"   Preferences: drink={user_prefs.get('favorite_drink')}, food={user_prefs.get('favorite_food')}")
+            amenities_result = await self.amenities_agent.order_amenities_async(
+                outcome['location'], user_prefs, outcome['duration'], prefetched
+            )
+            if outcome['status'] != 'failed':
+                print("✅ Amenities complete\n")
+            return amenities_result
         
-        # Check if charging needed by parsing actual tool results
+        # Step 4: Payment
+        async def process_payments(deps):
+            outcome = deps['charging_outcome']
+            if outcome is None or outcome['status'] == 'not_needed':
+                return None
+            amenities_result = deps['amenities'] or {}
+            if outcome['status'] == 'reserved':
+                transactions = self._collect_transactions(deps['charging'], amenities_result, vehicle_data)
+            else:
+                transactions = self._amenities_transactions(amenities_result)
+            if not transactions:
+                if outcome['status'] == 'reserved':
+                    print("⚠️  No transactions to process\n")
+                return None
+            
+            print(f"\n💳 Calling Payment Agent with {len(transactions)} transactions...")
+            payment_result = await self.payment_agent.process_payments_async(transactions, wallet_id, deps['wallet'])
+            print("✅ Payment processing complete\n")
+            return payment_result
+        
+        graph.add('trip_plan', plan_trip)
+        graph.add('narrative', narrate_trip, deps=['trip_plan'])
+        graph.add('energy', check_energy, deps=['trip_plan'])
+        graph.add('wallet', validate_wallet, deps=['energy'])
+        graph.add('charging', negotiate_charging, deps=['energy'])
+        graph.add('top_station', find_top_station, deps=['energy'])
+        graph.add('amenities_prefetch', prefetch_amenities, deps=['top_station'])
+        graph.add('charging_outcome', read_charging_outcome, deps=['charging'])
+        graph.add('amenities', order_amenities, deps=['charging_outcome', 'amenities_prefetch'])
+        graph.add('payments', process_payments, deps=['charging', 'charging_outcome', 'amenities', 'wallet'])
+        return graph
+    
+    def _energy_result(self, trip_plan: dict):
+        """Energy analysis of a trip plan (direct mode carries it, agent mode has it among the tool results)."""
         print("⚡ STEP 2: Checking if charging needed...")
-        needs_charging = False
-        energy_result = None
+        energy_result = trip_plan.get('energy')
+        needs_charging = bool(energy_result and energy_result.get('needs_charging'))
         
-        for tool_result in trip_plan.get('tool_results', []):
+        for tool_result in [] if energy_result else trip_plan.get('tool_results', []):
             if isinstance(tool_result, dict):
                 # Check if this is the energy calculation result
                 if 'needs_charging' in tool_result:
@@ -53,32 +247,24 @@ class CoordinatorAgent:
             print(f"   Required battery: {energy_result.get('required_battery')}%")
             print(f"   Deficit: {energy_result.get('deficit_percent')}%")
         print()
-        
-        if not needs_charging:
-            print("⏭️  Skipping charging, amenities, and payment\n")
-            battery_pct = vehicle_data.get('battery_percent', 0)
-            range_mi = vehicle_data.get('range_miles', 0)
-            return {
-                "summary": f"✅ No charging needed! Your {battery_pct}% battery ({range_mi} mi range) is sufficient for this trip.",
-                "results": results,
-                "energy_analysis": energy_result
-            }
-        
-        # Step 2: Charging Negotiation
-        print("⚡ STEP 2: Charging Negotiation Agent...")
-        print(f"   Origin: {trip_data['origin']}")
-        print(f"   Destination: {trip_data['destination']}")
-        print(f"   Current range: {int((vehicle_data['battery_percent']/100) * vehicle_data['range_miles'])} miles")
-        # Pass trip_data with vehicle_data embedded for range calculation
-        trip_data_with_vehicle = {**trip_data, 'vehicle_data': vehicle_data}
-        charging_result = self.charging_agent.find_and_reserve(trip_data_with_vehicle, user_prefs)
-        print("✅ Charging negotiation complete")
-        print(f"   Tool results: {len(charging_result.get('tool_results', []))} results\n")
-        results['charging'] = charging_result
-        
+        return energy_result
+    
+    async def _charging_outcome(self, charging_result: dict, trip_data: dict) -> dict:
+        """
+        Read the charging negotiation's outcome.
+        
+        Returns:
+            Dictionary with 'status' ("reserved", "insufficient_range", "not_needed"
+            when the charging plan reaches the destination without stops, or
+            "failed"), the charging 'location' and 'duration', the insufficient
+            range 'message', the 'recommended_stations' for a full battery and
+            the planned 'arrival_soc_percent' at the destination
+        """
         # Check if charging was successful or if there's an insufficient range error
         charging_successful = False
         insufficient_range = False
+        charger_id = None
+        plan_without_stops = None
         charger_location = "charging location"
         charging_duration = 30
         insufficient_range_message = ""
@@ -107,9 +293,14 @@ class CoordinatorAgent:
                     if 'stations_if_fully_charged' in r:
                         recommended_stations = r['stations_if_fully_charged']
                         print(f"   DEBUG: Extracted {len(recommended_stations)} recommended stations")
-                    
+                
+                # A feasible plan without stops: the trip needs no charging after all
+                if r.get('feasible') is True and r.get('stops') == []:
+                    plan_without_stops = r
+                
                 if 'reservation_id' in r:
                     charging_successful = True
+                    charger_id = r.get('charger_id')
                 if 'location' in r:
                     charger_location = r['location']
                 if 'duration_min' in r:
@@ -122,11 +313,12 @@ class CoordinatorAgent:
             print("   Recommendation: Charge to 100% at home before departure")
             
             # If we don't have recommended stations, query for them now
+            # (served from the corridor the charging agent's search already fetched)
             if not recommended_stations:
                 print("   Querying for stations with full battery...")
-                from tools.charging_tools import search_chargers
+                from tools.charging_tools import search_chargers_async
                 import json
-                full_battery_result = search_chargers(
+                full_battery_result = await search_chargers_async(
                     trip_data['origin'],
                     trip_data['destination'],
                     min_power_kw=150,
@@ -140,115 +332,102 @@ class CoordinatorAgent:
                 print(f"   Found {len(recommended_stations)} stations for full battery")
             
             # If we have recommended stations, use the first one for amenities planning
-            if recommended_stations and len(recommended_stations) > 0:
-                first_station = recommended_stations[0]
-                charger_location = first_station.get('location', 'charging location')
-                print(f"   Planning amenities at first stop: {charger_location}\n")
-                
-                # Step 3: Amenities at the first charging stop
-                print("🍽️  STEP 3: Amenities Agent...")
-                amenities_result = self.amenities_agent.order_amenities(
-                    charger_location, user_prefs, charging_duration
-                )
-                print("✅ Amenities complete\n")
-                results['amenities'] = amenities_result
-                
-                # Step 4: Payment
-                print("💳 STEP 4: Payment Agent...")
-                transactions = []
-                for r in amenities_result.get('tool_results', []):
-                    if isinstance(r, dict) and 'total_usd' in r:
-                        transactions.append({
-                            "amount": r['total_usd'],
-                            "merchant": r.get('restaurant', 'Food vendor'),
-                            "description": f"Pre-order: {', '.join(r.get('items', []))}"
-                        })
-                
-                if transactions:
-                    payment_result = self.payment_agent.process_payments(
-                        transactions, user_prefs.get('wallet_id', 'default')
-                    )
-                    print("✅ Payment complete\n")
-                    results['payments'] = payment_result
-                
-                # Generate summary with insufficient range warning + planned amenities
-                summary = self._generate_summary_with_insufficient_range(
-                    results, 
-                    insufficient_range_message,
-                    recommended_stations
-                )
-                
-                return {
-                    "summary": summary,
-                    "results": results,
-                    "insufficient_range": True
-                }
-            else:
-                # No stations available even with full charge
-                print("   No stations found even with full charge\n")
-                
-                summary_parts = [
-                    "⚠️ **Insufficient Battery Range**\n",
-                    insufficient_range_message[:500],
-                    "\n\n**Recommendation:** Charge to 100% at home before starting your trip."
-                ]
-                
-                return {
-                    "summary": "".join(summary_parts),
-                    "results": results,
-                    "insufficient_range": True
-                }
-        
-        # If charging failed for other reasons, continue with amenities
-        if not charging_successful:
-            print("\n⚠️  WARNING: Charging reservation failed!")
-            print("   No chargers were found or reserved.")
-            print("   Continuing with amenities only...\n")
-            
-            # Still try amenities even if charging failed
-            amenities_result = self.amenities_agent.order_amenities(
-                charger_location, user_prefs, charging_duration
-            )
-            results['amenities'] = amenities_result
-            
-            # Process amenities payments only
-            transactions = []
-            for r in amenities_result.get('tool_results', []):
-                if isinstance(r, dict) and 'total_usd' in r:
-                    transactions.append({
-                        "amount": r['total_usd'],
-                        "merchant": r.get('restaurant', 'Food vendor'),
-                        "description": f"Pre-order: {', '.join(r.get('items', []))}"
-                    })
-            
-            if transactions:
-                payment_result = self.payment_agent.process_payments(
-                    transactions, user_prefs.get('wallet_id', 'default')
-                )
-                results['payments'] = payment_result
-            
-            # Generate summary with charging failure notice
-            summary = self._generate_summary(results)
-            charging_failure_notice = "\n\n⚠️ **Charging Reservation Failed**\nNo chargers were found or reserved for this trip. Please manually search for charging options."
-            
-            return {
-                "summary": summary + charging_failure_notice,
-                "results": results,
-                "charging_failed": True
-            }
+            if recommended_stations:
+                charger_location = recommended_stations[0].get('location', 'charging location')
         
-        # Step 3: Amenities
-        print("🍽️  STEP 3: Amenities Agent...")
-        print(f"   Location: {charger_location}")
-        print(f"   Duration: {charging_duration} min")
-        print(f"   Preferences: drink={user_prefs.get('favorite_drink')}, food={user_prefs.get('favorite_food')}")
-        amenities_result = self.amenities_agent.order_amenities(
-            charger_location, user_prefs, charging_duration
-        )
-        print("✅ Amenities complete\n")
-        results['amenities'] = amenities_result
-        
-        # Step 4: Payment
+        if insufficient_range:
+            status = 'insufficient_range'
+        elif charging_successful:
+            status = 'reserved'
+        elif plan_without_stops is not None:
+            status = 'not_needed'
+        else:
+            status = 'failed'
+        return {
+            "status": status,
+            "charger_id": charger_id,
+            "location": charger_location,
+            "duration": charging_duration,
+            "message": insufficient_range_message,
+            "recommended_stations": recommended_stations,
+            "arrival_soc_percent": plan_without_stops.get('arrival_soc_percent') if plan_without_stops else None
+        }
+    
+    @staticmethod
+    def _skeleton_plan(plan_skeleton: Optional[dict], vehicle_data: dict) -> Optional[dict]:
+        """
+        The skeleton's charging plan redone for the vehicle's actual charge, if it can be reused.
+        
+        Skeletons are planned at the bottom of their battery bucket, so a feasible
+        plan also works from the actual charge; its arrival charges, charging times
+        and costs are recomputed from it. A plan for another vehicle's charging
+        curve, or an infeasible one, is left to the charging agent to redo.
+        """
+        if plan_skeleton is None or not plan_skeleton['charging_plan'].get('feasible'):
+            return None
+        vehicle_model = vehicle_data.get('model', DEFAULT_VEHICLE_MODEL)
+        if get_charging_curve(vehicle_model).model != get_charging_curve(plan_skeleton.get('vehicle_model')).model:
+            return None
+        battery_percent = vehicle_data.get('battery_percent', 100)
+        if battery_percent < plan_skeleton['battery_percent']:
+            return None
+        return replan_from_charge(plan_skeleton['charging_plan'], plan_skeleton['battery_percent'], battery_percent, vehicle_model)
+    
+    async def _top_station(self, vehicle_data: dict, trip_data: dict) -> Optional[dict]:
+        """
+        The station the charging agent will most likely reserve, found with the
+        tools it is told to call first: the plan's first stop, or else the best
+        station in range.
+        
+        Returns:
+            Station 'id' and 'location', or None if no stop is expected
+        """
+        from tools.charging_tools import plan_charging_stops_async, search_chargers_async
+        import json
+        battery_percent = vehicle_data.get('battery_percent', 100)
+        vehicle_range = vehicle_data.get('range_miles', 300)
+        plan = json.loads(await plan_charging_stops_async(
+            trip_data['origin'],
+            trip_data['destination'],
+            battery_percent=battery_percent,
+            vehicle_range_miles=vehicle_range,
+            min_power_kw=150,
+            vehicle_model=vehicle_data.get('model', DEFAULT_VEHICLE_MODEL)
+        ))
+        if plan.get('feasible'):
+            stops = plan.get('stops') or []
+            return {"id": stops[0]['station_id'], "location": stops[0]['location']} if stops else None
+        
+        found = json.loads(await search_chargers_async(
+            trip_data['origin'],
+            trip_data['destination'],
+            min_power_kw=150,
+            current_range_miles=int((battery_percent / 100) * vehicle_range)
+        ))
+        if isinstance(found, list) and found:
+            return {"id": found[0].get('id'), "location": found[0].get('location')}
+        return None
+    
+    @staticmethod
+    def _same_station(prefetched: dict, outcome: dict) -> bool:
+        if prefetched.get('station_id') and outcome.get('charger_id'):
+            return prefetched['station_id'] == outcome['charger_id']
+        return (prefetched.get('location') or '').strip().lower() == (outcome.get('location') or '').strip().lower()
+    
+    @staticmethod
+    def _amenities_transactions(amenities_result: dict) -> list:
+        transactions = []
+        for r in amenities_result.get('tool_results', []):
+            if isinstance(r, dict) and 'total_usd' in r:
+                transactions.append({
+                    "amount": r['total_usd'],
+                    "merchant": r.get('restaurant', 'Food vendor'),
+                    "description": f"Pre-order: {', '.join(r.get('items', []))}"
+                })
+        return transactions
+    
+    def _collect_transactions(self, charging_result: dict, amenities_result: dict, vehicle_data: dict) -> list:
+        """Charging sessions and amenities orders to pay for."""
         print("💳 STEP 4: Payment Processing...")
         print("="*70)
         print("🔍 COORDINATOR: Collecting payments")
@@ -259,67 +438,101 @@ class CoordinatorAgent:
         # Collect charging payments
         print("⚡ Collecting charging payments...")
         charging_payments_found = 0
-        for r in charging_result.get('tool_results', []):
-            if isinstance(r, dict):
-                # Check if this is a reservation with cost
-                if 'reservation_id' in r:
-                    # Get charger details from search results
-                    charger_id = r.get('charger_id')
-                    duration_min = r.get('duration_min', 30)
-                    
-                    # Find charger info from search results
-                    for search_result in charging_result.get('tool_results', []):
-                        if isinstance(search_result, list):
-                            for charger in search_result:
-                                if isinstance(charger, dict) and charger.get('id') == charger_id:
-                                    # Calculate charging cost
-                                    # Assume ~50 kWh for 30 min at 350kW (rough estimate)
-                                    kwh_charged = (duration_min / 60) * min(charger.get('power_kw', 150), 150) * 0.3
-                                    cost = kwh_charged * charger.get('price_per_kwh', 0.43)
-                                    merchant = f"{charger.get('network', 'Charging Network')} Charging"
-                                    
-                                    transactions.append({
-                                        "amount": round(cost, 2),
-                                        "merchant": merchant,
-                                        "description": f"Charging session at {charger.get('location', 'charger')}"
-                                    })
-                                    charging_payments_found += 1
-                                    print(f"   ✓ Found charging payment: ${round(cost, 2):.2f} to {merchant}")
-                                    break
-        
-        # Collect amenities payments
-        print("🍽️  Collecting amenities payments...")
-        print(f"   DEBUG: amenities_result has {len(amenities_result.get('tool_results', []))} tool results")
-        for idx, r in enumerate(amenities_result.get('tool_results', [])):
-            print(f"   DEBUG: tool_result[{idx}] type={type(r)}, keys={r.keys() if isinstance(r, dict) else 'N/A'}")
-        
-        amenities_payments_found = 0
-        for r in amenities_result.get('tool_results', []):
-            if isinstance(r, dict) and 'total_usd' in r:
-                merchant = r.get('restaurant', 'Food vendor')
-                amount = r['total_usd']
+        charging_tools = charging_result.get('tool_results', [])
+        stations = StationIndex.from_tool_results(charging_tools)
+        for r in charging_tools:
+            # Check if this is a reservation with cost
+            if isinstance(r, dict) and 'reservation_id' in r:
+                charger = stations.get(r.get('charger_id'))
+                if charger is None:
+                    continue
+                
+                session = estimate_reserved_session(charger, r.get('duration_min', 30), vehicle_data)
+                merchant = f"{charger.get('network') or 'Charging Network'} Charging"
                 transactions.append({
-                    "amount": amount,
+                    "amount": round(session.cost_usd, 2),
                     "merchant": merchant,
-                    "description": f"Pre-order: {', '.join(r.get('items', []))}"
+                    "description": f"Charging session at {charger.get('location') or 'charger'}"
                 })
-                amenities_payments_found += 1
-                print(f"   ✓ Found amenities payment: ${amount:.2f} to {merchant}")
+                charging_payments_found += 1
+                print(f"   ✓ Found charging payment: ${session.cost_usd:.2f} to {merchant} "
+                      f"({session.energy_kwh:.1f} kWh, {session.start_soc_percent:.0f}% → {session.target_soc_percent:.0f}%)")
+        
+        # Collect amenities payments
+        print("🍽️  Collecting amenities payments...")
+        amenities_transactions = self._amenities_transactions(amenities_result)
+        for transaction in amenities_transactions:
+            print(f"   ✓ Found amenities payment: ${transaction['amount']:.2f} to {transaction['merchant']}")
+        transactions.extend(amenities_transactions)
         
         print(f"\n📊 Total transactions collected: {len(transactions)}")
         print(f"   ⚡ Charging: {charging_payments_found}")
-        print(f"   🍽️  Amenities: {amenities_payments_found}")
+        print(f"   🍽️  Amenities: {len(amenities_transactions)}")
         print("="*70 + "\n")
+        return transactions
+    
+    def _assemble(self, vehicle_data: dict, steps: dict) -> dict:
+        """Build the orchestration result from the step results, always in the same order."""
+        trip_plan = steps['trip_plan']
+        if steps['narrative']:
+            trip_plan = {**trip_plan, 'analysis': steps['narrative']}
+        results = {'trip_plan': trip_plan}
+        energy_result = steps['energy']
+        
+        if steps['charging'] is None:
+            battery_pct = vehicle_data.get('battery_percent', 0)
+            range_mi = vehicle_data.get('range_miles', 0)
+            return {
+                "summary": f"✅ No charging needed! Your {battery_pct}% battery ({range_mi} mi range) is sufficient for this trip.",
+                "results": results,
+                "energy_analysis": energy_result
+            }
         
-        if transactions:
-            print(f"\n💳 Calling Payment Agent with {len(transactions)} transactions...")
-            payment_result = self.payment_agent.process_payments(
-                transactions, user_prefs.get('wallet_id', 'default')
-            )
-            print("✅ Payment processing complete\n")
-            results['payments'] = payment_result
-        else:
-            print("⚠️  No transactions to process\n")
+        results['charging'] = steps['charging']
+        if steps['amenities'] is not None:
+            results['amenities'] = steps['amenities']
+        if steps['payments'] is not None:
+            results['payments'] = steps['payments']
+        outcome = steps['charging_outcome']
+        
+        if outcome['status'] == 'not_needed':
+            arrival = outcome['arrival_soc_percent']
+            return {
+                "summary": f"✅ No charging needed! The charging plan reaches your destination with {arrival}% battery left.",
+                "results": results,
+                "energy_analysis": energy_result
+            }
+        
+        if outcome['status'] == 'insufficient_range':
+            if outcome['recommended_stations']:
+                # Generate summary with insufficient range warning + planned amenities
+                summary = self._generate_summary_with_insufficient_range(
+                    results,
+                    outcome['message'],
+                    outcome['recommended_stations']
+                )
+            else:
+                # No stations available even with full charge
+                summary = "".join([
+                    "⚠️ **Insufficient Battery Range**\n",
+                    outcome['message'][:500],
+                    "\n\n**Recommendation:** Charge to 100% at home before starting your trip."
+                ])
+            return {
+                "summary": summary,
+                "results": results,
+                "insufficient_range": True
+            }
+        
+        if outcome['status'] == 'failed':
+            # Generate summary with charging failure notice
+            summary = self._generate_summary(results)
+            charging_failure_notice = "\n\n⚠️ **Charging Reservation Failed**\nNo chargers were found or reserved for this trip. Please manually search for charging options."
+            return {
+                "summary": summary + charging_failure_notice,
+                "results": results,
+                "charging_failed": True
+            }
         
         # Step 5: Generate Summary
         print("📝 STEP 5: Generating summary...")
@@ -395,14 +608,8 @@ class CoordinatorAgent:
         has_reservation = False
         
         if charging_tools:
-            # First, collect charger info from search results
-            chargers_map = {}
-            for tool_result in charging_tools:
-                if isinstance(tool_result, list):
-                    # This is from search_chargers
-                    for charger in tool_result:
-                        if isinstance(charger, dict) and 'id' in charger:
-                            chargers_map[charger['id']] = charger
+            # First, index charger info from search results and planned stops
+            chargers_map = StationIndex.from_tool_results(charging_tools)
             
             # Check if there's a reservation
             for tool_result in charging_tools:
@@ -426,7 +633,7 @@ class CoordinatorAgent:
                         duration = tool_result.get('duration_min', 30)
                         
                         # Try to get charger details from search results first
-                        charger_info = chargers_map.get(charger_id, {})
+                        charger_info = chargers_map.get(charger_id) or {}
                         
                         # If not in map, use data from reservation (agent should pass it)
                         location = tool_result.get('location') or charger_info.get('location', charger_id)
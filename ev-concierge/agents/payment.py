@@ -6,15 +6,13 @@ Uses the isolated payment-agent tools for all payment operations
 import sys
 import os
 import json
-import asyncio
 
 # Add payment-agent to path for direct tool access
 payment_agent_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'payment-agent')
 sys.path.insert(0, payment_agent_path)
 
-from strands.models import BedrockModel
-from strands import Agent
-from utils.config import AWS_REGION, BEDROCK_MODEL_ID
+from utils.agent_pool import get_agent_template
+from utils.async_runtime import run_sync
 
 # Import wrapped tools for Strands (with @Tool decorator)
 from tools.payment_tools_wrapped import (
@@ -37,6 +35,24 @@ spec = importlib.util.spec_from_file_location("payment_tools_raw", payment_tools
 pt = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(pt)
 
+SYSTEM_PROMPT = """You are a payment specialist. Process all transactions securely 
+and provide a summary. Use the available payment tools to:
+1. Validate the wallet first
+2. Calculate fees for transparency
+3. Process payments (batch or individual)
+4. Generate receipts
+5. Provide a clear summary of all transactions"""
+
+# Provide all relevant tools to the agent (wrapped with @Tool decorator)
+PAYMENT_TOOLS = [
+    validate_wallet_tool,
+    calculate_fees_tool,
+    process_payment_tool,
+    process_batch_payments_tool,
+    generate_receipt_tool,
+    get_payment_history_tool
+]
+
 
 class PaymentAgent:
     """
@@ -45,31 +61,28 @@ class PaymentAgent:
     """
     
     def __init__(self):
-        self.model = BedrockModel(
-            model_id=BEDROCK_MODEL_ID,
-            region_name=AWS_REGION,
-            temperature=0.7
-        )
+        self.template = get_agent_template("payment", SYSTEM_PROMPT, PAYMENT_TOOLS)
     
-    def process_payments(self, transactions: list, wallet_id: str) -> dict:
+    def process_payments(self, transactions: list, wallet_id: str, wallet_status: dict = None) -> dict:
         """Synchronous wrapper for async process_payments"""
-        if not transactions:
-            print("⚠️  No transactions to process\n")
-            return {"payments": None, "message": "No payments to process", "tool_results": []}
-        
-        return asyncio.run(self.process_payments_async(transactions, wallet_id))
+        return run_sync(self.process_payments_async(transactions, wallet_id, wallet_status))
     
-    async def process_payments_async(self, transactions: list, wallet_id: str) -> dict:
+    async def process_payments_async(self, transactions: list, wallet_id: str, wallet_status: dict = None) -> dict:
         """
         Process multiple payment transactions.
         
         Args:
             transactions: List of transaction dicts with amount, merchant, description
             wallet_id: User's wallet identifier
+            wallet_status: Result of validate_user_wallet, if the wallet was already validated
             
         Returns:
             Dict with payment results and tool call details
         """
+        if not transactions:
+            print("⚠️  No transactions to process\n")
+            return {"payments": None, "message": "No payments to process", "tool_results": []}
+        
         print("\n" + "="*70)
         print("💳 PAYMENT AGENT CALLED")
         print("="*70)
@@ -79,76 +92,57 @@ class PaymentAgent:
         print(f"👛 Wallet ID: {wallet_id}")
         print("="*70 + "\n")
         
-        system_prompt = """You are a payment specialist. Process all transactions securely 
-and provide a summary. Use the available payment tools to:
-1. Validate the wallet first
-2. Calculate fees for transparency
-3. Process payments (batch or individual)
-4. Generate receipts
-5. Provide a clear summary of all transactions"""
-        
         user_prompt = f"""
 Transactions to process: {transactions}
 Wallet ID: {wallet_id}
 
 Process all payments and provide confirmation with transaction IDs."""
-        
-        # Provide all relevant tools to the agent (wrapped with @Tool decorator)
-        available_tools = [
-            validate_wallet_tool,
-            calculate_fees_tool,
-            process_payment_tool,
-            process_batch_payments_tool,
-            generate_receipt_tool,
-            get_payment_history_tool
-        ]
+        prevalidated = bool(wallet_status and wallet_status.get('valid'))
+        if prevalidated:
+            # Validated ahead of time: skip that tool round trip
+            user_prompt += f"""
+The wallet is already validated (balance: ${wallet_status.get('balance', 0):.2f}). Do NOT call validate_wallet again."""
         
         print("🔧 Payment tools available:")
-        for tool in available_tools:
+        for tool in self.template.tools:
             # Get tool name from function name or __name__
             tool_name = getattr(tool, '__name__', str(tool))
             print(f"   - {tool_name}")
         print()
         
-        # Create agent with tools
-        agent = Agent(
-            model=self.model,
-            system_prompt=system_prompt,
-            tools=available_tools
-        )
-        
         # Stream response and collect results
         response_text = ""
-        tool_results = []
+        tool_results = list(wallet_status.get('tool_results', [])) if prevalidated else []
         
         print(f"💳 Payment Agent: Starting Bedrock API stream...")
         
-        try:
-            async for event in agent.stream_async(user_prompt):
-                if isinstance(event, dict):
-                    if 'data' in event:
-                        response_text += str(event['data'])
-                    
-                    # Extract tool results from message
-                    if 'message' in event:
-                        message = event['message']
-                        if isinstance(message, dict) and 'content' in message:
-                            for content_block in message['content']:
-                                if isinstance(content_block, dict) and 'toolResult' in content_block:
-                                    tool_result = content_block['toolResult']
-                                    if 'content' in tool_result:
-                                        for content_item in tool_result['content']:
-                                            if 'text' in content_item:
-                                                try:
-                                                    result_json = json.loads(content_item['text'])
-                                                    tool_results.append(result_json)
-                                                except:
-                                                    pass
-        except Exception as e:
-            print(f"❌ Payment Agent Error: {e}")
-            import traceback
-            traceback.print_exc()
-            response_text = f"Error: {str(e)}"
+        with self.template.checkout() as agent:
+            try:
+                async for event in agent.stream_async(user_prompt):
+                    if isinstance(event, dict):
+                        if 'data' in event:
+                            response_text += str(event['data'])
+                        
+                        # Extract tool results from message
+                        if 'message' in event:
+                            message = event['message']
+                            if isinstance(message, dict) and 'content' in message:
+                                for content_block in message['content']:
+                                    if isinstance(content_block, dict) and 'toolResult' in content_block:
+                                        tool_result = content_block['toolResult']
+                                        if 'content' in tool_result:
+                                            for content_item in tool_result['content']:
+                                                if 'text' in content_item:
+                                                    try:
+                                                        result_json = json.loads(content_item['text'])
+                                                        tool_results.append(result_json)
+                                                    except:
+                                                        pass
+            except Exception as e:
+                print(f"❌ Payment Agent Error: {e}")
+                import traceback
+                traceback.print_exc()
+                response_text = f"Error: {str(e)}"
         
         # Log the results
         print("\n" + "="*70)
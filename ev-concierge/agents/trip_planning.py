@@ -1,30 +1,98 @@
-from strands.models import BedrockModel
-from strands import Agent
-from utils.config import AWS_REGION, BEDROCK_MODEL_ID
-from tools.route_tools import calculate_energy_needs, get_route_info
+from utils.agent_pool import get_agent_template
+from utils.async_runtime import run_sync
+from tools.route_tools import calculate_energy_needs, get_route_info, route_info
+from utils.energy import energy_needs
 import json
 import asyncio
 
+SYSTEM_PROMPT = """You are a trip planning specialist for EVs.
+
+You have access to tools that you MUST use. Never make calculations yourself.
+
+CRITICAL: You MUST call the calculate_energy_needs tool first before providing any analysis.
+Do NOT respond with text until you have called the tool and received the results."""
+
+NARRATIVE_PROMPT = "You are a trip planning specialist for EVs. Explain the given analysis in 2-3 friendly sentences. Never change its numbers."
+
 class TripPlanningAgent:
     def __init__(self):
-        self.model = BedrockModel(
-            model_id=BEDROCK_MODEL_ID,
-            region_name=AWS_REGION,
-            temperature=0.7
-        )
+        self.template = get_agent_template("trip_planning", SYSTEM_PROMPT, [calculate_energy_needs, get_route_info])
+        self.narrative_template = get_agent_template("trip_narrative", NARRATIVE_PROMPT, [])
+    
+    def analyze_direct(self, vehicle_data: dict, trip_data: dict, narrate: bool = False, route: dict = None) -> dict:
+        """Synchronous wrapper for async analyze_direct"""
+        return run_sync(self.analyze_direct_async(vehicle_data, trip_data, narrate, route))
+    
+    async def analyze_direct_async(self, vehicle_data: dict, trip_data: dict, narrate: bool = False, route: dict = None) -> dict:
+        """
+        Energy analysis and route info computed in-process, without the LLM.
+        
+        Args:
+            vehicle_data: Vehicle 'model', 'battery_percent' and 'range_miles'
+            trip_data: Trip 'origin', 'destination' and 'distance_miles'
+            narrate: Also ask the LLM to write the analysis text
+            route: Route info already looked up (e.g. from a plan skeleton)
+        
+        Returns:
+            Same shape as analyze(): 'analysis' text and 'tool_results' (energy
+            result first, then the route), plus the 'energy' and 'route' results
+        """
+        if route is None:
+            # Route lookup may load the road graph: keep it off the event loop
+            route = await asyncio.to_thread(route_info, trip_data['origin'], trip_data['destination'])
+        distance_miles = trip_data.get('distance_miles') or route.get('distance_miles', 0)
+        energy = energy_needs(vehicle_data['battery_percent'], distance_miles, vehicle_data['range_miles'])
+        
+        analysis = self._describe(vehicle_data, distance_miles, energy, route)
+        if narrate:
+            narrative = await self.narrate_async(vehicle_data, trip_data, energy, route)
+            analysis = narrative or analysis
+        
+        return {
+            "analysis": analysis,
+            "tool_results": [energy] + ([route] if 'error' not in route else []),
+            "energy": energy,
+            "route": route
+        }
+    
+    @staticmethod
+    def _describe(vehicle_data: dict, distance_miles: float, energy: dict, route: dict) -> str:
+        parts = [f"This {distance_miles}-mile trip"]
+        if 'error' not in route:
+            parts.append(f" ({route['route']}, about {route['duration_hours']} h)")
+        parts.append(f" needs {energy['required_battery']}% battery including a 20% buffer; "
+                     f"you have {vehicle_data['battery_percent']}%.")
+        if energy['needs_charging']:
+            when = "before departure" if energy['charging_strategy'] == "pre-trip" else "along the way"
+            parts.append(f" Charging is needed ({energy['deficit_percent']}% short), best done {when}.")
+        else:
+            parts.append(" No charging is needed.")
+        return "".join(parts)
+    
+    async def narrate_async(self, vehicle_data: dict, trip_data: dict, energy: dict, route: dict) -> str:
+        """Ask the LLM for a short narrative of an analysis that is already computed (no tools)."""
+        prompt = f"""
+Vehicle: {vehicle_data['model']}, {vehicle_data['battery_percent']}% battery, {vehicle_data['range_miles']} miles range
+Trip: {trip_data['origin']} → {trip_data['destination']}
+Route: {json.dumps(route)}
+Energy analysis: {json.dumps(energy)}"""
+        
+        response_text = ""
+        with self.narrative_template.checkout() as agent:
+            try:
+                async for event in agent.stream_async(prompt):
+                    if isinstance(event, dict) and 'data' in event:
+                        response_text += str(event['data'])
+            except Exception as e:
+                print(f"   ⚠️  Narrative unavailable: {str(e)}")
+                return ""
+        return response_text
     
     def analyze(self, vehicle_data: dict, trip_data: dict) -> dict:
         """Synchronous wrapper for async analyze"""
-        return asyncio.run(self.analyze_async(vehicle_data, trip_data))
+        return run_sync(self.analyze_async(vehicle_data, trip_data))
     
     async def analyze_async(self, vehicle_data: dict, trip_data: dict) -> dict:
-        system_prompt = """You are a trip planning specialist for EVs.
-
-You have access to tools that you MUST use. Never make calculations yourself.
-
-CRITICAL: You MUST call the calculate_energy_needs tool first before providing any analysis.
-Do NOT respond with text until you have called the tool and received the results."""
-        
         user_prompt = f"""
 Vehicle Information:
 - Model: {vehicle_data['model']}
@@ -40,48 +108,42 @@ Trip Information:
 Use the calculate_energy_needs tool to analyze if charging is needed for this trip.
 Call it with: battery_percent={vehicle_data['battery_percent']}, trip_distance_miles={trip_data['distance_miles']}, vehicle_range_miles={vehicle_data['range_miles']}"""
         
-        # Create agent with tools
-        agent = Agent(
-            model=self.model,
-            system_prompt=system_prompt,
-            tools=[calculate_energy_needs, get_route_info]
-        )
-        
         # Stream response and collect results
         response_text = ""
         tool_results = []
         
         print(f"\n🔍 DEBUG - Trip Planning Agent:")
         
-        try:
-            async for event in agent.stream_async(user_prompt):
-                # Extract text from events
-                if isinstance(event, dict):
-                    if 'data' in event:
-                        response_text += str(event['data'])
-                    
-                    # Look for tool results in the message
-                    if 'message' in event:
-                        message = event['message']
-                        if isinstance(message, dict) and 'content' in message:
-                            for content_block in message['content']:
-                                if isinstance(content_block, dict) and 'toolResult' in content_block:
-                                    tool_result = content_block['toolResult']
-                                    if 'content' in tool_result:
-                                        for content_item in tool_result['content']:
-                                            if 'text' in content_item:
-                                                try:
-                                                    result_json = json.loads(content_item['text'])
-                                                    tool_results.append(result_json)
-                                                    print(f"   - Tool result: {result_json}")
-                                                except:
-                                                    pass
-            
-            print(f"   Tool calls made: {len(tool_results)}")
-            
-        except Exception as e:
-            print(f"   ⚠️  Error: {str(e)}")
-            response_text = f"Error: {str(e)}"
+        with self.template.checkout() as agent:
+            try:
+                async for event in agent.stream_async(user_prompt):
+                    # Extract text from events
+                    if isinstance(event, dict):
+                        if 'data' in event:
+                            response_text += str(event['data'])
+                        
+                        # Look for tool results in the message
+                        if 'message' in event:
+                            message = event['message']
+                            if isinstance(message, dict) and 'content' in message:
+                                for content_block in message['content']:
+                                    if isinstance(content_block, dict) and 'toolResult' in content_block:
+                                        tool_result = content_block['toolResult']
+                                        if 'content' in tool_result:
+                                            for content_item in tool_result['content']:
+                                                if 'text' in content_item:
+                                                    try:
+                                                        result_json = json.loads(content_item['text'])
+                                                        tool_results.append(result_json)
+                                                        print(f"   - Tool result: {result_json}")
+                                                    except:
+                                                        pass
+                
+                print(f"   Tool calls made: {len(tool_results)}")
+                
+            except Exception as e:
+                print(f"   ⚠️  Error: {str(e)}")
+                response_text = f"Error: {str(e)}"
         
         return {
             "analysis": response_text,
@@ -2,6 +2,9 @@ import gradio as gr
 import json
 from datetime import datetime, timedelta
 from agents.coordinator import CoordinatorAgent
+from utils.config import DEFAULT_ORIGIN
+from utils.gazetteer import get_gazetteer
+from utils.location_coords import estimate_road_distance_miles, get_coordinates
 
 # Initialize coordinator
 coordinator = CoordinatorAgent()
@@ -23,20 +26,20 @@ def parse_user_message(message: str, vehicle_state: dict) -> dict:
     """Parse natural language into trip data"""
     message_lower = message.lower()
     
-    # Extract destination
-    destination = "Los Angeles, CA"
-    if "san francisco" in message_lower or "sf" in message_lower:
-        destination = "San Francisco, CA"
-        distance = 380
-    elif "san diego" in message_lower:
-        destination = "San Diego, CA"
-        distance = 120
-    elif "seattle" in message_lower:
-        destination = "Seattle, WA"
-        distance = 1150
-    elif "las vegas" in message_lower:
-        destination = "Las Vegas, NV"
-        distance = 270
+    # Extract origin and destination with the offline gazetteer
+    origin = destination = None
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        origin_place, destination_place = gazetteer.extract_route(message)
+        origin = origin_place.label if origin_place else None
+        destination = destination_place.label if destination_place else None
+    origin = origin or DEFAULT_ORIGIN
+    destination = destination or "Los Angeles, CA"
+    
+    origin_coords = get_coordinates(origin)
+    destination_coords = get_coordinates(destination)
+    if origin_coords and destination_coords:
+        distance = estimate_road_distance_miles(origin_coords, destination_coords)
     else:
         distance = 280
     
@@ -62,16 +65,17 @@ def parse_user_message(message: str, vehicle_state: dict) -> dict:
         departure = tomorrow.replace(hour=9, minute=0).isoformat()
     
     return {
-        "origin": "Current Location",
+        "origin": origin,
         "destination": destination,
         "distance_miles": distance,
         "departure": departure
     }, battery
 
-def chat_interface(message, history, vehicle_state, preferences):
+async def chat_interface(message, history, vehicle_state, preferences):
     """Main chat interface"""
     if not message:
-        return history, vehicle_state, preferences
+        yield history, vehicle_state, preferences
+        return
     
     # Parse user message
     trip_data, new_battery = parse_user_message(message, vehicle_state)
@@ -87,7 +91,7 @@ def chat_interface(message, history, vehicle_state, preferences):
     
     try:
         # Run coordinator
-        result = coordinator.orchestrate(vehicle_state, trip_data, preferences)
+        result = await coordinator.orchestrate_async(vehicle_state, trip_data, preferences)
         
         # Format response
         response = f"**🚗 EV Concierge Summary**\n\n{result['summary']}\n\n"
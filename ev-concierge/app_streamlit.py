@@ -2,10 +2,21 @@ import streamlit as st
 import json
 from datetime import datetime, timedelta
 from agents.coordinator import CoordinatorAgent
+from utils.plan_cache import get_plan_skeleton, start_plan_cache_warmer
 import time
 
 st.set_page_config(page_title="EV Concierge", page_icon="🚗", layout="wide")
 
+CITIES = ["San Francisco, CA", "Los Angeles, CA", "San Diego, CA", "Seattle, WA", "Las Vegas, NV"]
+
+@st.cache_resource
+def plan_cache_warmer():
+    """Precompute the plans of every selectable trip once per server process."""
+    pairs = [(origin, destination) for origin in CITIES for destination in CITIES if origin != destination]
+    return start_plan_cache_warmer(pairs)
+
+plan_cache_warmer()
+
 # Initialize
 if 'coordinator' not in st.session_state:
     st.session_state.coordinator = CoordinatorAgent()
@@ -36,8 +47,8 @@ with col1:
     
     # Trip Input
     with st.form("trip_form"):
-        origin = st.selectbox("Starting From", ["San Francisco, CA", "Los Angeles, CA", "San Diego, CA", "Seattle, WA", "Las Vegas, NV"])
-        destination = st.selectbox("Destination", ["Los Angeles, CA", "San Francisco, CA", "San Diego, CA", "Seattle, WA", "Las Vegas, NV"])
+        origin = st.selectbox("Starting From", CITIES)
+        destination = st.selectbox("Destination", CITIES, index=1)
         departure = st.selectbox("Departure", ["Tomorrow Morning", "Tonight", "Next Week"])
         
         col_a, col_b = st.columns(2)
@@ -80,9 +91,18 @@ with col1:
         # Get distance between origin and destination
         distance = distance_matrix.get((origin, destination), 0)
         
+        # Precomputed route, energy analysis and charging stops for this trip, if the warmer has built them;
+        # a miss isn't planned here, the coordinator plans the trip itself
+        plan_skeleton = None
         if origin == destination:
             st.warning("⚠️ Origin and destination are the same!")
             distance = 0
+        else:
+            plan_skeleton = get_plan_skeleton(origin, destination, current_battery,
+                                              st.session_state.vehicle['range_miles'],
+                                              vehicle_model=st.session_state.vehicle['model'], build=False)
+            if plan_skeleton is not None:
+                distance = plan_skeleton['route']['distance_miles']
         
         trip_data = {
             "origin": origin,
@@ -92,6 +112,23 @@ with col1:
         }
         st.session_state.vehicle['battery_percent'] = current_battery
         
+        if plan_skeleton is not None:
+            charging_plan = plan_skeleton['charging_plan']
+            with st.expander("📋 Plan Preview", expanded=False):
+                st.markdown(f"**Route:** {plan_skeleton['route']['route']}, {plan_skeleton['route']['distance_miles']} mi, "
+                            f"{plan_skeleton['route']['duration_hours']} h")
+                st.markdown(f"**Battery needed:** {plan_skeleton['energy']['required_battery']}% "
+                            f"(planned from {plan_skeleton['battery_percent']}%)")
+                if charging_plan.get('feasible'):
+                    for i, stop in enumerate(charging_plan['stops'], 1):
+                        st.markdown(f"{i}. ⚡ {stop['network']} - {stop['location']}: "
+                                    f"{stop['arrival_soc_percent']}% → {stop['departure_soc_percent']}% "
+                                    f"({stop['charge_minutes']:.0f} min)")
+                    if not charging_plan['stops']:
+                        st.markdown("No charging stops needed")
+                else:
+                    st.markdown(f"⚠️ {charging_plan.get('reason', 'No charging plan found')}")
+        
         # Agent Activity Panel
         st.markdown("---")
         st.markdown("### 🤖 Agent Activity (Live)")
@@ -122,7 +159,8 @@ with col1:
             result = st.session_state.coordinator.orchestrate(
                 st.session_state.vehicle,
                 trip_data,
-                st.session_state.preferences
+                st.session_state.preferences,
+                plan_skeleton
             )
             
             st.session_state.agent_status["Trip Planning"].success("✅ Complete")
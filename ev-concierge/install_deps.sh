@@ -3,7 +3,7 @@
 echo "📦 Installing EV Concierge dependencies..."
 
 # Install core dependencies first
-pip install boto3>=1.34.0 python-dotenv>=1.0.0 pydantic>=2.0.0 requests>=2.31.0
+pip install boto3>=1.34.0 python-dotenv>=1.0.0 pydantic>=2.0.0 requests>=2.31.0 numpy>=1.24.0
 
 # Try to install streamlit
 echo "📥 Installing Streamlit..."
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test the shared model clients and reusable agent templates
+"""
+
+import threading
+import utils.agent_pool as agent_pool
+from strands import Agent
+from agents.coordinator import CoordinatorAgent
+from tools.route_tools import get_route_info
+from utils.agent_pool import AgentTemplate, get_agent_template, get_model
+
+def test_models_are_shared():
+    assert get_model() is get_model()
+    assert get_model(temperature=0.2) is not get_model()
+
+def request_state(agent):
+    """Everything a request leaves behind on an agent."""
+    return {
+        "messages": agent.messages,
+        "state": agent.state.get(),
+        "interrupts": agent._interrupt_state.to_dict(),
+        "model_state": agent._model_state,
+        "cycles": agent.event_loop_metrics.cycle_count,
+        "removed_messages": agent.conversation_manager.removed_message_count,
+        "tools": agent.tool_names,
+        "system_prompt": agent.system_prompt,
+    }
+
+def test_checkout_matches_a_fresh_agent():
+    template = AgentTemplate("test", "You are a test.", [get_route_info])
+    with template.checkout() as agent:
+        agent.messages.append({"role": "user", "content": [{"text": "hello"}]})
+        agent.state.set("trip", "SF → LA")
+        agent._interrupt_state.activate()
+        agent._model_state["cache_point"] = 3
+        agent.event_loop_metrics.cycle_count = 2
+        first = agent
+    with template.checkout() as agent:
+        fresh = Agent(model=get_model(), system_prompt="You are a test.", tools=[get_route_info])
+        assert agent is not first and agent.model is first.model is get_model()
+        assert request_state(agent) == request_state(fresh)
+    assert template.created == 2
+
+def test_concurrent_checkouts_get_different_agents():
+    template = AgentTemplate("test", "You are a test.", [])
+    both_out = threading.Barrier(2)
+    seen = []
+
+    def request():
+        with template.checkout() as agent:
+            seen.append(agent)
+            both_out.wait(timeout=5)
+
+    threads = [threading.Thread(target=request) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert seen[0] is not seen[1] and template.created == 2
+    assert seen[0].model is seen[1].model
+
+def test_coordinators_share_models_and_templates():
+    agent_pool.clear_agent_pool()
+    built = []
+    original = agent_pool.BedrockModel
+    agent_pool.BedrockModel = lambda **kwargs: built.append(kwargs) or original(**kwargs)
+    try:
+        first = CoordinatorAgent()
+        second = CoordinatorAgent()
+        # Nothing is built until an agent is checked out
+        assert built == []
+        for template in (first.trip_agent.template, second.charging_agent.template, first.payment_agent.template):
+            with template.checkout():
+                pass
+        assert first.charging_agent.template is second.charging_agent.template
+        assert first.charging_agent.template.created == 1
+        assert get_agent_template("payment", "", []) is second.payment_agent.template
+    finally:
+        agent_pool.BedrockModel = original
+        agent_pool.clear_agent_pool()
+
+    # Every template shares one model client
+    assert len(built) == 1
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Shared Model Clients and Agent Templates")
+    print("=" * 60)
+    test_models_are_shared()
+    test_checkout_matches_a_fresh_agent()
+    test_concurrent_checkouts_get_different_agents()
+    test_coordinators_share_models_and_templates()
+    print("✅ Agent pool tests passed!")
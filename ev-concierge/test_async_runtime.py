@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test the persistent event loop behind the agents' sync wrappers and orchestrate_async
+"""
+
+import asyncio
+import agents.coordinator as coordinator
+from agents.coordinator import CoordinatorAgent
+from utils.async_runtime import AsyncRuntime, get_async_runtime, run_sync
+from utils.http_client import get_async_http_client
+
+VEHICLE = {"model": "Tesla Model Y", "battery_percent": 100, "range_miles": 300}
+TRIP = {"origin": "San Francisco, CA", "destination": "Los Angeles, CA", "distance_miles": 100}
+
+async def running_loop():
+    return asyncio.get_running_loop()
+
+def test_every_call_shares_one_loop():
+    first = run_sync(running_loop())
+    assert run_sync(running_loop()) is first
+    assert first is get_async_runtime().loop and first.is_running()
+
+def test_run_sync_inside_a_running_loop():
+    async def handler():
+        # e.g. an async UI handler calling a sync API
+        return run_sync(running_loop()), asyncio.get_running_loop()
+
+    runtime_loop, handler_loop = asyncio.run(handler())
+    assert runtime_loop is get_async_runtime().loop and runtime_loop is not handler_loop
+
+def test_errors_and_reentry():
+    async def fail():
+        raise ValueError("boom")
+
+    try:
+        run_sync(fail())
+        assert False, "expected ValueError"
+    except ValueError as e:
+        assert str(e) == "boom"
+
+    async def reenter():
+        run_sync(running_loop())
+
+    try:
+        run_sync(reenter())
+        assert False, "expected RuntimeError"
+    except RuntimeError as e:
+        assert "own event loop" in str(e)
+
+    runtime = AsyncRuntime("test-runtime")
+    assert runtime.run(running_loop()) is runtime.loop
+    runtime.stop(timeout=5)
+    assert runtime.loop is None
+
+def test_stopping_closes_the_loops_http_client():
+    runtime = AsyncRuntime("test-runtime")
+
+    async def client():
+        return get_async_http_client()
+
+    http_client = runtime.run(client())
+    assert not http_client.client.is_closed
+    runtime.stop(timeout=5)
+    assert http_client.client.is_closed
+
+def test_orchestrate_async_from_a_running_loop():
+    original = coordinator.TRIP_PLANNING_MODE
+    coordinator.TRIP_PLANNING_MODE = "direct"
+    try:
+        agent = CoordinatorAgent()
+
+        async def handler():
+            awaited = await agent.orchestrate_async(VEHICLE, TRIP, {})
+            # The sync facade still works from inside the loop
+            return awaited, agent.orchestrate(VEHICLE, TRIP, {})
+
+        awaited, wrapped = asyncio.run(handler())
+    finally:
+        coordinator.TRIP_PLANNING_MODE = original
+
+    assert awaited["summary"] == wrapped["summary"]
+    assert awaited["energy_analysis"]["needs_charging"] is False
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Persistent Async Runtime")
+    print("=" * 60)
+    test_every_call_shares_one_loop()
+    test_run_sync_inside_a_running_loop()
+    test_errors_and_reentry()
+    test_stopping_closes_the_loops_http_client()
+    test_orchestrate_async_from_a_running_loop()
+    print("✅ Async runtime tests passed!")
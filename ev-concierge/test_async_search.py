@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test the asyncio-native charger search (no network calls)
+"""
+
+import asyncio
+import json
+import os
+import time
+import utils.openchargemap_client as ocm
+import tools.charging_tools as charging_tools
+from utils import geohash
+from utils.location_coords import get_coordinates
+
+FETCH_DELAY = 0.05
+
+def tile_center(tile):
+    lat_min, lat_max, lon_min, lon_max = geohash.decode_bbox(tile)
+    return (lat_min + lat_max) / 2, (lon_min + lon_max) / 2
+
+async def fake_fetch_async(api_key, tile, min_power_kw, keep=None):
+    await asyncio.sleep(FETCH_DELAY)
+    lat, lon = tile_center(tile)
+    stations = [{
+        "id": f"OCM-{tile}", "network": "EVgo", "location": f"{tile}, CA", "address": f"{tile}, CA",
+        "latitude": lat, "longitude": lon, "power_kw": 150, "price_per_kwh": 0.4,
+        "available": True, "slots": ["10:00"], "amenities": []
+    }]
+    return stations if keep is None else list(keep(stations))
+
+def patched(test):
+    def wrapper():
+        original = (ocm.fetch_tile_stations_async, ocm.get_station_cache, ocm.STATION_SOURCE, charging_tools.STATION_SOURCE)
+        ocm.fetch_tile_stations_async = fake_fetch_async
+        ocm.get_station_cache = lambda: None
+        ocm.STATION_SOURCE = charging_tools.STATION_SOURCE = "api"
+        os.environ.setdefault("OPENCHARGEMAP_API_KEY", "test-key")
+        ocm.clear_corridor_memo()
+        try:
+            return test()
+        finally:
+            ocm.clear_corridor_memo()
+            (ocm.fetch_tile_stations_async, ocm.get_station_cache, ocm.STATION_SOURCE, charging_tools.STATION_SOURCE) = original
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+@patched
+def test_async_search_does_not_block_event_loop():
+    async def scenario():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        beat = asyncio.create_task(heartbeat())
+        start = time.perf_counter()
+        stations = await ocm.get_chargers_along_route_async(
+            get_coordinates("Los Angeles, CA"), get_coordinates("San Francisco, CA"),
+            min_power_kw=150, max_results=50
+        )
+        elapsed = time.perf_counter() - start
+        beat.cancel()
+        return stations, elapsed, ticks
+
+    stations, elapsed, ticks = asyncio.run(scenario())
+    print(f"   {len(stations)} stations in {elapsed * 1000:.0f} ms, heartbeat ticked {ticks} times")
+    assert stations
+    # Tiles were fetched concurrently (8 at a time), not one after another
+    assert elapsed < FETCH_DELAY * len(stations)
+    # Other coroutines kept running while the search was in flight
+    assert ticks >= 3
+
+@patched
+def test_async_tool_runs_searches_concurrently():
+    assert charging_tools.search_chargers_async.tool_name == "search_chargers"
+
+    async def scenario():
+        return await asyncio.gather(
+            charging_tools.search_chargers_async("Los Angeles, CA", "San Francisco, CA", 150, 300),
+            charging_tools.search_chargers_async("Los Angeles, CA", "San Francisco, CA", 150, 5),
+        )
+
+    reachable, insufficient = (json.loads(r) for r in asyncio.run(scenario()))
+    assert isinstance(reachable, list) and reachable
+    assert insufficient["error"] == "insufficient_range"
+    assert insufficient["stations_if_fully_charged"]
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Async Charger Search")
+    print("=" * 60)
+    test_async_search_does_not_block_event_loop()
+    test_async_tool_runs_searches_concurrently()
+    print("✅ Async charger search tests passed!")
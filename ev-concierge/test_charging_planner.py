@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Test the multi-stop charging planner: optimality on small trips, infeasible trips and the planning tool
+"""
+
+import heapq
+import json
+import math
+import random
+import time
+import utils.openchargemap_client as ocm
+import tools.charging_tools as charging_tools
+from utils.energy import energy_needs
+from utils.charging_planner import (
+    AVERAGE_SPEED_KPH,
+    RESERVE_PERCENT,
+    STOP_OVERHEAD_MIN,
+    constant_power_charge_table,
+    plan_charging_stops,
+    replan_from_charge,
+    select_candidates,
+)
+from utils.charging_session import get_charging_curve
+from utils.station import StationTable
+
+def make_stations(count, trip_km, seed):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"S{i}",
+            "network": rng.choice(["EVgo", "Electrify America", "Tesla Supercharger"]),
+            "location": f"Town {i}, CA",
+            "address": "",
+            "power_kw": rng.choice([50, 150, 250, 350]),
+            "price_per_kwh": rng.choice([0.35, 0.43, 0.48]),
+            "available": True,
+            "distance_from_origin_km": round(rng.uniform(5, trip_km - 5), 1),
+        }
+        for i in range(count)
+    ]
+
+def dijkstra_minutes(stations, trip_km, start, range_km, battery_kwh=75.0, reserve=RESERVE_PERCENT, cap=80):
+    """Label-setting search over (stop, departure charge) with every transition spelled out."""
+    table = constant_power_charge_table(battery_kwh, 250.0)
+    stations = select_candidates(stations)
+    positions = [0.0] + [s["distance_from_origin_km"] for s in stations]
+
+    def used(distance):
+        return math.ceil(distance / range_km * 100 - 1e-9)
+
+    best = {(0, start): 0.0}
+    heap = [(0.0, 0, start)]
+    answer = math.inf
+    while heap:
+        minutes, node, level = heapq.heappop(heap)
+        if minutes > best[(node, level)]:
+            continue
+        if level - used(trip_km - positions[node]) >= reserve:
+            answer = min(answer, minutes + (trip_km - positions[node]) / AVERAGE_SPEED_KPH * 60)
+        for nxt in range(node + 1, len(positions)):
+            distance = positions[nxt] - positions[node]
+            arrival = level - used(distance)
+            if arrival < reserve:
+                break
+            times = table(stations[nxt - 1])
+            for departure in range(arrival + 1, cap + 1):
+                cost = minutes + distance / AVERAGE_SPEED_KPH * 60 + STOP_OVERHEAD_MIN + times[departure] - times[arrival]
+                if cost < best.get((nxt, departure), math.inf):
+                    best[(nxt, departure)] = cost
+                    heapq.heappush(heap, (cost, nxt, departure))
+    return answer
+
+def test_matches_exhaustive_search():
+    for seed in range(6):
+        trip_km = 500.0
+        stations = make_stations(12, trip_km, seed)
+        plan = plan_charging_stops(stations, trip_km, start_soc_percent=60, range_km=300,
+                                   charge_table=constant_power_charge_table(75.0, 250.0))
+        expected = dijkstra_minutes(stations, trip_km, 60, 300)
+        if math.isinf(expected):
+            assert not plan["feasible"]
+            continue
+        assert plan["feasible"]
+        assert abs(plan["total_minutes"] - expected) < 0.1, (seed, plan["total_minutes"], expected)
+
+def test_plan_is_consistent():
+    trip_km = 1850.0
+    plan = plan_charging_stops(make_stations(50, trip_km, 11), trip_km, start_soc_percent=90, range_km=480)
+    assert plan["feasible"] and len(plan["stops"]) >= 3
+
+    position, charge = 0.0, 90
+    for stop in plan["stops"]:
+        assert stop["distance_from_origin_km"] > position
+        assert stop["arrival_soc_percent"] >= 10
+        assert stop["arrival_soc_percent"] <= charge - (stop["distance_from_origin_km"] - position) / 480 * 100 + 1e-6
+        assert stop["arrival_soc_percent"] < stop["departure_soc_percent"] <= 80
+        position, charge = stop["distance_from_origin_km"], stop["departure_soc_percent"]
+    assert plan["arrival_soc_percent"] >= 10
+
+def test_short_and_impossible_trips():
+    plan = plan_charging_stops([], 100.0, start_soc_percent=80, range_km=400)
+    assert plan["feasible"] and plan["stops"] == [] and plan["arrival_soc_percent"] >= 10
+
+    plan = plan_charging_stops([], 600.0, start_soc_percent=80, range_km=400)
+    assert not plan["feasible"] and "reason" in plan
+
+    # A gap longer than the range can't be bridged however the stops are chosen
+    stations = [{"id": "A", "power_kw": 250, "distance_from_origin_km": 100.0},
+                {"id": "B", "power_kw": 250, "distance_from_origin_km": 700.0}]
+    assert not plan_charging_stops(stations, 800.0, start_soc_percent=100, range_km=400)["feasible"]
+
+def test_agrees_with_energy_check():
+    # 80% charge, 200 mi trip, 300 mi range: the energy check keeps a buffer the
+    # planner must also keep, so a trip it flags can't be planned without a stop
+    needs = energy_needs(80, 200, 300)
+    assert needs["needs_charging"]
+    plan = plan_charging_stops([], 200 * 1.609344, start_soc_percent=80, range_km=300 * 1.609344)
+    assert not plan["feasible"]
+    stations = [{"id": "A", "power_kw": 150, "distance_from_origin_km": 160.0}]
+    plan = plan_charging_stops(stations, 200 * 1.609344, start_soc_percent=80, range_km=300 * 1.609344)
+    assert plan["feasible"] and len(plan["stops"]) == 1
+    assert plan["arrival_soc_percent"] >= RESERVE_PERCENT
+
+def test_replan_from_more_charge():
+    trip_km = 1850.0
+    plan = plan_charging_stops(make_stations(50, trip_km, 11), trip_km, start_soc_percent=40, range_km=480,
+                               vehicle_model="Hyundai Ioniq 5")
+    assert plan["feasible"] and len(plan["stops"]) >= 3
+    assert replan_from_charge(plan, 40, 40, "Hyundai Ioniq 5") == plan
+
+    # Same stops from 7% more: the first arrival is 7% higher and charges for less time
+    replanned = replan_from_charge(plan, 40, 47, "Hyundai Ioniq 5")
+    first, planned = replanned["stops"][0], plan["stops"][0]
+    assert first["station_id"] == planned["station_id"]
+    assert first["arrival_soc_percent"] == planned["arrival_soc_percent"] + 7
+    session = get_charging_curve("Hyundai Ioniq 5").estimate(
+        first["power_kw"], first["price_per_kwh"], first["arrival_soc_percent"], first["departure_soc_percent"])
+    assert first["charge_minutes"] == round(session.duration_min, 1) < planned["charge_minutes"]
+    assert first["cost_usd"] == round(session.cost_usd, 2) < planned["cost_usd"]
+    assert replanned["stops"][1:] == plan["stops"][1:]
+    assert replanned["arrival_soc_percent"] == plan["arrival_soc_percent"]
+    assert replanned["total_minutes"] < plan["total_minutes"]
+
+    # Enough extra charge to reach the first stop at its departure charge: it is skipped
+    start = 40 + planned["departure_soc_percent"] - planned["arrival_soc_percent"]
+    assert start <= 100
+    full = replan_from_charge(plan, 40, start, "Hyundai Ioniq 5")
+    assert [s["station_id"] for s in full["stops"]] == [s["station_id"] for s in plan["stops"][1:]]
+
+    try:
+        replan_from_charge(plan, 40, 30, "Hyundai Ioniq 5")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+def test_planner_speed():
+    trip_km = 1850.0
+    stations = make_stations(50, trip_km, 5)
+    plan_charging_stops(stations, trip_km, start_soc_percent=90, range_km=480)
+
+    start = time.perf_counter()
+    plan = plan_charging_stops(stations, trip_km, start_soc_percent=90, range_km=480)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"   {plan['candidates_considered']} candidates over {trip_km:.0f} km: {elapsed_ms:.1f} ms")
+    assert plan["feasible"]
+
+def test_tool_plans_along_the_corridor():
+    stations = make_stations(30, 1000.0, 8)
+    for i, station in enumerate(stations):
+        station.update(latitude=35.0 + i * 0.01, longitude=-119.0)
+    corridor = StationTable.from_stations(sorted(stations, key=lambda s: s["distance_from_origin_km"]))
+
+    original = (charging_tools.STATION_SOURCE, charging_tools.get_route_corridor, charging_tools._trip_distance_km)
+    charging_tools.STATION_SOURCE = "snapshot"
+    charging_tools.get_route_corridor = lambda origin, destination, min_power_kw=50: corridor
+    charging_tools._trip_distance_km = lambda origin, destination: (1000.0, True)
+    ocm.clear_corridor_memo()
+    try:
+        plan = json.loads(charging_tools.plan_charging_stops("Seattle, WA", "San Francisco, CA",
+                                                             battery_percent=70, vehicle_range_miles=300))
+        invalid = json.loads(charging_tools.plan_charging_stops("Atlantis", "San Francisco, CA"))
+    finally:
+        charging_tools.STATION_SOURCE, charging_tools.get_route_corridor, charging_tools._trip_distance_km = original
+        ocm.clear_corridor_memo()
+
+    assert plan["feasible"] and plan["stops"]
+    ids = {station["id"] for station in stations}
+    assert all(stop["station_id"] in ids for stop in plan["stops"])
+    assert all("distance_from_origin_miles" in stop for stop in plan["stops"])
+    assert invalid["error"] == "invalid_location"
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Multi-Stop Charging Planner")
+    print("=" * 60)
+    test_matches_exhaustive_search()
+    test_plan_is_consistent()
+    test_short_and_impossible_trips()
+    test_agrees_with_energy_check()
+    test_replan_from_more_charge()
+    test_planner_speed()
+    test_tool_plans_along_the_corridor()
+    print("✅ Charging planner tests passed!")
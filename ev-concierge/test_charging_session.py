@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test charging-curve sessions: integration tables, O(1) estimates, station index and shared use by the planner
+"""
+
+import time
+import numpy as np
+from utils.charging_planner import plan_charging_stops
+from utils.charging_session import (
+    CHARGING_EFFICIENCY,
+    StationIndex,
+    estimate_reserved_session,
+    get_charging_curve,
+)
+
+def integrate(curve, charger_kw, start, target, steps=200_000):
+    """Fine midpoint integration of dt = dE / P(soc)."""
+    soc = np.linspace(start, target, steps + 1)
+    mid = (soc[:-1] + soc[1:]) / 2
+    power = np.minimum(curve.power_at(mid), charger_kw)
+    return float(np.sum((soc[1:] - soc[:-1]) / 100 * curve.battery_kwh / power * 60))
+
+def test_estimates_match_fine_integration():
+    curve = get_charging_curve("Tesla Model Y")
+    for charger_kw, start, target in [(250, 10, 80), (150, 5.5, 62.3), (50, 20, 100), (350, 0, 100)]:
+        session = curve.estimate(charger_kw, 0.43, start, target)
+        assert abs(session.duration_min - integrate(curve, charger_kw, start, target)) < 0.05
+        assert abs(session.energy_kwh - (target - start) / 100 * 75) < 1e-9
+        assert abs(session.cost_usd - session.energy_kwh / CHARGING_EFFICIENCY * 0.43) < 1e-9
+
+    # The charger, not the car, limits a slow station
+    assert curve.estimate(50, 0.4, 10, 60).duration_min > curve.estimate(250, 0.4, 10, 60).duration_min
+    assert curve.estimate(0, 0.4, 10, 60).duration_min == float("inf")
+    assert curve.estimate(250, 0.4, 60, 40).energy_kwh == 0
+
+def test_soc_after_inverts_duration():
+    curve = get_charging_curve("hyundai ioniq 5")
+    assert curve.model == "Hyundai Ioniq 5"
+    for start, minutes in [(10, 18), (35, 5), (70, 20)]:
+        target = curve.soc_after(150, start, minutes)
+        assert abs(curve.estimate(150, 0.4, start, target).duration_min - minutes) < 0.05
+    assert curve.soc_after(150, 90, 600) == 100
+    assert get_charging_curve("Flux Capacitor").model == "Tesla Model Y"
+
+def test_station_index_and_reserved_sessions():
+    search = [{"id": "OCM-1", "network": "EVgo", "location": "Lost Hills, CA", "power_kw": 150,
+               "price_per_kwh": 0.48, "distance_from_origin_km": 200.0}]
+    plan = {"feasible": True, "stops": [{"station_id": "OCM-2", "network": "Tesla Supercharger", "power_kw": 250,
+                                         "price_per_kwh": 0.45, "arrival_soc_percent": 15, "departure_soc_percent": 65}]}
+    index = StationIndex.from_tool_results([search, plan, {"reservation_id": "RES-1"}, "text"])
+    assert len(index) == 2 and "OCM-1" in index and index.get("missing") is None
+
+    vehicle = {"model": "Tesla Model Y", "battery_percent": 80, "range_miles": 300}
+    planned = estimate_reserved_session(index.get("OCM-2"), 30, vehicle)
+    assert (planned.start_soc_percent, planned.target_soc_percent) == (15, 65)
+
+    searched = estimate_reserved_session(index.get("OCM-1"), 20, vehicle)
+    # 200 km of a 483 km range used on the way there
+    assert abs(searched.start_soc_percent - (80 - 200 / (300 * 1.60934) * 100)) < 1e-9
+    assert abs(searched.duration_min - 20) < 0.05 and searched.energy_kwh > 20
+
+def test_planner_uses_the_curve():
+    stations = [{"id": f"S{i}", "power_kw": 250, "price_per_kwh": 0.4, "distance_from_origin_km": 100.0 * i}
+                for i in range(1, 9)]
+    plan = plan_charging_stops(stations, 900.0, start_soc_percent=80, range_km=450, vehicle_model="Tesla Model Y")
+    curve = get_charging_curve("Tesla Model Y")
+    assert plan["feasible"] and plan["stops"]
+    for stop in plan["stops"]:
+        session = curve.estimate(250, 0.4, stop["arrival_soc_percent"], stop["departure_soc_percent"])
+        assert abs(stop["charge_minutes"] - session.duration_min) < 0.06
+        assert stop["cost_usd"] == round(session.cost_usd, 2)
+
+def test_estimate_speed():
+    curve = get_charging_curve("Ford Mustang Mach-E")
+    curve.estimate(150, 0.4, 10, 80)
+    start = time.perf_counter()
+    for i in range(10_000):
+        curve.estimate(150, 0.4, i % 50, 50 + i % 50)
+    elapsed_us = (time.perf_counter() - start) * 1e6 / 10_000
+    print(f"   {elapsed_us:.1f} µs per estimate")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Charging Session Engine")
+    print("=" * 60)
+    test_estimates_match_fine_integration()
+    test_soc_after_inverts_duration()
+    test_station_index_and_reserved_sessions()
+    test_planner_uses_the_curve()
+    test_estimate_speed()
+    print("✅ Charging session tests passed!")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test polyline corridor matching: chainage, deviation, grid index and route ordering
+"""
+
+import time
+import numpy as np
+import utils.openchargemap_client as ocm
+from utils import geohash
+from utils.corridor import PolylineCorridor
+from utils.location_coords import HAVERSINE, distances_from_line
+from utils.routing import Route
+from utils.station import Station, StationTable
+from test_station_store import EXPORT, write_export
+from utils.station_store import load_ocm_export
+
+def zigzag(points=2001):
+    lats = np.linspace(34.0, 38.0, points)
+    lons = -119.5 + 0.3 * np.sin(np.linspace(0, 12 * np.pi, points))
+    return list(zip(lats.tolist(), lons.tolist()))
+
+def brute_force(corridor, lats, lons):
+    """Nearest point over every segment, without the grid."""
+    px, py = corridor._project(lats, lons)
+    dist_sq, t = corridor._distances_to_segments(px, py, np.arange(corridor.segment_count))
+    dist = np.sqrt(dist_sq)
+    nearest = np.argmin(dist, axis=1)
+    rows = np.arange(len(lats))
+    chainage = corridor.chainage_start[nearest] + t[rows, nearest] * corridor.segment_km[nearest]
+    deviation = dist[rows, nearest]
+    outside = deviation > corridor.max_deviation_km
+    chainage[outside] = np.nan
+    deviation[outside] = np.nan
+    return chainage, deviation
+
+def test_straight_corridor_matches_line_distance():
+    corridor = PolylineCorridor([(34.05, -118.24), (37.77, -122.42)], 150)
+    rng = np.random.default_rng(1)
+    lats = rng.uniform(33.5, 38.5, 500)
+    lons = rng.uniform(-123.0, -117.5, 500)
+    chainage, deviation = corridor.locate(lats, lons)
+    expected = distances_from_line(lats, lons, (34.05, -118.24), (37.77, -122.42), HAVERSINE)
+
+    inside = ~np.isnan(deviation)
+    assert inside.any() and (~inside).any()
+    # Within a few percent of the great-circle distance to the line
+    assert np.allclose(deviation[inside], expected[inside], rtol=0.05, atol=2.0)
+    assert np.all(chainage[inside] <= corridor.length_km + 1e-9)
+
+def test_grid_index_matches_brute_force():
+    corridor = PolylineCorridor(zigzag(), 20)
+    rng = np.random.default_rng(2)
+    lats = rng.uniform(33.8, 38.2, 3000)
+    lons = rng.uniform(-120.0, -119.0, 3000)
+    chainage, deviation = corridor.locate(lats, lons)
+    expected_chainage, expected_deviation = brute_force(corridor, lats, lons)
+
+    assert np.array_equal(np.isnan(deviation), np.isnan(expected_deviation))
+    inside = ~np.isnan(deviation)
+    assert np.allclose(deviation[inside], expected_deviation[inside])
+    assert np.allclose(chainage[inside], expected_chainage[inside])
+
+def test_stations_follow_driving_progress():
+    # Out along one side of a U and back: the station across the gap from the
+    # origin is straight-line close but at the end of the drive
+    route = [(35.0, -119.0), (36.0, -119.0), (36.0, -118.8), (35.0, -118.8)]
+    stations = [
+        Station("near-end", "EVgo", "Town A, CA", "", 35.05, -118.79, 150, 0.4).to_dict(),
+        Station("middle", "EVgo", "Town B, CA", "", 36.01, -118.9, 150, 0.4).to_dict(),
+        Station("start", "EVgo", "Town C, CA", "", 35.1, -119.01, 150, 0.4).to_dict(),
+        Station("far-away", "EVgo", "Town D, CA", "", 35.5, -117.0, 150, 0.4).to_dict(),
+    ]
+    corridor = PolylineCorridor(route, 5)
+    table = ocm.annotate_route_stations(stations, route[0], route[-1], corridor=corridor)
+
+    assert table.ids == ["start", "middle", "near-end"]
+    assert table.distance(2) > 200  # ~111 + 18 + 105 km of driving
+    assert abs(table.detour(0) - 2 * 0.91) < 0.1
+    assert table.station(1)["detour_km"] == table.detour(1)
+
+    reachable = ocm.stations_within_range(table, current_range_miles=100, max_results=10)
+    assert [s["id"] for s in reachable] == ["start", "middle"]
+
+def test_detour_round_trips_through_table():
+    station = Station("s1", "EVgo", "Town, CA", "", 35.0, -119.0, 150, 0.4, distance_from_origin_km=12.0, detour_km=1.5)
+    table = StationTable.from_stations([{"id": "s0", "latitude": 35.0, "longitude": -119.0}, station])
+    assert table.detour(0) is None and table.detour(1) == 1.5
+    assert table.take([1]).station(0)["detour_km"] == 1.5
+    assert "detour_km" not in table.station(0)
+
+def test_tiles_cover_the_polyline():
+    corridor = PolylineCorridor(zigzag(), 50)
+    tiles = set(corridor.tiles(precision=3))
+    for lat, lon in corridor.polyline[::50].tolist():
+        assert geohash.encode(lat, lon, 3) in tiles
+    assert len(corridor.simplified()) < len(corridor.polyline)
+
+def test_route_corridor_follows_road_route():
+    store = load_ocm_export(write_export(EXPORT))
+    # Bakersfield -> Lost Hills -> Kettleman City -> Harris Ranch, as a road router would return it
+    road = Route(260.0, 2.6, [(35.37, -119.02), (35.62, -119.69), (35.99, -119.96), (36.25, -120.24)], "I 5")
+
+    original = (ocm.STATION_SOURCE, ocm.get_snapshot_store, ocm.find_route)
+    ocm.STATION_SOURCE = "snapshot"
+    ocm.get_snapshot_store = lambda: store
+    ocm.find_route = lambda origin, destination: road
+    ocm.clear_corridor_memo()
+    try:
+        corridor = ocm.get_route_corridor((35.37, -119.02), (36.25, -120.24), min_power_kw=150)
+    finally:
+        ocm.STATION_SOURCE, ocm.get_snapshot_store, ocm.find_route = original
+        ocm.clear_corridor_memo()
+
+    assert corridor.ids == ["OCM-2", "OCM-1", "OCM-3"]
+    assert all(corridor.detour(row) is not None for row in range(len(corridor)))
+    # Lost Hills sits on the route: its distance is the driving distance to it
+    assert 60 < corridor.distance(0) < 75
+
+def test_locate_speed():
+    corridor = PolylineCorridor(zigzag(5001), 150)
+    rng = np.random.default_rng(3)
+    lats = rng.uniform(33.0, 39.0, 5000)
+    lons = rng.uniform(-121.0, -118.0, 5000)
+
+    start = time.perf_counter()
+    corridor.locate(lats, lons)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"   5000 stations x {corridor.segment_count} segments: {elapsed_ms:.1f} ms")
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Polyline Corridor Matching")
+    print("=" * 60)
+    test_straight_corridor_matches_line_distance()
+    test_grid_index_matches_brute_force()
+    test_stations_follow_driving_progress()
+    test_detour_round_trips_through_table()
+    test_tiles_cover_the_polyline()
+    test_route_corridor_follows_road_route()
+    test_locate_speed()
+    print("✅ Corridor tests passed!")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test route-corridor tiling for OpenChargeMap station search (no network calls)
+"""
+
+import asyncio
+import json
+import os
+import tools.charging_tools as charging_tools
+from utils import geohash
+from utils.location_coords import get_coordinates, calculate_distance_km, route_corridor_tiles
+import utils.openchargemap_client as ocm
+
+def tile_center(tile):
+    lat_min, lat_max, lon_min, lon_max = geohash.decode_bbox(tile)
+    return (lat_min + lat_max) / 2, (lon_min + lon_max) / 2
+
+def fake_station(station_id, lat, lon, power_kw=150):
+    return {
+        "id": f"OCM-{station_id}", "network": "EVgo", "location": "Test, CA", "address": "Test, CA",
+        "latitude": lat, "longitude": lon, "power_kw": power_kw, "price_per_kwh": 0.4,
+        "available": True, "slots": ["10:00"], "amenities": []
+    }
+
+def test_tiles_scale_with_corridor_length():
+    la = get_coordinates("Los Angeles, CA")
+    sd = get_coordinates("San Diego, CA")
+    sf = get_coordinates("San Francisco, CA")
+    seattle = get_coordinates("Seattle, WA")
+
+    short = route_corridor_tiles(la, sd, 150)
+    medium = route_corridor_tiles(la, sf, 150)
+    long = route_corridor_tiles(seattle, sd, 150)
+    print(f"   LA→SD: {len(short)} tiles, LA→SF: {len(medium)} tiles, SEA→SD: {len(long)} tiles")
+
+    assert len(short) < len(medium) < len(long)
+    # Every tile along the straight line is included
+    for t in [i / 10 for i in range(11)]:
+        point = (seattle[0] + t * (sd[0] - seattle[0]), seattle[1] + t * (sd[1] - seattle[1]))
+        assert geohash.encode(point[0], point[1], 3) in long
+    # Tiles come back ordered by distance from the origin
+    first = tile_center(long[0])
+    last = tile_center(long[-1])
+    assert calculate_distance_km(seattle, first) < calculate_distance_km(seattle, last)
+
+def test_corridor_stations_are_deduplicated():
+    la = get_coordinates("Los Angeles, CA")
+    sf = get_coordinates("San Francisco, CA")
+    tiles = route_corridor_tiles(la, sf, 150)
+    requested = []
+
+    def fake_fetch(api_key, tile, min_power_kw, keep=None):
+        requested.append(tile)
+        lat, lon = tile_center(tile)
+        # Every tile also returns the same Kettleman City station
+        stations = [fake_station(tile, lat, lon), fake_station("KETTLEMAN", 35.99, -119.96)]
+        return stations if keep is None else list(keep(stations))
+
+    original_fetch, original_cache = ocm.fetch_tile_stations, ocm.get_station_cache
+    ocm.fetch_tile_stations = fake_fetch
+    ocm.get_station_cache = lambda: None
+    os.environ.setdefault("OPENCHARGEMAP_API_KEY", "test-key")
+    ocm.clear_corridor_memo()
+    try:
+        stations = ocm.get_corridor_stations("test-key", tiles, 150)
+        assert sorted(requested) == sorted(tiles)
+        ids = [s["id"] for s in stations]
+        assert len(ids) == len(set(ids)) == len(tiles) + 1
+
+        route_stations = ocm.get_chargers_along_route(la, sf, min_power_kw=150, max_results=50)
+        distances = [calculate_distance_km(la, (s["latitude"], s["longitude"])) for s in route_stations]
+        assert distances == sorted(distances)
+    finally:
+        ocm.fetch_tile_stations, ocm.get_station_cache = original_fetch, original_cache
+        ocm.clear_corridor_memo()
+
+def test_insufficient_range_fetches_corridor_once():
+    requested = []
+
+    def fake_fetch(api_key, tile, min_power_kw, keep=None):
+        requested.append(tile)
+        lat, lon = tile_center(tile)
+        stations = [fake_station(tile, lat, lon)]
+        return stations if keep is None else list(keep(stations))
+
+    original = (ocm.fetch_tile_stations, ocm.get_station_cache, ocm.STATION_SOURCE, charging_tools.STATION_SOURCE)
+    ocm.fetch_tile_stations = fake_fetch
+    ocm.get_station_cache = lambda: None
+    ocm.STATION_SOURCE = charging_tools.STATION_SOURCE = "api"
+    os.environ.setdefault("OPENCHARGEMAP_API_KEY", "test-key")
+    ocm.clear_corridor_memo()
+    try:
+        # Too little range: reachable and full-charge sets come from one fetch
+        result = json.loads(charging_tools.search_chargers("Los Angeles, CA", "San Francisco, CA", 150, 5))
+        tiles_fetched = len(requested)
+        assert result["error"] == "insufficient_range"
+        assert result["stations_if_fully_charged"]
+        distances = [s["distance_from_origin_km"] for s in result["stations_if_fully_charged"]]
+        assert distances == sorted(distances)
+        assert distances[-1] <= 300 * 1.60934 * 0.8
+
+        # The coordinator's full-battery follow-up reuses the same corridor
+        full = json.loads(charging_tools.search_chargers("Los Angeles, CA", "San Francisco, CA", 150, 300))
+        assert isinstance(full, list) and full
+        assert len(requested) == tiles_fetched
+        print(f"   {tiles_fetched} tile fetches for both searches")
+    finally:
+        (ocm.fetch_tile_stations, ocm.get_station_cache, ocm.STATION_SOURCE, charging_tools.STATION_SOURCE) = original
+        ocm.clear_corridor_memo()
+
+def test_corridor_with_failed_tiles_is_not_reused():
+    la = get_coordinates("Los Angeles, CA")
+    sf = get_coordinates("San Francisco, CA")
+    requested = []
+    failing = set()
+
+    def fake_fetch(api_key, tile, min_power_kw, keep=None):
+        requested.append(tile)
+        if tile in failing:
+            raise ConnectionError("tile unavailable")
+        lat, lon = tile_center(tile)
+        stations = [fake_station(tile, lat, lon)]
+        return stations if keep is None else list(keep(stations))
+
+    async def fake_fetch_async(api_key, tile, min_power_kw, keep=None):
+        return fake_fetch(api_key, tile, min_power_kw, keep)
+
+    original = (ocm.fetch_tile_stations, ocm.fetch_tile_stations_async, ocm.get_station_cache, ocm.STATION_SOURCE)
+    ocm.fetch_tile_stations = fake_fetch
+    ocm.fetch_tile_stations_async = fake_fetch_async
+    ocm.get_station_cache = lambda: None
+    ocm.STATION_SOURCE = "api"
+    os.environ.setdefault("OPENCHARGEMAP_API_KEY", "test-key")
+    ocm.clear_corridor_memo()
+    try:
+        for get_corridor in (ocm.get_route_corridor, lambda *args: asyncio.run(ocm.get_route_corridor_async(*args))):
+            requested.clear()
+            corridor = get_corridor(la, sf, 150)
+            tiles = list(requested)
+            # Fail a tile whose station is on the route
+            failing.add(corridor.ids[0][len("OCM-"):])
+            ocm.clear_corridor_memo()
+
+            # A corridor missing a tile is served once but fetched again next time
+            requested.clear()
+            partial = get_corridor(la, sf, 150)
+            requested.clear()
+            get_corridor(la, sf, 150)
+            assert sorted(requested) == sorted(tiles)
+
+            # Once every tile loads, the corridor is memoized again
+            failing.clear()
+            ocm.clear_corridor_memo()
+            full = get_corridor(la, sf, 150)
+            assert len(partial) < len(full)
+            requested.clear()
+            get_corridor(la, sf, 150)
+            assert not requested
+            ocm.clear_corridor_memo()
+    finally:
+        (ocm.fetch_tile_stations, ocm.fetch_tile_stations_async, ocm.get_station_cache, ocm.STATION_SOURCE) = original
+        ocm.clear_corridor_memo()
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Route-Corridor Tiling")
+    print("=" * 60)
+    test_tiles_scale_with_corridor_length()
+    test_corridor_stations_are_deduplicated()
+    test_insufficient_range_fetches_corridor_once()
+    test_corridor_with_failed_tiles_is_not_reused()
+    print("✅ Corridor tiling tests passed!")
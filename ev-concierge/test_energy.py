@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test the batch energy API against the single-trip rule, and the fleet CSV check
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from tools.route_tools import calculate_energy_needs
+from utils.energy import batch_energy_needs, energy_needs
+
+def reference(battery_percent, trip_distance_miles, vehicle_range_miles, weather_temp_f=70):
+    """The scalar rule calculate_energy_needs has always used."""
+    temp_factor = 1.0 if 50 <= weather_temp_f <= 80 else 1.15
+    required_percent = (trip_distance_miles / vehicle_range_miles) * 100 * temp_factor
+    buffer = 20
+    return {
+        "current_battery": battery_percent,
+        "required_battery": round(required_percent + buffer, 1),
+        "needs_charging": battery_percent < required_percent + buffer,
+        "deficit_percent": max(0, round(required_percent + buffer - battery_percent, 1)),
+        "charging_strategy": "en-route" if battery_percent > 30 else "pre-trip"
+    }
+
+def fleet(count, seed=4):
+    rng = np.random.default_rng(seed)
+    return (rng.integers(0, 101, count), rng.integers(5, 600, count),
+            rng.choice([220, 260, 300, 330, 358], count), rng.integers(-10, 110, count))
+
+def test_batch_matches_single_trip_rule():
+    battery, distance, vehicle_range, temp = fleet(5000)
+    needs = batch_energy_needs(battery, distance, vehicle_range, temp)
+    for i in range(len(battery)):
+        expected = reference(int(battery[i]), int(distance[i]), int(vehicle_range[i]), int(temp[i]))
+        assert expected == energy_needs(int(battery[i]), int(distance[i]), int(vehicle_range[i]), int(temp[i]))
+        # Vectorized rounding may settle an exact .x5 tie the other way
+        assert abs(needs["required_battery"][i] - expected["required_battery"]) < 0.1 + 1e-9
+        assert abs(needs["deficit_percent"][i] - expected["deficit_percent"]) < 0.1 + 1e-9
+        assert bool(needs["needs_charging"][i]) == expected["needs_charging"]
+        assert ("pre-trip" if needs["pre_trip"][i] else "en-route") == expected["charging_strategy"]
+
+def test_tool_result_unchanged():
+    for args in [(45, 380, 300), (80, 120, 300, 30), (20, 500, 250, 95), (100, 10, 300)]:
+        result = json.loads(calculate_energy_needs(*args))
+        assert result == reference(*args)
+    assert energy_needs(25, 100, 300)["charging_strategy"] == "pre-trip"
+
+def test_broadcasting_and_zero_range():
+    needs = batch_energy_needs([50, 90], 150, [300, 0])
+    assert list(needs["required_battery"]) == [70.0, np.inf]
+    assert list(needs["needs_charging"]) == [True, True]
+
+def test_fleet_speed():
+    battery, distance, vehicle_range, temp = fleet(100_000)
+    start = time.perf_counter()
+    needs = batch_energy_needs(battery, distance, vehicle_range, temp)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"   100000 vehicles: {elapsed_ms:.1f} ms")
+    assert len(needs["required_battery"]) == 100_000
+    assert elapsed_ms < 1000
+
+def test_fleet_csv_report():
+    path = os.path.join(tempfile.mkdtemp(), "fleet.csv")
+    with open(path, "w") as f:
+        f.write("vehicle_id,battery_percent,trip_distance_miles,range_miles,temp_f\n")
+        f.write("VAN-1,25,200,300,40\nVAN-2,90,50,300,\nVAN-3,60,280,300,70\n")
+    output = subprocess.run([sys.executable, "-m", "utils.energy", path], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout
+    assert "3 vehicles checked" in output and "1 need pre-trip charging" in output
+    assert "VAN-1" in output and "VAN-3" not in output
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Batch Energy Calculation")
+    print("=" * 60)
+    test_batch_matches_single_trip_rule()
+    test_tool_result_unchanged()
+    test_broadcasting_and_zero_range()
+    test_fleet_speed()
+    test_fleet_csv_report()
+    print("✅ Energy tests passed!")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test the offline gazetteer: exact, alias, prefix and fuzzy lookups and trip parsing
+"""
+
+import time
+from utils.gazetteer import get_gazetteer, lookup_place
+from utils.location_coords import CITY_COORDINATES, estimate_road_distance_miles, get_coordinates
+
+def test_lookup_names_aliases_and_states():
+    assert lookup_place("Kettleman City").label == "Kettleman City, CA"
+    assert lookup_place("SF").label == "San Francisco, CA"
+    assert lookup_place("L.A.").label == "Los Angeles, CA"
+    assert lookup_place("Bakersfield, CA").coordinates == (35.3733, -119.0187)
+    assert lookup_place("San Francisco, CA, USA").label == "San Francisco, CA"
+    # Same name in two states: the state code decides, otherwise the bigger town wins
+    assert lookup_place("Williams, AZ").admin1 == "AZ"
+    assert lookup_place("Williams").admin1 == "CA"
+    assert lookup_place("Portland, ME") is None
+
+def test_prefix_and_fuzzy_fallbacks():
+    assert lookup_place("Kettle").name == "Kettleman City"
+    assert lookup_place("Bakersfeild").name == "Bakersfield"
+    assert lookup_place("Sna Diego").name == "San Diego"
+    assert lookup_place("Xyzzy") is None
+
+def test_get_coordinates_falls_back_to_gazetteer():
+    for city, coords in CITY_COORDINATES.items():
+        assert get_coordinates(city) == coords
+    assert get_coordinates("Kettleman City") == (36.0083, -119.9618)
+    assert get_coordinates("Vegas") == CITY_COORDINATES["Las Vegas, NV"]
+    assert get_coordinates("Atlantis") is None
+
+def test_extract_route_from_messages():
+    gazetteer = get_gazetteer()
+    cases = {
+        "SF to LA": ("San Francisco, CA", "Los Angeles, CA"),
+        "Plan a trip to Bakersfield tomorrow": (None, "Bakersfield, CA"),
+        "Drive from Fresno to Kettleman City with 40% battery": ("Fresno, CA", "Kettleman City, CA"),
+        "Going to Williams AZ from Vegas": ("Las Vegas, NV", "Williams, AZ"),
+        "Battery at 60%, need to charge": (None, None),
+    }
+    for message, expected in cases.items():
+        origin, destination = gazetteer.extract_route(message)
+        assert (origin and origin.label, destination and destination.label) == expected, message
+
+def test_road_distance_estimate():
+    miles = estimate_road_distance_miles(get_coordinates("SF"), get_coordinates("Los Angeles, CA"))
+    assert 350 < miles < 450
+
+def test_lookups_do_no_file_io_and_are_fast():
+    gazetteer = get_gazetteer()
+    assert get_gazetteer() is gazetteer
+
+    start = time.perf_counter()
+    for _ in range(10000):
+        gazetteer.lookup("Bakersfield, CA")
+    per_lookup_us = (time.perf_counter() - start) / 10000 * 1e6
+    print(f"   exact lookup: {per_lookup_us:.1f} µs")
+    assert per_lookup_us < 200
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Offline Gazetteer")
+    print("=" * 60)
+    test_lookup_names_aliases_and_states()
+    test_prefix_and_fuzzy_fallbacks()
+    test_get_coordinates_falls_back_to_gazetteer()
+    test_extract_route_from_messages()
+    test_road_distance_estimate()
+    test_lookups_do_no_file_io_and_are_fast()
+    print("✅ Gazetteer tests passed!")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test the vectorized geometry kernels in utils/location_coords
+"""
+
+import time
+import numpy as np
+from utils.location_coords import (
+    get_coordinates,
+    calculate_distance_km,
+    distance_from_line,
+    haversine_km,
+    calculate_distances_km,
+    distances_from_line,
+    EQUIRECTANGULAR,
+    HAVERSINE,
+)
+
+SEATTLE = get_coordinates("Seattle, WA")
+SAN_DIEGO = get_coordinates("San Diego, CA")
+
+def random_points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(32, 48, n), rng.uniform(-124, -114, n)
+
+def test_equirectangular_batch_matches_scalar():
+    lats, lons = random_points(200)
+    batch_distance = calculate_distances_km(SEATTLE, lats, lons, EQUIRECTANGULAR)
+    batch_deviation = distances_from_line(lats, lons, SEATTLE, SAN_DIEGO, EQUIRECTANGULAR)
+    for i in range(len(lats)):
+        point = (lats[i], lons[i])
+        assert abs(batch_distance[i] - calculate_distance_km(SEATTLE, point)) < 1e-6
+        assert abs(batch_deviation[i] - distance_from_line(point, SEATTLE, SAN_DIEGO)) < 1e-6
+
+def test_haversine_distances():
+    # Seattle → San Diego great-circle distance is about 1712 km
+    assert abs(haversine_km(SEATTLE, SAN_DIEGO) - 1712) < 2
+    lats, lons = random_points(50)
+    batch = calculate_distances_km(SEATTLE, lats, lons, HAVERSINE)
+    for i in range(len(lats)):
+        assert abs(batch[i] - haversine_km(SEATTLE, (lats[i], lons[i]))) < 1e-6
+
+def test_haversine_segment_distance():
+    # Points on the route have no deviation
+    assert distances_from_line([SEATTLE[0]], [SEATTLE[1]], SEATTLE, SAN_DIEGO)[0] < 1e-6
+    # Points beyond the ends measure to the nearest endpoint
+    beyond = distances_from_line([30.0], [-117.0], SEATTLE, SAN_DIEGO)[0]
+    assert abs(beyond - haversine_km((30.0, -117.0), SAN_DIEGO)) < 1e-6
+    # Degenerate segment falls back to point distance
+    same = distances_from_line([34.0], [-118.0], SAN_DIEGO, SAN_DIEGO)[0]
+    assert abs(same - haversine_km((34.0, -118.0), SAN_DIEGO)) < 1e-6
+
+def test_100k_stations_filter_in_milliseconds():
+    lats, lons = random_points(100_000)
+    start = time.perf_counter()
+    deviations = distances_from_line(lats, lons, SEATTLE, SAN_DIEGO, HAVERSINE)
+    distances = calculate_distances_km(SEATTLE, lats, lons, HAVERSINE)
+    mask = (deviations <= 150) & (distances <= 400)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"   Filtered 100k stations in {elapsed_ms:.1f} ms ({int(mask.sum())} match)")
+    assert elapsed_ms < 500
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Vectorized Geometry Kernels")
+    print("=" * 60)
+    test_equirectangular_batch_matches_scalar()
+    test_haversine_distances()
+    test_haversine_segment_distance()
+    test_100k_stations_filter_in_milliseconds()
+    print("✅ Geometry kernel tests passed!")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test the pooled, retrying HTTP client against a local HTTP server
+"""
+
+import asyncio
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from utils.http_client import HttpClient, get_async_http_client, backoff_delay
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    failures_left = 0
+    connections = set()
+
+    def do_GET(self):
+        Handler.connections.add(self.client_address)
+        if self.path.startswith("/flaky") and Handler.failures_left > 0:
+            Handler.failures_left -= 1
+            self._send(503, b"busy")
+            return
+        if self.path.startswith("/missing"):
+            self._send(404, b"nope")
+            return
+
+        body = json.dumps([{"ID": 1}]).encode()
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            self._send(200, gzip.compress(body), {"Content-Encoding": "gzip"})
+        else:
+            self._send(200, body)
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Content-Type", "application/json")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def test_pooled_gzip_requests_reuse_connection():
+    server, base_url = start_server()
+    Handler.connections = set()
+    try:
+        client = HttpClient(max_retries=0)
+        for _ in range(5):
+            response = client.get(f"{base_url}/poi/")
+            assert response.json() == [{"ID": 1}]
+        assert response.headers["Content-Encoding"] == "gzip"
+        # All five requests went over one kept-alive connection
+        assert len(Handler.connections) == 1
+        assert client.metrics.snapshot()["requests"] == 5
+    finally:
+        server.shutdown()
+
+def test_retries_transient_errors_then_succeeds():
+    server, base_url = start_server()
+    Handler.failures_left = 2
+    try:
+        client = HttpClient(max_retries=3)
+        assert client.get_json(f"{base_url}/flaky") == [{"ID": 1}]
+        metrics = client.metrics.snapshot()
+        print(f"   Metrics: {metrics}")
+        assert metrics["retries"] == 2
+        assert metrics["failures"] == 0
+        assert metrics["p50_ms"] is not None
+    finally:
+        server.shutdown()
+
+def test_gives_up_after_bounded_retries():
+    server, base_url = start_server()
+    Handler.failures_left = 10
+    try:
+        client = HttpClient(max_retries=1)
+        try:
+            client.get(f"{base_url}/flaky")
+            assert False, "expected HTTPError"
+        except requests.exceptions.HTTPError as e:
+            assert e.response.status_code == 503
+
+        # Client errors are not retried
+        try:
+            client.get(f"{base_url}/missing")
+            assert False, "expected HTTPError"
+        except requests.exceptions.HTTPError as e:
+            assert e.response.status_code == 404
+        metrics = client.metrics.snapshot()
+        assert metrics["failures"] == 2
+        assert metrics["retries"] == 1
+    finally:
+        server.shutdown()
+        Handler.failures_left = 0
+
+def test_async_client_retries_and_is_per_loop():
+    server, base_url = start_server()
+    Handler.failures_left = 1
+    try:
+        async def scenario():
+            client = get_async_http_client()
+            assert get_async_http_client() is client
+            data = await client.get_json(f"{base_url}/flaky")
+            await client.aclose()
+            return client, data
+
+        first_client, data = asyncio.run(scenario())
+        assert data == [{"ID": 1}]
+        assert first_client.metrics.snapshot()["retries"] == 1
+
+        # A new event loop gets its own client
+        second_client, _ = asyncio.run(scenario())
+        assert second_client is not first_client
+    finally:
+        server.shutdown()
+        Handler.failures_left = 0
+
+def test_backoff_is_jittered_and_capped():
+    delays = [backoff_delay(attempt, base=0.25, cap=4) for attempt in range(10) for _ in range(20)]
+    assert all(0 <= d <= 4 for d in delays)
+    assert len(set(delays)) > 1
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Pooled HTTP Client")
+    print("=" * 60)
+    test_pooled_gzip_requests_reuse_connection()
+    test_retries_transient_errors_then_succeeds()
+    test_gives_up_after_bounded_retries()
+    test_async_client_retries_and_is_per_loop()
+    test_backoff_is_jittered_and_capped()
+    print("✅ HTTP client tests passed!")
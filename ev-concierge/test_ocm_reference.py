@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test compact OpenChargeMap responses resolved through cached reference data (local HTTP server)
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import utils.ocm_reference as ocm_reference
+import utils.openchargemap_client as ocm
+
+REFERENCE = {
+    "Operators": [{"ID": 23, "Title": "Tesla Motors (Worldwide)"}, {"ID": 59, "Title": "EVgo"}],
+    "StatusTypes": [{"ID": 50, "Title": "Operational", "IsOperational": True},
+                    {"ID": 100, "Title": "Not Operational", "IsOperational": False}],
+    "ConnectionTypes": [{"ID": 33, "Title": "CCS (Type 1)"}, {"ID": 27, "Title": "Tesla Supercharger"}],
+}
+
+def verbose_poi(poi_id, operator_id, status_id, power_kw):
+    operator = next(o for o in REFERENCE["Operators"] if o["ID"] == operator_id)
+    status = next(s for s in REFERENCE["StatusTypes"] if s["ID"] == status_id)
+    return {
+        "ID": poi_id,
+        "AddressInfo": {"Title": f"Site {poi_id}", "Town": "Kettleman City", "StateOrProvince": "CA",
+                        "AddressLine1": "1 Main St", "Latitude": 35.99, "Longitude": -119.96},
+        "OperatorID": operator_id, "OperatorInfo": operator,
+        "StatusTypeID": status_id, "StatusType": status,
+        "UsageCost": "$0.48/kWh",
+        "Connections": [{"ConnectionTypeID": 33, "ConnectionType": REFERENCE["ConnectionTypes"][0],
+                         "StatusTypeID": status_id, "StatusType": status, "PowerKW": power_kw}],
+    }
+
+def compact_poi(poi):
+    poi = {k: v for k, v in poi.items() if k not in ("OperatorInfo", "StatusType")}
+    poi["Connections"] = [
+        {k: v for k, v in c.items() if k not in ("ConnectionType", "StatusType")} for c in poi["Connections"]
+    ]
+    return poi
+
+POIS = [verbose_poi(1, 23, 50, 250), verbose_poi(2, 59, 100, 350), verbose_poi(3, 59, 50, 150)]
+
+class Handler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        Handler.requests.append((url.path, query.get("compact", [None])[0]))
+        if url.path.endswith("/referencedata/"):
+            body = REFERENCE
+        elif query.get("compact") == ["true"]:
+            body = [compact_poi(p) for p in POIS]
+        else:
+            body = POIS
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def with_server(test):
+    def wrapper():
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        path = os.path.join(tempfile.mkdtemp(), "ocm_reference.json")
+        original = (ocm.OPENCHARGEMAP_BASE_URL, ocm_reference.OPENCHARGEMAP_BASE_URL,
+                    ocm.OPENCHARGEMAP_COMPACT, ocm.get_reference_data)
+        ocm.OPENCHARGEMAP_BASE_URL = ocm_reference.OPENCHARGEMAP_BASE_URL = base_url
+        ocm.OPENCHARGEMAP_COMPACT = True
+        ocm.get_reference_data = lambda api_key: ocm_reference.get_reference_data(api_key, path)
+        ocm_reference.reset_reference_data()
+        Handler.requests = []
+        try:
+            return test(path)
+        finally:
+            (ocm.OPENCHARGEMAP_BASE_URL, ocm_reference.OPENCHARGEMAP_BASE_URL,
+             ocm.OPENCHARGEMAP_COMPACT, ocm.get_reference_data) = original
+            ocm_reference.reset_reference_data()
+            server.shutdown()
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+@with_server
+def test_compact_responses_parse_to_same_stations(path):
+    stations = ocm.fetch_tile_stations("test-key", "9q4", 150)
+    assert stations == ocm.parse_openchargemap_response(POIS)
+    assert [s["network"] for s in stations] == ["Tesla Supercharger", "EVgo", "EVgo"]
+    assert [s["available"] for s in stations] == [True, False, True]
+
+    # Reference data was downloaded once, then POIs were requested in compact form
+    assert Handler.requests == [("/referencedata/", None), ("/poi/", "true")]
+    verbose_size = len(json.dumps(POIS))
+    compact_size = len(json.dumps([compact_poi(p) for p in POIS]))
+    print(f"   Payload: verbose {verbose_size} bytes, compact {compact_size} bytes")
+    assert compact_size < verbose_size * 0.6
+
+@with_server
+def test_reference_data_is_reused_from_disk(path):
+    ocm.fetch_tile_stations("test-key", "9q4", 150)
+    assert os.path.exists(path)
+
+    # A new process (simulated by a reset) loads the disk copy instead of downloading
+    ocm_reference.reset_reference_data()
+    Handler.requests = []
+    ocm.fetch_tile_stations("test-key", "9q4", 150)
+    assert Handler.requests == [("/poi/", "true")]
+
+    reference = ocm_reference.OCMReferenceData.load(path)
+    assert reference.operator_title(23) == "Tesla Motors (Worldwide)"
+    assert reference.status_type(100) == ("Not Operational", False)
+    assert reference.connection_title(33) == "CCS (Type 1)"
+
+@with_server
+def test_old_reference_data_refreshes_in_background(path):
+    reference = ocm_reference.OCMReferenceData.from_api_response(REFERENCE)
+    reference.fetched_at = time.time() - 30 * 24 * 3600
+    reference.save(path)
+
+    # Old data is served immediately; the refresh happens off the request path
+    assert ocm_reference.get_reference_data("test-key", path) is not None
+    deadline = time.time() + 5
+    while ocm_reference.OCMReferenceData.load(path).fetched_at < time.time() - 3600:
+        assert time.time() < deadline, "reference data was not refreshed"
+        time.sleep(0.05)
+    assert ("/referencedata/", None) in Handler.requests
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Compact Responses and Reference Data")
+    print("=" * 60)
+    test_compact_responses_parse_to_same_stations()
+    test_reference_data_is_reused_from_disk()
+    test_old_reference_data_refreshes_in_background()
+    print("✅ Reference data tests passed!")
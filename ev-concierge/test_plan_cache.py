@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test the precomputed plan cache: bucketed keys, warm-up, TTL and invalidation on station changes
+"""
+
+import utils.plan_cache as plan_cache
+import tools.charging_tools as charging_tools
+from utils.plan_cache import PlanCache, get_plan_skeleton, plan_key, warm_plan_cache
+
+class FakeStore:
+    version = 0
+
+def counting_builder(calls):
+    def build(origin, destination, battery_percent, range_miles, min_power_kw=150, vehicle_model="Tesla Model Y"):
+        calls.append((origin, destination, battery_percent, range_miles))
+        return {"origin": origin, "destination": destination, "battery_percent": battery_percent}
+    return build
+
+def test_keys_share_buckets_and_aliases():
+    key = plan_key("San Francisco, CA", "Los Angeles, CA", 47, 310)
+    assert key == plan_key("SF", "LA", 40, 300)
+    assert key[4:] == (40, 300, 150, "Tesla Model Y")
+    # Each charging curve gets its own plans; unknown models share the default curve's
+    assert key != plan_key("SF", "LA", 40, 300, vehicle_model="Chevrolet Bolt EV")
+    assert key == plan_key("SF", "LA", 40, 300, vehicle_model="Unknown Roadster")
+    assert key != plan_key("San Francisco, CA", "Los Angeles, CA", 50, 310)
+    assert plan_key("Atlantis", "Los Angeles, CA", 50, 300) is None
+
+def test_warm_then_serve_without_rebuilding():
+    calls = []
+    original = plan_cache.build_plan_skeleton
+    plan_cache.build_plan_skeleton = counting_builder(calls)
+    plan_cache.clear_plan_cache()
+    try:
+        pairs = [("San Francisco, CA", "Los Angeles, CA"), ("Seattle, WA", "Las Vegas, NV"), ("Seattle, WA", "Seattle, WA")]
+        assert warm_plan_cache(pairs, battery_levels=[20, 60]) == 4
+        assert warm_plan_cache(pairs, battery_levels=[20, 60]) == 0
+
+        skeleton = get_plan_skeleton("SF", "Los Angeles, CA", 64)
+        assert skeleton["battery_percent"] == 60  # planned for the bottom of the bucket
+        assert len(calls) == 4
+        assert get_plan_skeleton("SF", "San Diego, CA", 64, build=False) is None
+    finally:
+        plan_cache.build_plan_skeleton = original
+        plan_cache.clear_plan_cache()
+
+def test_station_changes_and_ttl_invalidate():
+    calls = []
+    store = FakeStore()
+    original = (plan_cache.build_plan_skeleton, plan_cache.STATION_SOURCE, plan_cache.get_snapshot_store)
+    plan_cache.build_plan_skeleton = counting_builder(calls)
+    plan_cache.STATION_SOURCE = "snapshot"
+    plan_cache.get_snapshot_store = lambda: store
+    plan_cache.clear_plan_cache()
+    try:
+        get_plan_skeleton("Seattle, WA", "San Francisco, CA", 80)
+        get_plan_skeleton("Seattle, WA", "San Francisco, CA", 80)
+        assert len(calls) == 1
+
+        store.version += 1  # e.g. a delta sync updated a station
+        get_plan_skeleton("Seattle, WA", "San Francisco, CA", 80)
+        assert len(calls) == 2
+    finally:
+        plan_cache.build_plan_skeleton, plan_cache.STATION_SOURCE, plan_cache.get_snapshot_store = original
+        plan_cache.clear_plan_cache()
+
+    cache = PlanCache(ttl_seconds=0.0, max_entries=2)
+    cache.put("k", {}, None)
+    assert cache.get("k") is None and len(cache) == 0
+    cache = PlanCache(ttl_seconds=60, max_entries=2)
+    for key in "abc":
+        cache.put(key, {"key": key}, None)
+    assert cache.get("a") is None and cache.get("c") == {"key": "c"}
+
+def test_skeleton_has_route_energy_and_plan():
+    original = charging_tools.STATION_SOURCE
+    charging_tools.STATION_SOURCE = "mock"
+    plan_cache.clear_plan_cache()
+    try:
+        skeleton = get_plan_skeleton("Los Angeles, CA", "San Diego, CA", 90)
+    finally:
+        charging_tools.STATION_SOURCE = original
+        plan_cache.clear_plan_cache()
+
+    assert 100 < skeleton["route"]["distance_miles"] < 200
+    assert skeleton["energy"]["needs_charging"] is False
+    assert skeleton["charging_plan"]["feasible"] and skeleton["charging_plan"]["stops"] == []
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Precomputed Plan Cache")
+    print("=" * 60)
+    test_keys_share_buckets_and_aliases()
+    test_warm_then_serve_without_rebuilding()
+    test_station_changes_and_ttl_invalidate()
+    test_skeleton_has_route_energy_and_plan()
+    print("✅ Plan cache tests passed!")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test the offline road graph: OSM parsing, degree-2 contraction, CSR layout and A* routes
+"""
+
+import heapq
+import json
+import math
+import os
+import random
+import tempfile
+import time
+import utils.routing as routing
+from utils.routing import RoadGraph, build_road_graph
+
+def write_osm(nodes, ways, name="extract.osm"):
+    """nodes: {id: (lat, lon)}, ways: [(refs, tags)]"""
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<osm version="0.6">']
+    for node_id, (lat, lon) in nodes.items():
+        lines.append(f'  <node id="{node_id}" lat="{lat}" lon="{lon}"/>')
+    for way_id, (refs, tags) in enumerate(ways, 1):
+        lines.append(f'  <way id="{way_id}">')
+        lines.extend(f'    <nd ref="{ref}"/>' for ref in refs)
+        lines.extend(f'    <tag k="{k}" v="{v}"/>' for k, v in tags.items())
+        lines.append('  </way>')
+    lines.append('</osm>')
+    path = os.path.join(tempfile.mkdtemp(), name)
+    with open(path, "w") as f:
+        f.write("\n".join(lines))
+    return path
+
+def grid_extract(size, spacing=0.01, seed=7):
+    """size x size street grid with a north-south trunk road on the middle column."""
+    rng = random.Random(seed)
+    nodes = {}
+    for row in range(size):
+        for col in range(size):
+            nodes[row * size + col + 1] = (35.0 + row * spacing, -119.0 + col * spacing)
+    ways = []
+    classes = ["residential", "tertiary", "secondary", "primary"]
+    for row in range(size):
+        refs = [row * size + col + 1 for col in range(size)]
+        ways.append((refs, {"highway": rng.choice(classes), "name": f"Row {row}"}))
+    for col in range(size):
+        refs = [row * size + col + 1 for row in range(size)]
+        if col == size // 2:
+            ways.append((refs, {"highway": "trunk", "ref": "CA 99"}))
+        else:
+            ways.append((refs, {"highway": rng.choice(classes)}))
+    return nodes, ways
+
+def dijkstra_time(graph, source, target):
+    times = graph.segment_time_s[graph.edge_segments]
+    best = {source: 0.0}
+    heap = [(0.0, source)]
+    while heap:
+        cost, node = heapq.heappop(heap)
+        if node == target:
+            return cost
+        if cost > best[node]:
+            continue
+        for edge in range(graph.offsets[node], graph.offsets[node + 1]):
+            neighbor = int(graph.targets[edge])
+            new_cost = cost + float(times[edge])
+            if new_cost < best.get(neighbor, math.inf):
+                best[neighbor] = new_cost
+                heapq.heappush(heap, (new_cost, neighbor))
+    return None
+
+def test_degree_two_chains_are_contracted():
+    # A-B-C-D is one road; E joins at C. B is degree 2, so it is shape only
+    nodes = {1: (35.0, -119.0), 2: (35.01, -119.0), 3: (35.02, -119.0), 4: (35.03, -119.0), 5: (35.02, -119.01),
+             9: (36.0, -118.0)}
+    ways = [([1, 2, 3, 4], {"highway": "primary"}), ([3, 5], {"highway": "residential"}),
+            ([4, 9], {"highway": "footway"})]
+    graph = build_road_graph(write_osm(nodes, ways))
+
+    assert graph.node_count == 4  # 1, 3, 4, 5
+    assert graph.edge_count == 6  # three two-way segments
+    assert len(graph.shape_lat) == 1  # node 2
+    assert list(graph.offsets) == sorted(graph.offsets)
+
+    route = graph.route((35.0, -119.0), (35.03, -119.0))
+    assert route.polyline[0] == (35.0, -119.0) and route.polyline[-1] == (35.03, -119.0)
+    assert (35.01, -119.0) in route.polyline
+    assert abs(route.distance_km - 3.34) < 0.05
+    assert abs(route.duration_hours - route.distance_km / 75) < 1e-4
+
+def test_oneway_and_maxspeed():
+    nodes = {1: (35.0, -119.0), 2: (35.1, -119.0), 3: (35.05, -118.9)}
+    ways = [([1, 2], {"highway": "motorway", "maxspeed": "70 mph"}),
+            ([1, 3, 2], {"highway": "secondary", "oneway": "-1"})]
+    graph = build_road_graph(write_osm(nodes, ways))
+
+    forward = graph.route((35.0, -119.0), (35.1, -119.0))
+    backward = graph.route((35.1, -119.0), (35.0, -119.0))
+    assert forward.distance_km < backward.distance_km  # motorways are one-way; back via node 3
+    assert abs(forward.duration_hours - forward.distance_km / (70 * 1.60934)) < 1e-4
+    assert backward.polyline[1] == (35.05, -118.9)
+
+def test_astar_matches_dijkstra_and_survives_save_load():
+    graph = build_road_graph(write_osm(*grid_extract(30)))
+    path = os.path.join(tempfile.mkdtemp(), "roads.npz")
+    graph.save(path)
+    loaded = RoadGraph.load(path)
+    assert loaded.node_count == graph.node_count and loaded.road_names == graph.road_names
+
+    rng = random.Random(3)
+    for _ in range(20):
+        source, target = rng.randrange(graph.node_count), rng.randrange(graph.node_count)
+        edges = loaded.shortest_path(source, target)
+        cost = sum(float(loaded.segment_time_s[loaded.edge_segments[e]]) for e in edges)
+        assert abs(cost - dijkstra_time(graph, source, target)) < 1e-3
+
+    # Long north-south trips follow the trunk road
+    route = loaded.route((35.0, -119.0), (35.29, -118.71))
+    assert route.main_road == "CA 99"
+
+def test_grid_query_speed():
+    graph = build_road_graph(write_osm(*grid_extract(120)))
+    graph.route((35.0, -119.0), (35.0, -119.0))  # converts the search lists
+
+    start = time.perf_counter()
+    route = graph.route((35.0, -119.0), (36.19, -117.81))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"   {graph.node_count} nodes: corner-to-corner route in {elapsed_ms:.1f} ms")
+    assert route is not None and route.distance_km > 150
+
+def test_get_route_info_falls_back_without_graph():
+    from tools.route_tools import get_route_info
+
+    original = routing._graph, routing._failed_path
+    routing._graph, routing._failed_path = None, None
+    try:
+        info = json.loads(get_route_info("San Francisco, CA", "Los Angeles, CA"))
+        assert 350 < info["distance_miles"] < 450
+        assert info["route"].startswith("South")
+
+        routing._graph = build_road_graph(write_osm(*grid_extract(10)))
+        info = json.loads(get_route_info("Bakersfield, CA", "Kettleman City"))
+        assert "estimated" in info["route"]  # both ends are off the tiny graph
+
+        assert json.loads(get_route_info("Atlantis", "Los Angeles, CA"))["error"] == "invalid_location"
+    finally:
+        routing._graph, routing._failed_path = original
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Offline Road Routing")
+    print("=" * 60)
+    test_degree_two_chains_are_contracted()
+    test_oneway_and_maxspeed()
+    test_astar_matches_dijkstra_and_survives_save_load()
+    test_grid_query_speed()
+    test_get_route_info_falls_back_without_graph()
+    print("✅ Routing tests passed!")
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Test single-flight coalescing of concurrent identical station searches (no network calls)
+"""
+
+import asyncio
+import os
+import threading
+import time
+import utils.openchargemap_client as ocm
+from utils import geohash
+from utils.location_coords import get_coordinates
+from utils.singleflight import SingleFlight, AsyncSingleFlight
+
+ORIGIN = get_coordinates("Los Angeles, CA")
+DESTINATION = get_coordinates("San Francisco, CA")
+
+def tile_center(tile):
+    lat_min, lat_max, lon_min, lon_max = geohash.decode_bbox(tile)
+    return (lat_min + lat_max) / 2, (lon_min + lon_max) / 2
+
+def fake_station(tile):
+    lat, lon = tile_center(tile)
+    return {
+        "id": f"OCM-{tile}", "network": "EVgo", "location": f"{tile}, CA", "address": f"{tile}, CA",
+        "latitude": lat, "longitude": lon, "power_kw": 150, "price_per_kwh": 0.4,
+        "available": True, "slots": ["10:00"], "amenities": []
+    }
+
+def patched(test):
+    def wrapper():
+        original = (ocm.fetch_tile_stations, ocm.fetch_tile_stations_async, ocm.get_station_cache, ocm.STATION_SOURCE)
+        calls = {"sync": 0, "async": 0}
+
+        def fake_fetch(api_key, tile, min_power_kw, keep=None):
+            calls["sync"] += 1
+            time.sleep(0.02)
+            stations = [fake_station(tile)]
+            return stations if keep is None else list(keep(stations))
+
+        async def fake_fetch_async(api_key, tile, min_power_kw, keep=None):
+            calls["async"] += 1
+            await asyncio.sleep(0.02)
+            stations = [fake_station(tile)]
+            return stations if keep is None else list(keep(stations))
+
+        ocm.fetch_tile_stations = fake_fetch
+        ocm.fetch_tile_stations_async = fake_fetch_async
+        ocm.get_station_cache = lambda: None
+        ocm.STATION_SOURCE = "api"
+        os.environ.setdefault("OPENCHARGEMAP_API_KEY", "test-key")
+        ocm.clear_corridor_memo()
+        try:
+            return test(calls)
+        finally:
+            ocm.clear_corridor_memo()
+            (ocm.fetch_tile_stations, ocm.fetch_tile_stations_async, ocm.get_station_cache, ocm.STATION_SOURCE) = original
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+def test_singleflight_shares_result_and_error():
+    flight = SingleFlight()
+    runs = []
+    release = threading.Event()
+
+    def work():
+        runs.append(1)
+        release.wait(1)
+        return "result"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", work))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(runs) == 1
+    assert all(shared for _, shared in results)
+    assert all(result == "result" for result, _ in results)
+
+    # Errors reach every waiter, and nothing is cached afterwards
+    def failing():
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("bad", failing)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 3
+    assert flight.do("bad", lambda: "recovered") == ("recovered", False)
+
+@patched
+def test_concurrent_sync_searches_fetch_once(calls):
+    results = []
+
+    def search(range_miles):
+        results.append(ocm.get_chargers_along_route(
+            ORIGIN, DESTINATION, min_power_kw=150, max_results=50, current_range_miles=range_miles
+        ))
+
+    # Different ranges still share the corridor fetch; range is applied locally
+    threads = [threading.Thread(target=search, args=(283 if i % 2 else 289,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    tiles = len(ocm.route_corridor_tiles(ORIGIN, DESTINATION, ocm.MAX_DEVIATION_KM, ocm.TILE_PRECISION))
+    print(f"   6 searches, {calls['sync']} tile fetches for {tiles} tiles")
+    assert calls["sync"] == tiles
+    assert len(results) == 6 and results[0]
+
+    # Each caller owns its dicts
+    results[0][0]["available"] = "mutated"
+    assert results[1][0]["available"] is True
+
+@patched
+def test_concurrent_async_searches_fetch_once(calls):
+    async def scenario():
+        return await asyncio.gather(*[
+            ocm.get_chargers_along_route_async(ORIGIN, DESTINATION, min_power_kw=150, max_results=50)
+            for _ in range(6)
+        ])
+
+    results = asyncio.run(scenario())
+    tiles = len(ocm.route_corridor_tiles(ORIGIN, DESTINATION, ocm.MAX_DEVIATION_KM, ocm.TILE_PRECISION))
+    assert calls["async"] == tiles
+    assert all(r == results[0] for r in results) and results[0]
+
+    # Once finished, a new search fetches again unless the corridor is memoized
+    ocm.clear_corridor_memo()
+    asyncio.run(scenario())
+    assert calls["async"] == 2 * tiles
+
+def test_async_singleflight_survives_cancelled_caller():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        runs = []
+
+        async def work():
+            runs.append(1)
+            await asyncio.sleep(0.05)
+            return 42
+
+        first = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, runs
+
+    (result, shared), runs = asyncio.run(scenario())
+    assert (result, shared, len(runs)) == (42, True, 1)
+
+def test_async_singleflight_reports_sharing_to_the_leader():
+    async def work():
+        await asyncio.sleep(0.02)
+        return "result"
+
+    async def scenario():
+        flight = AsyncSingleFlight()
+        alone = await flight.do("k", work)
+        together = await asyncio.gather(*(flight.do("k", work) for _ in range(3)))
+        return alone, together
+
+    alone, together = asyncio.run(scenario())
+    assert alone == ("result", False)
+    # The leader's result went to the waiters too, just like with SingleFlight
+    assert together == [("result", True)] * 3
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Single-Flight Search Coalescing")
+    print("=" * 60)
+    test_singleflight_shares_result_and_error()
+    test_concurrent_sync_searches_fetch_once()
+    test_concurrent_async_searches_fetch_once()
+    test_async_singleflight_survives_cancelled_caller()
+    test_async_singleflight_reports_sharing_to_the_leader()
+    print("✅ Single-flight tests passed!")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test the on-disk station tile cache (fresh, stale-while-revalidate, expired)
+"""
+
+import os
+import tempfile
+import time
+from utils import geohash
+from utils.station_cache import StationTileCache, FRESH, STALE, EXPIRED, MISS
+
+STATIONS = [{"id": "OCM-1", "network": "EVgo", "latitude": 35.99, "longitude": -119.96, "power_kw": 350}]
+
+def make_cache(ttl_seconds=60, stale_seconds=60):
+    path = os.path.join(tempfile.mkdtemp(), "tiles.sqlite3")
+    return StationTileCache(path, ttl_seconds=ttl_seconds, stale_seconds=stale_seconds)
+
+def test_geohash_round_trip():
+    tile = geohash.encode(36.0, -120.0, 4)
+    lat_min, lat_max, lon_min, lon_max = geohash.decode_bbox(tile)
+    assert len(tile) == 4
+    assert lat_min <= 36.0 <= lat_max
+    assert lon_min <= -120.0 <= lon_max
+
+def test_fresh_hit_skips_fetch():
+    cache = make_cache()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return STATIONS
+
+    assert cache.get("9q5c/r500", 150) == (None, MISS)
+    assert cache.get_or_fetch("9q5c/r500", 150, fetch) == STATIONS
+    assert cache.get_or_fetch("9q5c/r500", 150, fetch) == STATIONS
+    assert len(calls) == 1
+    assert cache.get("9q5c/r500", 150)[1] == FRESH
+    # Power filter is part of the key
+    assert cache.get("9q5c/r500", 50) == (None, MISS)
+
+def test_stale_served_while_revalidating():
+    cache = make_cache(ttl_seconds=60, stale_seconds=3600)
+    cache.put("9q5c/r500", 150, STATIONS, ttl_seconds=0)
+    time.sleep(0.01)
+    assert cache.get("9q5c/r500", 150)[1] == STALE
+
+    refreshed = [{**STATIONS[0], "power_kw": 250}]
+    assert cache.get_or_fetch("9q5c/r500", 150, lambda: refreshed) == STATIONS
+
+    deadline = time.time() + 2
+    while cache.get("9q5c/r500", 150)[1] != FRESH and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.get("9q5c/r500", 150) == (refreshed, FRESH)
+
+def test_expired_falls_back_when_fetch_fails():
+    cache = make_cache(ttl_seconds=60, stale_seconds=0)
+    cache.put("9q5c/r500", 150, STATIONS, ttl_seconds=0)
+    time.sleep(0.01)
+    assert cache.get("9q5c/r500", 150)[1] == EXPIRED
+
+    def failing_fetch():
+        raise ConnectionError("OCM unavailable")
+
+    assert cache.get_or_fetch("9q5c/r500", 150, failing_fetch) == STATIONS
+
+def test_lookup_is_fast():
+    cache = make_cache()
+    cache.put("9q5c/r500", 150, STATIONS * 200)
+    start = time.perf_counter()
+    for _ in range(100):
+        cache.get("9q5c/r500", 150)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / 100
+    print(f"   Average cached tile lookup: {elapsed_ms:.2f} ms")
+    assert elapsed_ms < 10
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Station Tile Cache")
+    print("=" * 60)
+    test_geohash_round_trip()
+    test_fresh_hit_skips_fetch()
+    test_stale_served_while_revalidating()
+    test_expired_falls_back_when_fetch_fails()
+    test_lookup_is_fast()
+    print("✅ Station tile cache tests passed!")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test the offline station snapshot store (no network calls)
+"""
+
+import json
+import os
+import tempfile
+import utils.openchargemap_client as ocm
+from utils.location_coords import get_coordinates
+from utils.station_store import StationStore, load_ocm_export
+
+def make_poi(poi_id, title, town, lat, lon, power_kw, operator="Electrify America", operational=True):
+    return {
+        "ID": poi_id,
+        "OperatorInfo": {"Title": operator},
+        "AddressInfo": {
+            "Title": title, "Town": town, "StateOrProvince": "CA",
+            "AddressLine1": f"{poi_id} Main St", "Latitude": lat, "Longitude": lon
+        },
+        "Connections": [{"PowerKW": power_kw}],
+        "StatusType": {"IsOperational": operational},
+        "UsageCost": "$0.48/kWh"
+    }
+
+EXPORT = [
+    make_poi(1, "Kettleman City Supercharger", "Kettleman City", 35.99, -119.96, 250, "Tesla"),
+    make_poi(2, "Lost Hills EA", "Lost Hills", 35.62, -119.69, 350),
+    make_poi(3, "Harris Ranch", "Coalinga", 36.25, -120.24, 150, "EVgo Network"),
+    make_poi(4, "Slow Charger", "Bakersfield", 35.37, -119.02, 7, "ChargePoint"),
+    make_poi(5, "Las Vegas EA", "Las Vegas", 36.17, -115.14, 350),
+]
+
+def write_export(records, name="ocm-export.json"):
+    path = os.path.join(tempfile.mkdtemp(), name)
+    with open(path, "w") as f:
+        if name.endswith(".jsonl"):
+            f.write("\n".join(json.dumps(r) for r in records))
+        else:
+            json.dump(records, f)
+    return path
+
+def test_ingest_and_bbox_query():
+    store = load_ocm_export(write_export(EXPORT))
+    assert len(store) == 5
+    assert store.latitudes.itemsize == 8 and store.power_kw.itemsize == 4
+
+    rows = store.query_bbox(35.0, 37.0, -121.0, -118.0)
+    assert [store.ids[r] for r in rows] == ["OCM-1", "OCM-2", "OCM-3", "OCM-4"]
+
+    rows = store.query_bbox(35.0, 37.0, -121.0, -118.0, min_power_kw=200)
+    assert [store.ids[r] for r in rows] == ["OCM-1", "OCM-2"]
+
+    station = store.station(rows[0])
+    assert station["network"] == "Tesla Supercharger"
+    assert station["location"] == "Kettleman City, CA"
+    assert station["price_per_kwh"] == 0.48
+    assert station["power_kw"] == 250
+
+def test_ndjson_export_and_save_load():
+    store = load_ocm_export(write_export(EXPORT, "ocm-export.jsonl"))
+    path = os.path.join(tempfile.mkdtemp(), "stations.store")
+    store.save(path)
+
+    loaded = StationStore.load(path)
+    assert len(loaded) == len(store)
+    assert loaded.ids == store.ids
+    assert loaded.query_bbox(35.0, 37.0, -121.0, -118.0) == store.query_bbox(35.0, 37.0, -121.0, -118.0)
+
+def test_search_from_snapshot_makes_no_network_calls():
+    store = load_ocm_export(write_export(EXPORT))
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("snapshot mode must not call OpenChargeMap")
+
+    original = (ocm.STATION_SOURCE, ocm.get_snapshot_store, ocm.fetch_tile_stations)
+    ocm.STATION_SOURCE = "snapshot"
+    ocm.get_snapshot_store = lambda: store
+    ocm.fetch_tile_stations = no_network
+    ocm.clear_corridor_memo()
+    try:
+        stations = ocm.get_chargers_along_route(
+            get_coordinates("Los Angeles, CA"),
+            get_coordinates("San Francisco, CA"),
+            min_power_kw=150,
+            max_results=10
+        )
+    finally:
+        ocm.STATION_SOURCE, ocm.get_snapshot_store, ocm.fetch_tile_stations = original
+        ocm.clear_corridor_memo()
+
+    ids = [s["id"] for s in stations]
+    print(f"   Snapshot stations LA→SF: {ids}")
+    assert ids == ["OCM-2", "OCM-1", "OCM-3"]
+
+def test_removed_stations_are_not_listed():
+    store = load_ocm_export(write_export(EXPORT))
+    assert store.remove("OCM-3")
+    assert not store.remove("OCM-3")
+
+    # The row stays in the columns (len() is the table length) but is skipped when listing
+    assert len(store) == 5 and store.station_count == 4
+    assert [s["id"] for s in store.stations()] == ["OCM-1", "OCM-2", "OCM-4", "OCM-5"]
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Offline Station Snapshot Store")
+    print("=" * 60)
+    test_ingest_and_bbox_query()
+    test_ndjson_export_and_save_load()
+    test_search_from_snapshot_makes_no_network_calls()
+    test_removed_stations_are_not_listed()
+    print("✅ Station snapshot store tests passed!")
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Test incremental delta sync of the station store against a local OpenChargeMap stand-in
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import utils.openchargemap_client as ocm
+import utils.station_sync as station_sync
+from utils.station_store import StationStore, load_ocm_export
+from test_station_store import EXPORT, make_poi, write_export
+
+def changed(poi, status_type_id=50):
+    poi = dict(poi, DateLastStatusUpdate="2026-10-01T12:00:00Z", StatusTypeID=status_type_id)
+    poi["StatusType"] = dict(poi["StatusType"], ID=status_type_id)
+    return poi
+
+# Station 2 moves and gets faster, 3 is decommissioned, 6 is new
+CHANGES = [
+    changed(make_poi(2, "Lost Hills EA", "Buttonwillow", 35.40, -119.47, 400)),
+    changed(EXPORT[2], status_type_id=200),
+    changed(make_poi(6, "Gilroy EA", "Gilroy", 37.00, -121.57, 350)),
+]
+
+class Handler(BaseHTTPRequestHandler):
+    queries = []
+    changes = []
+    # Whether to apply modifiedsince, sortby and maxresults like the real API
+    paged = False
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        Handler.queries.append(query)
+        changes = Handler.changes
+        if Handler.paged:
+            since = query["modifiedsince"][0]
+            changes = [poi for poi in changes if poi["DateLastStatusUpdate"][:19] >= since]
+            if query.get("sortby") == ["modified_asc"]:
+                changes.sort(key=lambda poi: poi["DateLastStatusUpdate"])
+            changes = changes[:int(query["maxresults"][0])]
+        body = json.dumps(changes).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def with_server(test):
+    def wrapper():
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        original = (station_sync.OPENCHARGEMAP_BASE_URL, station_sync.OPENCHARGEMAP_COMPACT)
+        station_sync.OPENCHARGEMAP_BASE_URL = f"http://127.0.0.1:{server.server_address[1]}"
+        station_sync.OPENCHARGEMAP_COMPACT = False
+        Handler.queries = []
+        Handler.changes = list(CHANGES)
+        Handler.paged = False
+        try:
+            return test()
+        finally:
+            station_sync.OPENCHARGEMAP_BASE_URL, station_sync.OPENCHARGEMAP_COMPACT = original
+            server.shutdown()
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+def ids_in(store, south, north, west, east):
+    return [store.ids[r] for r in store.query_bbox(south, north, west, east)]
+
+@with_server
+def test_sync_merges_changes_in_place():
+    store = load_ocm_export(write_export(EXPORT))
+    grid_before = dict(store.grid)
+    rows_before = len(store.ids)
+
+    stats = station_sync.sync_once(store, "test-key", since=time.time() - 3600)
+    print(f"   Sync stats: {stats}")
+    assert stats == {"added": 1, "updated": 1, "removed": 1, "received": 3}
+
+    # modifiedsince was sent in OpenChargeMap's date format
+    since = Handler.queries[0]["modifiedsince"][0]
+    assert len(since) == 19 and since[10] == "T"
+
+    # Updated in place: same row, new position and power
+    row = store.rows_by_id["OCM-2"]
+    assert row < rows_before and store.power_kw[row] == 400
+    assert "OCM-2" in ids_in(store, 35.3, 35.5, -119.6, -119.4)
+    assert "OCM-2" not in ids_in(store, 35.5, 35.7, -119.8, -119.6)
+    # Decommissioned station leaves the index, new one is searchable
+    assert "OCM-3" not in ids_in(store, 30, 40, -125, -110)
+    assert "OCM-6" in ids_in(store, 36.9, 37.1, -121.7, -121.5)
+    assert store.station_count == 5
+
+    # Only the touched cells got new row lists; the rest are the same objects
+    untouched = [cell for cell in grid_before if store.grid.get(cell) is grid_before[cell]]
+    assert len(untouched) >= len(grid_before) - 3
+    assert store.version == 3
+    assert store.synced_through is not None
+
+@with_server
+def test_saved_store_drops_removed_stations():
+    store = load_ocm_export(write_export(EXPORT))
+    station_sync.sync_once(store, "test-key")
+    path = os.path.join(tempfile.mkdtemp(), "stations.store")
+    store.save(path)
+
+    loaded = StationStore.load(path)
+    assert len(loaded) == loaded.station_count == store.station_count
+    assert "OCM-3" not in loaded.rows_by_id
+    assert loaded.synced_through == store.synced_through
+    # Rows are renumbered by the compaction, so compare by ID
+    assert sorted(ids_in(loaded, 30, 40, -125, -110)) == sorted(ids_in(store, 30, 40, -125, -110))
+
+@with_server
+def test_background_job_keeps_readers_unblocked():
+    store = load_ocm_export(write_export(EXPORT))
+    ocm.clear_corridor_memo()
+    errors = []
+    reads = 0
+    stop = threading.Event()
+
+    def reader():
+        nonlocal reads
+        while not stop.is_set():
+            try:
+                for row in store.query_bbox(30, 40, -125, -110):
+                    store.station(row)
+                reads += 1
+            except Exception as e:
+                errors.append(e)
+
+    reader_thread = threading.Thread(target=reader)
+    reader_thread.start()
+    # Many upserts of the same stations while the reader runs
+    Handler.changes = [changed(make_poi(100 + i, "Site", "Fresno", 36.0 + i * 0.01, -119.8, 150)) for i in range(300)]
+    job = station_sync.StationSyncJob(store, "test-key", interval_seconds=0.05)
+    job.start()
+    deadline = time.time() + 5
+    while (job.last_stats is None or len(Handler.queries) < 3) and time.time() < deadline:
+        time.sleep(0.02)
+    job.stop(timeout=2)
+    stop.set()
+    reader_thread.join()
+
+    assert not errors
+    assert reads > 0
+    assert job.last_stats == {"added": 0, "updated": 300, "removed": 0, "received": 300}
+    assert store.station_count == len(EXPORT) + 300
+    # Later syncs ask only for changes since the previous run
+    assert Handler.queries[-1]["modifiedsince"][0] >= Handler.queries[0]["modifiedsince"][0]
+
+@with_server
+def test_truncated_sync_pages_through_every_change():
+    store = load_ocm_export(write_export(EXPORT))
+    # Twelve new stations changed a minute apart, served newest first without a sort order
+    Handler.changes = [
+        dict(changed(make_poi(100 + i, "Site", "Fresno", 36.0 + i * 0.01, -119.8, 150)),
+             DateLastStatusUpdate=f"2026-10-01T12:{i:02d}:00Z")
+        for i in reversed(range(12))
+    ]
+    Handler.paged = True
+    original = station_sync.STATION_SYNC_MAX_RESULTS
+    station_sync.STATION_SYNC_MAX_RESULTS = 5
+    try:
+        started = time.time()
+        # Synced through 12:00 (plus the overlap the request subtracts)
+        stats = station_sync.sync_once(store, "test-key", since=1790856000 + station_sync.SYNC_OVERLAP_SECONDS)
+    finally:
+        station_sync.STATION_SYNC_MAX_RESULTS = original
+
+    assert stats["added"] == 12
+    assert all(f"OCM-{100 + i}" in store.rows_by_id for i in range(12))
+    assert all(query["sortby"] == ["modified_asc"] for query in Handler.queries)
+    # Each page starts at the last change of the one before
+    assert [query["modifiedsince"][0] for query in Handler.queries[1:]] == ["2026-10-01T12:04:00", "2026-10-01T12:08:00"]
+    assert store.synced_through >= started
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Station Store Delta Sync")
+    print("=" * 60)
+    test_sync_merges_changes_in_place()
+    test_saved_store_drops_removed_stations()
+    test_background_job_keeps_readers_unblocked()
+    test_truncated_sync_pages_through_every_change()
+    print("✅ Station sync tests passed!")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test the compact Station record and StationTable (no network calls)
+"""
+
+import json
+import tracemalloc
+from utils.station import Station, StationTable, DEFAULT_SLOTS
+
+TOWNS = ["Kettleman City, CA", "Barstow, CA", "Gilroy, CA", "Harris Ranch, CA", "Tejon Ranch, CA"]
+NETWORKS = ["Tesla Supercharger", "EVgo", "Electrify America", "ChargePoint"]
+
+def legacy_station(i):
+    """A station as the API client used to build it: fresh lists per station."""
+    return {
+        "id": f"OCM-{100000 + i}",
+        "network": "".join(NETWORKS[i % len(NETWORKS)]),  # a distinct string object per station
+        "location": "".join(TOWNS[i % len(TOWNS)]),
+        "address": f"{i} Main St, {TOWNS[i % len(TOWNS)]}",
+        "latitude": 34.0 + (i % 1000) * 0.003,
+        "longitude": -118.0 - (i % 977) * 0.003,
+        "power_kw": 150 + (i % 4) * 50,
+        "price_per_kwh": 0.43 + (i % 5) * 0.0125,  # sub-cent prices survive the table
+        "available": i % 7 != 0,
+        "slots": ["10:00", "10:30", "11:00", "11:30", "12:00"],
+        "amenities": []
+    }
+
+def measure(build):
+    tracemalloc.start()
+    value = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size
+
+def test_table_round_trips_to_the_tool_json_shape():
+    stations = [legacy_station(i) for i in range(50)]
+    stations[3]["distance_from_origin_km"] = 12.5
+    table = StationTable.from_stations(stations)
+
+    assert len(table) == 50
+    for row, original in enumerate(stations):
+        assert json.loads(json.dumps(table.station(row))) == json.loads(json.dumps(original))
+    assert table.distance(3) == 12.5 and table.distance(4) is None
+
+    # Reordering keeps every column aligned
+    reordered = table.take([3, 0])
+    assert [s["id"] for s in reordered.stations()] == ["OCM-100003", "OCM-100000"]
+    assert reordered.distance(0) == 12.5
+
+def test_slotted_record_shares_defaults():
+    first = Station.from_dict(legacy_station(1))
+    second = Station.from_dict(legacy_station(21))
+    assert not hasattr(first, "__dict__")
+    assert first.slots is second.slots is DEFAULT_SLOTS
+    # Network names and locations are interned
+    assert first.network is second.network and first.location is second.location
+    assert first.to_dict()["id"] == "OCM-100001"
+
+def test_table_is_a_fraction_of_dict_memory():
+    count = 100_000
+    dicts, dict_bytes = measure(lambda: [legacy_station(i) for i in range(count)])
+    table, table_bytes = measure(lambda: StationTable.from_stations(legacy_station(i) for i in range(count)))
+    print(f"   {count} stations: dicts {dict_bytes / 1e6:.1f} MB, table {table_bytes / 1e6:.1f} MB")
+
+    assert len(table) == len(dicts)
+    assert table_bytes < dict_bytes / 3
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Compact Station Table")
+    print("=" * 60)
+    test_table_round_trips_to_the_tool_json_shape()
+    test_slotted_record_shares_defaults()
+    test_table_is_a_fraction_of_dict_memory()
+    print("✅ Station table tests passed!")
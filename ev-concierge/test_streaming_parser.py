@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Test incremental parsing of OpenChargeMap responses (local HTTP server, no network calls)
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import utils.openchargemap_client as ocm
+from utils import geohash
+from utils.json_stream import iter_json_array, iter_json_file_array
+from utils.location_coords import get_coordinates
+from utils.station_store import iter_export_pois
+
+def make_poi(poi_id, lat, lon, power_kw=150, town="Kettleman City"):
+    return {
+        "ID": poi_id,
+        "AddressInfo": {"Title": f"Station {poi_id} – Café", "Town": town, "StateOrProvince": "CA",
+                        "Latitude": lat, "Longitude": lon},
+        "OperatorInfo": {"Title": "EVgo Network"},
+        "Connections": [{"PowerKW": power_kw}],
+        "StatusType": {"IsOperational": True},
+        "UsageCost": "$0.43/kWh",
+    }
+
+# LA→SF corridor stations plus one far off the route (Las Vegas)
+POIS = [make_poi(i, 34.5 + i * 0.05, -118.5 - i * 0.04) for i in range(40)]
+POIS.append(make_poi(999, 36.17, -115.14, town="Las Vegas"))
+BODY = json.dumps(POIS, indent=1).encode()
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = gzip.compress(BODY)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+# 60 stations spread over tile 9q5, for a server that honors the bounding box and maxresults
+LAT_MIN, LAT_MAX, LON_MIN, LON_MAX = geohash.decode_bbox("9q5")
+GRID_POIS = [make_poi(1000 + i * 6 + j, LAT_MIN + (i + 0.5) * (LAT_MAX - LAT_MIN) / 10,
+                      LON_MIN + (j + 0.5) * (LON_MAX - LON_MIN) / 6)
+             for i in range(10) for j in range(6)]
+
+class BoundingBoxHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    boxes = []
+    # Requests being served at once, and the most seen
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        lat_max, lon_min, lat_min, lon_max = map(float, re.findall(r"-?[\d.]+", query["boundingbox"][0]))
+        with BoundingBoxHandler.lock:
+            BoundingBoxHandler.boxes.append(query["boundingbox"][0])
+            BoundingBoxHandler.in_flight += 1
+            BoundingBoxHandler.max_in_flight = max(BoundingBoxHandler.max_in_flight, BoundingBoxHandler.in_flight)
+        time.sleep(0.01)
+        with BoundingBoxHandler.lock:
+            BoundingBoxHandler.in_flight -= 1
+        inside = [poi for poi in GRID_POIS
+                  if lat_min <= poi["AddressInfo"]["Latitude"] < lat_max
+                  and lon_min <= poi["AddressInfo"]["Longitude"] < lon_max]
+        body = json.dumps(inside[:int(query["maxresults"][0])]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def chunked(data, size):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+def test_decodes_array_across_arbitrary_chunk_boundaries():
+    document = json.dumps([1, -2.5e3, "naïve ✓", {"a": [True, None]}, [], 12345678]).encode()
+    expected = json.loads(document)
+    # Every split point, including inside numbers and multi-byte UTF-8 characters
+    for size in (1, 2, 3, 7, len(document)):
+        assert list(iter_json_array(chunked(document, size))) == expected
+    assert list(iter_json_array([b"[]"])) == []
+
+    for bad in (b'{"ID": 1}', b'[{"ID": 1},', b'[{"ID": 1'):
+        try:
+            list(iter_json_array(chunked(bad, 4)))
+            assert False, f"expected ValueError for {bad!r}"
+        except ValueError:
+            pass
+
+def test_parsed_stations_match_whole_document_parse():
+    streamed = list(ocm.iter_openchargemap_stations(iter_json_array(chunked(BODY, 1000))))
+    assert streamed == ocm.parse_openchargemap_response(POIS)
+
+    # Power filter is applied while parsing
+    low_power = POIS + [make_poi(500, 35.0, -119.0, power_kw=22)]
+    ids = {s["id"] for s in ocm.iter_openchargemap_stations(low_power, min_power_kw=50)}
+    assert "OCM-500" not in ids and len(ids) == len(POIS)
+
+def test_route_filter_on_the_fly():
+    la = get_coordinates("Los Angeles, CA")
+    sf = get_coordinates("San Francisco, CA")
+    stations = ocm.iter_openchargemap_stations(iter_json_array(chunked(BODY, 4096)))
+    matches = list(ocm.iter_route_stations(stations, la, sf, current_range_miles=100, batch_size=8))
+
+    assert matches
+    assert "OCM-999" not in {s["id"] for s in matches}
+    assert all(s["distance_from_origin_km"] <= 100 * 1.60934 * 0.8 for s in matches)
+
+def test_streaming_tile_fetch_sync_and_async():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    original = (ocm.OPENCHARGEMAP_BASE_URL, ocm.OPENCHARGEMAP_COMPACT)
+    ocm.OPENCHARGEMAP_BASE_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    ocm.OPENCHARGEMAP_COMPACT = False
+    try:
+        expected = ocm.parse_openchargemap_response(POIS)
+        assert ocm.fetch_tile_stations("test-key", "9q5", 150) == expected
+
+        async def fetch_async():
+            return await ocm.fetch_tile_stations_async("test-key", "9q5", 150)
+
+        assert asyncio.run(fetch_async()) == expected
+
+        # Off-route and unreachable stations are dropped while the body is parsed
+        la, sf = get_coordinates("Los Angeles, CA"), get_coordinates("San Francisco, CA")
+        keep = ocm.route_filter(la, sf, current_range_miles=100)
+        near = list(keep(expected))
+        assert near == list(ocm.iter_route_stations(expected, la, sf, current_range_miles=100))
+        assert all("distance_from_origin_km" in s for s in near)
+        assert near and len(near) < len(expected) and "OCM-999" not in {s["id"] for s in near}
+        assert ocm.fetch_tile_stations("test-key", "9q5", 150, keep) == near
+
+        async def fetch_near_async():
+            return await ocm.fetch_tile_stations_async("test-key", "9q5", 150, keep)
+
+        assert asyncio.run(fetch_near_async()) == near
+    finally:
+        ocm.OPENCHARGEMAP_BASE_URL, ocm.OPENCHARGEMAP_COMPACT = original
+        server.shutdown()
+
+def test_truncated_tiles_are_split():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BoundingBoxHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    original = (ocm.OPENCHARGEMAP_BASE_URL, ocm.OPENCHARGEMAP_COMPACT, ocm.OPENCHARGEMAP_TILE_MAX_RESULTS, ocm.TILE_MAX_PRECISION)
+    ocm.OPENCHARGEMAP_BASE_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    ocm.OPENCHARGEMAP_COMPACT = False
+    ocm.OPENCHARGEMAP_TILE_MAX_RESULTS = 20
+    try:
+        expected = sorted(s["id"] for s in ocm.parse_openchargemap_response(GRID_POIS))
+
+        # The tile's 60 stations don't fit in one response: its 32 children are fetched instead
+        BoundingBoxHandler.boxes = []
+        BoundingBoxHandler.max_in_flight = 0
+        assert sorted(s["id"] for s in ocm.fetch_tile_stations("test-key", "9q5", 150)) == expected
+        assert len(BoundingBoxHandler.boxes) == 1 + 32
+        # The children are fetched concurrently, within the tile concurrency limit
+        assert 1 < BoundingBoxHandler.max_in_flight <= ocm.OPENCHARGEMAP_MAX_CONCURRENT_TILES
+
+        async def fetch_async():
+            return await ocm.fetch_tile_stations_async("test-key", "9q5", 150)
+
+        assert sorted(s["id"] for s in asyncio.run(fetch_async())) == expected
+
+        # At the finest precision the truncated response is all there is
+        ocm.TILE_MAX_PRECISION = 3
+        BoundingBoxHandler.boxes = []
+        assert len(ocm.fetch_tile_stations("test-key", "9q5", 150)) == 20
+        assert len(BoundingBoxHandler.boxes) == 1
+    finally:
+        (ocm.OPENCHARGEMAP_BASE_URL, ocm.OPENCHARGEMAP_COMPACT,
+         ocm.OPENCHARGEMAP_TILE_MAX_RESULTS, ocm.TILE_MAX_PRECISION) = original
+        server.shutdown()
+
+def test_large_export_file_is_read_incrementally():
+    path = os.path.join(tempfile.mkdtemp(), "ocm-export.json")
+    with open(path, "wb") as f:
+        f.write(BODY)
+    assert list(iter_json_file_array(path, chunk_size=333)) == POIS
+    assert list(iter_export_pois(path)) == POIS
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Streaming OpenChargeMap Parser")
+    print("=" * 60)
+    test_decodes_array_across_arbitrary_chunk_boundaries()
+    test_parsed_stations_match_whole_document_parse()
+    test_route_filter_on_the_fly()
+    test_streaming_tile_fetch_sync_and_async()
+    test_truncated_tiles_are_split()
+    test_large_export_file_is_read_incrementally()
+    print("✅ Streaming parser tests passed!")
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Test the step scheduler and the coordinator's orchestration graph, including the speculative amenities lookup
+"""
+
+import asyncio
+import time
+import json
+import agents.coordinator as coordinator
+import agents.trip_planning as trip_planning
+import tools.charging_tools as charging_tools
+from agents.coordinator import CoordinatorAgent
+from utils.plan_cache import build_plan_skeleton
+from utils.task_graph import TaskGraph
+
+def step(delay, value, log=None):
+    async def run(deps):
+        await asyncio.sleep(delay)
+        if log is not None:
+            log.append(value)
+        return (value, dict(deps))
+    return run
+
+def test_independent_steps_run_concurrently():
+    log = []
+    graph = TaskGraph()
+    graph.add("a", step(0.2, "a", log))
+    graph.add("b", step(0.1, "b", log))
+    graph.add("c", step(0.1, "c", log), deps=["a", "b"])
+
+    start = time.perf_counter()
+    results = asyncio.run(graph.run())
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.38  # a and b overlap: 0.2 + 0.1, not 0.4
+    assert log == ["b", "a", "c"]
+    # Results come back in the order the steps were added
+    assert list(results) == ["a", "b", "c"]
+    assert results["c"] == ("c", {"a": ("a", {}), "b": ("b", {})})
+    assert graph.critical_path() == ["a", "c"]
+
+def test_graph_validation_and_failures():
+    graph = TaskGraph()
+    graph.add("a", step(0, "a"))
+    for name, deps in [("a", []), ("b", ["missing"])]:
+        try:
+            graph.add(name, step(0, name), deps=deps)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+    cancelled = []
+    async def fail(deps):
+        raise RuntimeError("boom")
+    async def slow(deps):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+    graph.add("fail", fail)
+    graph.add("slow", slow)
+    graph.add("after", step(0, "after"), deps=["fail"])
+    try:
+        asyncio.run(graph.run())
+        assert False, "expected RuntimeError"
+    except RuntimeError as e:
+        assert str(e) == "boom"
+    assert cancelled == [True]
+
+VEHICLE = {"model": "Tesla Model Y", "battery_percent": 70, "range_miles": 300}
+TRIP = {"origin": "Los Angeles, CA", "destination": "Las Vegas, NV", "distance_miles": 270}
+PREFS = {"wallet_id": "W1", "auto_order_coffee": True, "favorite_drink": "Large Latte"}
+
+def fake_agents(agent, calls, station, charging_results=None):
+    async def find_and_reserve_async(trip_data, preferences=None, charging_plan=None):
+        await asyncio.sleep(0.3)
+        calls.append("charging" if charging_plan is None else ("charging", charging_plan))
+        if charging_results is not None:
+            return {"reservation": "Planned", "tool_results": charging_results}
+        return {"reservation": "Reserved", "tool_results": [
+            {"stations": [station]},
+            {"reservation_id": "R1", "charger_id": station["id"], "location": station["location"], "duration_min": 20},
+        ]}
+
+    async def order_amenities_async(location, user_prefs, duration, prefetched=None):
+        calls.append(("amenities", location, duration, prefetched and prefetched["location"]))
+        return {"order": "Ordered", "tool_results": [
+            {"order_id": "O1", "restaurant": "Starbucks", "items": ["Latte"], "total_usd": 5.5, "pickup_time": "10:20"}
+        ]}
+
+    def validate_user_wallet(wallet_id):
+        time.sleep(0.2)
+        calls.append("wallet")
+        return {"valid": True, "balance": 100.0, "message": "", "tool_results": [{"valid": True, "balance": 100.0}]}
+
+    async def process_payments_async(transactions, wallet_id, wallet_status=None):
+        calls.append(("payments", [t["merchant"] for t in transactions], wallet_status["valid"]))
+        return {"payments": "Paid", "tool_results": [
+            {"transaction_id": f"T{i}", "amount": t["amount"], "merchant": t["merchant"]}
+            for i, t in enumerate(transactions)
+        ]}
+
+    agent.charging_agent.find_and_reserve_async = find_and_reserve_async
+    agent.amenities_agent.order_amenities_async = order_amenities_async
+    agent.payment_agent.validate_user_wallet = validate_user_wallet
+    agent.payment_agent.process_payments_async = process_payments_async
+
+def orchestrate_with(station, charging_results=None, plan_skeleton=None):
+    """Orchestrate LA → Las Vegas with fake agents reserving the given station (mock station data)."""
+    original = (coordinator.TRIP_PLANNING_MODE, charging_tools.STATION_SOURCE)
+    coordinator.TRIP_PLANNING_MODE, charging_tools.STATION_SOURCE = "direct", "mock"
+    calls = []
+    try:
+        agent = CoordinatorAgent()
+        fake_agents(agent, calls, station, charging_results)
+        start = time.perf_counter()
+        result = agent.orchestrate(VEHICLE, TRIP, PREFS, plan_skeleton)
+        return result, calls, time.perf_counter() - start
+    finally:
+        coordinator.TRIP_PLANNING_MODE, charging_tools.STATION_SOURCE = original
+
+def planned_first_stop():
+    original = charging_tools.STATION_SOURCE
+    charging_tools.STATION_SOURCE = "mock"
+    try:
+        plan = json.loads(charging_tools.plan_charging_stops(TRIP["origin"], TRIP["destination"], battery_percent=VEHICLE["battery_percent"], vehicle_range_miles=VEHICLE["range_miles"]))
+    finally:
+        charging_tools.STATION_SOURCE = original
+    stop = plan["stops"][0]
+    return {"id": stop["station_id"], "network": stop["network"], "location": stop["location"],
+            "power_kw": stop["power_kw"], "price_per_kwh": stop["price_per_kwh"]}
+
+def test_orchestration_graph():
+    station = planned_first_stop()
+    result, calls, elapsed = orchestrate_with(station)
+
+    # The wallet check ran while charging was negotiated, and the payment agent got its result
+    assert calls[0] == "wallet" and calls[1] == "charging"
+    assert calls[2][:3] == ("amenities", station["location"], 20)
+    assert calls[3] == ("payments", [f"{station['network']} Charging", "Starbucks"], True)
+    assert elapsed < 0.48
+    assert list(result["results"]) == ["trip_plan", "charging", "amenities", "payments"]
+    assert "R1" in result["summary"] and "O1" in result["summary"]
+
+def test_speculative_amenities_commit_or_discard():
+    # The reservation lands at the planned first stop: the prefetched lookup is used
+    station = planned_first_stop()
+    _, calls, _ = orchestrate_with(station)
+    assert calls[2] == ("amenities", station["location"], 20, station["location"])
+
+    # Reserved elsewhere: the prefetch is discarded and amenities are looked up there
+    elsewhere = {**station, "id": "OCM-999", "location": "Kettleman City, CA"}
+    _, calls, _ = orchestrate_with(elsewhere)
+    assert calls[2] == ("amenities", "Kettleman City, CA", 20, None)
+
+    agent = CoordinatorAgent()
+    prefetched = asyncio.run(agent.amenities_agent.prefetch_async("Kettleman City, CA"))
+    assert prefetched["menus"]["Starbucks"] == ["Large Latte", "Cappuccino", "Breakfast Sandwich", "Croissant"]
+    assert not agent.amenities_agent.wants_order({"auto_order_coffee": True, "favorite_drink": "None", "favorite_food": "None"})
+
+def test_no_station_search_without_an_order():
+    original = (coordinator.TRIP_PLANNING_MODE, charging_tools.STATION_SOURCE)
+    coordinator.TRIP_PLANNING_MODE, charging_tools.STATION_SOURCE = "direct", "mock"
+    calls = []
+    try:
+        agent = CoordinatorAgent()
+        fake_agents(agent, calls, planned_first_stop())
+
+        async def top_station(*args):
+            calls.append("top_station")
+            return None
+
+        agent._top_station = top_station
+        result = agent.orchestrate(VEHICLE, TRIP, {**PREFS, "auto_order_coffee": False})
+    finally:
+        coordinator.TRIP_PLANNING_MODE, charging_tools.STATION_SOURCE = original
+    # Without an order there is nothing to prefetch, so no station search runs for it
+    assert "top_station" not in calls
+    assert "charging" in calls and "R1" in result["summary"]
+
+def test_plan_without_stops_needs_no_charging():
+    # The charging agent found the trip reachable as is: nothing is reserved, and that isn't a failure
+    plan = {"feasible": True, "stops": [], "arrival_soc_percent": 24.0}
+    result, calls, _ = orchestrate_with(planned_first_stop(), [plan])
+    assert "No charging needed" in result["summary"] and "24" in result["summary"]
+    assert "Failed" not in result["summary"]
+    assert list(result["results"]) == ["trip_plan", "charging"]
+    assert not any(isinstance(call, tuple) for call in calls)
+
+def test_trip_without_charging_skips_the_wallet():
+    original = (coordinator.TRIP_PLANNING_MODE, charging_tools.STATION_SOURCE)
+    coordinator.TRIP_PLANNING_MODE, charging_tools.STATION_SOURCE = "direct", "mock"
+    calls = []
+    try:
+        agent = CoordinatorAgent()
+        fake_agents(agent, calls, planned_first_stop())
+        result = agent.orchestrate({**VEHICLE, "battery_percent": 100}, {**TRIP, "distance_miles": 100}, PREFS)
+    finally:
+        coordinator.TRIP_PLANNING_MODE, charging_tools.STATION_SOURCE = original
+    assert calls == []
+    assert "wallet" not in result["results"]
+
+def test_plan_skeleton_is_reused():
+    original = charging_tools.STATION_SOURCE
+    charging_tools.STATION_SOURCE = "mock"
+    try:
+        skeleton = build_plan_skeleton(TRIP["origin"], TRIP["destination"], VEHICLE["battery_percent"], VEHICLE["range_miles"])
+    finally:
+        charging_tools.STATION_SOURCE = original
+
+    def no_lookup(*args, **kwargs):
+        raise AssertionError("the skeleton's route should be reused")
+
+    original_route_info = trip_planning.route_info
+    trip_planning.route_info = no_lookup
+    try:
+        station = planned_first_stop()
+        result, calls, _ = orchestrate_with(station, plan_skeleton=skeleton)
+    finally:
+        trip_planning.route_info = original_route_info
+
+    # The charging agent reserves from the precomputed plan and the prefetch is at its first stop
+    assert ("charging", skeleton["charging_plan"]) in calls
+    assert ("amenities", station["location"], 20, station["location"]) in calls
+    assert result["results"]["trip_plan"]["route"] == skeleton["route"]
+    assert "R1" in result["summary"]
+
+def test_skeleton_plan_is_redone_for_the_actual_charge():
+    original = charging_tools.STATION_SOURCE
+    charging_tools.STATION_SOURCE = "mock"
+    try:
+        skeleton = build_plan_skeleton(TRIP["origin"], TRIP["destination"], 70, VEHICLE["range_miles"])
+    finally:
+        charging_tools.STATION_SOURCE = original
+    planned = skeleton["charging_plan"]["stops"][0]
+
+    plan = CoordinatorAgent._skeleton_plan(skeleton, {**VEHICLE, "battery_percent": 74})
+    stop = plan["stops"][0]
+    assert stop["station_id"] == planned["station_id"]
+    assert stop["arrival_soc_percent"] == planned["arrival_soc_percent"] + 4
+    assert stop["charge_minutes"] < planned["charge_minutes"]
+
+    # Another vehicle's charging curve, or less charge than planned for: the agent plans again
+    assert CoordinatorAgent._skeleton_plan(skeleton, {**VEHICLE, "model": "Chevrolet Bolt EV"}) is None
+    assert CoordinatorAgent._skeleton_plan(skeleton, {**VEHICLE, "battery_percent": 65}) is None
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Task Graph Orchestration")
+    print("=" * 60)
+    test_independent_steps_run_concurrently()
+    test_graph_validation_and_failures()
+    test_orchestration_graph()
+    test_speculative_amenities_commit_or_discard()
+    test_no_station_search_without_an_order()
+    test_plan_without_stops_needs_no_charging()
+    test_trip_without_charging_skips_the_wallet()
+    test_plan_skeleton_is_reused()
+    test_skeleton_plan_is_redone_for_the_actual_charge()
+    print("✅ Task graph tests passed!")
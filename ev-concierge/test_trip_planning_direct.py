@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test the direct trip-planning path: energy and route computed without the LLM
+"""
+
+import json
+import agents.coordinator as coordinator
+from agents.coordinator import CoordinatorAgent
+from agents.trip_planning import TripPlanningAgent
+from tools.route_tools import calculate_energy_needs, get_route_info
+
+VEHICLE = {"model": "Tesla Model Y", "battery_percent": 45, "range_miles": 300}
+TRIP = {"origin": "San Francisco, CA", "destination": "Los Angeles, CA", "distance_miles": 380}
+
+def test_direct_matches_tool_results():
+    agent = TripPlanningAgent()
+    result = agent.analyze_direct(VEHICLE, TRIP)
+
+    energy = json.loads(calculate_energy_needs(45, 380, 300))
+    route = json.loads(get_route_info(TRIP["origin"], TRIP["destination"]))
+    assert result["energy"] == energy
+    assert result["tool_results"] == [energy, route]
+    assert "Charging is needed" in result["analysis"]
+
+def test_distance_falls_back_to_route():
+    agent = TripPlanningAgent()
+    result = agent.analyze_direct(VEHICLE, {**TRIP, "distance_miles": 0})
+    route = result["route"]
+    assert result["energy"] == json.loads(calculate_energy_needs(45, route["distance_miles"], 300))
+
+    unknown = agent.analyze_direct({**VEHICLE, "battery_percent": 100}, {"origin": "Atlantis", "destination": "Los Angeles, CA", "distance_miles": 50})
+    assert unknown["tool_results"] == [unknown["energy"]]
+    assert "No charging is needed" in unknown["analysis"]
+
+def test_coordinator_skips_trip_llm_in_direct_mode():
+    original = coordinator.TRIP_PLANNING_MODE
+    coordinator.TRIP_PLANNING_MODE = "direct"
+    try:
+        agent = CoordinatorAgent()
+        def no_llm(*args, **kwargs):
+            raise AssertionError("trip-planning LLM called in direct mode")
+        agent.trip_agent.analyze_async = no_llm
+        agent.trip_agent.narrate_async = no_llm
+        # Stop right after the energy check: no charging needed and no amenities requested
+        results = agent.orchestrate({**VEHICLE, "battery_percent": 100}, {**TRIP, "distance_miles": 100}, {})
+    finally:
+        coordinator.TRIP_PLANNING_MODE = original
+
+    assert results["energy_analysis"]["needs_charging"] is False
+    assert "charging" not in results["results"]
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Testing Direct Trip Planning")
+    print("=" * 60)
+    test_direct_matches_tool_results()
+    test_distance_falls_back_to_route()
+    test_coordinator_skips_trip_llm_in_direct_mode()
+    print("✅ Direct trip planning tests passed!")
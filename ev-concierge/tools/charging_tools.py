@@ -1,11 +1,54 @@
 from datetime import datetime
 from strands.tools import tool
-from utils.config import USE_MOCK_DATA
+from utils import charging_planner
+from utils.charging_session import DEFAULT_VEHICLE_MODEL
+from utils.config import STATION_SOURCE, ROAD_DISTANCE_FACTOR
 from utils.mock_data import get_mock_chargers
-from utils.location_coords import get_coordinates
-from utils.openchargemap_client import get_chargers_along_route
+from utils.location_coords import KM_PER_MILE, get_coordinates, haversine_km
+from utils.openchargemap_client import (
+    FULL_RANGE_MILES,
+    get_route_corridor,
+    get_route_corridor_async,
+    stations_within_range,
+)
+from utils.routing import find_route
+from utils.station import StationTable
+import asyncio
 import json
 
+def _insufficient_range_result(current_range_miles: int, full_range_stations: list) -> dict:
+    """Build the guidance returned when no station is reachable with the current battery."""
+    return {
+        "error": "insufficient_range",
+        "message": f"No charging stations reachable with current range ({current_range_miles} miles). Please charge at home before starting your trip.",
+        "current_range_miles": current_range_miles,
+        "recommended_action": "Charge to 100% at home before departure",
+        "stations_if_fully_charged": full_range_stations[:3] if full_range_stations else [],
+        "stations": []
+    }
+
+def _partition_corridor(corridor: StationTable, current_range_miles: int):
+    """Split one fetched corridor into the reachable stations, or the full-range guidance."""
+    result = stations_within_range(corridor, current_range_miles, max_results=10)
+    
+    # If no reachable stations, provide guidance
+    if not result:
+        print("⚠️  No reachable stations found with current battery level")
+        
+        # Find stations if they had full battery, from the same corridor
+        full_range_stations = stations_within_range(corridor, FULL_RANGE_MILES, max_results=5)
+        result = _insufficient_range_result(current_range_miles, full_range_stations)
+    
+    return result
+
+def _invalid_location_result(route: str, destination: str) -> dict:
+    print(f"⚠️  Could not find coordinates for {route} or {destination}")
+    return {
+        "error": "invalid_location",
+        "message": f"Could not find coordinates for {route} or {destination}",
+        "stations": []
+    }
+
 @tool
 def search_chargers(route: str, destination: str, min_power_kw: int = 150, current_range_miles: int = 300) -> str:
     """Search for available EV chargers along route.
@@ -19,7 +62,7 @@ def search_chargers(route: str, destination: str, min_power_kw: int = 150, curre
     Returns:
         JSON list of charging stations within range
     """
-    if USE_MOCK_DATA:
+    if STATION_SOURCE == 'mock':
         result = get_mock_chargers(route, destination)
     else:
         # Get coordinates for origin and destination
@@ -27,46 +70,142 @@ def search_chargers(route: str, destination: str, min_power_kw: int = 150, curre
         dest_coords = get_coordinates(destination)
         
         if not origin_coords or not dest_coords:
-            print(f"⚠️  Could not find coordinates for {route} or {destination}")
-            result = {
-                "error": "invalid_location",
-                "message": f"Could not find coordinates for {route} or {destination}",
-                "stations": []
-            }
+            result = _invalid_location_result(route, destination)
+        else:
+            # Fetch the corridor once (independent of range) and partition it locally
+            corridor = get_route_corridor(origin_coords, dest_coords, min_power_kw=min_power_kw)
+            result = _partition_corridor(corridor, current_range_miles)
+    
+    return json.dumps(result)
+
+@tool(name="search_chargers")
+async def search_chargers_async(route: str, destination: str, min_power_kw: int = 150, current_range_miles: int = 300) -> str:
+    """Search for available EV chargers along route.
+    
+    Args:
+        route: Starting location (e.g., "Los Angeles, CA")
+        destination: Ending location (e.g., "San Francisco, CA")
+        min_power_kw: Minimum power rating filter (default 150)
+        current_range_miles: Current vehicle range in miles (default 300)
+    
+    Returns:
+        JSON list of charging stations within range
+    """
+    if STATION_SOURCE == 'mock':
+        result = get_mock_chargers(route, destination)
+    else:
+        origin_coords = get_coordinates(route)
+        dest_coords = get_coordinates(destination)
+        
+        if not origin_coords or not dest_coords:
+            result = _invalid_location_result(route, destination)
         else:
-            # Query OpenChargeMap API with reachability filter
-            result = get_chargers_along_route(
-                origin_coords,
-                dest_coords,
-                min_power_kw=min_power_kw,
-                max_results=10,
-                current_range_miles=current_range_miles
-            )
-            
-            # If no reachable stations, provide guidance
-            if not result:
-                print("⚠️  No reachable stations found with current battery level")
-                
-                # Find stations if they had full battery
-                full_range_stations = get_chargers_along_route(
-                    origin_coords,
-                    dest_coords,
-                    min_power_kw=min_power_kw,
-                    max_results=5,
-                    current_range_miles=300  # Assume full range
-                )
-                
-                result = {
-                    "error": "insufficient_range",
-                    "message": f"No charging stations reachable with current range ({current_range_miles} miles). Please charge at home before starting your trip.",
-                    "current_range_miles": current_range_miles,
-                    "recommended_action": "Charge to 100% at home before departure",
-                    "stations_if_fully_charged": full_range_stations[:3] if full_range_stations else [],
-                    "stations": []
-                }
+            corridor = await get_route_corridor_async(origin_coords, dest_coords, min_power_kw=min_power_kw)
+            result = _partition_corridor(corridor, current_range_miles)
     
     return json.dumps(result)
 
+def _trip_distance_km(origin_coords: tuple, dest_coords: tuple) -> tuple[float, bool]:
+    """Driving distance of the trip, and whether it came from the road graph."""
+    route = find_route(origin_coords, dest_coords)
+    if route is not None:
+        return route.distance_km, True
+    return haversine_km(origin_coords, dest_coords) * ROAD_DISTANCE_FACTOR, False
+
+def _locate_mock_chargers(chargers: list, origin_coords: tuple) -> list:
+    """Place mock chargers on the route by their town's straight-line distance from the origin."""
+    located = []
+    for charger in chargers:
+        coords = get_coordinates(charger.get('location', ''))
+        if coords is not None:
+            located.append({**charger, 'distance_from_origin_km': round(haversine_km(origin_coords, coords), 1)})
+    return located
+
+def _plan_from_corridor(stations: list, trip_km: float, straight_line: bool, battery_percent: int,
+                        vehicle_range_miles: int, vehicle_model: str) -> dict:
+    if straight_line:
+        # Straight-line progress undercounts the drive the same way the trip estimate does
+        stations = [
+            {**station, 'distance_from_origin_km': station['distance_from_origin_km'] * ROAD_DISTANCE_FACTOR}
+            for station in stations
+        ]
+    
+    plan = charging_planner.plan_charging_stops(
+        stations,
+        trip_distance_km=trip_km,
+        start_soc_percent=battery_percent,
+        range_km=vehicle_range_miles * KM_PER_MILE,
+        vehicle_model=vehicle_model
+    )
+    for stop in plan["stops"]:
+        stop["distance_from_origin_miles"] = round(stop.pop("distance_from_origin_km") / KM_PER_MILE)
+    print(f"🔋 Charging plan: {len(plan['stops'])} stop(s), feasible={plan['feasible']}")
+    return plan
+
+@tool
+def plan_charging_stops(route: str, destination: str, battery_percent: int = 100, vehicle_range_miles: int = 300,
+                        min_power_kw: int = 150, vehicle_model: str = DEFAULT_VEHICLE_MODEL) -> str:
+    """Plan every charging stop for a trip: where to stop, arrival charge and how long to charge.
+    
+    Args:
+        route: Starting location (e.g., "Seattle, WA")
+        destination: Ending location (e.g., "San Francisco, CA")
+        battery_percent: Current battery percentage (default 100)
+        vehicle_range_miles: Range on a full battery in miles (default 300)
+        min_power_kw: Minimum power rating filter (default 150)
+        vehicle_model: Vehicle model, for its battery size and charging curve (default "Tesla Model Y")
+    
+    Returns:
+        JSON charging plan with the ordered stops and trip totals
+    """
+    origin_coords = get_coordinates(route)
+    dest_coords = get_coordinates(destination)
+    if not origin_coords or not dest_coords:
+        return json.dumps(_invalid_location_result(route, destination))
+    
+    trip_km, on_road = _trip_distance_km(origin_coords, dest_coords)
+    if STATION_SOURCE == 'mock':
+        stations, straight_line = _locate_mock_chargers(get_mock_chargers(route, destination), origin_coords), True
+    else:
+        corridor = get_route_corridor(origin_coords, dest_coords, min_power_kw=min_power_kw)
+        # The corridor follows the road route exactly when the trip distance did
+        stations, straight_line = corridor.stations(), not on_road
+    
+    plan = _plan_from_corridor(stations, trip_km, straight_line, battery_percent, vehicle_range_miles, vehicle_model)
+    return json.dumps(plan)
+
+@tool(name="plan_charging_stops")
+async def plan_charging_stops_async(route: str, destination: str, battery_percent: int = 100, vehicle_range_miles: int = 300,
+                                    min_power_kw: int = 150, vehicle_model: str = DEFAULT_VEHICLE_MODEL) -> str:
+    """Plan every charging stop for a trip: where to stop, arrival charge and how long to charge.
+    
+    Args:
+        route: Starting location (e.g., "Seattle, WA")
+        destination: Ending location (e.g., "San Francisco, CA")
+        battery_percent: Current battery percentage (default 100)
+        vehicle_range_miles: Range on a full battery in miles (default 300)
+        min_power_kw: Minimum power rating filter (default 150)
+        vehicle_model: Vehicle model, for its battery size and charging curve (default "Tesla Model Y")
+    
+    Returns:
+        JSON charging plan with the ordered stops and trip totals
+    """
+    origin_coords = get_coordinates(route)
+    dest_coords = get_coordinates(destination)
+    if not origin_coords or not dest_coords:
+        return json.dumps(_invalid_location_result(route, destination))
+    
+    trip_km, on_road = await asyncio.to_thread(_trip_distance_km, origin_coords, dest_coords)
+    if STATION_SOURCE == 'mock':
+        stations, straight_line = _locate_mock_chargers(get_mock_chargers(route, destination), origin_coords), True
+    else:
+        corridor = await get_route_corridor_async(origin_coords, dest_coords, min_power_kw=min_power_kw)
+        # The corridor follows the road route exactly when the trip distance did
+        stations, straight_line = corridor.stations(), not on_road
+    
+    plan = _plan_from_corridor(stations, trip_km, straight_line, battery_percent, vehicle_range_miles, vehicle_model)
+    return json.dumps(plan)
+
 @tool
 def reserve_charging_slot(charger_id: str, time_slot: str, duration_min: int = 30, location: str = "", network: str = "") -> str:
     """Reserve a specific charging slot at a charger.
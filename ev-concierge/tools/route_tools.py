@@ -1,31 +1,68 @@
 from strands.tools import tool
+from utils.energy import energy_needs
+from utils.location_coords import estimate_road_distance_miles, get_coordinates
+from utils.routing import find_route
 import json
+import math
+
+# Average speed for duration estimates when no road route is available
+ESTIMATE_SPEED_MPH = 60
 
 @tool
 def calculate_energy_needs(battery_percent: int, trip_distance_miles: int, vehicle_range_miles: int, weather_temp_f: int = 70) -> str:
     """Calculate energy requirements for a trip considering weather"""
-    temp_factor = 1.0 if 50 <= weather_temp_f <= 80 else 1.15
-    required_percent = (trip_distance_miles / vehicle_range_miles) * 100 * temp_factor
-    buffer = 20
-    
-    result = {
-        "current_battery": battery_percent,
-        "required_battery": round(required_percent + buffer, 1),
-        "needs_charging": battery_percent < required_percent + buffer,
-        "deficit_percent": max(0, round(required_percent + buffer - battery_percent, 1)),
-        "charging_strategy": "en-route" if battery_percent > 30 else "pre-trip"
-    }
+    result = energy_needs(battery_percent, trip_distance_miles, vehicle_range_miles, weather_temp_f)
     
     return json.dumps(result)
 
+def _heading(origin_coords: tuple[float, float], destination_coords: tuple[float, float]) -> str:
+    """Dominant compass direction of travel (e.g. "South" for SF to LA)."""
+    dlat = destination_coords[0] - origin_coords[0]
+    dlon = (destination_coords[1] - origin_coords[1]) * math.cos(math.radians(origin_coords[0]))
+    if abs(dlat) >= abs(dlon):
+        return "North" if dlat >= 0 else "South"
+    return "East" if dlon >= 0 else "West"
+
+def route_info(origin: str, destination: str) -> dict:
+    """
+    Route distance, duration and main road between two places.
+    
+    Args:
+        origin: Starting location (e.g., "San Francisco, CA")
+        destination: Ending location
+    
+    Returns:
+        Route dictionary (from the road graph when there is one, otherwise
+        estimated), or an 'invalid_location' error dictionary
+    """
+    origin_coords = get_coordinates(origin)
+    destination_coords = get_coordinates(destination)
+    if not origin_coords or not destination_coords:
+        return {
+            "error": "invalid_location",
+            "message": f"Could not find coordinates for {origin} or {destination}"
+        }
+    
+    heading = _heading(origin_coords, destination_coords)
+    route = find_route(origin_coords, destination_coords)
+    if route is not None:
+        return {
+            "distance_miles": round(route.distance_miles),
+            "duration_hours": round(route.duration_hours, 1),
+            "route": f"{route.main_road} {heading}" if route.main_road else f"{heading}bound",
+            "traffic_delay_min": 0
+        }
+    
+    # No road graph (or no path on it): estimate from the straight-line distance
+    distance_miles = estimate_road_distance_miles(origin_coords, destination_coords)
+    return {
+        "distance_miles": distance_miles,
+        "duration_hours": round(distance_miles / ESTIMATE_SPEED_MPH, 1),
+        "route": f"{heading}bound (estimated)",
+        "traffic_delay_min": 0
+    }
+
 @tool
 def get_route_info(origin: str, destination: str) -> str:
     """Get route information including distance and duration"""
-    result = {
-        "distance_miles": 280,
-        "duration_hours": 4.5,
-        "route": "I-5 South",
-        "traffic_delay_min": 15
-    }
-    
-    return json.dumps(result)
+    return json.dumps(route_info(origin, destination))
@@ -0,0 +1,124 @@
+"""
+Shared Bedrock model clients and agent templates.
+
+Creating a BedrockModel sets up a boto3 client (credentials, endpoint
+resolution, connection pool), and every agent of every orchestration step
+used to create its own. get_model() hands out one model client per (model,
+region, temperature) for the whole process. An AgentTemplate holds a system
+prompt and tool set, and checkout() builds a new Agent on the shared client
+for each request. On a shared client that takes well under a millisecond,
+and a new Agent carries no conversation, state, interrupts or metrics over
+from an earlier request.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from strands import Agent
+from strands.models import BedrockModel
+from utils.config import AWS_REGION, BEDROCK_MODEL_ID
+
+DEFAULT_TEMPERATURE = 0.7
+
+_models = {}
+_models_lock = threading.Lock()
+
+def get_model(
+    temperature: float = DEFAULT_TEMPERATURE,
+    model_id: str = BEDROCK_MODEL_ID,
+    region_name: str = AWS_REGION
+) -> BedrockModel:
+    """
+    Get the shared Bedrock model client for a configuration (created on first use).
+
+    Args:
+        temperature: Sampling temperature
+        model_id: Bedrock model ID
+        region_name: AWS region
+
+    Returns:
+        BedrockModel shared by every agent with the same configuration
+    """
+    key = (model_id, region_name, temperature)
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            model = BedrockModel(model_id=model_id, region_name=region_name, temperature=temperature)
+            _models[key] = model
+        return model
+
+class AgentTemplate:
+    """Agent configuration (system prompt and tools) that builds one agent per request."""
+
+    def __init__(self, name: str, system_prompt: str, tools: list, temperature: float = DEFAULT_TEMPERATURE):
+        """
+        Args:
+            name: Template name (e.g. "trip_planning")
+            system_prompt: System prompt of every agent built from the template
+            tools: Tools of every agent built from the template
+            temperature: Sampling temperature of the shared model client
+        """
+        self.name = name
+        self.system_prompt = system_prompt
+        self.tools = list(tools)
+        self.temperature = temperature
+        self.created = 0
+        self._lock = threading.Lock()
+
+    def _build(self) -> Agent:
+        agent = Agent(
+            model=get_model(self.temperature),
+            system_prompt=self.system_prompt,
+            tools=self.tools
+        )
+        with self._lock:
+            self.created += 1
+        return agent
+
+    @contextmanager
+    def checkout(self) -> Iterator[Agent]:
+        """
+        Get a new agent for one request.
+
+        Every checkout builds its own agent on the shared model client, so
+        concurrent requests never share one and no request sees another's state.
+        """
+        yield self._build()
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+def get_agent_template(
+    name: str,
+    system_prompt: str,
+    tools: list,
+    temperature: float = DEFAULT_TEMPERATURE
+) -> AgentTemplate:
+    """
+    Get the process-wide agent template with a name (created on first use).
+
+    Args:
+        name: Template name
+        system_prompt: System prompt, used when the template is created
+        tools: Tools, used when the template is created
+        temperature: Sampling temperature, used when the template is created
+
+    Returns:
+        The shared AgentTemplate
+    """
+    with _templates_lock:
+        template = _templates.get(name)
+        if template is None:
+            template = AgentTemplate(name, system_prompt, tools, temperature)
+            _templates[name] = template
+        return template
+
+def clear_agent_pool(name: Optional[str] = None):
+    """Drop the cached templates (all of them, or one by name) and, when clearing all, the model clients."""
+    with _templates_lock:
+        if name is not None:
+            _templates.pop(name, None)
+            return
+        _templates.clear()
+    with _models_lock:
+        _models.clear()
@@ -0,0 +1,125 @@
+"""
+A long-lived event loop for running the agents' coroutines from sync code.
+
+asyncio.run() creates and closes an event loop on every call, so one
+orchestration used to spin up a loop per agent step, and the per-loop state
+(the async HTTP client's connections, cached tasks) went away with it.
+asyncio.run() also refuses to run inside a loop that is already running,
+such as an async UI handler. AsyncRuntime owns one event loop running
+forever on a daemon thread. run_sync() submits a coroutine to it from any
+thread, including one whose own loop is running, and waits for the result.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Coroutine, Optional
+from utils.http_client import close_async_http_client
+
+class AsyncRuntime:
+    """An event loop running on its own background thread."""
+
+    def __init__(self, name: str = "async-runtime"):
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        return self._loop
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        self._ready.wait()
+
+    def stop(self, timeout: Optional[float] = None):
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._thread = None
+        if thread is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the runtime's loop and wait for its result.
+
+        Args:
+            coro: Coroutine to run
+            timeout: Seconds to wait (None waits until it finishes)
+
+        Returns:
+            The coroutine's result (its exception is re-raised here)
+
+        Raises:
+            RuntimeError: If called from the runtime's own loop, which would deadlock
+            concurrent.futures.TimeoutError: If the timeout expires (the coroutine is cancelled)
+        """
+        self.start()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("AsyncRuntime.run() called from its own event loop; await the coroutine instead")
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            # Let cancelled tasks and async generators finish, and close the loop's
+            # HTTP connections, before closing
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(close_async_http_client())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+            self._loop = None
+
+_runtime: Optional[AsyncRuntime] = None
+_runtime_lock = threading.Lock()
+
+def get_async_runtime() -> AsyncRuntime:
+    """
+    Get the process-wide async runtime, starting it on first use.
+
+    Returns:
+        Running AsyncRuntime
+    """
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = AsyncRuntime()
+        runtime = _runtime
+    runtime.start()
+    return runtime
+
+def run_sync(coro: Coroutine, timeout: Optional[float] = None) -> Any:
+    """
+    Run a coroutine on the shared runtime loop from sync code.
+
+    Args:
+        coro: Coroutine to run
+        timeout: Seconds to wait (None waits until it finishes)
+
+    Returns:
+        The coroutine's result
+    """
+    return get_async_runtime().run(coro, timeout)
@@ -0,0 +1,316 @@
+"""
+Multi-stop charging plans.
+
+plan_charging_stops() chooses where to stop and how long to charge by dynamic
+programming over the candidate stations in route order. The state is
+(stop, state of charge on departure) with the charge discretized in
+SOC_STEP_PERCENT steps; charging time at a station is looked up from a
+cumulative time-vs-charge table (by default the vehicle's charging curve,
+see utils/charging_session.py), so charging from a to d costs T[d] - T[a]
+and each station-to-station transition is a handful of vectorized NumPy
+operations (a prefix minimum over arrival charges). The result is the plan
+with the least total time (driving, charging and a fixed overhead per stop)
+that never arrives anywhere below the reserve.
+"""
+
+import math
+from typing import Callable, Optional
+import numpy as np
+from utils.charging_session import get_charging_curve
+from utils.energy import BUFFER_PERCENT
+
+# Charge discretization of the search (percent of battery)
+SOC_STEP_PERCENT = 1
+# Minimum charge on arrival at every stop and at the destination: the same buffer
+# the energy check keeps, so a trip it flags always gets a stop from the planner
+RESERVE_PERCENT = BUFFER_PERCENT
+# Fast charging above this is slow enough that nobody plans for it
+MAX_CHARGE_PERCENT = 80
+# Pulling in, plugging in and leaving again
+STOP_OVERHEAD_MIN = 5
+# Average driving speed used for drive and detour time
+AVERAGE_SPEED_KPH = 60 * 1.60934
+# Candidates are thinned to the best station per bin of this length along the route
+CANDIDATE_SPACING_KM = 10.0
+
+ChargeTable = Callable[[dict], np.ndarray]
+
+def constant_power_charge_table(battery_kwh: float, max_charge_kw: float, step_percent: int = SOC_STEP_PERCENT) -> ChargeTable:
+    """
+    Charging time model that charges at min(station, vehicle) power throughout.
+
+    Args:
+        battery_kwh: Usable battery capacity
+        max_charge_kw: Vehicle's peak DC charging power
+        step_percent: Charge discretization
+
+    Returns:
+        Function mapping a station dictionary to cumulative minutes to reach each charge level
+    """
+    levels = np.arange(0, 100 + step_percent, step_percent, dtype=np.float64)
+
+    def table(station: dict) -> np.ndarray:
+        power_kw = min(float(station.get('power_kw') or 0), max_charge_kw)
+        if power_kw <= 0:
+            return np.full(len(levels), np.inf)
+        return levels / 100 * battery_kwh / power_kw * 60
+
+    return table
+
+def select_candidates(stations: list[dict], spacing_km: float = CANDIDATE_SPACING_KM) -> list[dict]:
+    """
+    Keep the fastest (then cheapest, then closest to the road) station per stretch of route.
+
+    Args:
+        stations: Stations with 'distance_from_origin_km'
+        spacing_km: Length of route stretch that keeps one station
+
+    Returns:
+        Candidate stations sorted by distance along the route
+    """
+    best = {}
+    for station in stations:
+        position = station.get('distance_from_origin_km')
+        if position is None or not station.get('available', True):
+            continue
+        key = (-float(station.get('power_kw') or 0), float(station.get('price_per_kwh') or 0),
+               float(station.get('detour_km') or 0))
+        bin_index = int(position // spacing_km)
+        if bin_index not in best or key < best[bin_index][0]:
+            best[bin_index] = (key, station)
+    return sorted((station for _, station in best.values()), key=lambda s: s['distance_from_origin_km'])
+
+def _infeasible(reason: str, trip_distance_km: float) -> dict:
+    return {"feasible": False, "reason": reason, "trip_distance_km": round(trip_distance_km, 1), "stops": []}
+
+def plan_charging_stops(
+    stations: list[dict],
+    trip_distance_km: float,
+    start_soc_percent: float,
+    range_km: float,
+    vehicle_model: Optional[str] = None,
+    reserve_percent: float = RESERVE_PERCENT,
+    max_charge_percent: float = MAX_CHARGE_PERCENT,
+    charge_table: Optional[ChargeTable] = None
+) -> dict:
+    """
+    Find the fastest sequence of charging stops for a trip.
+
+    Args:
+        stations: Candidate stations with 'distance_from_origin_km' (and optionally
+                  'detour_km'), e.g. a route corridor's stations
+        trip_distance_km: Driving distance to the destination
+        start_soc_percent: Charge at departure
+        range_km: Range on a full battery
+        vehicle_model: Vehicle model whose charging curve, capacity and charging
+                       cost are used (default model if unknown)
+        reserve_percent: Minimum charge on arrival anywhere
+        max_charge_percent: Highest charge to plan at a stop
+        charge_table: Station -> cumulative charging minutes per charge level
+                      (defaults to the vehicle's charging curve)
+
+    Returns:
+        Plan dictionary: 'feasible', the ordered 'stops' (arrival/departure charge,
+        charging minutes, energy and cost per stop), totals and the arrival charge
+        at the destination; or 'feasible': False with a 'reason'
+    """
+    step = SOC_STEP_PERCENT
+    n_levels = 100 // step + 1
+    curve = get_charging_curve(vehicle_model)
+    charge_table = charge_table or curve.charge_table()
+    if range_km <= 0:
+        return _infeasible("Vehicle range must be positive", trip_distance_km)
+
+    def levels_used(distance_km: float) -> int:
+        # Rounded up so the plan never relies on charge it doesn't have
+        return math.ceil(distance_km / range_km * 100 / step - 1e-9)
+
+    def drive_minutes(distance_km: float) -> float:
+        return distance_km / AVERAGE_SPEED_KPH * 60
+
+    reserve = math.ceil(reserve_percent / step)
+    cap = min(n_levels - 1, int(max_charge_percent // step))
+    start = min(n_levels - 1, int(start_soc_percent // step))
+
+    candidates = [s for s in select_candidates(stations) if 0 <= s['distance_from_origin_km'] < trip_distance_km]
+    n = len(candidates)
+    positions = np.array([0.0] + [s['distance_from_origin_km'] for s in candidates])
+    half_detours = np.array([0.0] + [float(s.get('detour_km') or 0) / 2 for s in candidates])
+
+    # best[i, d]: least minutes to leave node i (0 = origin) with charge level d
+    best = np.full((n + 1, n_levels), np.inf)
+    best[0, start] = 0.0
+    parent = np.full((n + 1, n_levels, 2), -1, dtype=np.int64)
+    level_index = np.arange(n_levels)
+
+    max_used = n_levels - 1 - reserve
+    departures = level_index[reserve + 1:cap + 1]
+    for j in range(1, n + 1 if len(departures) else 1):
+        table = np.asarray(charge_table(candidates[j - 1]), dtype=np.float64)
+
+        # Every earlier node within one battery's range can be the previous stop
+        first = int(np.searchsorted(positions[:j], positions[j] - range_km))
+        preds = np.arange(first, j)
+        distances = positions[j] - positions[preds] + half_detours[preds] + half_detours[j]
+        used = np.ceil(distances / range_km * 100 / step - 1e-9).astype(np.int64)
+        reachable = used <= max_used
+        preds, distances, used = preds[reachable], distances[reachable], used[reachable]
+        if not len(preds):
+            continue
+
+        # arrive[p, a]: minutes to reach j from preds[p] arriving with charge a
+        source_levels = level_index[None, :] + used[:, None]
+        arrive = np.where(
+            source_levels < n_levels,
+            best[preds[:, None], np.minimum(source_levels, n_levels - 1)],
+            np.inf
+        ) + (distances / AVERAGE_SPEED_KPH * 60 + STOP_OVERHEAD_MIN)[:, None]
+        arrive[:, :reserve] = np.inf
+        pred_choice = np.argmin(arrive, axis=0)
+        # value[a]: best arrival cost with charge a, minus the charging time "banked" in a
+        value = arrive[pred_choice, level_index] - table
+        if not np.isfinite(value).any():
+            continue
+
+        running_min = np.minimum.accumulate(value)
+        argmin = np.maximum.accumulate(np.where(value == running_min, level_index, 0))
+        # Depart with d > a: charge from the best arrival below d
+        cost = table[departures] + running_min[departures - 1]
+        better = cost < best[j, departures]
+        if better.any():
+            improved = departures[better]
+            arrival = argmin[improved - 1]
+            chosen = pred_choice[arrival]
+            best[j, improved] = cost[better]
+            parent[j, improved, 0] = preds[chosen]
+            parent[j, improved, 1] = arrival + used[chosen]
+
+    # Finish: drive from the last node to the destination
+    finish = None
+    for i in range(n + 1):
+        distance = trip_distance_km - positions[i] + half_detours[i]
+        used = levels_used(distance)
+        if used > n_levels - 1 - reserve:
+            continue
+        totals = best[i, used + reserve:] + drive_minutes(distance)
+        if not len(totals) or not np.isfinite(totals).any():
+            continue
+        d = int(np.argmin(totals)) + used + reserve
+        if finish is None or totals[d - used - reserve] < finish[0]:
+            finish = (float(totals[d - used - reserve]), i, d, used)
+
+    if finish is None:
+        return _infeasible(
+            "No combination of reachable chargers completes this trip from the current charge",
+            trip_distance_km
+        )
+
+    total_minutes, node, level, used = finish
+    arrival_percent = (level - used) * step
+    stops = []
+    while node > 0:
+        prev_node, prev_level = parent[node, level]
+        station = candidates[node - 1]
+        distance = positions[node] - positions[prev_node] + half_detours[prev_node] + half_detours[node]
+        arrival = prev_level - levels_used(distance)
+        table = np.asarray(charge_table(station), dtype=np.float64)
+        price = float(station.get('price_per_kwh') or 0)
+        session = curve.estimate(float(station.get('power_kw') or 0), price, arrival * step, level * step)
+        stops.append({
+            "station_id": station['id'],
+            "network": station.get('network'),
+            "location": station.get('location'),
+            "address": station.get('address'),
+            "power_kw": station.get('power_kw'),
+            "price_per_kwh": price,
+            "distance_from_origin_km": station['distance_from_origin_km'],
+            "arrival_soc_percent": int(arrival * step),
+            "departure_soc_percent": int(level * step),
+            "charge_minutes": round(float(table[level] - table[arrival]), 1),
+            "energy_kwh": round(session.energy_kwh, 1),
+            "cost_usd": round(session.cost_usd, 2),
+            "slots": station.get('slots', []),
+        })
+        node, level = int(prev_node), int(prev_level)
+    stops.reverse()
+
+    charge_minutes = sum(stop["charge_minutes"] for stop in stops)
+    return {
+        "feasible": True,
+        "trip_distance_km": round(trip_distance_km, 1),
+        "stops": stops,
+        "total_charge_minutes": round(charge_minutes, 1),
+        "total_drive_minutes": round(total_minutes - charge_minutes - STOP_OVERHEAD_MIN * len(stops), 1),
+        "total_minutes": round(total_minutes, 1),
+        "total_cost_usd": round(sum(stop["cost_usd"] for stop in stops), 2),
+        "arrival_soc_percent": int(arrival_percent),
+        "candidates_considered": n,
+    }
+
+def replan_from_charge(
+    plan: dict,
+    planned_start_percent: float,
+    start_soc_percent: float,
+    vehicle_model: Optional[str] = None
+) -> dict:
+    """
+    Redo a feasible plan's numbers for a departure with more charge than it was planned from.
+
+    The stops stay the same stations in the same order. The charge each leg
+    uses is read off the plan (departure charge minus the next arrival charge),
+    so every arrival is higher by the extra charge until a stop tops the car
+    up to its planned departure charge; a stop the car already reaches with
+    that much is dropped. Charging minutes, energy and cost are recomputed on
+    the vehicle's charging curve.
+
+    Args:
+        plan: Result of plan_charging_stops (an infeasible plan is returned as is)
+        planned_start_percent: Charge at departure the plan was computed for
+        start_soc_percent: Actual charge at departure
+        vehicle_model: Vehicle model the plan was computed for
+
+    Returns:
+        Copy of the plan with its stops and totals for the actual charge
+
+    Raises:
+        ValueError: If the actual charge is below the planned one (the plan may not hold)
+    """
+    if not plan.get('feasible'):
+        return plan
+    if start_soc_percent < planned_start_percent:
+        raise ValueError(f"Plan computed from {planned_start_percent}% can't be reused from {start_soc_percent}%")
+    curve = get_charging_curve(vehicle_model)
+    # Same discretization as plan_charging_stops
+    charge = min(100, int(start_soc_percent // SOC_STEP_PERCENT) * SOC_STEP_PERCENT)
+    planned_charge = int(planned_start_percent // SOC_STEP_PERCENT) * SOC_STEP_PERCENT
+
+    stops = []
+    for stop in plan['stops']:
+        used = planned_charge - stop['arrival_soc_percent']
+        planned_charge = stop['departure_soc_percent']
+        arrival = charge - used
+        if arrival >= stop['departure_soc_percent']:
+            charge = arrival
+            continue
+        session = curve.estimate(
+            float(stop.get('power_kw') or 0), float(stop.get('price_per_kwh') or 0),
+            arrival, stop['departure_soc_percent']
+        )
+        stops.append({
+            **stop,
+            "arrival_soc_percent": int(arrival),
+            "charge_minutes": round(session.duration_min, 1),
+            "energy_kwh": round(session.energy_kwh, 1),
+            "cost_usd": round(session.cost_usd, 2),
+        })
+        charge = stop['departure_soc_percent']
+
+    charge_minutes = sum(stop["charge_minutes"] for stop in stops)
+    return {
+        **plan,
+        "stops": stops,
+        "total_charge_minutes": round(charge_minutes, 1),
+        "total_minutes": round(plan['total_drive_minutes'] + charge_minutes + STOP_OVERHEAD_MIN * len(stops), 1),
+        "total_cost_usd": round(sum(stop["cost_usd"] for stop in stops), 2),
+        "arrival_soc_percent": int(charge - (planned_charge - plan['arrival_soc_percent'])),
+    }
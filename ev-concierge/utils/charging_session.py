@@ -0,0 +1,249 @@
+"""
+Charging session estimates: energy, duration and cost.
+
+Each vehicle model has a charging curve: the DC power it accepts (kW) at each
+state of charge, given as breakpoints that are linearly interpolated. For a
+given charger power the curve is integrated once into a cumulative table of
+minutes to reach each whole percent of charge. After that, a session between
+any start and target charge costs two table lookups. The charging planner
+uses the same tables as its time-vs-charge model.
+
+StationIndex maps station IDs to the stations that appeared in the charging
+agent's tool results (search results and planned stops). A reservation then
+finds its charger with one dictionary lookup.
+"""
+
+import threading
+from typing import Callable, Iterable, NamedTuple, Optional
+import numpy as np
+from utils.location_coords import KM_PER_MILE
+
+# Integration sub-steps per percent of charge when building a time table
+INTEGRATION_SUBSTEPS = 10
+# Share of the energy drawn from the charger that ends up in the battery
+CHARGING_EFFICIENCY = 0.92
+DEFAULT_VEHICLE_MODEL = "Tesla Model Y"
+
+# Usable capacity (kWh) and (state of charge %, peak DC power kW) breakpoints per model
+CHARGING_CURVES = {
+    "Tesla Model Y": (75.0, [(0, 170), (10, 250), (20, 250), (30, 200), (40, 170), (50, 140),
+                             (60, 115), (70, 90), (80, 65), (90, 40), (100, 10)]),
+    "Tesla Model 3": (75.0, [(0, 170), (10, 250), (25, 250), (40, 180), (50, 150), (60, 120),
+                             (70, 95), (80, 70), (90, 40), (100, 10)]),
+    "Hyundai Ioniq 5": (77.4, [(0, 180), (10, 230), (50, 220), (65, 180), (80, 110), (90, 50), (100, 10)]),
+    "Ford Mustang Mach-E": (88.0, [(0, 150), (10, 150), (40, 130), (60, 100), (80, 60), (90, 30), (100, 10)]),
+    "Chevrolet Bolt EV": (65.0, [(0, 55), (50, 55), (60, 45), (70, 35), (80, 25), (90, 15), (100, 8)]),
+}
+
+class SessionEstimate(NamedTuple):
+    start_soc_percent: float
+    target_soc_percent: float
+    # Energy added to the battery
+    energy_kwh: float
+    duration_min: float
+    # Billed on the energy drawn from the charger
+    cost_usd: float
+
+class ChargingCurve:
+    """A vehicle's DC charging curve with cached cumulative time tables per charger power."""
+
+    def __init__(self, model: str, battery_kwh: float, breakpoints: list[tuple[float, float]]):
+        """
+        Args:
+            model: Vehicle model name
+            battery_kwh: Usable battery capacity
+            breakpoints: (state of charge %, kW) points from 0% to 100%
+        """
+        self.model = model
+        self.battery_kwh = battery_kwh
+        self.soc_points = np.array([soc for soc, _ in breakpoints], dtype=np.float64)
+        self.kw_points = np.array([kw for _, kw in breakpoints], dtype=np.float64)
+        self.levels = np.arange(101, dtype=np.float64)
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    @property
+    def peak_kw(self) -> float:
+        return float(self.kw_points.max())
+
+    def power_at(self, soc_percent) -> np.ndarray:
+        """Power (kW) the vehicle accepts at the given charge levels."""
+        return np.interp(soc_percent, self.soc_points, self.kw_points)
+
+    def time_table(self, charger_kw: float) -> np.ndarray:
+        """
+        Cumulative minutes to charge from 0% to each whole percent on a charger.
+
+        Args:
+            charger_kw: Charger's rated power
+
+        Returns:
+            Array of 101 minute values (all inf if the charger has no power)
+        """
+        # Curves are integrated at whole-kW charger ratings
+        key = max(0, int(round(charger_kw)))
+        table = self._tables.get(key)
+        if table is not None:
+            return table
+
+        if key == 0:
+            table = np.full(len(self.levels), np.inf)
+        else:
+            step = 1.0 / INTEGRATION_SUBSTEPS
+            midpoints = np.arange(step / 2, 100, step)
+            power = np.minimum(self.power_at(midpoints), key)
+            minutes = step / 100 * self.battery_kwh / power * 60
+            table = np.concatenate([[0.0], np.cumsum(minutes)])[::INTEGRATION_SUBSTEPS]
+        table.setflags(write=False)
+        with self._lock:
+            self._tables.setdefault(key, table)
+        return self._tables[key]
+
+    def charge_table(self) -> Callable[[dict], np.ndarray]:
+        """Time-vs-charge model for the charging planner (station dictionary -> time table)."""
+        return lambda station: self.time_table(float(station.get('power_kw') or 0))
+
+    def minutes_to(self, charger_kw: float, soc_percent: float) -> float:
+        table = self.time_table(charger_kw)
+        soc_percent = min(max(soc_percent, 0.0), 100.0)
+        low = min(int(soc_percent), 99)
+        return float(table[low] + (soc_percent - low) * (table[low + 1] - table[low]))
+
+    def soc_after(self, charger_kw: float, start_soc_percent: float, minutes: float) -> float:
+        """
+        Charge reached after charging for a given time.
+
+        Args:
+            charger_kw: Charger's rated power
+            start_soc_percent: Charge when plugging in
+            minutes: Time on the charger
+
+        Returns:
+            State of charge in percent (at most 100)
+        """
+        table = self.time_table(charger_kw)
+        if not np.isfinite(table[-1]):
+            return start_soc_percent
+        return float(np.interp(self.minutes_to(charger_kw, start_soc_percent) + minutes, table, self.levels))
+
+    def estimate(self, charger_kw: float, price_per_kwh: float, start_soc_percent: float,
+                 target_soc_percent: float) -> SessionEstimate:
+        """
+        Energy, duration and cost of charging from one level to another.
+
+        Args:
+            charger_kw: Charger's rated power
+            price_per_kwh: Charger's price
+            start_soc_percent: Charge when plugging in
+            target_soc_percent: Charge when unplugging
+
+        Returns:
+            SessionEstimate (zero energy if the target isn't above the start)
+        """
+        target_soc_percent = max(target_soc_percent, start_soc_percent)
+        energy_kwh = (target_soc_percent - start_soc_percent) / 100 * self.battery_kwh
+        if energy_kwh <= 0:
+            duration_min = 0.0
+        elif not np.isfinite(self.time_table(charger_kw)[-1]):
+            duration_min = float('inf')
+        else:
+            duration_min = self.minutes_to(charger_kw, target_soc_percent) - self.minutes_to(charger_kw, start_soc_percent)
+        return SessionEstimate(
+            start_soc_percent,
+            target_soc_percent,
+            energy_kwh,
+            duration_min,
+            energy_kwh / CHARGING_EFFICIENCY * price_per_kwh
+        )
+
+_curves = {
+    model.lower(): ChargingCurve(model, battery_kwh, breakpoints)
+    for model, (battery_kwh, breakpoints) in CHARGING_CURVES.items()
+}
+
+def get_charging_curve(model: Optional[str] = None) -> ChargingCurve:
+    """
+    Charging curve of a vehicle model (shared, with its cached tables).
+
+    Args:
+        model: Vehicle model name (e.g. "Tesla Model Y"); case-insensitive
+
+    Returns:
+        The model's curve, or the default model's curve for unknown models
+    """
+    curve = _curves.get((model or '').strip().lower())
+    return curve if curve is not None else _curves[DEFAULT_VEHICLE_MODEL.lower()]
+
+class StationIndex:
+    """Stations from charging tool results, indexed by station ID."""
+
+    def __init__(self):
+        self._stations = {}
+
+    def __len__(self) -> int:
+        return len(self._stations)
+
+    def __contains__(self, station_id) -> bool:
+        return station_id in self._stations
+
+    @classmethod
+    def from_tool_results(cls, tool_results: Iterable) -> "StationIndex":
+        """
+        Index the stations of search_chargers results (lists, or dictionaries
+        with 'stations' / 'stations_if_fully_charged') and plan_charging_stops
+        results (planned 'stops', indexed by their 'station_id').
+        """
+        index = cls()
+        for result in tool_results:
+            if isinstance(result, list):
+                index.add_all(result)
+            elif isinstance(result, dict):
+                index.add_all(result.get('stations') or [])
+                index.add_all(result.get('stations_if_fully_charged') or [])
+                for stop in result.get('stops') or []:
+                    if isinstance(stop, dict) and 'station_id' in stop:
+                        # Planned stops are the most specific: they carry the planned charge levels
+                        index._stations[stop['station_id']] = {**stop, 'id': stop['station_id']}
+        return index
+
+    def add_all(self, stations: Iterable):
+        for station in stations:
+            if isinstance(station, dict) and 'id' in station:
+                self._stations.setdefault(station['id'], station)
+
+    def get(self, station_id: Optional[str]) -> Optional[dict]:
+        return self._stations.get(station_id)
+
+def estimate_reserved_session(
+    station: dict,
+    duration_min: float,
+    vehicle_data: dict
+) -> SessionEstimate:
+    """
+    Estimate a reserved charging session.
+
+    Planned stops are charged between their planned arrival and departure
+    levels. For other stations the vehicle arrives with its current charge,
+    less the drive to the station when that distance is known, and charges
+    for the reserved duration.
+
+    Args:
+        station: Station or planned-stop dictionary
+        duration_min: Reserved duration
+        vehicle_data: Vehicle 'model', 'battery_percent' and 'range_miles'
+
+    Returns:
+        SessionEstimate for the station's power and price
+    """
+    curve = get_charging_curve(vehicle_data.get('model'))
+    charger_kw = float(station.get('power_kw') or 0)
+    price = float(station.get('price_per_kwh') or 0)
+    if 'arrival_soc_percent' in station and 'departure_soc_percent' in station:
+        return curve.estimate(charger_kw, price, station['arrival_soc_percent'], station['departure_soc_percent'])
+
+    start = float(vehicle_data.get('battery_percent', 0))
+    range_miles = vehicle_data.get('range_miles') or 0
+    if station.get('distance_from_origin_km') is not None and range_miles > 0:
+        start -= station['distance_from_origin_km'] / (range_miles * KM_PER_MILE) * 100
+    start = min(max(start, 0.0), 100.0)
+    return curve.estimate(charger_kw, price, start, curve.soc_after(charger_kw, start, duration_min))
@@ -6,6 +6,33 @@ load_dotenv()
 AWS_REGION = os.getenv('AWS_REGION', 'us-west-2')
 BEDROCK_MODEL_ID = os.getenv('BEDROCK_MODEL_ID', 'anthropic.claude-3-5-sonnet-20241022-v2:0')
 USE_MOCK_DATA = os.getenv('USE_MOCK_DATA', 'true').lower() == 'true'
+# Trip planning: "direct" computes energy and route in-process, "agent" asks the trip-planning LLM
+TRIP_PLANNING_MODE = os.getenv('TRIP_PLANNING_MODE', 'direct').lower()
+# In direct mode, also ask the LLM for a short narrative of the analysis
+TRIP_NARRATIVE_ENABLED = os.getenv('TRIP_NARRATIVE_ENABLED', 'false').lower() == 'true'
+
+# Where search_chargers gets stations: "mock", "api" (OpenChargeMap) or "snapshot" (local export)
+STATION_SOURCE = os.getenv('STATION_SOURCE', 'mock' if USE_MOCK_DATA else 'api').lower()
+STATION_SNAPSHOT_PATH = os.getenv('STATION_SNAPSHOT_PATH', '')
+# Background delta sync of the snapshot from OpenChargeMap (needs OPENCHARGEMAP_API_KEY)
+STATION_SYNC_ENABLED = os.getenv('STATION_SYNC_ENABLED', 'true').lower() == 'true'
+STATION_SYNC_INTERVAL_SECONDS = int(os.getenv('STATION_SYNC_INTERVAL_SECONDS', str(15 * 60)))
+STATION_SYNC_MAX_RESULTS = int(os.getenv('STATION_SYNC_MAX_RESULTS', '5000'))
+STATION_SYNC_COUNTRY_CODE = os.getenv('STATION_SYNC_COUNTRY_CODE', '')
+
+# Route geometry: "haversine" (great-circle) or "equirectangular" (flat-earth approximation)
+DISTANCE_METHOD = os.getenv('DISTANCE_METHOD', 'haversine').lower()
+# Offline place-name dump used to resolve origins and destinations
+GAZETTEER_PATH = os.getenv(
+    'GAZETTEER_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'places.tsv')
+)
+# Where trips start when the message doesn't say ("from ...")
+DEFAULT_ORIGIN = os.getenv('DEFAULT_ORIGIN', 'San Francisco, CA')
+# Road graph for get_route_info: a saved graph (.npz, see utils/routing.py) or an OSM XML extract
+ROAD_GRAPH_PATH = os.getenv('ROAD_GRAPH_PATH', '')
+# Road distance / great-circle distance, for estimating trip length without a road graph
+ROAD_DISTANCE_FACTOR = float(os.getenv('ROAD_DISTANCE_FACTOR', '1.2'))
 
 # API Keys
 EVGO_API_KEY = os.getenv('EVGO_API_KEY')
@@ -15,4 +42,37 @@ STRIPE_API_KEY = os.getenv('STRIPE_API_KEY')
 OPENCHARGEMAP_API_KEY = os.getenv('OPENCHARGEMAP_API_KEY', '')
 
 # OpenChargeMap Configuration
-OPENCHARGEMAP_BASE_URL = 'https://api.openchargemap.io/v3'
+OPENCHARGEMAP_BASE_URL = os.getenv('OPENCHARGEMAP_BASE_URL', 'https://api.openchargemap.io/v3')
+OPENCHARGEMAP_TILE_MAX_RESULTS = int(os.getenv('OPENCHARGEMAP_TILE_MAX_RESULTS', '500'))
+OPENCHARGEMAP_MAX_CONCURRENT_TILES = int(os.getenv('OPENCHARGEMAP_MAX_CONCURRENT_TILES', '8'))
+# Request compact POIs (IDs only) and resolve them through cached reference data
+OPENCHARGEMAP_COMPACT = os.getenv('OPENCHARGEMAP_COMPACT', 'true').lower() == 'true'
+OCM_REFERENCE_PATH = os.getenv(
+    'OCM_REFERENCE_PATH',
+    os.path.join(os.path.expanduser('~'), '.cache', 'ev-concierge', 'ocm_reference.json')
+)
+OCM_REFERENCE_MAX_AGE_SECONDS = int(os.getenv('OCM_REFERENCE_MAX_AGE_SECONDS', str(7 * 24 * 60 * 60)))
+# Decode POI responses incrementally instead of building the whole JSON list first
+OPENCHARGEMAP_STREAM_RESPONSES = os.getenv('OPENCHARGEMAP_STREAM_RESPONSES', 'true').lower() == 'true'
+# How long a fetched route corridor is reused in-process (0 disables)
+CORRIDOR_MEMO_TTL_SECONDS = int(os.getenv('CORRIDOR_MEMO_TTL_SECONDS', '300'))
+# Precomputed trip plans (route, energy, charging stops) for popular city pairs
+PLAN_CACHE_TTL_SECONDS = int(os.getenv('PLAN_CACHE_TTL_SECONDS', str(60 * 60)))
+PLAN_CACHE_SIZE = int(os.getenv('PLAN_CACHE_SIZE', '256'))
+PLAN_CACHE_WARM_INTERVAL_SECONDS = int(os.getenv('PLAN_CACHE_WARM_INTERVAL_SECONDS', str(30 * 60)))
+
+# Shared HTTP client (connection pool, retries with jittered backoff)
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '16'))
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '3'))
+HTTP_BACKOFF_BASE_SECONDS = float(os.getenv('HTTP_BACKOFF_BASE_SECONDS', '0.25'))
+HTTP_BACKOFF_MAX_SECONDS = float(os.getenv('HTTP_BACKOFF_MAX_SECONDS', '4'))
+HTTP_TIMEOUT_SECONDS = float(os.getenv('HTTP_TIMEOUT_SECONDS', '10'))
+
+# Station tile cache (on-disk cache of OpenChargeMap results per geohash tile)
+STATION_CACHE_ENABLED = os.getenv('STATION_CACHE_ENABLED', 'true').lower() == 'true'
+STATION_CACHE_PATH = os.getenv(
+    'STATION_CACHE_PATH',
+    os.path.join(os.path.expanduser('~'), '.cache', 'ev-concierge', 'station_tiles.sqlite3')
+)
+STATION_CACHE_TTL_SECONDS = int(os.getenv('STATION_CACHE_TTL_SECONDS', str(6 * 60 * 60)))
+STATION_CACHE_STALE_SECONDS = int(os.getenv('STATION_CACHE_STALE_SECONDS', str(24 * 60 * 60)))
@@ -0,0 +1,224 @@
+"""
+Station matching against a route polyline.
+
+PolylineCorridor projects the route onto a local plane (sinusoidal around
+the route's mean longitude, accurate to a few percent over a state-sized
+route) and buckets its segments into a uniform grid. For each grid cell a
+station falls in, the segments that could be nearest to any point of the
+cell are worked out once; stations sharing a cell are then matched together
+in one vectorized point-to-segment pass over that short list. Each match
+reports the station's chainage (how far along the route its nearest point
+is) and its deviation from the route.
+"""
+
+import math
+import numpy as np
+from utils.location_coords import EARTH_RADIUS_KM, route_corridor_tiles
+
+KM_PER_DEGREE = 111.0
+# Douglas-Peucker tolerance used to simplify a route before tiling its corridor
+TILE_SIMPLIFY_KM = 5.0
+
+def _segment_lengths_km(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    phi1, phi2 = np.radians(lats[:-1]), np.radians(lats[1:])
+    dlambda = np.radians(lons[1:] - lons[:-1])
+    a = np.sin((phi2 - phi1) / 2)**2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2)**2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+class PolylineCorridor:
+    """Corridor of a given half-width around a route polyline, with a segment grid index."""
+
+    def __init__(self, polyline: list[tuple[float, float]], max_deviation_km: float):
+        """
+        Args:
+            polyline: (lat, lon) points from origin to destination
+            max_deviation_km: Half-width of the corridor in kilometers
+
+        Raises:
+            ValueError: If the polyline is empty
+        """
+        points = np.asarray(polyline, dtype=np.float64).reshape(-1, 2)
+        if len(points) == 0:
+            raise ValueError("Route polyline has no points")
+        # Repeated points make zero-length segments that can never be nearest
+        keep = np.ones(len(points), dtype=bool)
+        keep[1:] = np.any(points[1:] != points[:-1], axis=1)
+        points = points[keep]
+        if len(points) == 1:
+            points = np.vstack([points, points])
+
+        self.polyline = points
+        self.max_deviation_km = max_deviation_km
+        self._lon0 = float(points[:, 1].mean())
+
+        x, y = self._project(points[:, 0], points[:, 1])
+        self._ax, self._ay = x[:-1], y[:-1]
+        self._dx, self._dy = x[1:] - x[:-1], y[1:] - y[:-1]
+        self._len_sq = self._dx**2 + self._dy**2
+
+        # Chainage uses great-circle segment lengths, not projected ones
+        self.segment_km = _segment_lengths_km(points[:, 0], points[:, 1])
+        self.chainage_start = np.concatenate([[0.0], np.cumsum(self.segment_km)[:-1]])
+        self.length_km = float(self.segment_km.sum())
+
+        # Small cells keep each cell's candidate list short even for wide corridors
+        self._cell_km = min(max(max_deviation_km / 4, 1.0), 25.0)
+        self._cells = self._build_grid(x, y)
+        self._candidates = {}
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._ax)
+
+    def _project(self, lats, lons) -> tuple[np.ndarray, np.ndarray]:
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        return (lons - self._lon0) * KM_PER_DEGREE * np.cos(np.radians(lats)), lats * KM_PER_DEGREE
+
+    def _build_grid(self, x: np.ndarray, y: np.ndarray) -> dict:
+        # Each segment goes into every cell its bounding box touches
+        cell = self._cell_km
+        x_lo = np.floor(np.minimum(x[:-1], x[1:]) / cell).astype(np.int64)
+        x_hi = np.floor(np.maximum(x[:-1], x[1:]) / cell).astype(np.int64)
+        y_lo = np.floor(np.minimum(y[:-1], y[1:]) / cell).astype(np.int64)
+        y_hi = np.floor(np.maximum(y[:-1], y[1:]) / cell).astype(np.int64)
+
+        cells = {}
+        for segment in range(len(x) - 1):
+            for cx in range(x_lo[segment], x_hi[segment] + 1):
+                for cy in range(y_lo[segment], y_hi[segment] + 1):
+                    cells.setdefault((cx, cy), []).append(segment)
+        return cells
+
+    def _distances_to_segments(self, px, py, segments: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # (points x segments) distances and projection parameters t in [0, 1]
+        rel_x = px[:, None] - self._ax[segments]
+        rel_y = py[:, None] - self._ay[segments]
+        len_sq = self._len_sq[segments]
+        t = np.divide(rel_x * self._dx[segments] + rel_y * self._dy[segments], len_sq,
+                      out=np.zeros_like(rel_x), where=len_sq > 0)
+        np.clip(t, 0.0, 1.0, out=t)
+        dist_sq = (rel_x - t * self._dx[segments])**2 + (rel_y - t * self._dy[segments])**2
+        return dist_sq, t
+
+    def _cell_candidates(self, key: tuple[int, int]) -> np.ndarray:
+        """Segments that can be nearest to some point of a cell, computed once per cell."""
+        candidates = self._candidates.get(key)
+        if candidates is not None:
+            return candidates
+
+        cell = self._cell_km
+        half_diagonal = cell * math.sqrt(0.5)
+        rings = math.ceil(self.max_deviation_km / cell) + 1
+        nearby = set()
+        for cx in range(key[0] - rings, key[0] + rings + 1):
+            for cy in range(key[1] - rings, key[1] + rings + 1):
+                nearby.update(self._cells.get((cx, cy), ()))
+
+        candidates = np.array(sorted(nearby), dtype=np.int64)
+        if len(candidates):
+            # Any point of the cell is within best + half_diagonal of the segment
+            # nearest the centre, so its own nearest segment is within
+            # best + 2 * half_diagonal of the centre
+            center_x, center_y = (key[0] + 0.5) * cell, (key[1] + 0.5) * cell
+            dist_sq, _ = self._distances_to_segments(np.array([center_x]), np.array([center_y]), candidates)
+            dist = np.sqrt(dist_sq[0])
+            bound = min(dist.min() + 2 * half_diagonal, self.max_deviation_km + half_diagonal)
+            candidates = candidates[dist <= bound]
+        self._candidates[key] = candidates
+        return candidates
+
+    def locate(self, latitudes, longitudes) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Project points onto the route.
+
+        Args:
+            latitudes: Array-like of latitudes
+            longitudes: Array-like of longitudes
+
+        Returns:
+            Tuple of arrays (chainage_km, deviation_km); both are NaN for
+            points farther than max_deviation_km from the route
+        """
+        px, py = self._project(latitudes, longitudes)
+        chainage = np.full(len(px), np.nan)
+        deviation = np.full(len(px), np.nan)
+        if not len(px):
+            return chainage, deviation
+
+        cell_x = np.floor(px / self._cell_km).astype(np.int64)
+        cell_y = np.floor(py / self._cell_km).astype(np.int64)
+        groups = {}
+        for i, key in enumerate(zip(cell_x.tolist(), cell_y.tolist())):
+            groups.setdefault(key, []).append(i)
+
+        for key, members in groups.items():
+            segments = self._cell_candidates(key)
+            if not len(segments):
+                continue
+            members = np.array(members, dtype=np.int64)
+
+            dist_sq, t = self._distances_to_segments(px[members], py[members], segments)
+            nearest = np.argmin(dist_sq, axis=1)
+            rows = np.arange(len(members))
+            best = np.sqrt(dist_sq[rows, nearest])
+            within = best <= self.max_deviation_km
+            best_segments = segments[nearest]
+            chainage[members[within]] = (
+                self.chainage_start[best_segments] + t[rows, nearest] * self.segment_km[best_segments]
+            )[within]
+            deviation[members[within]] = best[within]
+
+        return chainage, deviation
+
+    def simplified(self, tolerance_km: float = TILE_SIMPLIFY_KM) -> list[tuple[float, float]]:
+        """
+        Douglas-Peucker simplification of the route.
+
+        Args:
+            tolerance_km: Maximum distance of a dropped point from the simplified line
+
+        Returns:
+            (lat, lon) points, always including both ends
+        """
+        x, y = self._project(self.polyline[:, 0], self.polyline[:, 1])
+        keep = np.zeros(len(x), dtype=bool)
+        keep[0] = keep[-1] = True
+        stack = [(0, len(x) - 1)]
+        while stack:
+            start, end = stack.pop()
+            if end - start < 2:
+                continue
+            sx, sy = x[end] - x[start], y[end] - y[start]
+            inner_x, inner_y = x[start + 1:end] - x[start], y[start + 1:end] - y[start]
+            length = math.hypot(sx, sy)
+            if length > 0:
+                distances = np.abs(inner_x * sy - inner_y * sx) / length
+            else:
+                distances = np.hypot(inner_x, inner_y)
+            farthest = int(np.argmax(distances))
+            if distances[farthest] > tolerance_km:
+                split = start + 1 + farthest
+                keep[split] = True
+                stack.append((start, split))
+                stack.append((split, end))
+        return [tuple(point) for point in self.polyline[keep].tolist()]
+
+    def tiles(self, precision: int = 3) -> list[str]:
+        """
+        Geohash tiles covering the corridor, in route order.
+
+        Args:
+            precision: Geohash precision of the tiles
+
+        Returns:
+            List of geohash tile strings
+        """
+        # Pad by the simplification tolerance so the simplified route's corridor covers the real one
+        corridor_km = self.max_deviation_km + TILE_SIMPLIFY_KM
+        points = self.simplified()
+        tiles = {}
+        for start, end in zip(points, points[1:]):
+            for tile in route_corridor_tiles(start, end, corridor_km, precision):
+                tiles.setdefault(tile, len(tiles))
+        return sorted(tiles, key=tiles.get)
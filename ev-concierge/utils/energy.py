@@ -0,0 +1,109 @@
+"""
+Trip energy requirements, one vehicle or a whole fleet at a time.
+
+batch_energy_needs() evaluates the same rule as the calculate_energy_needs
+tool (required charge = distance / range, +15% outside the mild temperature
+band, plus a fixed buffer) over NumPy arrays, so checking thousands of
+vehicles is a single vectorized pass. Run as a module to check a fleet
+CSV overnight:
+
+    python -m utils.energy fleet.csv
+"""
+
+import csv
+import sys
+import time
+import numpy as np
+
+# Outside this temperature band (F) the battery needs TEMP_FACTOR more energy
+MILD_TEMP_MIN_F = 50
+MILD_TEMP_MAX_F = 80
+TEMP_FACTOR = 1.15
+# Extra charge (percent) kept on top of the trip's requirement
+BUFFER_PERCENT = 20
+# Above this battery level the car can leave and charge en route
+EN_ROUTE_MIN_PERCENT = 30
+DEFAULT_TEMP_F = 70
+
+def _required_percent(trip_distance_miles: np.ndarray, vehicle_range_miles: np.ndarray, weather_temp_f: np.ndarray) -> np.ndarray:
+    temp_factor = np.where((weather_temp_f >= MILD_TEMP_MIN_F) & (weather_temp_f <= MILD_TEMP_MAX_F), 1.0, TEMP_FACTOR)
+    # A vehicle without range can't make any trip
+    with np.errstate(divide='ignore', invalid='ignore'):
+        trip_percent = np.where(vehicle_range_miles > 0, trip_distance_miles / vehicle_range_miles * 100, np.inf)
+    return trip_percent * temp_factor + BUFFER_PERCENT
+
+def batch_energy_needs(battery_percent, trip_distance_miles, vehicle_range_miles, weather_temp_f=DEFAULT_TEMP_F) -> dict:
+    """
+    Energy requirements of many trips at once.
+
+    Args:
+        battery_percent: Current battery levels (array-like or scalar)
+        trip_distance_miles: Trip distances
+        vehicle_range_miles: Ranges on a full battery
+        weather_temp_f: Temperatures (defaults to 70F for every trip)
+
+    Returns:
+        Dictionary of arrays, one element per trip: 'required_battery',
+        'needs_charging', 'deficit_percent' and 'pre_trip' (True where the
+        strategy is "pre-trip" rather than "en-route")
+    """
+    battery, distance, vehicle_range, temp = np.broadcast_arrays(
+        np.asarray(battery_percent, dtype=np.float64),
+        np.asarray(trip_distance_miles, dtype=np.float64),
+        np.asarray(vehicle_range_miles, dtype=np.float64),
+        np.asarray(weather_temp_f, dtype=np.float64)
+    )
+    required = _required_percent(distance, vehicle_range, temp)
+    return {
+        "required_battery": np.round(required, 1),
+        "needs_charging": battery < required,
+        "deficit_percent": np.maximum(0.0, np.round(required - battery, 1)),
+        "pre_trip": battery <= EN_ROUTE_MIN_PERCENT,
+    }
+
+def energy_needs(battery_percent: float, trip_distance_miles: float, vehicle_range_miles: float,
+                 weather_temp_f: float = DEFAULT_TEMP_F) -> dict:
+    """
+    Energy requirements of one trip (the calculate_energy_needs tool's result).
+
+    Returns:
+        Dictionary with current/required battery, whether charging is needed,
+        the deficit and the charging strategy
+    """
+    required = float(_required_percent(np.float64(trip_distance_miles), np.float64(vehicle_range_miles),
+                                       np.float64(weather_temp_f)))
+    return {
+        "current_battery": battery_percent,
+        "required_battery": round(required, 1),
+        "needs_charging": battery_percent < required,
+        "deficit_percent": max(0, round(required - battery_percent, 1)),
+        "charging_strategy": "en-route" if battery_percent > EN_ROUTE_MIN_PERCENT else "pre-trip"
+    }
+
+def _read_fleet_csv(path: str) -> tuple[list[str], dict]:
+    """Columns: vehicle_id, battery_percent, trip_distance_miles, range_miles, optional temp_f."""
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    ids = [row["vehicle_id"] for row in rows]
+    columns = {
+        "battery_percent": [float(row["battery_percent"]) for row in rows],
+        "trip_distance_miles": [float(row["trip_distance_miles"]) for row in rows],
+        "vehicle_range_miles": [float(row["range_miles"]) for row in rows],
+        "weather_temp_f": [float(row.get("temp_f") or DEFAULT_TEMP_F) for row in rows],
+    }
+    return ids, columns
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python -m utils.energy <fleet.csv>")
+        sys.exit(1)
+    vehicle_ids, columns = _read_fleet_csv(sys.argv[1])
+    started = time.perf_counter()
+    needs = batch_energy_needs(**columns)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    pre_trip = np.flatnonzero(needs["needs_charging"] & needs["pre_trip"])
+    print(f"🔋 {len(vehicle_ids)} vehicles checked in {elapsed_ms:.1f} ms, {len(pre_trip)} need pre-trip charging")
+    for row in pre_trip.tolist():
+        print(f"   {vehicle_ids[row]}: {columns['battery_percent'][row]:.0f}% → "
+              f"{needs['required_battery'][row]:.1f}% (+{needs['deficit_percent'][row]:.1f}%)")
@@ -0,0 +1,360 @@
+"""
+Offline gazetteer: place names to coordinates without network or file I/O per lookup.
+
+The place dump (data/places.tsv, one GeoNames-style row per place) is read
+once into column arrays plus three indexes over normalized names:
+a dictionary for exact names and aliases ("SF", "Vegas"), a sorted key list
+searched with bisect for prefixes ("Kettle" -> Kettleman City) and a trigram
+index that narrows fuzzy matches ("Bakersfeild") to a handful of candidates
+before difflib scores them.
+"""
+
+import bisect
+import difflib
+import re
+import threading
+from array import array
+from typing import NamedTuple, Optional
+from utils.config import GAZETTEER_PATH
+
+# Minimum difflib ratio for a fuzzy match to be accepted
+FUZZY_CUTOFF = 0.8
+# Candidates (by shared trigrams) scored with difflib per fuzzy lookup
+FUZZY_CANDIDATES = 8
+# Longest place name, in words, looked for in free text
+MAX_NAME_WORDS = 4
+
+_NORMALIZE_RE = re.compile(r"[^a-z0-9' ]+")
+_WORD_RE = re.compile(r"[A-Za-z0-9'.]+")
+_COUNTRY_SUFFIXES = ("usa", "us", "united states")
+_DESTINATION_CUES = ("to", "into", "towards", "toward")
+
+class Place(NamedTuple):
+    name: str
+    admin1: str
+    latitude: float
+    longitude: float
+    population: int
+
+    @property
+    def label(self) -> str:
+        """Display name in the "Town, ST" form the tools use."""
+        return f"{self.name}, {self.admin1}"
+
+    @property
+    def coordinates(self) -> tuple[float, float]:
+        return (self.latitude, self.longitude)
+
+def normalize_name(name: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace ("L.A." -> "la")."""
+    name = name.lower().replace(".", "").replace("-", " ")
+    return " ".join(_NORMALIZE_RE.sub(" ", name).split())
+
+def _tokenize(text: str) -> list[str]:
+    return [w.strip("'.") for w in _WORD_RE.findall(text)]
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class Gazetteer:
+    """In-memory place index with exact, prefix and fuzzy lookup."""
+
+    def __init__(self):
+        self.names = []
+        self.admin1 = []
+        self.latitudes = array('d')
+        self.longitudes = array('d')
+        self.population = array('l')
+        # Normalized name or alias -> rows, most populous first
+        self._exact = {}
+        # Sorted keys for bisect prefix search
+        self._prefix_keys = []
+        # Trigram -> keys containing it
+        self._trigrams = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_tsv(cls, path: str) -> "Gazetteer":
+        """
+        Load a tab-separated place dump.
+
+        Columns: name, admin1 code, latitude, longitude, population and an
+        optional comma-separated alias list. Lines starting with # are skipped.
+
+        Args:
+            path: Place dump file
+
+        Returns:
+            Populated Gazetteer
+
+        Raises:
+            ValueError: If a row is malformed
+        """
+        gazetteer = cls()
+        with open(path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip() or line.startswith('#'):
+                    continue
+                fields = line.rstrip('\n').split('\t')
+                try:
+                    name, admin1, latitude, longitude, population = fields[:5]
+                    aliases = fields[5].split(',') if len(fields) > 5 and fields[5] else []
+                    gazetteer.add(name, admin1, float(latitude), float(longitude), int(population or 0), aliases)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_number}: malformed place row ({e})")
+        gazetteer.build_index()
+        return gazetteer
+
+    def add(
+        self,
+        name: str,
+        admin1: str,
+        latitude: float,
+        longitude: float,
+        population: int = 0,
+        aliases: Optional[list[str]] = None
+    ) -> int:
+        """
+        Add a place. Call build_index() once all places are added.
+
+        Args:
+            name: Place name (e.g. "Kettleman City")
+            admin1: State/province code (e.g. "CA")
+            latitude: Latitude
+            longitude: Longitude
+            population: Population, used to rank places sharing a name
+            aliases: Other names for the place (e.g. ["SF"])
+
+        Returns:
+            Row index of the place
+        """
+        row = len(self.names)
+        self.names.append(name)
+        self.admin1.append(admin1.upper())
+        self.latitudes.append(latitude)
+        self.longitudes.append(longitude)
+        self.population.append(population)
+        for key in {normalize_name(n) for n in [name, *(aliases or [])]}:
+            if key:
+                self._exact.setdefault(key, []).append(row)
+        return row
+
+    def build_index(self):
+        """Sort the name index and build the prefix and trigram indexes."""
+        for rows in self._exact.values():
+            rows.sort(key=lambda row: -self.population[row])
+
+        self._prefix_keys = sorted(self._exact)
+
+        self._trigrams = {}
+        for key in self._exact:
+            for trigram in _trigrams(key):
+                self._trigrams.setdefault(trigram, []).append(key)
+
+    def place(self, row: int) -> Place:
+        return Place(
+            self.names[row],
+            self.admin1[row],
+            self.latitudes[row],
+            self.longitudes[row],
+            self.population[row],
+        )
+
+    @staticmethod
+    def _split_query(query: str) -> tuple[str, Optional[str]]:
+        # "Bakersfield, CA" / "Bakersfield, CA, USA" -> ("bakersfield", "CA")
+        parts = [p.strip() for p in query.split(',') if p.strip()]
+        while len(parts) > 1 and normalize_name(parts[-1]) in _COUNTRY_SUFFIXES:
+            parts.pop()
+        if len(parts) > 1 and len(parts[-1]) == 2 and parts[-1].isalpha():
+            return normalize_name(" ".join(parts[:-1])), parts[-1].upper()
+        return normalize_name(" ".join(parts)), None
+
+    def _pick(self, rows: list[int], admin1: Optional[str]) -> Optional[int]:
+        if admin1 is None:
+            return rows[0]
+        for row in rows:
+            if self.admin1[row] == admin1:
+                return row
+        return None
+
+    def _exact_row(self, key: str, admin1: Optional[str]) -> Optional[int]:
+        rows = self._exact.get(key)
+        return self._pick(rows, admin1) if rows else None
+
+    def _prefix_row(self, key: str, admin1: Optional[str]) -> Optional[int]:
+        best = None
+        i = bisect.bisect_left(self._prefix_keys, key)
+        while i < len(self._prefix_keys) and self._prefix_keys[i].startswith(key):
+            row = self._pick(self._exact[self._prefix_keys[i]], admin1)
+            if row is not None and (best is None or self.population[row] > self.population[best]):
+                best = row
+            i += 1
+        return best
+
+    def _fuzzy_row(self, key: str, admin1: Optional[str]) -> Optional[int]:
+        shared = {}
+        for trigram in _trigrams(key):
+            for candidate in self._trigrams.get(trigram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        if not shared:
+            return None
+
+        candidates = sorted(shared, key=shared.get, reverse=True)[:FUZZY_CANDIDATES]
+        best, best_ratio = None, FUZZY_CUTOFF
+        for candidate in candidates:
+            ratio = difflib.SequenceMatcher(None, key, candidate).ratio()
+            row = self._pick(self._exact[candidate], admin1) if ratio >= best_ratio else None
+            if row is not None and (best is None or ratio > best_ratio):
+                best, best_ratio = row, ratio
+        return best
+
+    def lookup(self, query: str, fuzzy: bool = True) -> Optional[Place]:
+        """
+        Resolve a place name to a place.
+
+        Tries an exact name/alias match, then the most populous place whose
+        name starts with the query, then (if enabled) a fuzzy match for typos.
+        A trailing state code ("Bakersfield, CA") restricts the match to that state.
+
+        Args:
+            query: Place name (e.g. "Kettleman City", "SF", "Bakersfield, CA")
+            fuzzy: Whether to fall back to fuzzy matching
+
+        Returns:
+            Place, or None if nothing matches
+        """
+        if not query:
+            return None
+        key, admin1 = self._split_query(query)
+        if not key:
+            return None
+
+        row = self._exact_row(key, admin1)
+        if row is None and len(key) >= 3:
+            row = self._prefix_row(key, admin1)
+        if row is None and fuzzy and len(key) >= 4:
+            row = self._fuzzy_row(key, admin1)
+        return self.place(row) if row is not None else None
+
+    def find_places(self, text: str) -> list[tuple[int, Place]]:
+        """
+        Find place names mentioned in free text, longest match first.
+
+        Only exact names and aliases count here, so ordinary words are not
+        fuzzily turned into towns. A state code right after a name
+        ("Williams AZ") picks the place in that state.
+
+        Args:
+            text: Free text (e.g. "Drive to Bakersfield tomorrow")
+
+        Returns:
+            (word index, place) pairs in the order they appear
+        """
+        words = _tokenize(text)
+        keys = [normalize_name(w) for w in words]
+        found = []
+        i = 0
+        while i < len(words):
+            for n in range(min(MAX_NAME_WORDS, len(words) - i), 0, -1):
+                rows = self._exact.get(" ".join(keys[i:i + n]))
+                if not rows:
+                    continue
+                row = rows[0]
+                state = words[i + n] if i + n < len(words) else ""
+                if len(state) == 2 and state.isupper():
+                    in_state = self._pick(rows, state)
+                    if in_state is not None:
+                        row = in_state
+                        n += 1
+                found.append((i, self.place(row)))
+                i += n
+                break
+            else:
+                i += 1
+        return found
+
+    def extract_route(self, text: str) -> tuple[Optional[Place], Optional[Place]]:
+        """
+        Pick the origin and destination out of a trip request.
+
+        Places after "from" are origins and places after "to" destinations;
+        otherwise the first unmarked place is the origin and the last the
+        destination ("SF to LA", "Plan a trip to Bakersfield").
+
+        Args:
+            text: Free text trip request
+
+        Returns:
+            (origin, destination); either is None if not mentioned
+        """
+        words = _tokenize(text)
+        origin = destination = None
+        unmarked = []
+        for index, place in self.find_places(text):
+            cue = words[index - 1].lower() if index else ""
+            if cue == "from" and origin is None:
+                origin = place
+            elif cue in _DESTINATION_CUES and destination is None:
+                destination = place
+            else:
+                unmarked.append(place)
+
+        if destination is None and unmarked:
+            destination = unmarked.pop()
+        if origin is None and unmarked:
+            origin = unmarked[0]
+        return origin, destination
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_lock = threading.Lock()
+# Path that failed to load, so a missing dump is reported once rather than per lookup
+_failed_path: Optional[str] = None
+
+def get_gazetteer(path: str = GAZETTEER_PATH) -> Optional[Gazetteer]:
+    """
+    Get the process-wide gazetteer, loading the place dump on first use.
+
+    Args:
+        path: Place dump file
+
+    Returns:
+        Gazetteer, or None if the place dump can't be read
+    """
+    global _gazetteer, _failed_path
+    if _gazetteer is not None:
+        return _gazetteer
+    with _gazetteer_lock:
+        if _gazetteer is None:
+            if _failed_path == path:
+                return None
+            try:
+                _gazetteer = Gazetteer.from_tsv(path)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Gazetteer unavailable ({e}), only built-in cities will resolve")
+                _failed_path = path
+                return None
+        return _gazetteer
+
+def reset_gazetteer():
+    """Forget the loaded gazetteer so the next lookup reloads the place dump."""
+    global _gazetteer, _failed_path
+    with _gazetteer_lock:
+        _gazetteer = None
+        _failed_path = None
+
+def lookup_place(query: str) -> Optional[Place]:
+    """
+    Resolve a place name with the process-wide gazetteer.
+
+    Args:
+        query: Place name (e.g. "Bakersfield, CA")
+
+    Returns:
+        Place, or None if it can't be resolved
+    """
+    gazetteer = get_gazetteer()
+    return gazetteer.lookup(query) if gazetteer is not None else None
@@ -0,0 +1,102 @@
+"""
+Geohash encoding helpers used to key cached charging station tiles.
+
+A geohash is a base32 string where each extra character narrows the cell,
+so nearby coordinates share a prefix and a given precision gives a fixed
+grid of tiles (precision 4 ≈ 39 km x 20 km, precision 3 ≈ 156 km x 156 km).
+"""
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE_MAP = {c: i for i, c in enumerate(_BASE32)}
+
+def encode(latitude: float, longitude: float, precision: int = 4) -> str:
+    """
+    Encode a coordinate into a geohash string.
+
+    Args:
+        latitude: Latitude in degrees
+        longitude: Longitude in degrees
+        precision: Number of geohash characters
+
+    Returns:
+        Geohash string of the given precision
+    """
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_lo = mid
+            else:
+                bits <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_lo = mid
+            else:
+                bits <<= 1
+                lat_hi = mid
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+def decode_bbox(geohash: str) -> tuple[float, float, float, float]:
+    """
+    Decode a geohash into its bounding box.
+
+    Args:
+        geohash: Geohash string
+
+    Returns:
+        Tuple of (lat_min, lat_max, lon_min, lon_max)
+    """
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    even = True
+
+    for char in geohash:
+        value = _DECODE_MAP[char]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                if bit:
+                    lon_lo = mid
+                else:
+                    lon_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                if bit:
+                    lat_lo = mid
+                else:
+                    lat_hi = mid
+            even = not even
+
+    return lat_lo, lat_hi, lon_lo, lon_hi
+
+def children(geohash: str) -> list[str]:
+    """
+    The 32 cells one character finer that exactly cover a geohash cell.
+
+    Args:
+        geohash: Geohash string
+
+    Returns:
+        Child geohashes
+    """
+    return [geohash + char for char in _BASE32]
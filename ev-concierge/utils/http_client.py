@@ -0,0 +1,327 @@
+"""
+Shared HTTP clients for outbound API calls (OpenChargeMap and friends).
+
+One process-wide requests.Session keeps a keep-alive connection pool so
+steady-state calls skip the TCP+TLS handshake. Requests negotiate gzip,
+retry transient failures with bounded, jittered exponential backoff and
+record per-request latency metrics. AsyncHttpClient does the same on top
+of httpx for code running inside an event loop.
+"""
+
+import asyncio
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Optional
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from utils.config import (
+    HTTP_POOL_SIZE,
+    HTTP_MAX_RETRIES,
+    HTTP_BACKOFF_BASE_SECONDS,
+    HTTP_BACKOFF_MAX_SECONDS,
+    HTTP_TIMEOUT_SECONDS,
+)
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# Number of recent latencies kept for percentile metrics
+LATENCY_WINDOW = 500
+
+class RequestMetrics:
+    """Thread-safe counters and a rolling latency window."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._latencies_ms = deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+
+    def record(self, latency_ms: float, ok: bool, retries: int):
+        with self._lock:
+            self.requests += 1
+            self.retries += retries
+            if not ok:
+                self.failures += 1
+            self._latencies_ms.append(latency_ms)
+
+    def snapshot(self) -> dict:
+        """
+        Summarize the metrics collected so far.
+
+        Returns:
+            Dictionary with request/failure/retry counts and latency percentiles in ms
+        """
+        with self._lock:
+            latencies = sorted(self._latencies_ms)
+            summary = {
+                "requests": self.requests,
+                "failures": self.failures,
+                "retries": self.retries,
+            }
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 1)
+
+        summary["p50_ms"] = percentile(0.50)
+        summary["p95_ms"] = percentile(0.95)
+        summary["max_ms"] = round(latencies[-1], 1) if latencies else None
+        return summary
+
+def backoff_delay(attempt: int, base: float = HTTP_BACKOFF_BASE_SECONDS, cap: float = HTTP_BACKOFF_MAX_SECONDS) -> float:
+    """
+    Full-jitter exponential backoff: a random delay up to base * 2^attempt, capped.
+
+    Args:
+        attempt: Zero-based retry attempt
+        base: Base delay in seconds
+        cap: Maximum delay in seconds
+
+    Returns:
+        Delay in seconds
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+def retry_after_seconds(response) -> Optional[float]:
+    """Parse a numeric Retry-After header, if present."""
+    value = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+class HttpClient:
+    """Pooled, retrying wrapper around requests.Session."""
+
+    def __init__(
+        self,
+        pool_size: int = HTTP_POOL_SIZE,
+        max_retries: int = HTTP_MAX_RETRIES,
+        timeout: float = HTTP_TIMEOUT_SECONDS
+    ):
+        """
+        Args:
+            pool_size: Connections kept alive per host
+            max_retries: Retries after the first attempt for transient failures
+            timeout: Default request timeout in seconds
+        """
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.metrics = RequestMetrics()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "User-Agent": "ev-concierge/1.0",
+        })
+
+    def get(self, url: str, params: Optional[dict] = None, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        """
+        GET a URL, retrying connection errors, timeouts, 429 and 5xx responses.
+
+        Args:
+            url: URL to fetch
+            params: Query parameters
+            timeout: Request timeout in seconds (defaults to the client timeout)
+            **kwargs: Passed through to requests.Session.get (e.g. stream=True)
+
+        Returns:
+            Successful response
+
+        Raises:
+            requests.exceptions.RequestException: If the request still fails after all retries
+        """
+        timeout = timeout or self.timeout
+        start = time.perf_counter()
+        attempt = 0
+
+        while True:
+            response = None
+            try:
+                response = self.session.get(url, params=params, timeout=timeout, **kwargs)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    self.metrics.record((time.perf_counter() - start) * 1000, True, attempt)
+                    return response
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    self.metrics.record((time.perf_counter() - start) * 1000, False, attempt)
+                    raise
+            except requests.exceptions.RequestException:
+                self.metrics.record((time.perf_counter() - start) * 1000, False, attempt)
+                raise
+
+            delay = retry_after_seconds(response)
+            if delay is None or delay > HTTP_BACKOFF_MAX_SECONDS:
+                delay = backoff_delay(attempt)
+            if response is not None:
+                response.close()
+            attempt += 1
+            time.sleep(delay)
+
+    def get_json(self, url: str, params: Optional[dict] = None, timeout: Optional[float] = None):
+        """
+        GET a URL and decode its JSON body.
+
+        Args:
+            url: URL to fetch
+            params: Query parameters
+            timeout: Request timeout in seconds
+
+        Returns:
+            Decoded JSON value
+        """
+        return self.get(url, params=params, timeout=timeout).json()
+
+class AsyncHttpClient:
+    """Pooled, retrying wrapper around httpx.AsyncClient (one per event loop)."""
+
+    def __init__(
+        self,
+        pool_size: int = HTTP_POOL_SIZE,
+        max_retries: int = HTTP_MAX_RETRIES,
+        timeout: float = HTTP_TIMEOUT_SECONDS
+    ):
+        """
+        Args:
+            pool_size: Maximum pooled connections
+            max_retries: Retries after the first attempt for transient failures
+            timeout: Default request timeout in seconds
+        """
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.metrics = RequestMetrics()
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=timeout,
+            headers={
+                "Accept": "application/json",
+                "Accept-Encoding": "gzip, deflate",
+                "User-Agent": "ev-concierge/1.0",
+            },
+        )
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        stream: bool = False
+    ) -> httpx.Response:
+        """
+        GET a URL, retrying connection errors, timeouts, 429 and 5xx responses.
+
+        Args:
+            url: URL to fetch
+            params: Query parameters
+            timeout: Request timeout in seconds (defaults to the client timeout)
+            stream: Return once headers arrive; the caller reads the body and must aclose() it
+
+        Returns:
+            Successful response
+
+        Raises:
+            httpx.HTTPError: If the request still fails after all retries
+        """
+        timeout = timeout or self.timeout
+        start = time.perf_counter()
+        attempt = 0
+
+        while True:
+            response = None
+            try:
+                request = self.client.build_request("GET", url, params=params, timeout=timeout)
+                response = await self.client.send(request, stream=stream)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    if stream and response.is_error:
+                        await response.aclose()
+                    response.raise_for_status()
+                    self.metrics.record((time.perf_counter() - start) * 1000, True, attempt)
+                    return response
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    self.metrics.record((time.perf_counter() - start) * 1000, False, attempt)
+                    raise
+            except httpx.HTTPError:
+                self.metrics.record((time.perf_counter() - start) * 1000, False, attempt)
+                raise
+
+            delay = retry_after_seconds(response)
+            if delay is None or delay > HTTP_BACKOFF_MAX_SECONDS:
+                delay = backoff_delay(attempt)
+            if response is not None:
+                await response.aclose()
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get_json(self, url: str, params: Optional[dict] = None, timeout: Optional[float] = None):
+        """
+        GET a URL and decode its JSON body.
+
+        Args:
+            url: URL to fetch
+            params: Query parameters
+            timeout: Request timeout in seconds
+
+        Returns:
+            Decoded JSON value
+        """
+        response = await self.get(url, params=params, timeout=timeout)
+        return response.json()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+def get_http_client() -> HttpClient:
+    """
+    Get the process-wide HTTP client.
+
+    Returns:
+        Shared HttpClient
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+# httpx connections are bound to the loop that opened them, so each event loop
+# gets its own async client; close_async_http_client() closes it before the loop
+# closes (entries also disappear when the loop is collected, but unclosed)
+_async_clients = weakref.WeakKeyDictionary()
+
+def get_async_http_client() -> AsyncHttpClient:
+    """
+    Get the async HTTP client for the running event loop.
+
+    Returns:
+        AsyncHttpClient shared by all coroutines on the current loop
+    """
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            client = AsyncHttpClient()
+            _async_clients[loop] = client
+        return client
+
+async def close_async_http_client():
+    """Close the running event loop's async HTTP client, if it has one."""
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        client = _async_clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
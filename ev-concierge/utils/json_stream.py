@@ -0,0 +1,154 @@
+"""
+Incremental decoding of large JSON arrays.
+
+OpenChargeMap answers with one top-level JSON array of POIs, which can run
+to tens of MB for a busy corridor. These helpers decode the array element by
+element from a stream of byte (or text) chunks, so only the element being
+decoded and the unconsumed tail of the last chunk are held in memory.
+"""
+
+import codecs
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, Union
+
+# Default read size for files and HTTP bodies
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+class _ArrayDecoder:
+    """Push-style decoder state shared by the sync and async iterators."""
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._finished = False
+
+    def feed(self, chunk: Union[bytes, str], final: bool = False) -> list:
+        """
+        Add a chunk and return the array elements it completed.
+
+        Args:
+            chunk: Next piece of the document
+            final: True if no more data will follow
+
+        Returns:
+            Decoded elements, in order
+
+        Raises:
+            ValueError: If the document is not a JSON array or is truncated
+        """
+        if isinstance(chunk, bytes):
+            chunk = self._text.decode(chunk, final=final)
+        if self._pos:
+            # Drop the consumed prefix before growing the buffer
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        self._buffer += chunk
+
+        items = []
+        buffer = self._buffer
+        pos = self._pos
+        while not self._finished:
+            pos = self._skip_whitespace(buffer, pos)
+            if pos >= len(buffer):
+                break
+
+            if not self._started:
+                if buffer[pos] != "[":
+                    raise ValueError("Expected a JSON array")
+                self._started = True
+                pos += 1
+                continue
+
+            if buffer[pos] == "]":
+                self._finished = True
+                pos += 1
+                break
+            if buffer[pos] == ",":
+                pos += 1
+                continue
+
+            try:
+                item, end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise ValueError("Truncated or invalid JSON array element")
+                break
+            # An element is only complete once a separator follows it: a scalar
+            # such as "-2." or "12" may still continue in the next chunk
+            after = self._skip_whitespace(buffer, end)
+            if after >= len(buffer) or buffer[after] not in ",]":
+                if final:
+                    raise ValueError("Truncated or invalid JSON array element")
+                break
+            items.append(item)
+            pos = after
+
+        self._pos = pos
+        if final and not self._finished:
+            raise ValueError("JSON array was not terminated")
+        return items
+
+    @staticmethod
+    def _skip_whitespace(buffer: str, pos: int) -> int:
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        return pos
+
+def iter_json_array(chunks: Iterable[Union[bytes, str]]) -> Iterator[Any]:
+    """
+    Decode the elements of a top-level JSON array as its chunks arrive.
+
+    Args:
+        chunks: Byte or text chunks of the document (e.g. response.iter_content())
+
+    Returns:
+        Iterator over the array's elements
+
+    Raises:
+        ValueError: If the document is not a complete JSON array
+    """
+    decoder = _ArrayDecoder()
+    for chunk in chunks:
+        if chunk:
+            yield from decoder.feed(chunk)
+    yield from decoder.feed(b"", final=True)
+
+async def aiter_json_array(chunks: AsyncIterable[Union[bytes, str]]) -> AsyncIterator[Any]:
+    """
+    Async version of iter_json_array (e.g. for httpx's response.aiter_bytes()).
+
+    Args:
+        chunks: Async iterable of byte or text chunks
+
+    Returns:
+        Async iterator over the array's elements
+
+    Raises:
+        ValueError: If the document is not a complete JSON array
+    """
+    decoder = _ArrayDecoder()
+    async for chunk in chunks:
+        if chunk:
+            for item in decoder.feed(chunk):
+                yield item
+    for item in decoder.feed(b"", final=True):
+        yield item
+
+def iter_json_file_array(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Decode the elements of a JSON array file without loading it whole.
+
+    Args:
+        path: JSON file holding a top-level array
+        chunk_size: Bytes read at a time
+
+    Returns:
+        Iterator over the array's elements
+    """
+    with open(path, "rb") as f:
+        yield from iter_json_array(iter(lambda: f.read(chunk_size), b""))
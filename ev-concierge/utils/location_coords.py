@@ -3,6 +3,20 @@ Location coordinate mappings for cities in the EV Concierge application.
 Maps city names to (latitude, longitude) tuples for OpenChargeMap API queries.
 """
 
+import math
+import numpy as np
+from utils import geohash
+from utils.config import ROAD_DISTANCE_FACTOR
+from utils.gazetteer import lookup_place
+
+# Mean Earth radius in kilometers
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_MILE = 1.60934
+
+# Distance methods for the batch kernels
+EQUIRECTANGULAR = "equirectangular"  # Flat-earth approximation (matches the scalar helpers)
+HAVERSINE = "haversine"              # Great-circle distance on a spherical Earth
+
 CITY_COORDINATES = {
     "Los Angeles, CA": (34.0522, -118.2437),
     "San Francisco, CA": (37.7749, -122.4194),
@@ -14,6 +28,8 @@ CITY_COORDINATES = {
 def get_coordinates(city_name: str) -> tuple[float, float] | None:
     """
     Get coordinates for a city name.
+    Names outside CITY_COORDINATES are resolved with the offline gazetteer
+    (aliases like "SF", towns like "Kettleman City", small typos).
     
     Args:
         city_name: City name (e.g., "Los Angeles, CA")
@@ -21,7 +37,24 @@ def get_coordinates(city_name: str) -> tuple[float, float] | None:
     Returns:
         Tuple of (latitude, longitude) or None if city not found
     """
-    return CITY_COORDINATES.get(city_name)
+    coords = CITY_COORDINATES.get(city_name)
+    if coords is None:
+        place = lookup_place(city_name)
+        coords = place.coordinates if place is not None else None
+    return coords
+
+def estimate_road_distance_miles(coord1: tuple[float, float], coord2: tuple[float, float]) -> int:
+    """
+    Estimate driving distance from the great-circle distance.
+    
+    Args:
+        coord1: Start coordinate (lat, lon)
+        coord2: End coordinate (lat, lon)
+    
+    Returns:
+        Estimated road distance in whole miles
+    """
+    return round(haversine_km(coord1, coord2) * ROAD_DISTANCE_FACTOR / KM_PER_MILE)
 
 def calculate_midpoint(coord1: tuple[float, float], coord2: tuple[float, float]) -> tuple[float, float]:
     """
@@ -54,7 +87,6 @@ def calculate_distance_km(coord1: tuple[float, float], coord2: tuple[float, floa
     lat2, lon2 = coord2
     
     # Approximate: 1 degree latitude ≈ 111 km, 1 degree longitude ≈ 111 km * cos(latitude)
-    import math
     avg_lat = (lat1 + lat2) / 2
     lat_diff_km = (lat2 - lat1) * 111
     lon_diff_km = (lon2 - lon1) * 111 * math.cos(math.radians(avg_lat))
@@ -74,8 +106,6 @@ def distance_from_line(point: tuple[float, float], line_start: tuple[float, floa
     Returns:
         Distance in kilometers
     """
-    import math
-    
     # Convert to approximate km coordinates
     lat, lon = point
     lat1, lon1 = line_start
@@ -106,3 +136,216 @@ def distance_from_line(point: tuple[float, float], line_start: tuple[float, floa
     
     # Distance from point to closest point on line
     return math.sqrt((px - closest_x)**2 + (py - closest_y)**2)
+
+def _segment_to_bbox_km(
+    line_start: tuple[float, float],
+    line_end: tuple[float, float],
+    bbox: tuple[float, float, float, float]
+) -> float:
+    """
+    Approximate distance in kilometers between a line segment and a lat/lon box.
+    The distance from a point moving along the segment to the box is convex,
+    so a ternary search over the segment parameter finds the minimum.
+    
+    Args:
+        line_start: Start of line (lat, lon)
+        line_end: End of line (lat, lon)
+        bbox: (lat_min, lat_max, lon_min, lon_max)
+    
+    Returns:
+        Distance in kilometers (0 if the segment crosses the box)
+    """
+    lat_min, lat_max, lon_min, lon_max = bbox
+    lon_scale = math.cos(math.radians((line_start[0] + line_end[0]) / 2))
+    
+    def distance_at(t):
+        lat = line_start[0] + t * (line_end[0] - line_start[0])
+        lon = line_start[1] + t * (line_end[1] - line_start[1])
+        dy = max(lat_min - lat, 0, lat - lat_max) * 111
+        dx = max(lon_min - lon, 0, lon - lon_max) * 111 * lon_scale
+        return math.sqrt(dx**2 + dy**2)
+    
+    lo, hi = 0.0, 1.0
+    for _ in range(40):
+        m1 = lo + (hi - lo) / 3
+        m2 = hi - (hi - lo) / 3
+        if distance_at(m1) <= distance_at(m2):
+            hi = m2
+        else:
+            lo = m1
+    return distance_at((lo + hi) / 2)
+
+def route_corridor_tiles(
+    origin: tuple[float, float],
+    destination: tuple[float, float],
+    corridor_km: float,
+    precision: int = 3
+) -> list[str]:
+    """
+    Decompose the corridor around a route into geohash tiles.
+    Returns every tile of the given precision that may contain a point within
+    corridor_km of the origin-destination line, ordered by distance from the origin.
+    
+    Args:
+        origin: Start of route (lat, lon)
+        destination: End of route (lat, lon)
+        corridor_km: Half-width of the corridor in kilometers
+        precision: Geohash precision of the tiles (3 ≈ 156 km cells)
+    
+    Returns:
+        List of geohash tile strings
+    """
+    # Geohash cells are a regular lat/lon grid; measure one cell at the origin
+    lat_min, lat_max, lon_min, lon_max = geohash.decode_bbox(geohash.encode(origin[0], origin[1], precision))
+    cell_lat = lat_max - lat_min
+    cell_lon = lon_max - lon_min
+    
+    # Bounding box of the route expanded by the corridor width
+    pad_lat = corridor_km / 111
+    max_abs_lat = min(89.0, max(abs(origin[0]), abs(destination[0])) + pad_lat)
+    pad_lon = corridor_km / (111 * math.cos(math.radians(max_abs_lat)))
+    south = max(-90.0, min(origin[0], destination[0]) - pad_lat)
+    north = min(90.0, max(origin[0], destination[0]) + pad_lat)
+    west = min(origin[1], destination[1]) - pad_lon
+    east = max(origin[1], destination[1]) + pad_lon
+    
+    tiles = {}
+    lat = math.floor(south / cell_lat) * cell_lat + cell_lat / 2
+    while lat < north + cell_lat / 2:
+        lon = math.floor(west / cell_lon) * cell_lon + cell_lon / 2
+        while lon < east + cell_lon / 2:
+            tile = geohash.encode(lat, ((lon + 180) % 360) - 180, precision)
+            if tile not in tiles:
+                # Keep the tile if any part of it is within the corridor
+                bbox = (lat - cell_lat / 2, lat + cell_lat / 2, lon - cell_lon / 2, lon + cell_lon / 2)
+                if _segment_to_bbox_km(origin, destination, bbox) <= corridor_km:
+                    tiles[tile] = calculate_distance_km(origin, (lat, lon))
+            lon += cell_lon
+        lat += cell_lat
+    
+    return sorted(tiles, key=tiles.get)
+
+def haversine_km(coord1: tuple[float, float], coord2: tuple[float, float]) -> float:
+    """
+    Calculate great-circle distance between two coordinates in kilometers.
+    
+    Args:
+        coord1: First coordinate (lat, lon)
+        coord2: Second coordinate (lat, lon)
+    
+    Returns:
+        Distance in kilometers
+    """
+    lat1, lon1 = map(math.radians, coord1)
+    lat2, lon2 = map(math.radians, coord2)
+    a = math.sin((lat2 - lat1) / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2)**2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def _unit_vectors(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Convert degrees to 3D unit vectors on the sphere, shape (n, 3)."""
+    lat = np.radians(latitudes)
+    lon = np.radians(longitudes)
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+
+def calculate_distances_km(
+    origin: tuple[float, float],
+    latitudes,
+    longitudes,
+    method: str = HAVERSINE
+) -> np.ndarray:
+    """
+    Calculate distances from one coordinate to many coordinates in one pass.
+    
+    Args:
+        origin: Reference coordinate (lat, lon)
+        latitudes: Array-like of latitudes
+        longitudes: Array-like of longitudes
+        method: "haversine" (great-circle) or "equirectangular" (same as calculate_distance_km)
+    
+    Returns:
+        Array of distances in kilometers
+    """
+    lats = np.asarray(latitudes, dtype=np.float64)
+    lons = np.asarray(longitudes, dtype=np.float64)
+    lat0, lon0 = origin
+    
+    if method == EQUIRECTANGULAR:
+        avg_lat = (lat0 + lats) / 2
+        lat_diff_km = (lats - lat0) * 111
+        lon_diff_km = (lons - lon0) * 111 * np.cos(np.radians(avg_lat))
+        return np.sqrt(lat_diff_km**2 + lon_diff_km**2)
+    
+    if method != HAVERSINE:
+        raise ValueError(f"Unknown distance method: {method}")
+    
+    phi0 = math.radians(lat0)
+    phi = np.radians(lats)
+    a = np.sin((phi - phi0) / 2)**2 + math.cos(phi0) * np.cos(phi) * np.sin(np.radians(lons - lon0) / 2)**2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+def distances_from_line(
+    latitudes,
+    longitudes,
+    line_start: tuple[float, float],
+    line_end: tuple[float, float],
+    method: str = HAVERSINE
+) -> np.ndarray:
+    """
+    Calculate distances from many points to a line segment in one pass.
+    
+    Args:
+        latitudes: Array-like of latitudes
+        longitudes: Array-like of longitudes
+        line_start: Start of line (lat, lon)
+        line_end: End of line (lat, lon)
+        method: "haversine" (distance to the great-circle arc) or
+                "equirectangular" (same as distance_from_line)
+    
+    Returns:
+        Array of distances in kilometers
+    """
+    lats = np.asarray(latitudes, dtype=np.float64)
+    lons = np.asarray(longitudes, dtype=np.float64)
+    
+    if method == EQUIRECTANGULAR:
+        lat1, lon1 = line_start
+        lat2, lon2 = line_end
+        lon_scale = math.cos(math.radians((lat1 + lat2) / 2))
+        
+        px, py = lons * 111 * lon_scale, lats * 111
+        x1, y1 = lon1 * 111 * lon_scale, lat1 * 111
+        x2, y2 = lon2 * 111 * lon_scale, lat2 * 111
+        
+        line_len_sq = (x2 - x1)**2 + (y2 - y1)**2
+        if line_len_sq == 0:
+            return np.sqrt((px - x1)**2 + (py - y1)**2)
+        
+        t = np.clip(((px - x1) * (x2 - x1) + (py - y1) * (y2 - y1)) / line_len_sq, 0, 1)
+        return np.sqrt((px - (x1 + t * (x2 - x1)))**2 + (py - (y1 + t * (y2 - y1)))**2)
+    
+    if method != HAVERSINE:
+        raise ValueError(f"Unknown distance method: {method}")
+    
+    endpoint_distance = np.minimum(
+        calculate_distances_km(line_start, lats, lons, HAVERSINE),
+        calculate_distances_km(line_end, lats, lons, HAVERSINE)
+    )
+    
+    a = _unit_vectors(np.array(line_start[0]), np.array(line_start[1]))
+    b = _unit_vectors(np.array(line_end[0]), np.array(line_end[1]))
+    normal = np.cross(a, b)
+    normal_len = np.linalg.norm(normal)
+    if normal_len < 1e-12:
+        # Degenerate segment: start and end are the same point
+        return endpoint_distance
+    normal /= normal_len
+    
+    # The foot of the perpendicular lies between the endpoints when the point is
+    # on the inner side of the planes through each endpoint perpendicular to the arc
+    points = _unit_vectors(lats, lons)
+    sin_cross = points @ normal
+    within_segment = (points @ np.cross(normal, a) >= 0) & (points @ np.cross(b, normal) >= 0)
+    cross_track = np.abs(np.arcsin(np.clip(sin_cross, -1.0, 1.0))) * EARTH_RADIUS_KM
+    
+    return np.where(within_segment, cross_track, endpoint_distance)
@@ -0,0 +1,125 @@
+"""
+Operator/title to charging network name resolution.
+
+The operator and title patterns are compiled once into single regular
+expressions, and operator results are memoized per distinct operator
+string, so normalizing a POI costs a dictionary lookup in the common case
+no matter how many networks the mapping knows about.
+"""
+
+import re
+import threading
+from typing import Optional
+
+UNKNOWN_NETWORK = "Unknown Network"
+# Distinct operator strings remembered (OpenChargeMap has a few hundred operators)
+OPERATOR_CACHE_SIZE = 4096
+
+# Substrings of a station title that identify its network when the operator
+# is missing, in priority order
+TITLE_ALIASES = (
+    ("evgo", "EVgo"),
+    ("chargepoint", "ChargePoint"),
+    ("charge point", "ChargePoint"),
+    ("electrify america", "Electrify America"),
+    ("tesla", "Tesla Supercharger"),
+    ("supercharger", "Tesla Supercharger"),
+    ("blink", "Blink"),
+)
+
+def _compile_patterns(patterns: list[str]) -> re.Pattern:
+    # The lookahead reports every match, including overlapping ones, so the
+    # highest priority pattern can win rather than the leftmost one
+    alternation = "|".join(re.escape(p) for p in patterns)
+    return re.compile(f"(?=({alternation}))", re.IGNORECASE)
+
+class NetworkResolver:
+    """Maps OpenChargeMap operator names and station titles to standardized network names."""
+
+    def __init__(self, mapping: dict[str, str], title_aliases=TITLE_ALIASES):
+        """
+        Args:
+            mapping: Operator name -> network name; earlier entries win substring ties
+            title_aliases: (title substring, network name) pairs, in priority order
+        """
+        self._exact = dict(mapping)
+
+        self._operator_keys = {}
+        for priority, (key, network) in enumerate(mapping.items()):
+            self._operator_keys.setdefault(key.lower(), (priority, network))
+        self._operator_pattern = _compile_patterns(list(self._operator_keys))
+
+        self._title_keys = {}
+        for priority, (alias, network) in enumerate(title_aliases):
+            self._title_keys.setdefault(alias.lower(), (priority, network))
+        self._title_pattern = _compile_patterns(list(self._title_keys))
+
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _best_match(pattern: re.Pattern, keys: dict, text: str) -> Optional[str]:
+        best = None
+        for match in pattern.finditer(text):
+            candidate = keys[match.group(1).lower()]
+            if best is None or candidate[0] < best[0]:
+                best = candidate
+        return best[1] if best else None
+
+    def resolve_operator(self, operator_name: Optional[str]) -> str:
+        """
+        Map an operator name to a network name.
+
+        Args:
+            operator_name: Operator name from OpenChargeMap
+
+        Returns:
+            Standardized network name, or the operator name itself if it isn't known
+        """
+        if not operator_name:
+            return UNKNOWN_NETWORK
+
+        network = self._cache.get(operator_name)
+        if network is not None:
+            return network
+
+        # Check exact match first, then known network names contained in the operator name
+        network = self._exact.get(operator_name)
+        if network is None:
+            network = self._best_match(self._operator_pattern, self._operator_keys, operator_name) or operator_name
+
+        with self._lock:
+            if len(self._cache) >= OPERATOR_CACHE_SIZE:
+                self._cache.clear()
+            self._cache[operator_name] = network
+        return network
+
+    def resolve_title(self, title: Optional[str]) -> Optional[str]:
+        """
+        Infer the network from a station title.
+
+        Args:
+            title: Station title (e.g. "Kettleman City Supercharger")
+
+        Returns:
+            Network name, or None if the title names no known network
+        """
+        if not title:
+            return None
+        alias_network = self._best_match(self._title_pattern, self._title_keys, title)
+        return self._exact.get(alias_network, alias_network) if alias_network else None
+
+    def resolve(self, operator_name: Optional[str], title: Optional[str] = None) -> str:
+        """
+        Resolve a POI's network from its operator, falling back to its title.
+
+        Args:
+            operator_name: Operator name from OpenChargeMap (may be empty)
+            title: Station title used when there is no operator
+
+        Returns:
+            Standardized network name ("Unknown Network" if nothing matches)
+        """
+        if operator_name:
+            return self.resolve_operator(operator_name)
+        return self.resolve_title(title) or UNKNOWN_NETWORK
@@ -0,0 +1,216 @@
+"""
+Locally cached OpenChargeMap reference data.
+
+In compact mode OpenChargeMap POIs carry only IDs (OperatorID,
+StatusTypeID, ConnectionTypeID) instead of embedding the full operator and
+status objects in every POI. The ID tables change rarely, so they are
+downloaded from /referencedata/ once, kept on disk, and refreshed in the
+background when they get old.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Optional
+from utils.config import (
+    OPENCHARGEMAP_BASE_URL,
+    OCM_REFERENCE_PATH,
+    OCM_REFERENCE_MAX_AGE_SECONDS,
+)
+from utils.http_client import get_http_client
+
+# Bump when the on-disk layout changes so old files are re-downloaded
+REFERENCE_FORMAT_VERSION = 1
+# After a failed download with no local copy, wait this long before trying again
+REFERENCE_RETRY_SECONDS = 600
+
+class OCMReferenceData:
+    """ID -> title tables for operators, status types and connection types."""
+
+    def __init__(
+        self,
+        operators: dict[int, str],
+        status_types: dict[int, tuple[str, Optional[bool]]],
+        connection_types: dict[int, str],
+        fetched_at: float = 0.0
+    ):
+        """
+        Args:
+            operators: Operator ID -> operator title
+            status_types: Status type ID -> (title, is_operational)
+            connection_types: Connection type ID -> connector title
+            fetched_at: When the data was downloaded (epoch seconds)
+        """
+        self.operators = operators
+        self.status_types = status_types
+        self.connection_types = connection_types
+        self.fetched_at = fetched_at
+
+    @classmethod
+    def from_api_response(cls, data: dict) -> "OCMReferenceData":
+        """
+        Build the tables from an OpenChargeMap /referencedata/ response.
+
+        Args:
+            data: Decoded reference data JSON
+
+        Returns:
+            OCMReferenceData
+        """
+        return cls(
+            operators={o['ID']: o.get('Title') for o in data.get('Operators') or []},
+            status_types={
+                s['ID']: (s.get('Title'), s.get('IsOperational'))
+                for s in data.get('StatusTypes') or []
+            },
+            connection_types={c['ID']: c.get('Title') for c in data.get('ConnectionTypes') or []},
+            fetched_at=time.time(),
+        )
+
+    def operator_title(self, operator_id: Optional[int]) -> Optional[str]:
+        return self.operators.get(operator_id)
+
+    def status_type(self, status_type_id: Optional[int]) -> Optional[tuple[str, Optional[bool]]]:
+        """(title, is_operational) of a status type, or None if the ID is unknown."""
+        return self.status_types.get(status_type_id)
+
+    def connection_title(self, connection_type_id: Optional[int]) -> Optional[str]:
+        return self.connection_types.get(connection_type_id)
+
+    def save(self, path: str):
+        """
+        Write the tables to disk as JSON.
+
+        Args:
+            path: Destination file
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        state = {
+            "version": REFERENCE_FORMAT_VERSION,
+            "fetched_at": self.fetched_at,
+            "operators": self.operators,
+            "status_types": {k: list(v) for k, v in self.status_types.items()},
+            "connection_types": self.connection_types,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "OCMReferenceData":
+        """
+        Read tables written by save().
+
+        Args:
+            path: Reference data file
+
+        Returns:
+            OCMReferenceData
+
+        Raises:
+            ValueError: If the file was written by an incompatible version
+        """
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+
+        if state.get("version") != REFERENCE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported reference data version: {state.get('version')}")
+
+        # JSON object keys are strings; the POIs use integer IDs
+        return cls(
+            operators={int(k): v for k, v in state["operators"].items()},
+            status_types={int(k): tuple(v) for k, v in state["status_types"].items()},
+            connection_types={int(k): v for k, v in state["connection_types"].items()},
+            fetched_at=state.get("fetched_at", 0.0),
+        )
+
+def fetch_reference_data(api_key: str) -> OCMReferenceData:
+    """
+    Download the reference data tables from OpenChargeMap.
+
+    Args:
+        api_key: OpenChargeMap API key
+
+    Returns:
+        OCMReferenceData
+
+    Raises:
+        requests.exceptions.RequestException: If the API request fails
+    """
+    data = get_http_client().get_json(f"{OPENCHARGEMAP_BASE_URL}/referencedata/", params={"key": api_key})
+    return OCMReferenceData.from_api_response(data)
+
+_reference: Optional[OCMReferenceData] = None
+_reference_lock = threading.Lock()
+_refreshing = False
+_retry_after = 0.0
+
+def _refresh_in_background(api_key: str, path: str):
+    global _refreshing
+    if _refreshing:
+        return
+    _refreshing = True
+
+    def refresh():
+        global _reference, _refreshing
+        try:
+            reference = fetch_reference_data(api_key)
+            reference.save(path)
+            _reference = reference
+        except Exception as e:
+            print(f"⚠️  Background refresh of OpenChargeMap reference data failed: {e}")
+        finally:
+            _refreshing = False
+
+    threading.Thread(target=refresh, name="ocm-reference-refresh", daemon=True).start()
+
+def get_reference_data(api_key: str, path: str = OCM_REFERENCE_PATH) -> Optional[OCMReferenceData]:
+    """
+    Get the process-wide reference data, loading it from disk or downloading it on first use.
+    Data older than OCM_REFERENCE_MAX_AGE_SECONDS is served while it refreshes in the background.
+
+    Args:
+        api_key: OpenChargeMap API key (used only when a download is needed)
+        path: Reference data file
+
+    Returns:
+        OCMReferenceData, or None if there is no local copy and it can't be downloaded
+    """
+    global _reference, _retry_after
+    with _reference_lock:
+        if _reference is None and os.path.exists(path):
+            try:
+                _reference = OCMReferenceData.load(path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️  Ignoring unreadable OpenChargeMap reference data ({e})")
+
+        if _reference is None:
+            if time.time() < _retry_after:
+                return None
+            try:
+                print("📥 Downloading OpenChargeMap reference data...")
+                _reference = fetch_reference_data(api_key)
+            except Exception as e:
+                print(f"⚠️  OpenChargeMap reference data unavailable ({e}), using verbose responses")
+                _retry_after = time.time() + REFERENCE_RETRY_SECONDS
+                return None
+            try:
+                _reference.save(path)
+            except OSError as e:
+                print(f"⚠️  Could not save OpenChargeMap reference data: {e}")
+        elif time.time() - _reference.fetched_at > OCM_REFERENCE_MAX_AGE_SECONDS:
+            _refresh_in_background(api_key, path)
+
+        return _reference
+
+def reset_reference_data():
+    """Forget the in-memory reference data (the disk copy is kept)."""
+    global _reference, _retry_after
+    with _reference_lock:
+        _reference = None
+        _retry_after = 0.0
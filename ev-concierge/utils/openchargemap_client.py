@@ -2,15 +2,53 @@
 OpenChargeMap API client for fetching real charging station data.
 """
 
+import asyncio
+import httpx
+import numpy as np
 import requests
 import os
-from typing import Optional
+import sys
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, Optional
 from dotenv import load_dotenv
-from utils.location_coords import calculate_midpoint, calculate_distance_km, distance_from_line
+from utils import geohash
+from utils.corridor import PolylineCorridor
+from utils.config import (
+    OPENCHARGEMAP_BASE_URL,
+    OPENCHARGEMAP_TILE_MAX_RESULTS,
+    OPENCHARGEMAP_MAX_CONCURRENT_TILES,
+    OPENCHARGEMAP_STREAM_RESPONSES,
+    OPENCHARGEMAP_COMPACT,
+    CORRIDOR_MEMO_TTL_SECONDS,
+    STATION_SOURCE,
+    DISTANCE_METHOD,
+)
+from utils.location_coords import (
+    calculate_distance_km,
+    calculate_distances_km,
+    distances_from_line,
+    route_corridor_tiles,
+)
+from utils.http_client import get_http_client, get_async_http_client
+from utils.json_stream import CHUNK_SIZE, iter_json_array, aiter_json_array
+from utils.network_resolver import NetworkResolver
+from utils.ocm_reference import OCMReferenceData, get_reference_data
+from utils.routing import find_route
+from utils.singleflight import SingleFlight, AsyncSingleFlight
+from utils.station import DEFAULT_SLOTS, NO_AMENITIES, StationTable
+from utils.station_cache import get_station_cache
+from utils.station_store import get_snapshot_store
 
 # Load environment variables
 load_dotenv()
 
+# Filters a stream of parsed stations (e.g. route_filter), yielding the ones to keep
+StationFilter = Callable[[Iterable[dict]], Iterable[dict]]
+
 # Network name mapping
 NETWORK_MAPPING = {
     "EVgo Network": "EVgo",
@@ -30,6 +68,28 @@ NETWORK_MAPPING = {
     "Webasto": "Webasto",
 }
 
+# Geohash precision of the corridor tiles (~156 km x 156 km at the equator)
+TILE_PRECISION = 3
+# Finest tiles a tile that hits OPENCHARGEMAP_TILE_MAX_RESULTS is split into (~5 km x 5 km)
+TILE_MAX_PRECISION = 5
+# Stations farther than this from the route line are dropped (allows for reasonable detours)
+MAX_DEVIATION_KM = 150
+# Stations run through the vectorized route filter at a time when streaming
+ROUTE_FILTER_BATCH = 256
+# Range assumed for a fully charged vehicle
+FULL_RANGE_MILES = 300
+# Fraction of the remaining range used for reachability (20% safety buffer)
+RANGE_SAFETY_FACTOR = 0.8
+# Number of recently fetched corridors kept in memory
+CORRIDOR_MEMO_SIZE = 32
+
+# Concurrent identical corridor fetches share one upstream request
+_corridor_flight = SingleFlight()
+_async_corridor_flight = AsyncSingleFlight()
+
+# Built once; memoizes each distinct operator string
+_network_resolver = NetworkResolver(NETWORK_MAPPING)
+
 def map_operator_to_network(operator_name: Optional[str]) -> str:
     """
     Map OpenChargeMap operator names to standardized network names.
@@ -40,233 +100,937 @@ def map_operator_to_network(operator_name: Optional[str]) -> str:
     Returns:
         Standardized network name or original name if not in mapping
     """
-    if not operator_name:
-        return "Unknown Network"
+    return _network_resolver.resolve_operator(operator_name)
+
+def _parse_poi(poi: dict, reference: Optional[OCMReferenceData] = None) -> Optional[dict]:
+    """
+    Convert one OpenChargeMap POI to a station dictionary (None if it has no coordinates).
+    Compact POIs (IDs instead of embedded objects) are resolved through the reference data.
+    """
+    # Extract address info
+    address_info = poi.get('AddressInfo', {})
+    
+    # Extract operator, inferring the network from the title if there is none
+    operator_info = poi.get('OperatorInfo', {})
+    operator_name = operator_info.get('Title') if operator_info else None
+    if not operator_info and reference is not None:
+        operator_name = reference.operator_title(poi.get('OperatorID'))
+    network = sys.intern(_network_resolver.resolve(operator_name, address_info.get('Title')))
+    
+    # Extract location
+    title = address_info.get('Title', 'Unknown Location')
+    town = address_info.get('Town', '')
+    state = address_info.get('StateOrProvince', '')
+    location = sys.intern(f"{town}, {state}") if town and state else title
+    
+    # Extract address
+    address_line = address_info.get('AddressLine1', '')
+    address = f"{address_line}, {town}, {state}" if address_line else location
+    
+    # Extract coordinates
+    latitude = address_info.get('Latitude')
+    longitude = address_info.get('Longitude')
+    
+    if not latitude or not longitude:
+        return None  # Skip stations without coordinates
+    
+    # Extract power rating (max from all connections)
+    connections = poi.get('Connections', [])
+    max_power = 0
+    for conn in connections:
+        power = conn.get('PowerKW')
+        if power and power > max_power:
+            max_power = power
+    
+    # Check operational status
+    status_type = poi.get('StatusType', {})
+    if status_type:
+        is_operational = status_type.get('IsOperational', True)
+    elif reference is not None and reference.status_type(poi.get('StatusTypeID')):
+        is_operational = reference.status_type(poi.get('StatusTypeID'))[1]
+    else:
+        is_operational = True
+    
+    # Extract usage cost (if available)
+    usage_cost = poi.get('UsageCost', '')
+    price_per_kwh = 0.40  # Default estimate
+    if usage_cost and '$' in usage_cost:
+        try:
+            # Try to extract price from string like "$0.43/kWh"
+            price_str = usage_cost.split('$')[1].split('/')[0]
+            price_per_kwh = float(price_str)
+        except:
+            pass
+    
+    station = {
+        "id": f"OCM-{poi.get('ID', 'unknown')}",
+        "network": network,
+        "location": location,
+        "address": address,
+        "latitude": latitude,
+        "longitude": longitude,
+        "power_kw": int(max_power) if max_power > 0 else 50,  # Default to 50kW if unknown
+        "price_per_kwh": price_per_kwh,
+        "available": is_operational,
+        "slots": DEFAULT_SLOTS,  # Mock slots (shared, immutable)
+        "amenities": NO_AMENITIES  # Will be populated in future enhancement
+    }
     
-    # Check exact match first
-    if operator_name in NETWORK_MAPPING:
-        return NETWORK_MAPPING[operator_name]
+    return station
+
+def _station_from_poi(
+    poi: dict,
+    min_power_kw: Optional[int],
+    reference: Optional[OCMReferenceData]
+) -> Optional[dict]:
+    """Parse one POI, or None if it can't be parsed or is below the power filter."""
+    try:
+        station = _parse_poi(poi, reference)
+    except Exception as e:
+        print(f"Error parsing station: {e}")
+        return None
     
-    # Check if any known network name is contained in the operator name
-    operator_lower = operator_name.lower()
-    for key, value in NETWORK_MAPPING.items():
-        if key.lower() in operator_lower:
-            return value
+    if station is None:
+        return None
+    if min_power_kw and station['power_kw'] < min_power_kw:
+        return None
+    return station
+
+def iter_openchargemap_stations(
+    pois: Iterable[dict],
+    min_power_kw: Optional[int] = None,
+    reference: Optional[OCMReferenceData] = None,
+    keep: Optional[StationFilter] = None
+) -> Iterator[dict]:
+    """
+    Parse OpenChargeMap POIs lazily, one station at a time.
     
-    return operator_name
+    Args:
+        pois: Raw POIs (a decoded list or a stream from iter_json_array)
+        min_power_kw: Optional minimum power filter applied as stations are parsed
+        reference: Reference data for compact POIs
+        keep: Optional station filter (e.g. route_filter) the parsed stations are streamed through
+    
+    Returns:
+        Iterator over standardized charging station dictionaries
+    """
+    stations = (
+        station for station in (_station_from_poi(poi, min_power_kw, reference) for poi in pois)
+        if station is not None
+    )
+    yield from stations if keep is None else keep(stations)
 
-def parse_openchargemap_response(api_response: list) -> list[dict]:
+async def aiter_openchargemap_stations(
+    pois: AsyncIterable[dict],
+    min_power_kw: Optional[int] = None,
+    reference: Optional[OCMReferenceData] = None,
+    keep: Optional[StationFilter] = None
+) -> AsyncIterator[dict]:
+    """
+    Async version of iter_openchargemap_stations (e.g. over aiter_json_array);
+    the filter is run over batches of ROUTE_FILTER_BATCH parsed stations.
+    """
+    batch = []
+    async for poi in pois:
+        station = _station_from_poi(poi, min_power_kw, reference)
+        if station is None:
+            continue
+        if keep is None:
+            yield station
+            continue
+        batch.append(station)
+        if len(batch) >= ROUTE_FILTER_BATCH:
+            for kept in keep(batch):
+                yield kept
+            batch = []
+    if batch:
+        for kept in keep(batch):
+            yield kept
+
+def parse_openchargemap_response(api_response: list, reference: Optional[OCMReferenceData] = None) -> list[dict]:
     """
     Parse OpenChargeMap API response into internal format.
     
     Args:
         api_response: Raw JSON response from OpenChargeMap (list of POIs)
+        reference: Reference data, required to resolve compact responses
     
     Returns:
         List of standardized charging station dictionaries
     """
-    stations = []
+    return list(iter_openchargemap_stations(api_response, reference=reference))
+
+def _tile_query_params(api_key: str, tile: str, min_power_kw: int, compact: bool = False) -> dict:
+    """Build the OpenChargeMap query for a geohash tile's bounding box."""
+    lat_min, lat_max, lon_min, lon_max = geohash.decode_bbox(tile)
+    return {
+        "key": api_key,
+        "boundingbox": f"({lat_max},{lon_min}),({lat_min},{lon_max})",
+        "maxresults": OPENCHARGEMAP_TILE_MAX_RESULTS,
+        "minpowerkw": min_power_kw,
+        # Compact POIs carry IDs only; without reference data ask for embedded operator info
+        "compact": "true" if compact else "false",
+        "verbose": "false"
+    }
+
+class _POICounter:
+    """Counts the POIs of a response as they are parsed, to detect truncated tiles."""
+
+    def __init__(self):
+        self.count = 0
+
+    def wrap(self, pois: Iterable[dict]) -> Iterator[dict]:
+        for poi in pois:
+            self.count += 1
+            yield poi
+
+    async def awrap(self, pois: AsyncIterable[dict]) -> AsyncIterator[dict]:
+        async for poi in pois:
+            self.count += 1
+            yield poi
+
+def _truncated(tile: str, poi_count: int) -> bool:
+    """
+    Whether a tile response hit the result limit and the tile should be split
+    (warns either way: a full response may have left stations out).
+    """
+    if poi_count < OPENCHARGEMAP_TILE_MAX_RESULTS:
+        return False
+    if len(tile) >= TILE_MAX_PRECISION:
+        print(f"   ⚠️  Tile {tile} hit the {OPENCHARGEMAP_TILE_MAX_RESULTS} result limit; "
+              f"some of its stations may be missing")
+        return False
+    print(f"   ⚠️  Tile {tile} hit the {OPENCHARGEMAP_TILE_MAX_RESULTS} result limit, splitting it")
+    return True
+
+def _merge_stations(station_lists: Iterable[list[dict]]) -> list[dict]:
+    """Concatenate station lists, de-duplicating by station ID (first one wins)."""
+    merged = {}
+    for stations in station_lists:
+        for station in stations:
+            merged.setdefault(station['id'], station)
+    return list(merged.values())
+
+def _fetch_tile_stations(
+    api_key: str,
+    tile: str,
+    min_power_kw: int,
+    keep: Optional[StationFilter],
+    reference: Optional[OCMReferenceData]
+) -> list[dict]:
+    params = _tile_query_params(api_key, tile, min_power_kw, compact=reference is not None)
+    client = get_http_client()
+    counter = _POICounter()
+    if not OPENCHARGEMAP_STREAM_RESPONSES:
+        data = client.get_json(f"{OPENCHARGEMAP_BASE_URL}/poi/", params=params)
+        stations = list(iter_openchargemap_stations(counter.wrap(data), min_power_kw, reference, keep))
+    else:
+        # Parse and filter POIs as the body arrives so the verbose POI list is never built
+        with client.get(f"{OPENCHARGEMAP_BASE_URL}/poi/", params=params, stream=True) as response:
+            pois = counter.wrap(iter_json_array(response.iter_content(chunk_size=CHUNK_SIZE)))
+            stations = list(iter_openchargemap_stations(pois, min_power_kw, reference, keep))
+    
+    if not _truncated(tile, counter.count):
+        return stations
+    # The child tiles cover the tile exactly, so their stations replace the truncated list
+    with ThreadPoolExecutor(max_workers=OPENCHARGEMAP_MAX_CONCURRENT_TILES) as executor:
+        return _merge_stations(executor.map(
+            lambda child: _fetch_tile_stations(api_key, child, min_power_kw, keep, reference),
+            geohash.children(tile)
+        ))
+
+def fetch_tile_stations(
+    api_key: str,
+    tile: str,
+    min_power_kw: int,
+    keep: Optional[StationFilter] = None
+) -> list[dict]:
+    """
+    Fetch and parse the stations inside a geohash tile from OpenChargeMap.
+    A tile whose response hits OPENCHARGEMAP_TILE_MAX_RESULTS is fetched again
+    as its child tiles (down to TILE_MAX_PRECISION), so no stations are cut off;
+    the children are fetched OPENCHARGEMAP_MAX_CONCURRENT_TILES at a time.
     
-    for poi in api_response:
-        try:
-            # Extract address info
-            address_info = poi.get('AddressInfo', {})
-            
-            # Extract operator - try multiple fields
-            operator_info = poi.get('OperatorInfo', {})
-            operator_name = operator_info.get('Title') if operator_info else None
-            
-            # If no operator, try to infer from title or comments
-            if not operator_name:
-                title = address_info.get('Title', '').lower()
-                if 'evgo' in title:
-                    operator_name = 'EVgo'
-                elif 'chargepoint' in title or 'charge point' in title:
-                    operator_name = 'ChargePoint'
-                elif 'electrify america' in title:
-                    operator_name = 'Electrify America'
-                elif 'tesla' in title or 'supercharger' in title:
-                    operator_name = 'Tesla Supercharger'
-                elif 'blink' in title:
-                    operator_name = 'Blink'
-            
-            network = map_operator_to_network(operator_name)
-            
-            # Extract location
-            title = address_info.get('Title', 'Unknown Location')
-            town = address_info.get('Town', '')
-            state = address_info.get('StateOrProvince', '')
-            location = f"{town}, {state}" if town and state else title
-            
-            # Extract address
-            address_line = address_info.get('AddressLine1', '')
-            address = f"{address_line}, {town}, {state}" if address_line else location
-            
-            # Extract coordinates
-            latitude = address_info.get('Latitude')
-            longitude = address_info.get('Longitude')
-            
-            if not latitude or not longitude:
-                continue  # Skip stations without coordinates
-            
-            # Extract power rating (max from all connections)
-            connections = poi.get('Connections', [])
-            max_power = 0
-            for conn in connections:
-                power = conn.get('PowerKW')
-                if power and power > max_power:
-                    max_power = power
-            
-            # Check operational status
-            status_type = poi.get('StatusType', {})
-            is_operational = status_type.get('IsOperational', True) if status_type else True
-            
-            # Extract usage cost (if available)
-            usage_cost = poi.get('UsageCost', '')
-            price_per_kwh = 0.40  # Default estimate
-            if usage_cost and '$' in usage_cost:
-                try:
-                    # Try to extract price from string like "$0.43/kWh"
-                    price_str = usage_cost.split('$')[1].split('/')[0]
-                    price_per_kwh = float(price_str)
-                except:
-                    pass
-            
-            station = {
-                "id": f"OCM-{poi.get('ID', 'unknown')}",
-                "network": network,
-                "location": location,
-                "address": address,
-                "latitude": latitude,
-                "longitude": longitude,
-                "power_kw": int(max_power) if max_power > 0 else 50,  # Default to 50kW if unknown
-                "price_per_kwh": price_per_kwh,
-                "available": is_operational,
-                "slots": ["10:00", "10:30", "11:00", "11:30", "12:00"],  # Mock slots
-                "amenities": []  # Will be populated in future enhancement
-            }
-            
-            stations.append(station)
-            
-        except Exception as e:
-            print(f"Error parsing station: {e}")
-            continue
+    Args:
+        api_key: OpenChargeMap API key
+        tile: Geohash tile to query (its bounding box is sent to the API)
+        min_power_kw: Minimum power rating filter
+        keep: Optional station filter applied while parsing (None keeps the whole tile)
     
-    return stations
+    Returns:
+        List of parsed charging station dictionaries
+    
+    Raises:
+        requests.exceptions.RequestException: If the API request fails
+    """
+    reference = get_reference_data(api_key) if OPENCHARGEMAP_COMPACT else None
+    return _fetch_tile_stations(api_key, tile, min_power_kw, keep, reference)
 
-def get_chargers_along_route(
+async def _fetch_tile_stations_async(
+    api_key: str,
+    tile: str,
+    min_power_kw: int,
+    keep: Optional[StationFilter],
+    reference: Optional[OCMReferenceData],
+    semaphore: asyncio.Semaphore
+) -> list[dict]:
+    params = _tile_query_params(api_key, tile, min_power_kw, compact=reference is not None)
+    client = get_async_http_client()
+    counter = _POICounter()
+    async with semaphore:
+        if not OPENCHARGEMAP_STREAM_RESPONSES:
+            data = await client.get_json(f"{OPENCHARGEMAP_BASE_URL}/poi/", params=params)
+            stations = list(iter_openchargemap_stations(counter.wrap(data), min_power_kw, reference, keep))
+        else:
+            response = await client.get(f"{OPENCHARGEMAP_BASE_URL}/poi/", params=params, stream=True)
+            try:
+                pois = counter.awrap(aiter_json_array(response.aiter_bytes()))
+                stations = [station async for station in aiter_openchargemap_stations(pois, min_power_kw, reference, keep)]
+            finally:
+                await response.aclose()
+    
+    if not _truncated(tile, counter.count):
+        return stations
+    return _merge_stations(await asyncio.gather(*(
+        _fetch_tile_stations_async(api_key, child, min_power_kw, keep, reference, semaphore)
+        for child in geohash.children(tile)
+    )))
+
+async def fetch_tile_stations_async(
+    api_key: str,
+    tile: str,
+    min_power_kw: int,
+    keep: Optional[StationFilter] = None
+) -> list[dict]:
+    """
+    Async version of fetch_tile_stations; the child tiles of a truncated tile
+    are fetched concurrently, up to OPENCHARGEMAP_MAX_CONCURRENT_TILES at a time.
+    
+    Args:
+        api_key: OpenChargeMap API key
+        tile: Geohash tile to query (its bounding box is sent to the API)
+        min_power_kw: Minimum power rating filter
+        keep: Optional station filter applied while parsing (None keeps the whole tile)
+    
+    Returns:
+        List of parsed charging station dictionaries
+    
+    Raises:
+        httpx.HTTPError: If the API request fails
+    """
+    # Reference data may need a disk read or download the first time, so keep it off the loop
+    reference = await asyncio.to_thread(get_reference_data, api_key) if OPENCHARGEMAP_COMPACT else None
+    semaphore = asyncio.Semaphore(OPENCHARGEMAP_MAX_CONCURRENT_TILES)
+    return await _fetch_tile_stations_async(api_key, tile, min_power_kw, keep, reference, semaphore)
+
+def _merge_tiles(tiles: list[str], results: dict) -> list[dict]:
+    """Merge per-tile results in route order, de-duplicating by station ID."""
+    return _merge_stations(results.get(tile, []) for tile in tiles)
+
+def _keep_stations(stations: list[dict], keep: Optional[StationFilter]) -> list[dict]:
+    return stations if keep is None else list(keep(stations))
+
+def _load_corridor_tiles(
+    api_key: str,
+    tiles: list[str],
+    min_power_kw: int,
+    keep: Optional[StationFilter]
+) -> tuple[dict, list[str]]:
+    """Load corridor tiles concurrently; returns (stations by tile, tiles that failed)."""
+    cache = get_station_cache()
+    
+    def load_tile(tile):
+        if cache is not None:
+            def fetch():
+                return fetch_tile_stations(api_key, tile, min_power_kw)
+            return _keep_stations(cache.get_or_fetch(tile, min_power_kw, fetch), keep)
+        return fetch_tile_stations(api_key, tile, min_power_kw, keep)
+    
+    results = {}
+    failed = []
+    with ThreadPoolExecutor(max_workers=OPENCHARGEMAP_MAX_CONCURRENT_TILES) as executor:
+        futures = {executor.submit(load_tile, tile): tile for tile in tiles}
+        for future in as_completed(futures):
+            tile = futures[future]
+            try:
+                results[tile] = future.result()
+            except Exception as e:
+                print(f"   ⚠️  Tile {tile} failed: {e}")
+                failed.append(tile)
+    return results, failed
+
+def get_corridor_stations(
+    api_key: str,
+    tiles: list[str],
+    min_power_kw: int,
+    keep: Optional[StationFilter] = None
+) -> list[dict]:
+    """
+    Fetch the stations for a set of corridor tiles concurrently and merge them.
+    Tiles are served from the station cache when possible. A tile that fails
+    to load is skipped so one bad request doesn't sink the whole corridor.
+    
+    Cached tiles are shared by every route crossing them, so they are stored
+    whole and the predicate is applied on the way out; without a cache it is
+    applied while the response is parsed.
+    
+    Args:
+        api_key: OpenChargeMap API key
+        tiles: Geohash tiles covering the corridor, in route order
+        min_power_kw: Minimum power rating filter
+        keep: Optional station filter (e.g. route_filter)
+    
+    Returns:
+        List of station dictionaries de-duplicated by OpenChargeMap ID
+    """
+    results, _ = _load_corridor_tiles(api_key, tiles, min_power_kw, keep)
+    # Merge in route order so the output doesn't depend on completion order
+    return _merge_tiles(tiles, results)
+
+async def _load_corridor_tiles_async(
+    api_key: str,
+    tiles: list[str],
+    min_power_kw: int,
+    keep: Optional[StationFilter]
+) -> tuple[dict, list[str]]:
+    """Async version of _load_corridor_tiles."""
+    cache = get_station_cache()
+    semaphore = asyncio.Semaphore(OPENCHARGEMAP_MAX_CONCURRENT_TILES)
+    
+    async def load_tile(tile):
+        if cache is not None:
+            async def fetch_async():
+                async with semaphore:
+                    return await fetch_tile_stations_async(api_key, tile, min_power_kw)
+            def fetch():
+                return fetch_tile_stations(api_key, tile, min_power_kw)
+            return _keep_stations(await cache.get_or_fetch_async(tile, min_power_kw, fetch_async, fetch), keep)
+        async with semaphore:
+            return await fetch_tile_stations_async(api_key, tile, min_power_kw, keep)
+    
+    outcomes = await asyncio.gather(*(load_tile(tile) for tile in tiles), return_exceptions=True)
+    
+    results = {}
+    failed = []
+    for tile, outcome in zip(tiles, outcomes):
+        if isinstance(outcome, Exception):
+            print(f"   ⚠️  Tile {tile} failed: {outcome}")
+            failed.append(tile)
+        else:
+            results[tile] = outcome
+    return results, failed
+
+async def get_corridor_stations_async(
+    api_key: str,
+    tiles: list[str],
+    min_power_kw: int,
+    keep: Optional[StationFilter] = None
+) -> list[dict]:
+    """
+    Async version of get_corridor_stations: tiles are fetched as concurrent
+    coroutines (bounded by OPENCHARGEMAP_MAX_CONCURRENT_TILES) on the running loop.
+    
+    Args:
+        api_key: OpenChargeMap API key
+        tiles: Geohash tiles covering the corridor, in route order
+        min_power_kw: Minimum power rating filter
+        keep: Optional station filter (e.g. route_filter)
+    
+    Returns:
+        List of station dictionaries de-duplicated by OpenChargeMap ID
+    """
+    results, _ = await _load_corridor_tiles_async(api_key, tiles, min_power_kw, keep)
+    return _merge_tiles(tiles, results)
+
+def iter_route_stations(
+    stations: Iterable[dict],
     origin_coords: tuple[float, float],
     destination_coords: tuple[float, float],
-    min_power_kw: int = 50,
-    max_results: int = 10,
-    distance_km: int = 50,
-    current_range_miles: int = 300
-) -> list[dict]:
+    current_range_miles: Optional[int] = None,
+    max_deviation_km: float = MAX_DEVIATION_KM,
+    batch_size: int = ROUTE_FILTER_BATCH,
+    corridor: Optional[PolylineCorridor] = None
+) -> Iterator[dict]:
     """
-    Query OpenChargeMap for charging stations along a route.
+    Filter a stream of stations to those near the route (and optionally reachable).
+    Stations are checked in small vectorized batches as they arrive, so the
+    input can be a generator such as iter_openchargemap_stations.
+    
+    Without a corridor the route is the straight origin-destination line and
+    distances are measured from the origin. With a road-route corridor the
+    distance is the driving progress to the station's nearest route point
+    plus the way off the route to it, and a 'detour_km' (there and back) is added.
     
     Args:
+        stations: Station dictionaries, in any order
         origin_coords: (latitude, longitude) of starting point
         destination_coords: (latitude, longitude) of destination
-        min_power_kw: Minimum power rating filter
+        current_range_miles: Current vehicle range in miles; None skips the reachability filter
+        max_deviation_km: Maximum distance from the route line in kilometers
+        batch_size: Stations per vectorized batch
+        corridor: Road-route corridor to match against instead of the straight line
+                  (its own width replaces max_deviation_km)
+    
+    Returns:
+        Iterator over copies of the matching stations with a 'distance_from_origin_km'
+        field, in input order
+    """
+    max_distance_km = None
+    if current_range_miles is not None:
+        # Convert current range to km (with 20% safety buffer)
+        max_distance_km = (current_range_miles * 1.60934) * RANGE_SAFETY_FACTOR
+    
+    def matches(batch):
+        latitudes = np.fromiter((st['latitude'] for st in batch), dtype=np.float64, count=len(batch))
+        longitudes = np.fromiter((st['longitude'] for st in batch), dtype=np.float64, count=len(batch))
+        if corridor is not None:
+            chainage, deviations = corridor.locate(latitudes, longitudes)
+            distances_from_origin = chainage + deviations
+            keep = ~np.isnan(chainage)
+        else:
+            deviations = distances_from_line(latitudes, longitudes, origin_coords, destination_coords, DISTANCE_METHOD)
+            distances_from_origin = calculate_distances_km(origin_coords, latitudes, longitudes, DISTANCE_METHOD)
+            keep = deviations <= max_deviation_km
+        
+        if max_distance_km is not None:
+            keep &= distances_from_origin <= max_distance_km
+        for i in np.flatnonzero(keep):
+            station = {**batch[i], 'distance_from_origin_km': round(float(distances_from_origin[i]), 1)}
+            if corridor is not None:
+                station['detour_km'] = round(2 * float(deviations[i]), 1)
+            yield station
+    
+    batch = []
+    for station in stations:
+        batch.append(station)
+        if len(batch) >= batch_size:
+            yield from matches(batch)
+            batch = []
+    if batch:
+        yield from matches(batch)
+
+def route_filter(
+    origin_coords: tuple[float, float],
+    destination_coords: tuple[float, float],
+    max_deviation_km: float = MAX_DEVIATION_KM,
+    corridor: Optional[PolylineCorridor] = None,
+    current_range_miles: Optional[int] = None
+) -> StationFilter:
+    """
+    Bind iter_route_stations to a route, for dropping off-route stations while
+    a response is parsed. The stations it keeps are already tagged with their
+    route distances, so route_station_table can use them as they are.
+    
+    Args:
+        origin_coords: (latitude, longitude) of starting point
+        destination_coords: (latitude, longitude) of destination
+        max_deviation_km: Maximum distance from the route line in kilometers
+        corridor: Road-route corridor (its own width replaces max_deviation_km)
+        current_range_miles: Current vehicle range in miles; None skips the reachability filter
+    
+    Returns:
+        Function filtering a stream of stations to those near the route (and reachable)
+    """
+    def keep(stations: Iterable[dict]) -> Iterator[dict]:
+        return iter_route_stations(
+            stations, origin_coords, destination_coords, current_range_miles,
+            max_deviation_km=max_deviation_km, corridor=corridor
+        )
+    
+    return keep
+
+def annotate_route_stations(
+    stations: Iterable[dict],
+    origin_coords: tuple[float, float],
+    destination_coords: tuple[float, float],
+    max_deviation_km: float = MAX_DEVIATION_KM,
+    corridor: Optional[PolylineCorridor] = None
+) -> StationTable:
+    """
+    Keep the stations near the route, tagged with their distance from the origin.
+    
+    Args:
+        stations: Candidate station dictionaries (a list or a stream)
+        origin_coords: (latitude, longitude) of starting point
+        destination_coords: (latitude, longitude) of destination
+        max_deviation_km: Maximum distance from the route line in kilometers
+        corridor: Road-route corridor (see iter_route_stations); None for the straight line
+    
+    Returns:
+        Compact table of the on-route stations with their 'distance_from_origin_km',
+        sorted by that distance (order along the route)
+    """
+    return route_station_table(iter_route_stations(
+        stations, origin_coords, destination_coords, max_deviation_km=max_deviation_km, corridor=corridor
+    ), max_deviation_km)
+
+def route_station_table(route_stations: Iterable[dict], max_deviation_km: float = MAX_DEVIATION_KM) -> StationTable:
+    """
+    Collect stations that already went through the route filter into a table.
+    
+    Args:
+        route_stations: Station dictionaries from iter_route_stations or route_filter
+        max_deviation_km: Route deviation they were filtered with (for the log line)
+    
+    Returns:
+        Compact table of the stations sorted by 'distance_from_origin_km'
+    """
+    table = StationTable.from_stations(route_stations)
+    print(f"   Stations on route (within {max_deviation_km}km): {len(table)}")
+    if not len(table):
+        return table
+    
+    order = np.argsort(np.frombuffer(table.distances, dtype=np.float64), kind='stable')
+    return table.take(order)
+
+def stations_within_range(
+    route_stations: StationTable,
+    current_range_miles: int,
+    max_results: int
+) -> list[dict]:
+    """
+    Select the stations reachable with the given range from an annotated corridor.
+    
+    Args:
+        route_stations: Table from annotate_route_stations (sorted by distance from origin)
+        current_range_miles: Current vehicle range in miles
         max_results: Maximum number of results to return
-        distance_km: Search radius from route midpoint in kilometers
+    
+    Returns:
+        Station dictionaries for the first reachable stations along the route
+    """
+    # Convert current range to km (with 20% safety buffer)
+    current_range_km = (current_range_miles * 1.60934) * RANGE_SAFETY_FACTOR
+    
+    # Stations are sorted by distance, so the reachable ones are a prefix
+    reachable = bisect_right(route_stations.distances, current_range_km) if len(route_stations) else 0
+    
+    print(f"   Stations reachable (within {current_range_km:.0f}km): {reachable}")
+    return route_stations.stations(range(min(reachable, max_results)))
+
+def filter_stations_along_route(
+    stations: list[dict],
+    origin_coords: tuple[float, float],
+    destination_coords: tuple[float, float],
+    current_range_miles: int,
+    max_results: int,
+    max_deviation_km: float = MAX_DEVIATION_KM
+) -> list[dict]:
+    """
+    Keep the stations that are near the route and reachable, ordered along the route.
+    
+    Args:
+        stations: Candidate station dictionaries
+        origin_coords: (latitude, longitude) of starting point
+        destination_coords: (latitude, longitude) of destination
         current_range_miles: Current vehicle range in miles (for reachability filter)
+        max_results: Maximum number of results to return
+        max_deviation_km: Maximum distance from the route line in kilometers
     
     Returns:
-        List of charging station dictionaries (only reachable stations)
+        List of charging station dictionaries sorted by distance from the origin
+    """
+    route_stations = annotate_route_stations(stations, origin_coords, destination_coords, max_deviation_km)
+    return stations_within_range(route_stations, current_range_miles, max_results)
+
+def _station_source(
+    origin_coords: tuple[float, float],
+    destination_coords: tuple[float, float],
+    tiles: list[str],
+    min_power_kw: int
+):
     """
-    api_key = os.getenv('OPENCHARGEMAP_API_KEY', '')
+    Resolve where corridor stations come from and log the query.
     
-    if not api_key:
-        print("⚠️  OpenChargeMap API key not found. Falling back to mock data.")
-        return []
+    Returns:
+        Tuple of (snapshot store or None, api key or None); both None if no source is usable
+    """
+    if STATION_SOURCE == 'snapshot':
+        store = get_snapshot_store()
+        if store is None:
+            return None, None
+        print(f"🔍 Searching local station snapshot ({store.station_count} stations)...")
+        api_key = None
+    else:
+        store = None
+        api_key = os.getenv('OPENCHARGEMAP_API_KEY', '')
+        if not api_key:
+            print("⚠️  OpenChargeMap API key not found. Falling back to mock data.")
+            return None, None
+        print(f"🔍 Querying OpenChargeMap API...")
     
-    # Calculate midpoint and search radius
-    midpoint = calculate_midpoint(origin_coords, destination_coords)
-    route_distance = calculate_distance_km(origin_coords, destination_coords)
+    print(f"   Route distance: {calculate_distance_km(origin_coords, destination_coords):.1f} km")
+    print(f"   Corridor tiles: {len(tiles)} (±{MAX_DEVIATION_KM} km)")
+    print(f"   Min power: {min_power_kw} kW")
+    return store, api_key
+
+class _CorridorMemo:
+    """Small in-process LRU of annotated corridors with a time-to-live."""
     
-    # Use route distance / 2 + buffer as search radius
-    search_radius = max(distance_km, route_distance / 2 + 30)
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
     
-    # Build API request
-    base_url = "https://api.openchargemap.io/v3/poi/"
-    params = {
-        "key": api_key,
-        "latitude": midpoint[0],
-        "longitude": midpoint[1],
-        "distance": search_radius,
-        "distanceunit": "KM",
-        "maxresults": max_results * 2,  # Get more results to filter
-        "minpowerkw": min_power_kw,
-        "compact": "false",  # Get full response with operator info
-        "verbose": "false"
-    }
+    def get(self, key) -> Optional[StationTable]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, corridor = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return corridor
+    
+    def put(self, key, corridor: StationTable):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), corridor)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+_corridor_memo = _CorridorMemo(CORRIDOR_MEMO_TTL_SECONDS, CORRIDOR_MEMO_SIZE)
+
+def clear_corridor_memo():
+    """Forget all in-process corridors (e.g. after the station data changed)."""
+    _corridor_memo.clear()
+
+def _corridor_key(
+    origin_coords: tuple[float, float],
+    destination_coords: tuple[float, float],
+    min_power_kw: int
+) -> tuple:
+    """Identity of a corridor, used for the memo and to coalesce concurrent fetches."""
+    return (
+        round(origin_coords[0], 4), round(origin_coords[1], 4),
+        round(destination_coords[0], 4), round(destination_coords[1], 4),
+        int(min_power_kw)
+    )
+
+def _road_corridor(
+    origin_coords: tuple[float, float],
+    destination_coords: tuple[float, float]
+) -> Optional[PolylineCorridor]:
+    """Corridor around the driving route, or None without a road graph (straight-line matching)."""
+    route = find_route(origin_coords, destination_coords)
+    if route is None:
+        return None
+    print(f"🛣️  Matching stations along the road route ({route.distance_km:.0f} km, {len(route.polyline)} points)")
+    return PolylineCorridor(route.polyline, MAX_DEVIATION_KM)
+
+def _corridor_tiles(
+    origin_coords: tuple[float, float],
+    destination_coords: tuple[float, float],
+    corridor: Optional[PolylineCorridor]
+) -> list[str]:
+    # Cover the route corridor with geohash tiles instead of one big circle
+    if corridor is not None:
+        return corridor.tiles(TILE_PRECISION)
+    return route_corridor_tiles(origin_coords, destination_coords, MAX_DEVIATION_KM, TILE_PRECISION)
+
+def _fetch_route_corridor(
+    origin_coords: tuple[float, float],
+    destination_coords: tuple[float, float],
+    min_power_kw: int,
+    key: tuple
+) -> Optional[StationTable]:
+    road_corridor = _road_corridor(origin_coords, destination_coords)
+    tiles = _corridor_tiles(origin_coords, destination_coords, road_corridor)
+    store, api_key = _station_source(origin_coords, destination_coords, tiles, min_power_kw)
+    if store is None and api_key is None:
+        return None
     
     try:
-        print(f"🔍 Querying OpenChargeMap API...")
-        print(f"   Midpoint: {midpoint}")
-        print(f"   Search radius: {search_radius:.1f} km")
-        print(f"   Min power: {min_power_kw} kW")
-        
-        response = requests.get(base_url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        print(f"   Found {len(data)} stations from API")
-        
-        # Parse response
-        stations = parse_openchargemap_response(data)
-        
-        # Convert current range to km (with 20% safety buffer)
-        current_range_km = (current_range_miles * 1.60934) * 0.8  # 80% of range for safety
-        
-        # Filter stations by:
-        # 1. Distance from route line (not too far off route)
-        # 2. Reachability (within current battery range from origin)
-        max_deviation_km = 150  # 150km from the route line (allows for reasonable detours)
-        
-        filtered_stations = []
-        reachable_count = 0
-        on_route_count = 0
-        
-        for station in stations:
-            station_coords = (station['latitude'], station['longitude'])
-            
-            # Check if station is on the route
-            deviation = distance_from_line(station_coords, origin_coords, destination_coords)
-            
-            # Check if station is reachable with current battery
-            distance_from_origin = calculate_distance_km(origin_coords, station_coords)
-            
-            if deviation <= max_deviation_km:
-                on_route_count += 1
-            
-            if distance_from_origin <= current_range_km:
-                reachable_count += 1
-            
-            if deviation <= max_deviation_km and distance_from_origin <= current_range_km:
-                station['_distance_from_origin'] = distance_from_origin
-                station['_deviation_from_route'] = deviation
-                filtered_stations.append(station)
-        
-        print(f"   Stations on route (within {max_deviation_km}km): {on_route_count}")
-        print(f"   Stations reachable (within {current_range_km:.0f}km): {reachable_count}")
-        print(f"   Stations matching both criteria: {len(filtered_stations)}")
-        
-        # Sort by distance from origin (order along the route)
-        filtered_stations.sort(key=lambda s: s['_distance_from_origin'])
-        
-        # Remove temporary fields and limit results
-        for station in filtered_stations:
-            station.pop('_distance_from_origin', None)
-            station.pop('_deviation_from_route', None)
-        
-        return filtered_stations[:max_results]
+        failed = []
+        if store is not None:
+            stations = store.corridor_stations(tiles, min_power_kw)
+            print(f"   Found {len(stations)} unique stations in corridor")
+            corridor = annotate_route_stations(stations, origin_coords, destination_coords, corridor=road_corridor)
+        else:
+            # The corridor is shared by every range, so only the route filter applies here;
+            # the stations it keeps come back with their route distances
+            keep = route_filter(origin_coords, destination_coords, corridor=road_corridor)
+            results, failed = _load_corridor_tiles(api_key, tiles, min_power_kw, keep)
+            stations = _merge_tiles(tiles, results)
+            print(f"   Found {len(stations)} unique stations in corridor")
+            corridor = route_station_table(stations)
+        if failed:
+            # Serve the partial corridor this once, but fetch it again next time
+            print(f"   ⚠️  {len(failed)} corridor tiles failed, not reusing this corridor")
+        else:
+            _corridor_memo.put(key, corridor)
+        return corridor
         
     except requests.exceptions.RequestException as e:
         print(f"❌ Error querying OpenChargeMap API: {e}")
-        return []
+        return None
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        return None
+
+async def _fetch_route_corridor_async(
+    origin_coords: tuple[float, float],
+    destination_coords: tuple[float, float],
+    min_power_kw: int,
+    key: tuple
+) -> Optional[StationTable]:
+    # Route search is CPU-bound; keep it off the event loop
+    road_corridor = await asyncio.to_thread(_road_corridor, origin_coords, destination_coords)
+    tiles = _corridor_tiles(origin_coords, destination_coords, road_corridor)
+    store, api_key = _station_source(origin_coords, destination_coords, tiles, min_power_kw)
+    if store is None and api_key is None:
+        return None
+    
+    try:
+        failed = []
+        if store is not None:
+            stations = store.corridor_stations(tiles, min_power_kw)
+            print(f"   Found {len(stations)} unique stations in corridor")
+            corridor = annotate_route_stations(stations, origin_coords, destination_coords, corridor=road_corridor)
+        else:
+            # The corridor is shared by every range, so only the route filter applies here;
+            # the stations it keeps come back with their route distances
+            keep = route_filter(origin_coords, destination_coords, corridor=road_corridor)
+            results, failed = await _load_corridor_tiles_async(api_key, tiles, min_power_kw, keep)
+            stations = _merge_tiles(tiles, results)
+            print(f"   Found {len(stations)} unique stations in corridor")
+            corridor = route_station_table(stations)
+        if failed:
+            # Serve the partial corridor this once, but fetch it again next time
+            print(f"   ⚠️  {len(failed)} corridor tiles failed, not reusing this corridor")
+        else:
+            _corridor_memo.put(key, corridor)
+        return corridor
+        
+    except httpx.HTTPError as e:
+        print(f"❌ Error querying OpenChargeMap API: {e}")
+        return None
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
-        return []
+        return None
+
+def get_route_corridor(
+    origin_coords: tuple[float, float],
+    destination_coords: tuple[float, float],
+    min_power_kw: int = 50
+) -> StationTable:
+    """
+    Fetch every station along a route once, regardless of vehicle range.
+    Use stations_within_range to pick reachable stations for a given range.
+    Recent corridors are reused from memory and concurrent identical fetches
+    share one request.
+    
+    Args:
+        origin_coords: (latitude, longitude) of starting point
+        destination_coords: (latitude, longitude) of destination
+        min_power_kw: Minimum power rating filter
+    
+    Returns:
+        Table of the stations near the route with their 'distance_from_origin_km',
+        sorted along the route (shared, treat as read-only); empty if no station
+        source is usable
+    """
+    key = _corridor_key(origin_coords, destination_coords, min_power_kw)
+    corridor = _corridor_memo.get(key)
+    if corridor is not None:
+        print(f"♻️  Reusing station corridor fetched earlier ({len(corridor)} stations)")
+        return corridor
+    
+    corridor, shared = _corridor_flight.do(
+        key,
+        lambda: _fetch_route_corridor(origin_coords, destination_coords, min_power_kw, key)
+    )
+    if shared:
+        print("🔁 Station search shared with concurrent identical requests")
+    return corridor if corridor is not None else StationTable()
+
+async def get_route_corridor_async(
+    origin_coords: tuple[float, float],
+    destination_coords: tuple[float, float],
+    min_power_kw: int = 50
+) -> StationTable:
+    """
+    Async version of get_route_corridor. Tile requests run as coroutines
+    on the caller's event loop instead of blocking it.
+    
+    Args:
+        origin_coords: (latitude, longitude) of starting point
+        destination_coords: (latitude, longitude) of destination
+        min_power_kw: Minimum power rating filter
+    
+    Returns:
+        Table of the stations near the route with their 'distance_from_origin_km',
+        sorted along the route (shared, treat as read-only); empty if no station
+        source is usable
+    """
+    key = _corridor_key(origin_coords, destination_coords, min_power_kw)
+    corridor = _corridor_memo.get(key)
+    if corridor is not None:
+        print(f"♻️  Reusing station corridor fetched earlier ({len(corridor)} stations)")
+        return corridor
+    
+    corridor, shared = await _async_corridor_flight.do(
+        key,
+        lambda: _fetch_route_corridor_async(origin_coords, destination_coords, min_power_kw, key)
+    )
+    if shared:
+        print("🔁 Station search shared with concurrent identical requests")
+    return corridor if corridor is not None else StationTable()
+
+def get_chargers_along_route(
+    origin_coords: tuple[float, float],
+    destination_coords: tuple[float, float],
+    min_power_kw: int = 50,
+    max_results: int = 10,
+    distance_km: int = 50,
+    current_range_miles: int = 300
+) -> list[dict]:
+    """
+    Query OpenChargeMap for charging stations along a route.
+    
+    Args:
+        origin_coords: (latitude, longitude) of starting point
+        destination_coords: (latitude, longitude) of destination
+        min_power_kw: Minimum power rating filter
+        max_results: Maximum number of results to return
+        distance_km: Unused; the corridor is tiled instead of searched around the midpoint
+        current_range_miles: Current vehicle range in miles (for reachability filter)
+    
+    Returns:
+        List of charging station dictionaries (only reachable stations)
+    """
+    corridor = get_route_corridor(origin_coords, destination_coords, min_power_kw)
+    return stations_within_range(corridor, current_range_miles, max_results)
+
+async def get_chargers_along_route_async(
+    origin_coords: tuple[float, float],
+    destination_coords: tuple[float, float],
+    min_power_kw: int = 50,
+    max_results: int = 10,
+    current_range_miles: int = 300
+) -> list[dict]:
+    """
+    Async version of get_chargers_along_route. Tile requests run as coroutines
+    on the caller's event loop instead of blocking it.
+    
+    Args:
+        origin_coords: (latitude, longitude) of starting point
+        destination_coords: (latitude, longitude) of destination
+        min_power_kw: Minimum power rating filter
+        max_results: Maximum number of results to return
+        current_range_miles: Current vehicle range in miles (for reachability filter)
+    
+    Returns:
+        List of charging station dictionaries (only reachable stations)
+    """
+    corridor = await get_route_corridor_async(origin_coords, destination_coords, min_power_kw)
+    return stations_within_range(corridor, current_range_miles, max_results)
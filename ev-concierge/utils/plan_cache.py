@@ -0,0 +1,315 @@
+"""
+Precomputed trip plans for popular origin/destination pairs.
+
+A plan skeleton is the part of a trip plan that needs no LLM: the route, the
+energy analysis and the charging stops. Skeletons are keyed by (origin,
+destination, battery bucket, range bucket, min power, vehicle model) and
+planned at the bottom of their buckets, so a cached plan never assumes more
+charge or range than the vehicle has; charging_planner.replan_from_charge
+redoes the stop numbers for the actual charge. PlanCacheWarmer builds the skeletons for a fixed set
+of city pairs in the background and rebuilds them when they go stale.
+Entries expire after a TTL, or as soon as the snapshot store they were
+planned from changes.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+from utils.charging_session import DEFAULT_VEHICLE_MODEL, get_charging_curve
+from utils.config import (
+    STATION_SOURCE,
+    PLAN_CACHE_TTL_SECONDS,
+    PLAN_CACHE_SIZE,
+    PLAN_CACHE_WARM_INTERVAL_SECONDS,
+)
+from utils.location_coords import get_coordinates
+from utils.station_store import get_snapshot_store
+
+# Battery levels sharing a cached plan (0-9%, 10-19%, ...)
+BATTERY_BUCKET_PERCENT = 10
+# Vehicle ranges sharing a cached plan
+RANGE_BUCKET_MILES = 25
+DEFAULT_MIN_POWER_KW = 150
+DEFAULT_RANGE_MILES = 300
+
+def _bucket(value: float, size: int) -> int:
+    return int(value // size) * size
+
+def plan_key(
+    origin: str,
+    destination: str,
+    battery_percent: float,
+    range_miles: float,
+    min_power_kw: int = DEFAULT_MIN_POWER_KW,
+    vehicle_model: str = DEFAULT_VEHICLE_MODEL
+) -> Optional[tuple]:
+    """
+    Cache key of a trip; place names resolving to the same coordinates share it,
+    and so do vehicle models with the same charging curve.
+
+    Returns:
+        Key tuple, or None if either place is unknown
+    """
+    origin_coords = get_coordinates(origin)
+    dest_coords = get_coordinates(destination)
+    if not origin_coords or not dest_coords:
+        return None
+    return (
+        round(origin_coords[0], 4), round(origin_coords[1], 4),
+        round(dest_coords[0], 4), round(dest_coords[1], 4),
+        _bucket(battery_percent, BATTERY_BUCKET_PERCENT),
+        _bucket(range_miles, RANGE_BUCKET_MILES),
+        int(min_power_kw),
+        get_charging_curve(vehicle_model).model
+    )
+
+def _station_data_version() -> Optional[tuple]:
+    """Identity of the station data a plan is computed from (None when it can't be tracked)."""
+    if STATION_SOURCE != 'snapshot':
+        return None
+    store = get_snapshot_store()
+    return (id(store), store.version) if store is not None else None
+
+def build_plan_skeleton(
+    origin: str,
+    destination: str,
+    battery_percent: int,
+    range_miles: int,
+    min_power_kw: int = DEFAULT_MIN_POWER_KW,
+    vehicle_model: str = DEFAULT_VEHICLE_MODEL
+) -> Optional[dict]:
+    """
+    Compute a plan skeleton with the same tools the agents call.
+
+    Args:
+        origin: Starting location (e.g., "Seattle, WA")
+        destination: Ending location
+        battery_percent: Battery at departure
+        range_miles: Range on a full battery
+        min_power_kw: Minimum charger power
+        vehicle_model: Vehicle model, for its charging curve
+
+    Returns:
+        Skeleton dictionary with 'route', 'energy' and 'charging_plan', or None
+        if either place is unknown
+    """
+    # Imported here: the tools pull in the agent SDK, which the cache itself doesn't need
+    from tools.charging_tools import plan_charging_stops
+    from tools.route_tools import calculate_energy_needs, get_route_info
+
+    route = json.loads(get_route_info(origin, destination))
+    if 'error' in route:
+        return None
+    energy = json.loads(calculate_energy_needs(battery_percent, route['distance_miles'], range_miles))
+    charging_plan = json.loads(plan_charging_stops(
+        origin, destination,
+        battery_percent=battery_percent,
+        vehicle_range_miles=range_miles,
+        min_power_kw=min_power_kw,
+        vehicle_model=vehicle_model
+    ))
+    return {
+        "origin": origin,
+        "destination": destination,
+        "battery_percent": battery_percent,
+        "range_miles": range_miles,
+        "min_power_kw": min_power_kw,
+        "vehicle_model": vehicle_model,
+        "route": route,
+        "energy": energy,
+        "charging_plan": charging_plan,
+    }
+
+class PlanCache:
+    """In-process LRU of plan skeletons with a time-to-live and station-data versioning."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key) -> Optional[dict]:
+        version = _station_data_version()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, stored_version, skeleton = entry
+            if time.monotonic() - stored_at > self.ttl_seconds or stored_version != version:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return skeleton
+
+    def put(self, key, skeleton: dict, version: Optional[tuple]):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), version, skeleton)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+_plan_cache = PlanCache(PLAN_CACHE_TTL_SECONDS, PLAN_CACHE_SIZE)
+
+def clear_plan_cache():
+    """Forget all precomputed plans."""
+    _plan_cache.clear()
+
+def get_plan_skeleton(
+    origin: str,
+    destination: str,
+    battery_percent: float,
+    range_miles: float = DEFAULT_RANGE_MILES,
+    min_power_kw: int = DEFAULT_MIN_POWER_KW,
+    vehicle_model: str = DEFAULT_VEHICLE_MODEL,
+    build: bool = True
+) -> Optional[dict]:
+    """
+    Get the plan skeleton of a trip, from the cache when it has been precomputed.
+
+    Args:
+        origin: Starting location
+        destination: Ending location
+        battery_percent: Battery at departure
+        range_miles: Range on a full battery
+        min_power_kw: Minimum charger power
+        vehicle_model: Vehicle model, for its charging curve
+        build: Compute (and cache) the plan on a miss
+
+    Returns:
+        Skeleton planned for the bottom of the battery and range buckets, or None
+        on a miss with build=False or for unknown places
+    """
+    key = plan_key(origin, destination, battery_percent, range_miles, min_power_kw, vehicle_model)
+    if key is None:
+        return None
+    skeleton = _plan_cache.get(key)
+    if skeleton is not None:
+        print(f"♻️  Using precomputed plan for {origin} → {destination}")
+        return skeleton
+    if not build:
+        return None
+
+    # Read before planning so a store change during the build leaves the entry stale
+    version = _station_data_version()
+    skeleton = build_plan_skeleton(
+        origin, destination,
+        battery_percent=key[4],
+        range_miles=key[5],
+        min_power_kw=min_power_kw,
+        vehicle_model=key[7]
+    )
+    if skeleton is not None:
+        _plan_cache.put(key, skeleton, version)
+    return skeleton
+
+def warm_plan_cache(
+    pairs: Iterable[tuple[str, str]],
+    battery_levels: Optional[Iterable[int]] = None,
+    range_miles: Iterable[int] = (DEFAULT_RANGE_MILES,),
+    min_power_kw: int = DEFAULT_MIN_POWER_KW,
+    vehicle_model: str = DEFAULT_VEHICLE_MODEL
+) -> int:
+    """
+    Precompute the plans of popular trips that aren't cached (or went stale).
+
+    Args:
+        pairs: (origin, destination) place names
+        battery_levels: Departure battery levels (defaults to every bucket)
+        range_miles: Vehicle ranges
+        min_power_kw: Minimum charger power
+        vehicle_model: Vehicle model, for its charging curve
+
+    Returns:
+        Number of plans computed
+    """
+    if battery_levels is None:
+        battery_levels = range(0, 101, BATTERY_BUCKET_PERCENT)
+    battery_levels, range_miles = list(battery_levels), list(range_miles)
+
+    built = 0
+    for origin, destination in pairs:
+        if origin == destination:
+            continue
+        for vehicle_range in range_miles:
+            for battery in battery_levels:
+                key = plan_key(origin, destination, battery, vehicle_range, min_power_kw, vehicle_model)
+                if key is None or _plan_cache.get(key) is not None:
+                    continue
+                try:
+                    if get_plan_skeleton(origin, destination, battery, vehicle_range, min_power_kw, vehicle_model) is not None:
+                        built += 1
+                except Exception as e:
+                    print(f"⚠️  Could not precompute plan for {origin} → {destination}: {e}")
+    return built
+
+class PlanCacheWarmer:
+    """Background thread keeping the plans of a fixed set of trips precomputed."""
+
+    def __init__(
+        self,
+        pairs: list[tuple[str, str]],
+        interval_seconds: float = PLAN_CACHE_WARM_INTERVAL_SECONDS,
+        **warm_options
+    ):
+        """
+        Args:
+            pairs: (origin, destination) place names
+            interval_seconds: Time between warm-ups
+            **warm_options: battery_levels / range_miles / min_power_kw / vehicle_model for warm_plan_cache
+        """
+        self.pairs = pairs
+        self.interval_seconds = interval_seconds
+        self.warm_options = warm_options
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self) -> int:
+        started = time.perf_counter()
+        built = warm_plan_cache(self.pairs, **self.warm_options)
+        if built:
+            print(f"📋 Precomputed {built} trip plans in {time.perf_counter() - started:.1f}s")
+        return built
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="plan-cache-warmer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval_seconds)
+
+def start_plan_cache_warmer(pairs: list[tuple[str, str]], **warm_options) -> PlanCacheWarmer:
+    """
+    Start precomputing the plans of popular trips in the background.
+
+    Args:
+        pairs: (origin, destination) place names
+        **warm_options: battery_levels / range_miles / min_power_kw / vehicle_model for warm_plan_cache
+
+    Returns:
+        Running PlanCacheWarmer
+    """
+    warmer = PlanCacheWarmer(pairs, **warm_options)
+    warmer.start()
+    return warmer
@@ -0,0 +1,557 @@
+"""
+Offline road routing over an OpenStreetMap extract.
+
+build_road_graph() streams an OSM XML extract with iterparse, keeps the
+drivable highways and collapses every chain of degree-2 nodes into one edge
+(its intermediate points are kept only as polyline geometry), so the graph
+has a node per intersection or road end. The graph is stored as CSR
+adjacency arrays (offsets/targets/segments) that save to and load from a
+single .npz file, and routes are found with A* on travel time using a
+straight-line-at-top-speed heuristic.
+"""
+
+import heapq
+import math
+import sys
+import threading
+import xml.etree.ElementTree as ET
+from array import array
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+import numpy as np
+from utils.config import ROAD_GRAPH_PATH
+from utils.location_coords import EARTH_RADIUS_KM, KM_PER_MILE
+
+# Bump when the saved array layout changes so old graphs are rebuilt
+GRAPH_FORMAT_VERSION = 1
+
+# Default speeds (km/h) of the OSM highway classes kept for routing
+HIGHWAY_SPEEDS_KPH = {
+    "motorway": 105,
+    "motorway_link": 65,
+    "trunk": 90,
+    "trunk_link": 55,
+    "primary": 75,
+    "primary_link": 50,
+    "secondary": 65,
+    "secondary_link": 45,
+    "tertiary": 55,
+    "tertiary_link": 40,
+    "unclassified": 45,
+    "residential": 35,
+    "living_street": 15,
+}
+
+# Snap distance beyond which an origin/destination is considered off the graph
+MAX_SNAP_KM = 25
+# Recent routes kept per graph (one trip is routed by the corridor search, the
+# charging planner and get_route_info)
+ROUTE_MEMO_SIZE = 64
+
+class Route(NamedTuple):
+    distance_km: float
+    duration_hours: float
+    # (lat, lon) points from origin to destination
+    polyline: list[tuple[float, float]]
+    # Name or ref of the road carrying most of the distance (e.g. "I 5")
+    main_road: Optional[str]
+
+    @property
+    def distance_miles(self) -> float:
+        return self.distance_km / KM_PER_MILE
+
+def _haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * 1000 * math.asin(min(1.0, math.sqrt(a)))
+
+def _parse_maxspeed(value: Optional[str]) -> Optional[float]:
+    # "65 mph", "100", "50;70" -> km/h
+    if not value:
+        return None
+    value = value.split(';')[0].strip().lower()
+    try:
+        if value.endswith('mph'):
+            return float(value[:-3]) * KM_PER_MILE
+        return float(value.split()[0])
+    except (ValueError, IndexError):
+        return None
+
+def _oneway(tags: dict) -> int:
+    # 1: forward only, -1: backward only, 0: both directions
+    value = tags.get('oneway', '').lower()
+    if value in ('yes', 'true', '1'):
+        return 1
+    if value == '-1':
+        return -1
+    if value == 'no':
+        return 0
+    return 1 if tags.get('highway') in ('motorway', 'motorway_link') else 0
+
+class RoadGraph:
+    """Road network in CSR form with polyline geometry per contracted segment."""
+
+    def __init__(
+        self,
+        node_lat: np.ndarray,
+        node_lon: np.ndarray,
+        offsets: np.ndarray,
+        targets: np.ndarray,
+        edge_segments: np.ndarray,
+        edge_forward: np.ndarray,
+        segment_length_m: np.ndarray,
+        segment_time_s: np.ndarray,
+        segment_road: np.ndarray,
+        shape_offsets: np.ndarray,
+        shape_lat: np.ndarray,
+        shape_lon: np.ndarray,
+        road_names: list[str]
+    ):
+        """
+        Args:
+            node_lat, node_lon: Coordinates of the graph nodes
+            offsets: CSR row pointers; node i's edges are offsets[i]:offsets[i + 1]
+            targets: Target node of each directed edge
+            edge_segments: Segment traversed by each directed edge
+            edge_forward: 1 if the edge runs along the segment's shape, 0 if reversed
+            segment_length_m, segment_time_s: Length and free-flow travel time per segment
+            segment_road: Index into road_names per segment (-1 for unnamed roads)
+            shape_offsets: Segment i's intermediate points are shape_*[shape_offsets[i]:shape_offsets[i + 1]]
+            shape_lat, shape_lon: Intermediate points of all segments
+            road_names: Distinct road refs/names
+        """
+        self.node_lat = node_lat
+        self.node_lon = node_lon
+        self.offsets = offsets
+        self.targets = targets
+        self.edge_segments = edge_segments
+        self.edge_forward = edge_forward
+        self.segment_length_m = segment_length_m
+        self.segment_time_s = segment_time_s
+        self.segment_road = segment_road
+        self.shape_offsets = shape_offsets
+        self.shape_lat = shape_lat
+        self.shape_lon = shape_lon
+        self.road_names = road_names
+        self._search_lists = None
+        self._search_lock = threading.Lock()
+        self._routes = OrderedDict()
+        self._routes_lock = threading.Lock()
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_lat)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def save(self, path: str):
+        """
+        Write the graph arrays to an uncompressed .npz file (loads without parsing).
+
+        Args:
+            path: Destination file
+        """
+        np.savez(
+            path,
+            version=np.array(GRAPH_FORMAT_VERSION),
+            node_lat=self.node_lat,
+            node_lon=self.node_lon,
+            offsets=self.offsets,
+            targets=self.targets,
+            edge_segments=self.edge_segments,
+            edge_forward=self.edge_forward,
+            segment_length_m=self.segment_length_m,
+            segment_time_s=self.segment_time_s,
+            segment_road=self.segment_road,
+            shape_offsets=self.shape_offsets,
+            shape_lat=self.shape_lat,
+            shape_lon=self.shape_lon,
+            road_names=np.array(self.road_names, dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "RoadGraph":
+        """
+        Read a graph written by save().
+
+        Args:
+            path: Graph .npz file
+
+        Returns:
+            RoadGraph
+
+        Raises:
+            ValueError: If the file was written by an incompatible version
+        """
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != GRAPH_FORMAT_VERSION:
+                raise ValueError(f"Unsupported road graph version: {int(data['version'])}")
+            return cls(
+                data["node_lat"],
+                data["node_lon"],
+                data["offsets"],
+                data["targets"],
+                data["edge_segments"],
+                data["edge_forward"],
+                data["segment_length_m"],
+                data["segment_time_s"],
+                data["segment_road"],
+                data["shape_offsets"],
+                data["shape_lat"],
+                data["shape_lon"],
+                [str(name) for name in data["road_names"]],
+            )
+
+    def nearest_node(self, coord: tuple[float, float]) -> Optional[int]:
+        """
+        Snap a coordinate to the closest graph node.
+
+        Args:
+            coord: (lat, lon)
+
+        Returns:
+            Node index, or None if no node is within MAX_SNAP_KM
+        """
+        if self.node_count == 0:
+            return None
+        lat, lon = coord
+        dx = (self.node_lon - lon) * math.cos(math.radians(lat))
+        dy = self.node_lat - lat
+        node = int(np.argmin(dx * dx + dy * dy))
+        if _haversine_m(lat, lon, self.node_lat[node], self.node_lon[node]) > MAX_SNAP_KM * 1000:
+            return None
+        return node
+
+    def _lists(self):
+        # Scalar access to Python lists is several times faster than to numpy
+        # arrays, which is what the A* inner loop does; converted once, on first query
+        if self._search_lists is None:
+            with self._search_lock:
+                if self._search_lists is None:
+                    self._search_lists = (
+                        self.offsets.tolist(),
+                        self.targets.tolist(),
+                        self.segment_time_s[self.edge_segments].tolist(),
+                        self.node_lat.tolist(),
+                        self.node_lon.tolist(),
+                        self._top_speed(),
+                    )
+        return self._search_lists
+
+    def _top_speed(self) -> float:
+        if len(self.segment_length_m) == 0:
+            return 0.0
+        return float((self.segment_length_m / np.maximum(self.segment_time_s, 1e-3)).max())
+
+    def shortest_path(self, source: int, target: int) -> Optional[list[int]]:
+        """
+        Fastest path between two nodes with A*.
+
+        Args:
+            source: Start node
+            target: End node
+
+        Returns:
+            Directed edge indices along the path (empty if source == target),
+            or None if target is unreachable
+        """
+        offsets, targets, edge_times, node_lat, node_lon, top_speed = self._lists()
+        if source == target:
+            return []
+
+        target_lat, target_lon = node_lat[target], node_lon[target]
+        target_phi = math.radians(target_lat)
+        cos_target = math.cos(target_phi)
+        # Seconds at the network's top speed over the straight-line distance:
+        # never more than the real remaining time, so A* stays exact
+        seconds_per_m = 1.0 / top_speed if top_speed > 0 else 0.0
+        radians = math.radians
+        sin, cos, asin, sqrt = math.sin, math.cos, math.asin, math.sqrt
+        diameter_m = 2 * EARTH_RADIUS_KM * 1000
+
+        def heuristic(node):
+            phi = radians(node_lat[node])
+            a = (sin((target_phi - phi) / 2) ** 2
+                 + cos(phi) * cos_target * sin(radians(target_lon - node_lon[node]) / 2) ** 2)
+            return diameter_m * asin(min(1.0, sqrt(a))) * seconds_per_m
+
+        best = {source: 0.0}
+        came_from = {}
+        settled = set()
+        heap = [(heuristic(source), 0.0, source)]
+        while heap:
+            _, cost, node = heapq.heappop(heap)
+            if node == target:
+                break
+            if node in settled:
+                continue
+            settled.add(node)
+            for edge in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[edge]
+                new_cost = cost + edge_times[edge]
+                if new_cost < best.get(neighbor, math.inf):
+                    best[neighbor] = new_cost
+                    came_from[neighbor] = (node, edge)
+                    heapq.heappush(heap, (new_cost + heuristic(neighbor), new_cost, neighbor))
+        else:
+            return None
+
+        path = []
+        node = target
+        while node != source:
+            node, edge = came_from[node]
+            path.append(edge)
+        path.reverse()
+        return path
+
+    def route(self, origin: tuple[float, float], destination: tuple[float, float]) -> Optional[Route]:
+        """
+        Route between two coordinates.
+
+        Args:
+            origin: (lat, lon)
+            destination: (lat, lon)
+
+        Returns:
+            Route, or None if either end is off the graph or no path exists
+        """
+        source = self.nearest_node(origin)
+        target = self.nearest_node(destination)
+        if source is None or target is None:
+            return None
+        edges = self.shortest_path(source, target)
+        if edges is None:
+            return None
+
+        polyline = [(float(self.node_lat[source]), float(self.node_lon[source]))]
+        length_m = time_s = 0.0
+        road_lengths = {}
+        for edge in edges:
+            segment = int(self.edge_segments[edge])
+            length_m += float(self.segment_length_m[segment])
+            time_s += float(self.segment_time_s[segment])
+            road = int(self.segment_road[segment])
+            if road >= 0:
+                road_lengths[road] = road_lengths.get(road, 0.0) + float(self.segment_length_m[segment])
+
+            start, end = int(self.shape_offsets[segment]), int(self.shape_offsets[segment + 1])
+            shape = list(zip(self.shape_lat[start:end].tolist(), self.shape_lon[start:end].tolist()))
+            if not self.edge_forward[edge]:
+                shape.reverse()
+            polyline.extend(shape)
+            head = int(self.targets[edge])
+            polyline.append((float(self.node_lat[head]), float(self.node_lon[head])))
+
+        main_road = self.road_names[max(road_lengths, key=road_lengths.get)] if road_lengths else None
+        return Route(length_m / 1000, time_s / 3600, polyline, main_road)
+
+def _iter_osm_elements(path: str, tag: str):
+    # Stream one element type, clearing everything as it goes so memory stays flat
+    for _, elem in ET.iterparse(path, events=("end",)):
+        if elem.tag == tag:
+            yield elem
+        if elem.tag in ("node", "way", "relation"):
+            elem.clear()
+
+def build_road_graph(osm_path: str, highway_speeds: Optional[dict[str, float]] = None) -> RoadGraph:
+    """
+    Build a routing graph from an OSM XML extract.
+
+    Two streaming passes: the first keeps the drivable ways, the second the
+    coordinates of just the nodes those ways use.
+
+    Args:
+        osm_path: .osm XML file (e.g. a state extract converted with osmium)
+        highway_speeds: Highway class -> default speed in km/h (defaults to HIGHWAY_SPEEDS_KPH)
+
+    Returns:
+        RoadGraph
+    """
+    highway_speeds = highway_speeds or HIGHWAY_SPEEDS_KPH
+
+    ways = []
+    node_uses = {}
+    for way in _iter_osm_elements(osm_path, "way"):
+        tags = {t.get('k'): t.get('v') for t in way.iter('tag')}
+        highway = tags.get('highway')
+        if highway not in highway_speeds:
+            continue
+        refs = array('q', (int(nd.get('ref')) for nd in way.iter('nd')))
+        if len(refs) < 2:
+            continue
+        speed = _parse_maxspeed(tags.get('maxspeed')) or highway_speeds[highway]
+        road = tags.get('ref') or tags.get('name')
+        ways.append((refs, speed, _oneway(tags), sys.intern(road.split(';')[0]) if road else None))
+        for i, ref in enumerate(refs):
+            # Way ends count twice so they always become graph nodes
+            node_uses[ref] = node_uses.get(ref, 0) + (2 if i in (0, len(refs) - 1) else 1)
+
+    coords = {}
+    for node in _iter_osm_elements(osm_path, "node"):
+        ref = int(node.get('id'))
+        if ref in node_uses:
+            coords[ref] = (float(node.get('lat')), float(node.get('lon')))
+
+    # Intersections and road ends become graph nodes; so do the ends of the
+    # pieces left where an extract clipped a way's nodes away
+    graph_refs = {ref for ref, uses in node_uses.items() if uses >= 2 and ref in coords}
+    runs = []
+    for refs, speed, oneway, road in ways:
+        run = []
+        for ref in refs:
+            if ref in coords:
+                run.append(ref)
+                continue
+            if len(run) >= 2:
+                runs.append((run, speed, oneway, road))
+            run = []
+        if len(run) >= 2:
+            runs.append((run, speed, oneway, road))
+    for run, _, _, _ in runs:
+        graph_refs.add(run[0])
+        graph_refs.add(run[-1])
+
+    node_index = {}
+    node_lat, node_lon = array('d'), array('d')
+    for ref in graph_refs:
+        node_index[ref] = len(node_lat)
+        lat, lon = coords[ref]
+        node_lat.append(lat)
+        node_lon.append(lon)
+
+    road_index = {}
+    sources, targets, edge_segments, edge_forward = array('l'), array('l'), array('l'), array('b')
+    segment_length, segment_time, segment_road = array('d'), array('d'), array('l')
+    shape_offsets, shape_lat, shape_lon = array('q', [0]), array('d'), array('d')
+    for run, speed, oneway, road in runs:
+        road_id = road_index.setdefault(road, len(road_index)) if road else -1
+        start = run[0]
+        length = 0.0
+        for prev, ref in zip(run, run[1:]):
+            length += _haversine_m(*coords[prev], *coords[ref])
+            if ref not in node_index:
+                lat, lon = coords[ref]
+                shape_lat.append(lat)
+                shape_lon.append(lon)
+                continue
+
+            segment = len(segment_length)
+            segment_length.append(length)
+            segment_time.append(length / (speed / 3.6))
+            segment_road.append(road_id)
+            shape_offsets.append(len(shape_lat))
+            u, v = node_index[start], node_index[ref]
+            if oneway >= 0:
+                sources.append(u)
+                targets.append(v)
+                edge_segments.append(segment)
+                edge_forward.append(1)
+            if oneway <= 0:
+                sources.append(v)
+                targets.append(u)
+                edge_segments.append(segment)
+                edge_forward.append(0)
+            start = ref
+            length = 0.0
+
+    sources = np.array(sources, dtype=np.int64)
+    order = np.argsort(sources, kind='stable')
+    offsets = np.zeros(len(node_lat) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=len(node_lat)), out=offsets[1:])
+
+    return RoadGraph(
+        np.array(node_lat, dtype=np.float64),
+        np.array(node_lon, dtype=np.float64),
+        offsets,
+        np.array(targets, dtype=np.int32)[order],
+        np.array(edge_segments, dtype=np.int32)[order],
+        np.array(edge_forward, dtype=np.int8)[order],
+        np.array(segment_length, dtype=np.float32),
+        np.array(segment_time, dtype=np.float32),
+        np.array(segment_road, dtype=np.int32),
+        np.array(shape_offsets, dtype=np.int64),
+        np.array(shape_lat, dtype=np.float64),
+        np.array(shape_lon, dtype=np.float64),
+        list(road_index),
+    )
+
+_graph: Optional[RoadGraph] = None
+_graph_lock = threading.Lock()
+# Path that failed to load, so a missing graph is reported once rather than per route
+_failed_path: Optional[str] = None
+
+def get_road_graph(path: str = ROAD_GRAPH_PATH) -> Optional[RoadGraph]:
+    """
+    Get the process-wide road graph, loading it on first use.
+    ROAD_GRAPH_PATH may point at a saved graph (.npz) or directly at an OSM
+    XML extract (parsed on first use, which is slow for large extracts).
+
+    Args:
+        path: Graph or extract file
+
+    Returns:
+        RoadGraph, or None if no graph is configured or it can't be loaded
+    """
+    global _graph, _failed_path
+    if _graph is not None or not path:
+        return _graph
+    with _graph_lock:
+        if _graph is None and _failed_path != path:
+            try:
+                if path.endswith('.npz'):
+                    _graph = RoadGraph.load(path)
+                else:
+                    print(f"🔄 Building road graph from {path}...")
+                    _graph = build_road_graph(path)
+                print(f"📦 Road graph: {_graph.node_count} nodes, {_graph.edge_count} edges")
+            except (OSError, ValueError, KeyError, ET.ParseError) as e:
+                print(f"⚠️  Road graph unavailable ({e}), using distance estimates")
+                _failed_path = path
+        return _graph
+
+def reset_road_graph():
+    """Forget the loaded road graph so the next route reloads it."""
+    global _graph, _failed_path
+    with _graph_lock:
+        _graph = None
+        _failed_path = None
+
+def find_route(origin: tuple[float, float], destination: tuple[float, float]) -> Optional[Route]:
+    """
+    Route between two coordinates with the process-wide road graph.
+    Recent routes are remembered, so routing the same trip again is free.
+
+    Args:
+        origin: (lat, lon)
+        destination: (lat, lon)
+
+    Returns:
+        Route, or None if there is no graph or no path
+    """
+    graph = get_road_graph()
+    if graph is None:
+        return None
+
+    key = (round(origin[0], 5), round(origin[1], 5), round(destination[0], 5), round(destination[1], 5))
+    with graph._routes_lock:
+        if key in graph._routes:
+            graph._routes.move_to_end(key)
+            return graph._routes[key]
+    route = graph.route(origin, destination)
+    with graph._routes_lock:
+        graph._routes[key] = route
+        while len(graph._routes) > ROUTE_MEMO_SIZE:
+            graph._routes.popitem(last=False)
+    return route
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m utils.routing <extract.osm> <output.npz>")
+        sys.exit(1)
+    graph = build_road_graph(sys.argv[1])
+    graph.save(sys.argv[2])
+    print(f"📦 Road graph: {graph.node_count} nodes, {graph.edge_count} edges -> {sys.argv[2]}")
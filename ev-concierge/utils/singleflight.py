@@ -0,0 +1,111 @@
+"""
+Single-flight call coalescing.
+
+When several callers ask for the same key at the same time, only the first
+(the leader) runs the work; the others wait for it and receive the same
+result or exception. Nothing is cached once the call completes.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Hashable
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """Coalesces concurrent identical calls across threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> tuple[Any, bool]:
+        """
+        Run fn once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the call
+            fn: Zero-argument callable doing the work
+
+        Returns:
+            Tuple of (result, shared) where shared is True if more than one caller received the result
+
+        Raises:
+            Exception: Whatever fn raised, re-raised in every waiting caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, call.waiters > 0
+
+class _AsyncCall:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class AsyncSingleFlight:
+    """Coalesces concurrent identical coroutine calls on an event loop."""
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key: Hashable, coro_fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """
+        Await coro_fn once for all concurrent callers with the same key on the running loop.
+        The shared work runs as its own task, so a cancelled caller doesn't cancel it for the others.
+
+        Args:
+            key: Identity of the call
+            coro_fn: Zero-argument coroutine function doing the work
+
+        Returns:
+            Tuple of (result, shared) where shared is True if more than one caller received the result
+
+        Raises:
+            Exception: Whatever coro_fn raised, re-raised in every waiting caller
+        """
+        loop = asyncio.get_running_loop()
+        call_key = (id(loop), key)
+
+        call = self._calls.get(call_key)
+        if call is not None:
+            call.waiters += 1
+            return await asyncio.shield(call.task), True
+
+        call = _AsyncCall(loop.create_task(coro_fn()))
+        self._calls[call_key] = call
+        call.task.add_done_callback(lambda _: self._calls.pop(call_key, None))
+        result = await asyncio.shield(call.task)
+        return result, call.waiters > 0
@@ -0,0 +1,292 @@
+"""
+Compact charging station records.
+
+Station is a __slots__ record for code that works with one station at a
+time; StationTable keeps many stations column-wise in typed arrays. Both
+intern repeated strings (network names, "Town, ST" locations) and share
+immutable slot/amenity defaults instead of allocating them per station,
+and both serialize to the dictionary shape the tools have always returned.
+"""
+
+import math
+import sys
+from array import array
+from typing import Iterable, Optional, Union
+
+# Same mock slots the API client has always attached to every station
+DEFAULT_SLOTS = ("10:00", "10:30", "11:00", "11:30", "12:00")
+NO_AMENITIES = ()
+UNKNOWN_NETWORK = "Unknown Network"
+
+class Station:
+    """One charging station as a slotted record."""
+
+    __slots__ = (
+        "id", "network", "location", "address", "latitude", "longitude",
+        "power_kw", "price_per_kwh", "available", "distance_from_origin_km", "detour_km",
+    )
+
+    # Shared by every station; nothing populates these per station yet
+    slots = DEFAULT_SLOTS
+    amenities = NO_AMENITIES
+
+    def __init__(
+        self,
+        id: str,
+        network: str,
+        location: str,
+        address: str,
+        latitude: float,
+        longitude: float,
+        power_kw: int,
+        price_per_kwh: float,
+        available: bool = True,
+        distance_from_origin_km: Optional[float] = None,
+        detour_km: Optional[float] = None
+    ):
+        self.id = id
+        self.network = sys.intern(network or UNKNOWN_NETWORK)
+        self.location = sys.intern(location or "")
+        self.address = address
+        self.latitude = latitude
+        self.longitude = longitude
+        self.power_kw = power_kw
+        self.price_per_kwh = price_per_kwh
+        self.available = available
+        self.distance_from_origin_km = distance_from_origin_km
+        self.detour_km = detour_km
+
+    @classmethod
+    def from_dict(cls, station: dict) -> "Station":
+        """
+        Build a record from a station dictionary.
+
+        Args:
+            station: Station dictionary in the format produced by parse_openchargemap_response
+
+        Returns:
+            Station record
+        """
+        return cls(
+            station['id'],
+            station.get('network'),
+            station.get('location', ''),
+            station.get('address', ''),
+            float(station['latitude']),
+            float(station['longitude']),
+            int(station.get('power_kw') or 0),
+            float(station.get('price_per_kwh') or 0),
+            bool(station.get('available', True)),
+            station.get('distance_from_origin_km'),
+            station.get('detour_km'),
+        )
+
+    def to_dict(self) -> dict:
+        """
+        Serialize to the station dictionary shape used by the tools.
+
+        Returns:
+            Charging station dictionary
+        """
+        station = {
+            "id": self.id,
+            "network": self.network,
+            "location": self.location,
+            "address": self.address,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "power_kw": self.power_kw,
+            "price_per_kwh": self.price_per_kwh,
+            "available": self.available,
+            "slots": DEFAULT_SLOTS,
+            "amenities": NO_AMENITIES,
+        }
+        if self.distance_from_origin_km is not None:
+            station["distance_from_origin_km"] = self.distance_from_origin_km
+        if self.detour_km is not None:
+            station["detour_km"] = self.detour_km
+        return station
+
+    def __repr__(self) -> str:
+        return f"Station({self.id!r}, {self.network!r}, {self.location!r}, {self.power_kw} kW)"
+
+class StationTable:
+    """Struct-of-arrays station table: one typed array or list per field."""
+
+    def __init__(self):
+        self.ids = []
+        self.networks = []
+        self.locations = []
+        self.addresses = []
+        self.latitudes = array('d')
+        self.longitudes = array('d')
+        self.power_kw = array('f')
+        self.price_per_kwh = array('d')
+        self.available = array('b')
+        # Only allocated once a station carrying a distance/detour is appended
+        self.distances = None
+        self.detours = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_stations(cls, stations: Iterable[Union[dict, Station]]) -> "StationTable":
+        """
+        Build a table from station dictionaries or records.
+
+        Args:
+            stations: Stations to append, in order
+
+        Returns:
+            Populated StationTable
+        """
+        table = cls()
+        for station in stations:
+            table.append(station)
+        return table
+
+    def append(self, station: Union[dict, Station]) -> int:
+        """
+        Append a station.
+
+        Args:
+            station: Station dictionary or Station record
+
+        Returns:
+            Row index of the new station
+        """
+        if isinstance(station, Station):
+            station = station.to_dict()
+
+        row = len(self.ids)
+        self.ids.append(station['id'])
+        self.networks.append(sys.intern(station.get('network') or UNKNOWN_NETWORK))
+        self.locations.append(sys.intern(station.get('location') or ''))
+        self.addresses.append(station.get('address', ''))
+        self.latitudes.append(float(station['latitude']))
+        self.longitudes.append(float(station['longitude']))
+        self.power_kw.append(float(station.get('power_kw') or 0))
+        self.price_per_kwh.append(float(station.get('price_per_kwh') or 0))
+        self.available.append(1 if station.get('available', True) else 0)
+
+        self.distances = self._append_optional(self.distances, row, station.get('distance_from_origin_km'))
+        self.detours = self._append_optional(self.detours, row, station.get('detour_km'))
+        return row
+
+    @staticmethod
+    def _append_optional(column: Optional[array], row: int, value: Optional[float]) -> Optional[array]:
+        # Optional columns are NaN-padded for the rows appended before the first value
+        if value is not None and column is None:
+            column = array('d', [math.nan]) * row
+        if column is not None:
+            column.append(math.nan if value is None else float(value))
+        return column
+
+    def set_row(self, row: int, station: Union[dict, Station]):
+        """
+        Overwrite an existing row in place.
+
+        Args:
+            row: Row index
+            station: New station dictionary or Station record
+        """
+        if isinstance(station, Station):
+            station = station.to_dict()
+
+        self.ids[row] = station['id']
+        self.networks[row] = sys.intern(station.get('network') or UNKNOWN_NETWORK)
+        self.locations[row] = sys.intern(station.get('location') or '')
+        self.addresses[row] = station.get('address', '')
+        self.latitudes[row] = float(station['latitude'])
+        self.longitudes[row] = float(station['longitude'])
+        self.power_kw[row] = float(station.get('power_kw') or 0)
+        self.price_per_kwh[row] = float(station.get('price_per_kwh') or 0)
+        self.available[row] = 1 if station.get('available', True) else 0
+
+    def take(self, rows: Iterable[int]) -> "StationTable":
+        """
+        Copy selected rows, in the given order, into a new table.
+
+        Args:
+            rows: Row indices (e.g. an argsort order)
+
+        Returns:
+            New StationTable
+        """
+        rows = [int(row) for row in rows]
+        table = StationTable()
+        table.ids = [self.ids[row] for row in rows]
+        table.networks = [self.networks[row] for row in rows]
+        table.locations = [self.locations[row] for row in rows]
+        table.addresses = [self.addresses[row] for row in rows]
+        table.latitudes = array('d', (self.latitudes[row] for row in rows))
+        table.longitudes = array('d', (self.longitudes[row] for row in rows))
+        table.power_kw = array('f', (self.power_kw[row] for row in rows))
+        table.price_per_kwh = array('d', (self.price_per_kwh[row] for row in rows))
+        table.available = array('b', (self.available[row] for row in rows))
+        if self.distances is not None:
+            table.distances = array('d', (self.distances[row] for row in rows))
+        if self.detours is not None:
+            table.detours = array('d', (self.detours[row] for row in rows))
+        return table
+
+    def distance(self, row: int) -> Optional[float]:
+        if self.distances is None or math.isnan(self.distances[row]):
+            return None
+        return self.distances[row]
+
+    def detour(self, row: int) -> Optional[float]:
+        if self.detours is None or math.isnan(self.detours[row]):
+            return None
+        return self.detours[row]
+
+    def record(self, row: int) -> Station:
+        """
+        Materialize one row as a Station record.
+
+        Args:
+            row: Row index
+
+        Returns:
+            Station record
+        """
+        return Station(
+            self.ids[row],
+            self.networks[row],
+            self.locations[row],
+            self.addresses[row],
+            self.latitudes[row],
+            self.longitudes[row],
+            int(self.power_kw[row]),
+            self.price_per_kwh[row],
+            bool(self.available[row]),
+            self.distance(row),
+            self.detour(row),
+        )
+
+    def station(self, row: int) -> dict:
+        """
+        Materialize one row in the same shape the API client returns.
+
+        Args:
+            row: Row index
+
+        Returns:
+            Charging station dictionary
+        """
+        return self.record(row).to_dict()
+
+    def stations(self, rows: Optional[Iterable[int]] = None) -> list[dict]:
+        """
+        Materialize several rows (all rows if None) as station dictionaries.
+
+        Args:
+            rows: Row indices
+
+        Returns:
+            List of charging station dictionaries
+        """
+        if rows is None:
+            rows = range(len(self))
+        return [self.station(row) for row in rows]
@@ -0,0 +1,254 @@
+"""
+Persistent on-disk cache of OpenChargeMap results, keyed by geohash tile and
+minimum power filter.
+
+Each tile entry carries its own TTL. Entries past their TTL but still inside
+the stale window are served immediately while a background thread refreshes
+them (stale-while-revalidate), so repeat corridor lookups never wait on the
+OpenChargeMap API once a tile has been seen.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Optional
+from utils.config import (
+    STATION_CACHE_ENABLED,
+    STATION_CACHE_PATH,
+    STATION_CACHE_TTL_SECONDS,
+    STATION_CACHE_STALE_SECONDS,
+)
+
+# Tiles with no stations change rarely, so they are kept longer
+EMPTY_TILE_TTL_FACTOR = 4
+# Spread expiry of neighbouring tiles so a corridor doesn't expire all at once
+TTL_JITTER = 0.1
+
+FRESH = "fresh"
+STALE = "stale"
+EXPIRED = "expired"
+MISS = "miss"
+
+class StationTileCache:
+    """SQLite-backed cache of parsed station lists per (tile, min_power_kw)."""
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: int = STATION_CACHE_TTL_SECONDS,
+        stale_seconds: int = STATION_CACHE_STALE_SECONDS
+    ):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            ttl_seconds: Base time a tile is considered fresh
+            stale_seconds: Extra time a tile may be served while it refreshes
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tiles ("
+            " tile TEXT NOT NULL,"
+            " min_power_kw INTEGER NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " ttl REAL NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " PRIMARY KEY (tile, min_power_kw))"
+        )
+
+    def get(self, tile: str, min_power_kw: int) -> tuple[Optional[list[dict]], str]:
+        """
+        Look up a tile.
+
+        Args:
+            tile: Tile key (geohash based)
+            min_power_kw: Minimum power filter the tile was fetched with
+
+        Returns:
+            Tuple of (stations or None, status) where status is one of
+            "fresh", "stale", "expired" or "miss"
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, ttl, payload FROM tiles WHERE tile = ? AND min_power_kw = ?",
+                (tile, int(min_power_kw))
+            ).fetchone()
+
+        if row is None:
+            return None, MISS
+
+        fetched_at, ttl, payload = row
+        age = time.time() - fetched_at
+        if age <= ttl:
+            status = FRESH
+        elif age <= ttl + self.stale_seconds:
+            status = STALE
+        else:
+            status = EXPIRED
+        return json.loads(payload), status
+
+    def put(self, tile: str, min_power_kw: int, stations: list[dict], ttl_seconds: Optional[float] = None):
+        """
+        Store the stations for a tile.
+
+        Args:
+            tile: Tile key (geohash based)
+            min_power_kw: Minimum power filter the tile was fetched with
+            stations: Parsed station dictionaries
+            ttl_seconds: Explicit TTL; defaults to the base TTL (longer for empty tiles) with jitter
+        """
+        if ttl_seconds is None:
+            ttl_seconds = self.ttl_seconds * (EMPTY_TILE_TTL_FACTOR if not stations else 1)
+            ttl_seconds *= random.uniform(1 - TTL_JITTER, 1 + TTL_JITTER)
+
+        payload = json.dumps(stations, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tiles (tile, min_power_kw, fetched_at, ttl, payload) VALUES (?, ?, ?, ?, ?)",
+                (tile, int(min_power_kw), time.time(), ttl_seconds, payload)
+            )
+
+    def get_or_fetch(self, tile: str, min_power_kw: int, fetch: Callable[[], list[dict]]) -> list[dict]:
+        """
+        Return cached stations for a tile, calling fetch only when needed.
+
+        Fresh tiles are returned as-is. Stale tiles are returned immediately and
+        refreshed in the background. Missing or expired tiles are fetched inline;
+        if that fetch fails, expired data is served rather than nothing.
+
+        Args:
+            tile: Tile key (geohash based)
+            min_power_kw: Minimum power filter
+            fetch: Zero-argument callable returning the tile's stations from the API
+
+        Returns:
+            List of station dictionaries for the tile
+        """
+        stations, status = self.get(tile, min_power_kw)
+
+        if status == FRESH:
+            return stations
+
+        if status == STALE:
+            self._refresh_in_background(tile, min_power_kw, fetch)
+            return stations
+
+        try:
+            fresh_stations = fetch()
+        except Exception:
+            if stations is not None:
+                print(f"⚠️  Refresh of tile {tile} failed, serving expired cache entry")
+                return stations
+            raise
+
+        self.put(tile, min_power_kw, fresh_stations)
+        return fresh_stations
+
+    async def get_or_fetch_async(
+        self,
+        tile: str,
+        min_power_kw: int,
+        fetch_async: Callable[[], Awaitable[list[dict]]],
+        fetch: Callable[[], list[dict]]
+    ) -> list[dict]:
+        """
+        Async counterpart of get_or_fetch.
+        Misses are fetched with fetch_async on the caller's event loop; stale
+        tiles are refreshed with the blocking fetch on a background thread so
+        the refresh outlives the request that triggered it.
+
+        Args:
+            tile: Tile key (geohash based)
+            min_power_kw: Minimum power filter
+            fetch_async: Zero-argument coroutine function returning the tile's stations
+            fetch: Blocking equivalent used for background refreshes
+
+        Returns:
+            List of station dictionaries for the tile
+        """
+        stations, status = self.get(tile, min_power_kw)
+
+        if status == FRESH:
+            return stations
+
+        if status == STALE:
+            self._refresh_in_background(tile, min_power_kw, fetch)
+            return stations
+
+        try:
+            fresh_stations = await fetch_async()
+        except Exception:
+            if stations is not None:
+                print(f"⚠️  Refresh of tile {tile} failed, serving expired cache entry")
+                return stations
+            raise
+
+        self.put(tile, min_power_kw, fresh_stations)
+        return fresh_stations
+
+    def invalidate(self, tile: Optional[str] = None):
+        """
+        Drop cached tiles.
+
+        Args:
+            tile: Tile key to drop (all power filters); drops everything if None
+        """
+        with self._lock:
+            if tile is None:
+                self._conn.execute("DELETE FROM tiles")
+            else:
+                self._conn.execute("DELETE FROM tiles WHERE tile = ?", (tile,))
+
+    def _refresh_in_background(self, tile: str, min_power_kw: int, fetch: Callable[[], list[dict]]):
+        key = (tile, int(min_power_kw))
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.put(tile, min_power_kw, fetch())
+            except Exception as e:
+                print(f"⚠️  Background refresh of tile {tile} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f"tile-refresh-{tile}", daemon=True).start()
+
+_cache: Optional[StationTileCache] = None
+_cache_lock = threading.Lock()
+
+def get_station_cache() -> Optional[StationTileCache]:
+    """
+    Get the process-wide station tile cache.
+
+    Returns:
+        Shared StationTileCache, or None if caching is disabled or the cache file can't be opened
+    """
+    global _cache
+    if not STATION_CACHE_ENABLED:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = StationTileCache(STATION_CACHE_PATH)
+            except (sqlite3.Error, OSError) as e:
+                print(f"⚠️  Station cache unavailable ({e}), continuing without cache")
+                return None
+        return _cache
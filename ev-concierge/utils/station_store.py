@@ -0,0 +1,378 @@
+"""
+Offline charging station store built from an OpenChargeMap bulk export.
+
+Stations are held column-wise (compact typed arrays for lat/lon/power/price/
+status, plain lists for the text fields) with a uniform lat/lon grid as the
+spatial index, so corridor lookups run fully in memory with no network calls.
+"""
+
+import json
+import os
+import pickle
+import sys
+import threading
+from typing import Iterable, Iterator, Optional
+from utils import geohash
+from utils.config import STATION_SNAPSHOT_PATH, STATION_SYNC_ENABLED
+from utils.json_stream import iter_json_file_array
+from utils.station import StationTable
+
+# Size of a spatial index cell in degrees (~55 km of latitude)
+GRID_CELL_DEG = 0.5
+# Bump when the on-disk layout changes so old snapshots get re-ingested
+STORE_FORMAT_VERSION = 1
+
+def _grid_cell(latitude: float, longitude: float) -> tuple[int, int]:
+    return (int(latitude // GRID_CELL_DEG), int(longitude // GRID_CELL_DEG))
+
+class StationStore(StationTable):
+    """Columnar in-memory station table with a grid spatial index."""
+
+    def __init__(self):
+        super().__init__()
+        self.grid = {}
+        self.rows_by_id = {}
+        # Rows of stations removed by a delta sync (kept in the columns, dropped from the index)
+        self.removed = set()
+        # Bumped on every in-place change so dependent caches can tell they are stale
+        self.version = 0
+        # Epoch seconds up to which OpenChargeMap changes are included
+        self.synced_through = None
+        self._write_lock = threading.Lock()
+
+    @property
+    def station_count(self) -> int:
+        """Number of live stations (len() counts the table rows, removed ones included)."""
+        return len(self.ids) - len(self.removed)
+
+    def stations(self, rows: Optional[Iterable[int]] = None) -> list[dict]:
+        """
+        Materialize several rows (all live rows if None) as station dictionaries.
+
+        Args:
+            rows: Row indices
+
+        Returns:
+            List of charging station dictionaries
+        """
+        if rows is None:
+            rows = (row for row in range(len(self)) if row not in self.removed)
+        return super().stations(rows)
+
+    def add(self, station: dict):
+        """
+        Append a parsed station and index it.
+
+        Args:
+            station: Station dictionary in the format produced by parse_openchargemap_response
+        """
+        row = self.append(station)
+        self.rows_by_id[station['id']] = row
+        self.grid.setdefault(_grid_cell(self.latitudes[row], self.longitudes[row]), []).append(row)
+
+    def upsert(self, station: dict) -> bool:
+        """
+        Insert a new station or update an existing one in place.
+
+        The spatial index is updated incrementally and copy-on-write: touched
+        cells get new row lists, so readers iterating a cell are never disturbed
+        and never have to take a lock.
+
+        Args:
+            station: Station dictionary in the format produced by parse_openchargemap_response
+
+        Returns:
+            True if the station was new
+        """
+        with self._write_lock:
+            row = self.rows_by_id.get(station['id'])
+            if row is None:
+                row = self.append(station)
+                self.rows_by_id[station['id']] = row
+                self._index_row(row, _grid_cell(self.latitudes[row], self.longitudes[row]))
+                self.version += 1
+                return True
+
+            old_cell = _grid_cell(self.latitudes[row], self.longitudes[row])
+            self.set_row(row, station)
+            new_cell = _grid_cell(self.latitudes[row], self.longitudes[row])
+            if new_cell != old_cell:
+                self._index_row(row, new_cell)
+                self._unindex_row(row, old_cell)
+            self.version += 1
+            return False
+
+    def remove(self, station_id: str) -> bool:
+        """
+        Drop a station from the index (e.g. decommissioned upstream).
+
+        Args:
+            station_id: Station ID (e.g. "OCM-12345")
+
+        Returns:
+            True if the station was present
+        """
+        with self._write_lock:
+            row = self.rows_by_id.pop(station_id, None)
+            if row is None:
+                return False
+            self._unindex_row(row, _grid_cell(self.latitudes[row], self.longitudes[row]))
+            self.removed.add(row)
+            self.version += 1
+            return True
+
+    def _index_row(self, row: int, cell: tuple[int, int]):
+        self.grid[cell] = [*self.grid.get(cell, ()), row]
+
+    def _unindex_row(self, row: int, cell: tuple[int, int]):
+        remaining = [r for r in self.grid.get(cell, ()) if r != row]
+        if remaining:
+            self.grid[cell] = remaining
+        else:
+            self.grid.pop(cell, None)
+
+    def query_bbox(
+        self,
+        south: float,
+        north: float,
+        west: float,
+        east: float,
+        min_power_kw: float = 0
+    ) -> list[int]:
+        """
+        Find the rows of stations inside a bounding box.
+
+        Args:
+            south: Minimum latitude
+            north: Maximum latitude
+            west: Minimum longitude
+            east: Maximum longitude
+            min_power_kw: Minimum power rating filter
+
+        Returns:
+            List of row indices, in ascending order
+        """
+        cell_south, cell_west = _grid_cell(south, west)
+        cell_north, cell_east = _grid_cell(north, east)
+        latitudes, longitudes, power = self.latitudes, self.longitudes, self.power_kw
+
+        rows = []
+        for cell_lat in range(cell_south, cell_north + 1):
+            for cell_lon in range(cell_west, cell_east + 1):
+                for row in self.grid.get((cell_lat, cell_lon), ()):
+                    if (south <= latitudes[row] <= north and west <= longitudes[row] <= east
+                            and power[row] >= min_power_kw):
+                        rows.append(row)
+        rows.sort()
+        return rows
+
+    def corridor_stations(self, tiles: list[str], min_power_kw: float = 0) -> list[dict]:
+        """
+        Collect the stations inside a set of geohash tiles.
+
+        Args:
+            tiles: Geohash tiles covering the corridor, in route order
+            min_power_kw: Minimum power rating filter
+
+        Returns:
+            List of station dictionaries, each station at most once
+        """
+        seen = set()
+        stations = []
+        for tile in tiles:
+            lat_min, lat_max, lon_min, lon_max = geohash.decode_bbox(tile)
+            for row in self.query_bbox(lat_min, lat_max, lon_min, lon_max, min_power_kw):
+                if row not in seen:
+                    seen.add(row)
+                    stations.append(self.station(row))
+        return stations
+
+    def save(self, path: str):
+        """
+        Write the store to disk.
+
+        Args:
+            path: Destination file
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Removed stations are compacted away rather than written out
+        table = self.take(r for r in range(len(self)) if r not in self.removed) if self.removed else self
+        state = {
+            "version": STORE_FORMAT_VERSION,
+            "synced_through": self.synced_through,
+            "ids": table.ids,
+            "networks": table.networks,
+            "locations": table.locations,
+            "addresses": table.addresses,
+            "latitudes": table.latitudes.tobytes(),
+            "longitudes": table.longitudes.tobytes(),
+            "power_kw": table.power_kw.tobytes(),
+            "price_per_kwh": table.price_per_kwh.tobytes(),
+            "available": table.available.tobytes(),
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "StationStore":
+        """
+        Read a store written by save() and rebuild its spatial index.
+
+        Args:
+            path: Store file
+
+        Returns:
+            Loaded StationStore
+
+        Raises:
+            ValueError: If the file was written by an incompatible version
+        """
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+
+        if state.get("version") != STORE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported station store version: {state.get('version')}")
+
+        store = cls()
+        store.synced_through = state.get("synced_through")
+        store.ids = state["ids"]
+        store.networks = [sys.intern(n) for n in state["networks"]]
+        store.locations = [sys.intern(n) for n in state["locations"]]
+        store.addresses = state["addresses"]
+        store.latitudes.frombytes(state["latitudes"])
+        store.longitudes.frombytes(state["longitudes"])
+        store.power_kw.frombytes(state["power_kw"])
+        store.price_per_kwh.frombytes(state["price_per_kwh"])
+        store.available.frombytes(state["available"])
+
+        store.rows_by_id = {station_id: row for row, station_id in enumerate(store.ids)}
+        for row, (latitude, longitude) in enumerate(zip(store.latitudes, store.longitudes)):
+            store.grid.setdefault(_grid_cell(latitude, longitude), []).append(row)
+
+        return store
+
+def iter_export_pois(path: str) -> Iterator[dict]:
+    """
+    Read POIs from an OpenChargeMap export on local disk.
+    Accepts a JSON array file, a newline-delimited JSON file (.jsonl/.ndjson),
+    or a directory of .json files (each a POI or a list of POIs).
+
+    Args:
+        path: Export file or directory
+
+    Returns:
+        Iterator over raw POI dictionaries
+    """
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.endswith('.json'):
+                    yield from iter_export_pois(os.path.join(root, name))
+        return
+
+    if path.endswith(('.jsonl', '.ndjson')):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        return
+
+    with open(path, 'rb') as f:
+        head = f.read(1024).lstrip()
+    if head.startswith(b'['):
+        # Decode large array exports incrementally instead of loading them whole
+        yield from iter_json_file_array(path)
+        return
+
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        yield data
+    else:
+        yield from data
+
+def build_store(pois: Iterable[dict]) -> StationStore:
+    """
+    Build a station store from raw OpenChargeMap POIs.
+    POIs with the same ID keep the last occurrence's data.
+
+    Args:
+        pois: Raw POI dictionaries
+
+    Returns:
+        Populated StationStore
+    """
+    from utils.openchargemap_client import iter_openchargemap_stations
+
+    by_id = {}
+    for station in iter_openchargemap_stations(pois):
+        by_id[station['id']] = station
+
+    store = StationStore()
+    for station in by_id.values():
+        store.add(station)
+    return store
+
+def load_ocm_export(export_path: str, store_path: Optional[str] = None) -> StationStore:
+    """
+    Ingest an OpenChargeMap bulk export into a station store.
+
+    Args:
+        export_path: Export file or directory (see iter_export_pois)
+        store_path: Optional file to save the compact store to
+
+    Returns:
+        Populated StationStore
+    """
+    store = build_store(iter_export_pois(export_path))
+    # Changes after the export was written are picked up by the delta sync
+    store.synced_through = os.path.getmtime(export_path)
+    print(f"📦 Loaded {store.station_count} stations from {export_path}")
+    if store_path:
+        store.save(store_path)
+    return store
+
+_store: Optional[StationStore] = None
+_store_lock = threading.Lock()
+
+def get_snapshot_store() -> Optional[StationStore]:
+    """
+    Get the process-wide snapshot store, loading it on first use.
+    STATION_SNAPSHOT_PATH may point at a saved store (.store) or directly at
+    an OpenChargeMap export, which is ingested in memory.
+
+    Returns:
+        Shared StationStore, or None if no snapshot is configured or it can't be read
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            if not STATION_SNAPSHOT_PATH or not os.path.exists(STATION_SNAPSHOT_PATH):
+                print(f"⚠️  Station snapshot not found: {STATION_SNAPSHOT_PATH or '(STATION_SNAPSHOT_PATH not set)'}")
+                return None
+            try:
+                if STATION_SNAPSHOT_PATH.endswith('.store'):
+                    _store = StationStore.load(STATION_SNAPSHOT_PATH)
+                else:
+                    _store = load_ocm_export(STATION_SNAPSHOT_PATH)
+            except (OSError, ValueError, pickle.UnpicklingError) as e:
+                print(f"❌ Could not load station snapshot: {e}")
+                return None
+
+            if STATION_SYNC_ENABLED:
+                # Imported here: the sync job depends on the API client, which imports this module
+                from utils.station_sync import start_station_sync
+                start_station_sync(_store)
+        return _store
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m utils.station_store <ocm-export.json|dir> <output.store>")
+        sys.exit(1)
+    load_ocm_export(sys.argv[1], sys.argv[2])
@@ -0,0 +1,220 @@
+"""
+Incremental delta sync of the offline station store.
+
+After a snapshot is loaded, a background job periodically asks OpenChargeMap
+for the POIs modified since the last sync (its modifiedsince filter, oldest
+first) and merges them into the store in place: changed stations are overwritten,
+new ones appended, decommissioned ones dropped from the spatial index.
+Only the touched grid cells change, and readers never wait on the sync.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from utils.config import (
+    OPENCHARGEMAP_BASE_URL,
+    OPENCHARGEMAP_COMPACT,
+    STATION_SNAPSHOT_PATH,
+    STATION_SYNC_INTERVAL_SECONDS,
+    STATION_SYNC_MAX_RESULTS,
+    STATION_SYNC_COUNTRY_CODE,
+)
+from utils.http_client import get_http_client
+from utils.json_stream import CHUNK_SIZE, iter_json_array
+from utils.ocm_reference import get_reference_data
+from utils.station_store import StationStore
+
+# OpenChargeMap status types for POIs that no longer exist
+REMOVED_STATUS_TYPE_IDS = frozenset({200, 210})
+# Overlap between syncs so changes committed while a sync ran aren't missed
+SYNC_OVERLAP_SECONDS = 120
+
+def _format_modified_since(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+def _parse_ocm_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+def _is_removed(poi: dict) -> bool:
+    status_id = poi.get('StatusTypeID')
+    if status_id is None and poi.get('StatusType'):
+        status_id = poi['StatusType'].get('ID')
+    return status_id in REMOVED_STATUS_TYPE_IDS
+
+def _merge_changes(store: StationStore, params: dict, reference, stats: dict) -> tuple[int, Optional[float]]:
+    """
+    Fetch one page of changed POIs and merge it into the store.
+
+    Returns:
+        Tuple of (POIs received, change time of the last one that had one)
+    """
+    # Imported here: the API client imports the store module
+    from utils.openchargemap_client import iter_openchargemap_stations
+
+    received = 0
+    last_change = None
+    with get_http_client().get(f"{OPENCHARGEMAP_BASE_URL}/poi/", params=params, stream=True) as response:
+        for poi in iter_json_array(response.iter_content(chunk_size=CHUNK_SIZE)):
+            received += 1
+            changed_at = _parse_ocm_date(poi.get('DateLastStatusUpdate'))
+            if changed_at is not None:
+                last_change = changed_at
+
+            if _is_removed(poi):
+                if store.remove(f"OCM-{poi.get('ID', 'unknown')}"):
+                    stats["removed"] += 1
+                continue
+
+            for station in iter_openchargemap_stations((poi,), reference=reference):
+                if store.upsert(station):
+                    stats["added"] += 1
+                else:
+                    stats["updated"] += 1
+    stats["received"] += received
+    return received, last_change
+
+def sync_once(store: StationStore, api_key: str, since: Optional[float] = None) -> dict:
+    """
+    Pull the POIs changed since the last sync and merge them into the store.
+    Changes are requested oldest first, and a page that hits
+    STATION_SYNC_MAX_RESULTS is followed by one starting at its last change.
+
+    Args:
+        store: Station store to update in place
+        api_key: OpenChargeMap API key
+        since: Epoch seconds to sync from (defaults to store.synced_through)
+
+    Returns:
+        Dictionary with counts of added, updated and removed stations
+
+    Raises:
+        requests.exceptions.RequestException: If the API request fails
+    """
+    from utils.openchargemap_client import clear_corridor_memo
+
+    started_at = time.time()
+    since = since if since is not None else store.synced_through
+    if since is None:
+        since = started_at - STATION_SYNC_INTERVAL_SECONDS
+
+    reference = get_reference_data(api_key) if OPENCHARGEMAP_COMPACT else None
+    params = {
+        "key": api_key,
+        "maxresults": STATION_SYNC_MAX_RESULTS,
+        # Oldest change first, so a truncated page ends at a point every missing change is after
+        "sortby": "modified_asc",
+        "compact": "true" if reference is not None else "false",
+        "verbose": "false",
+    }
+    if STATION_SYNC_COUNTRY_CODE:
+        params["countrycode"] = STATION_SYNC_COUNTRY_CODE
+
+    stats = {"added": 0, "updated": 0, "removed": 0, "received": 0}
+    modified_since = since - SYNC_OVERLAP_SECONDS
+    while True:
+        params["modifiedsince"] = _format_modified_since(modified_since)
+        received, last_change = _merge_changes(store, params, reference, stats)
+        if received < STATION_SYNC_MAX_RESULTS:
+            store.synced_through = started_at
+            break
+        if last_change is None or last_change <= modified_since:
+            # The page didn't get past its start: retry from the same point next run
+            print(f"⚠️  Station sync hit the {STATION_SYNC_MAX_RESULTS} result limit, continuing next run")
+            store.synced_through = modified_since + SYNC_OVERLAP_SECONDS
+            break
+        # Truncated page: the changes not received yet are all at or after its last one
+        modified_since = last_change
+
+    if stats["added"] or stats["updated"] or stats["removed"]:
+        # Corridors computed from the old data must not be served again
+        clear_corridor_memo()
+    return stats
+
+class StationSyncJob:
+    """Background thread running sync_once on a fixed interval."""
+
+    def __init__(
+        self,
+        store: StationStore,
+        api_key: str,
+        interval_seconds: float = STATION_SYNC_INTERVAL_SECONDS,
+        save_path: Optional[str] = None
+    ):
+        """
+        Args:
+            store: Station store to keep fresh
+            api_key: OpenChargeMap API key
+            interval_seconds: Time between syncs
+            save_path: If set, the store is saved here after each sync that changed it
+        """
+        self.store = store
+        self.api_key = api_key
+        self.interval_seconds = interval_seconds
+        self.save_path = save_path
+        self.last_stats = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self) -> Optional[dict]:
+        """Run one sync, logging instead of raising on failure."""
+        try:
+            stats = sync_once(self.store, self.api_key)
+        except Exception as e:
+            print(f"⚠️  Station sync failed: {e}")
+            return None
+
+        self.last_stats = stats
+        changed = stats["added"] + stats["updated"] + stats["removed"]
+        if changed:
+            print(f"🔄 Station sync: +{stats['added']} new, {stats['updated']} updated, -{stats['removed']} removed")
+        if changed and self.save_path:
+            try:
+                self.store.save(self.save_path)
+            except OSError as e:
+                print(f"⚠️  Could not save synced station store: {e}")
+        return stats
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="station-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        # Sync right away: a snapshot is usually older than one interval
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval_seconds)
+
+def start_station_sync(store: StationStore) -> Optional[StationSyncJob]:
+    """
+    Start keeping a snapshot store fresh in the background.
+
+    Args:
+        store: Loaded snapshot store
+
+    Returns:
+        Running StationSyncJob, or None if no OpenChargeMap API key is configured
+    """
+    api_key = os.getenv('OPENCHARGEMAP_API_KEY', '')
+    if not api_key:
+        print("⚠️  OpenChargeMap API key not found, station snapshot will not be synced")
+        return None
+
+    save_path = STATION_SNAPSHOT_PATH if STATION_SNAPSHOT_PATH.endswith('.store') else None
+    job = StationSyncJob(store, api_key, save_path=save_path)
+    job.start()
+    return job
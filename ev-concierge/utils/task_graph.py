@@ -0,0 +1,100 @@
+"""
+A small scheduler for async steps with dependencies.
+
+Steps are added with the names of the steps they depend on, which must have
+been added before them, so the graph can't have cycles. run() starts every
+step as soon as its dependencies have finished, so independent branches run
+concurrently and the total time is that of the critical path. Each step gets
+its dependencies' results, and run() returns all results in the order the
+steps were added, whatever order they finished in.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Iterable, NamedTuple
+
+class StepTiming(NamedTuple):
+    # Seconds since the start of the run
+    started: float
+    finished: float
+
+class TaskGraph:
+    """Named async steps run concurrently as soon as their dependencies finish."""
+
+    def __init__(self):
+        self._steps = {}
+        self.timings = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._steps
+
+    def add(self, name: str, fn: Callable[[dict], Awaitable[Any]], deps: Iterable[str] = ()):
+        """
+        Add a step.
+
+        Args:
+            name: Step name (its result is stored under it)
+            fn: Coroutine function called with a {dependency name: result} dictionary
+            deps: Names of the steps it needs
+
+        Raises:
+            ValueError: If the name is taken or a dependency hasn't been added yet
+        """
+        deps = tuple(deps)
+        if name in self._steps:
+            raise ValueError(f"Step '{name}' is already in the graph")
+        missing = [dep for dep in deps if dep not in self._steps]
+        if missing:
+            raise ValueError(f"Step '{name}' depends on unknown steps: {', '.join(missing)}")
+        self._steps[name] = (fn, deps)
+
+    async def run(self) -> dict:
+        """
+        Run every step once.
+
+        Returns:
+            {step name: result} in the order the steps were added
+
+        Raises:
+            The first exception raised by a step; the steps still running are cancelled
+        """
+        self.timings = {}
+        start = time.perf_counter()
+        tasks = {}
+
+        async def run_step(name, fn, deps):
+            if deps:
+                await asyncio.gather(*(tasks[dep] for dep in deps))
+            started = time.perf_counter() - start
+            try:
+                return await fn({dep: tasks[dep].result() for dep in deps})
+            finally:
+                self.timings[name] = StepTiming(started, time.perf_counter() - start)
+
+        for name, (fn, deps) in self._steps.items():
+            tasks[name] = asyncio.ensure_future(run_step(name, fn, deps))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return {name: tasks[name].result() for name in self._steps}
+
+    def critical_path(self) -> list[str]:
+        """
+        Steps of the last run's critical path: from the last step to finish,
+        back through the dependency that finished last at each step.
+        """
+        if not self.timings:
+            return []
+        name = max(self.timings, key=lambda step: self.timings[step].finished)
+        path = [name]
+        while True:
+            deps = [dep for dep in self._steps[name][1] if dep in self.timings]
+            if not deps:
+                break
+            name = max(deps, key=lambda dep: self.timings[dep].finished)
+            path.append(name)
+        return path[::-1]